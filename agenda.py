@@ -0,0 +1,314 @@
+"""
+MÓDULO DE AGENDA
+Carga de tareas por día (en curso y que vencen) para ver una semana o un mes
+
+UTILIDAD:
+Para cada día de una semana o de un mes muestra cuántas tareas pendientes
+están en curso (ya empezaron y todavía no vencieron) y cuántas vencen ese día,
+y avisa de los días sobrecargados (ver obtener_indicador_carga en herramientas.py).
+
+ESTRUCTURA (arreglo de diferencias sobre los ordinales de las fechas):
+Una tarea pendiente que va del día I al día F suma +1 en I y -1 en F+1. La
+cantidad en curso un día D es la suma de las diferencias hasta D inclusive:
+- _diferencias guarda esas sumas por día y _vencen cuántas vencen cada día
+  (diccionarios: solo ocupan los días que tienen algo)
+- Un árbol de Fenwick sobre las mismas diferencias da la suma hasta el primer
+  día de la ventana en O(log días); desde ahí cada día siguiente es una suma
+  más. Una semana o un mes se arma en O(días), sin importar cuántas tareas haya
+- Cada alta, baja o cambio de una tarea toca dos o tres posiciones: se
+  mantiene al día con los eventos del bus, sin recorrer las tareas
+
+La estructura se arma la primera vez que se pide (se importa recién ahí) y es
+del inquilino activo: si se cambia de inquilino, se vuelve a armar al pedirla.
+Las ocurrencias de tareas recurrentes (ver recurrencias.py) no están en la
+estructura: se calculan solo las de la ventana y se suman en un arreglo de
+diferencias local.
+
+DEPENDENCIAS:
+- datetime, calendar: Módulos estándar de Python para fechas y meses
+- eventos.py: Para mantener la estructura al día y saber el inquilino activo
+- gestor_tareas.py: Necesita obtener_tareas() para armar la estructura
+- recurrencias.py: Necesita ocurrencias() para las tareas recurrentes
+- herramientas.py: Fechas (hoy sale de fecha_de_hoy(), el reloj del programa),
+  indicadores de urgencia y de carga, y la interfaz
+
+¿POR QUÉ UN MÓDULO APARTE?
+- gestor_tareas lo importa recién cuando se abre la agenda, así no pesa en el
+  arranque ni recibe eventos si nadie la usa
+"""
+
+# Módulo estándar para trabajar con fechas
+from datetime import date
+# Módulo estándar para saber cuántos días tiene un mes
+import calendar
+
+# Importa el bus de eventos
+import eventos
+# Importa las tareas del inquilino activo
+import gestor_tareas
+# Importa las ocurrencias de tareas recurrentes
+import recurrencias
+# Importa las fechas, los indicadores y las utilidades de la interfaz
+from herramientas import (
+    string_a_fecha, obtener_indicador_urgencia, obtener_indicador_carga,
+    limpiar_pantalla, linea_separadora, fecha_de_hoy
+)
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Días extra que cubre el árbol a cada lado de las fechas conocidas
+MARGEN_ARBOL = 366
+# Nombres cortos de los días para la vista del mes (0 = lunes)
+DIAS_CORTOS = ("Lu", "Ma", "Mi", "Ju", "Vi", "Sa", "Do")
+# Nombres de los días para la vista de la semana
+DIAS_SEMANA = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+# Nombres de los meses (calendar los da en el idioma del sistema)
+MESES = ("ENERO", "FEBRERO", "MARZO", "ABRIL", "MAYO", "JUNIO", "JULIO", "AGOSTO",
+         "SEPTIEMBRE", "OCTUBRE", "NOVIEMBRE", "DICIEMBRE")
+
+# ============================================
+# ESTADO
+# ============================================
+# Inquilino para el que está armada la estructura (None = sin armar)
+_particion = None
+# Diferencias de tareas en curso {ordinal: suma}
+_diferencias = {}
+# Tareas que vencen {ordinal: cantidad}
+_vencen = {}
+# Árbol de Fenwick de _diferencias (posición 1 = día _base)
+_arbol = [0]
+# Ordinal del primer día que cubre el árbol
+_base = 0
+
+# ============================================
+# ÁRBOL DE FENWICK
+# ============================================
+
+def _armar_arbol(desde, hasta):
+    """Arma el árbol para cubrir [desde, hasta] (con margen) a partir de _diferencias"""
+    global _arbol, _base
+
+    _base = desde - MARGEN_ARBOL
+    tamano = 1
+    while tamano < hasta + MARGEN_ARBOL - _base + 1:
+        tamano *= 2
+    _arbol = [0] * (tamano + 1)
+    for ordinal, suma in _diferencias.items():
+        _arbol[ordinal - _base + 1] += suma
+    # Armado en O(tamaño): cada nodo pasa su suma a su padre
+    for posicion in range(1, tamano + 1):
+        padre = posicion + (posicion & -posicion)
+        if padre <= tamano:
+            _arbol[padre] += _arbol[posicion]
+
+def _sumar_en_arbol(ordinal, cantidad):
+    """Suma una cantidad a la diferencia de un día (agranda el árbol si no lo cubre)"""
+    if not _base <= ordinal < _base + len(_arbol) - 1:
+        # _diferencias ya tiene el cambio: se arma de nuevo, más grande
+        dias = list(_diferencias) + [ordinal]
+        _armar_arbol(min(dias), max(dias))
+        return
+    posicion = ordinal - _base + 1
+    while posicion < len(_arbol):
+        _arbol[posicion] += cantidad
+        posicion += posicion & -posicion
+
+def _suma_hasta(ordinal):
+    """Devuelve la suma de las diferencias hasta un día inclusive (tareas en curso)"""
+    posicion = min(ordinal - _base + 1, len(_arbol) - 1)
+    suma = 0
+    while posicion > 0:
+        suma += _arbol[posicion]
+        posicion -= posicion & -posicion
+    return suma
+
+# ============================================
+# MANTENIMIENTO
+# ============================================
+
+def _periodo(info):
+    """Devuelve (inicio, vencimiento) en ordinales de una tarea pendiente
+
+    Returns:
+        Tupla de ordinales, o None si la tarea está completada o no tiene un
+        vencimiento válido (sin inicio válido, se cuenta solo el día en que vence)
+    """
+    if info is None or info.get("estado") == "Completada":
+        return None
+    fin = string_a_fecha(info.get("fecha_fin", ""))
+    if fin is None:
+        return None
+    inicio = string_a_fecha(info.get("fecha_inicio", ""))
+    fin = fin.toordinal()
+    inicio = min(inicio.toordinal(), fin) if inicio else fin
+    return inicio, fin
+
+def _sumar(dias, ordinal, cantidad):
+    """Suma en un diccionario por día y quita el día si queda en cero"""
+    total = dias.get(ordinal, 0) + cantidad
+    if total:
+        dias[ordinal] = total
+    else:
+        dias.pop(ordinal, None)
+
+def _contar(info, signo):
+    """Suma (signo 1) o resta (signo -1) una tarea en la estructura"""
+    periodo = _periodo(info)
+    if periodo is None:
+        return
+    inicio, fin = periodo
+    _sumar(_diferencias, inicio, signo)
+    _sumar_en_arbol(inicio, signo)
+    _sumar(_diferencias, fin + 1, -signo)
+    _sumar_en_arbol(fin + 1, -signo)
+    _sumar(_vencen, fin, signo)
+
+def _armar():
+    """Arma la estructura con las tareas del inquilino activo"""
+    global _particion
+
+    with eventos.bloqueo():
+        # Primero termina de cargar el snapshot: eso publica un evento que no debe contarse dos veces
+        tareas = gestor_tareas.obtener_tareas()
+        _particion = None
+        _diferencias.clear()
+        _vencen.clear()
+        for info in tareas.values():
+            periodo = _periodo(info)
+            if periodo is not None:
+                _sumar(_diferencias, periodo[0], 1)
+                _sumar(_diferencias, periodo[1] + 1, -1)
+                _sumar(_vencen, periodo[1], 1)
+        hoy = fecha_de_hoy().toordinal()
+        _armar_arbol(min(_diferencias, default=hoy), max(_diferencias, default=hoy))
+        _particion = eventos.particion_actual()
+
+def aplicar_evento(evento):
+    """Actualiza la estructura con los cambios de un evento de tareas"""
+    global _particion
+
+    if (_particion is None or evento["entidad"] != "tarea"
+            or evento.get("particion", "") != _particion):
+        return
+    if evento["tipo"] == "borrado_total":
+        # Se vuelve a armar la próxima vez que se pida
+        _particion = None
+        return
+    for cambio in evento["cambios"]:
+        _contar(cambio["antes"], -1)
+        _contar(cambio["despues"], 1)
+
+# Sincrónico: la próxima vista ya debe incluir el cambio
+eventos.suscribir(aplicar_evento, nombre="agenda", sincronico=True)
+
+# ============================================
+# CONSULTA
+# ============================================
+
+def carga_por_dia(desde, hasta):
+    """Calcula la carga de cada día de una ventana
+
+    Args:
+        desde, hasta: Ordinales del primer y último día (incluidos)
+
+    Returns:
+        Lista de (ordinal, en_curso, vencen), un elemento por día
+    """
+    with eventos.bloqueo():
+        if _particion != eventos.particion_actual():
+            _armar()
+        en_curso = _suma_hasta(desde - 1)
+        dias = []
+        for ordinal in range(desde, hasta + 1):
+            en_curso += _diferencias.get(ordinal, 0)
+            dias.append([ordinal, en_curso, _vencen.get(ordinal, 0)])
+
+        # Ocurrencias recurrentes: solo las que tocan la ventana, en un arreglo local
+        if recurrencias.hay_reglas():
+            extra = [0] * (len(dias) + 1)
+            for _, info in recurrencias.ocurrencias(desde, hasta + recurrencias.duracion_maxima()):
+                inicio, fin = _periodo(info)
+                if inicio > hasta:
+                    continue
+                extra[max(inicio, desde) - desde] += 1
+                extra[min(fin, hasta) - desde + 1] -= 1
+                if fin <= hasta:
+                    dias[fin - desde][2] += 1
+            suma = 0
+            for posicion, dia in enumerate(dias):
+                suma += extra[posicion]
+                dia[1] += suma
+
+    return [tuple(dia) for dia in dias]
+
+# ============================================
+# VISTAS
+# ============================================
+
+def _avisos(dias):
+    """Imprime un aviso por cada día sobrecargado"""
+    sobrecargados = [(ordinal, en_curso, vencen) for ordinal, en_curso, vencen in dias
+                     if obtener_indicador_carga(en_curso, vencen) == "[SOBRECARGA]"]
+    if not sobrecargados:
+        print("\nNingun dia sobrecargado")
+        return
+    print(f"\nATENCION: {len(sobrecargados)} dia(s) sobrecargado(s)")
+    for ordinal, en_curso, vencen in sobrecargados:
+        print(f"  {date.fromordinal(ordinal):%d/%m/%Y}: vencen {vencen}, "
+              f"en curso {en_curso}. Conviene adelantar tareas")
+
+def mostrar_semana(dia=None):
+    """Muestra la carga de cada día de la semana (de lunes a domingo)
+
+    Args:
+        dia: Cualquier fecha de la semana a mostrar (default hoy)
+    """
+    # El reloj se lee una sola vez para toda la pantalla
+    hoy = fecha_de_hoy().toordinal()
+    dia = dia or date.fromordinal(hoy)
+    lunes = dia.toordinal() - dia.weekday()
+    dias = carga_por_dia(lunes, lunes + 6)
+
+    limpiar_pantalla()
+    linea_separadora()
+    print(f"  AGENDA DE LA SEMANA DEL {date.fromordinal(lunes):%d/%m/%Y}")
+    linea_separadora()
+    print(f"{'DIA':<11} {'FECHA':<11} {'CUANDO':<17} {'EN CURSO':>8} {'VENCEN':>7}  CARGA")
+    linea_separadora(80, "-")
+    for ordinal, en_curso, vencen in dias:
+        fecha = date.fromordinal(ordinal)
+        print(f"{DIAS_SEMANA[fecha.weekday()]:<11} {fecha:%d/%m/%Y}  "
+              f"{obtener_indicador_urgencia(ordinal - hoy):<17} {en_curso:>8} {vencen:>7}  "
+              f"{obtener_indicador_carga(en_curso, vencen)}")
+    _avisos(dias)
+
+def mostrar_mes(anio=None, mes=None):
+    """Muestra el mes como calendario con la carga de cada día
+
+    Cada día se ve como "dd e/v": e tareas en curso, v que vencen; "!" marca
+    los días sobrecargados y "+" los cargados.
+    """
+    hoy = fecha_de_hoy()
+    anio = anio or hoy.year
+    mes = mes or hoy.month
+    primero = date(anio, mes, 1).toordinal()
+    dias = carga_por_dia(primero, primero + calendar.monthrange(anio, mes)[1] - 1)
+    marcas = {"[SOBRECARGA]": "!", "(cargado)": "+", "": " "}
+
+    limpiar_pantalla()
+    linea_separadora(80)
+    print(f"  AGENDA DE {MESES[mes - 1]} {anio}")
+    linea_separadora(80)
+    print(" ".join(f"{nombre:<10}" for nombre in DIAS_CORTOS))
+
+    # La primera semana empieza en el lunes: los días anteriores van en blanco
+    celdas = [" " * 10] * date.fromordinal(primero).weekday()
+    for ordinal, en_curso, vencen in dias:
+        marca = marcas[obtener_indicador_carga(en_curso, vencen)]
+        celdas.append(f"{date.fromordinal(ordinal).day:>2} {en_curso:>2}/{vencen:<2}{marca} ")
+    for semana in range(0, len(celdas), 7):
+        print(" ".join(celdas[semana:semana + 7]))
+
+    print("\ndd e/v: e tareas en curso, v que vencen  (! sobrecargado, + cargado)")
+    _avisos(dias)
@@ -0,0 +1,180 @@
+"""
+MÓDULO DE ARCHIVO
+Depósito comprimido en disco para las tareas viejas
+
+UTILIDAD:
+Las tareas completadas o vencidas hace mucho no se miran casi nunca, pero
+ocupan memoria y alargan cada listado, búsqueda y estadística. gestor_tareas
+las saca de tareas_colegio con archivar_tareas_viejas() y las guarda acá:
+
+- El archivo de tareas (tareas_archivadas.jsonl.gz) tiene una tarea por línea
+  en JSON, comprimido con gzip. Cada archivado agrega un bloque gzip nuevo al
+  final (gzip permite leer varios bloques seguidos como uno solo), así nunca
+  hace falta descomprimir y reescribir lo que ya estaba.
+- El resumen (tareas_archivadas.resumen.json) guarda los totales de lo
+  archivado: cuántas, cuántas completadas y cuántas por materia. Con él las
+  estadísticas siguen contando las tareas archivadas sin abrir el archivo.
+
+Las tareas archivadas se pueden buscar a demanda con buscar(): se descomprime
+el archivo línea por línea y se aplica la consulta (ver consultas.py), sin
+cargarlo entero en memoria.
+
+Cada tarea archivada guarda también el nombre de su materia ("materia"), por
+si la materia se elimina del catálogo después.
+
+DEPENDENCIAS:
+- gzip, json, os: Módulos estándar de Python (comprimir, serializar, reemplazar
+  el resumen de forma atómica)
+- consultas.py: Necesita parsear() y filtrar() para buscar en el archivo. Se
+  importa recién al buscar
+
+¿POR QUÉ UN MÓDULO APARTE?
+- gestor_tareas decide qué tareas archivar; este módulo solo sabe guardarlas
+  y leerlas, y se importa recién cuando se usa el archivo
+"""
+
+# Módulo estándar para comprimir el archivo
+import gzip
+# Módulo estándar para guardar cada tarea como una línea de texto
+import json
+# Módulo estándar para reemplazar el resumen sin dejarlo a medio escribir
+import os
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Archivo comprimido con las tareas archivadas (una por línea)
+RUTA_ARCHIVO = "tareas_archivadas.jsonl.gz"
+# Antigüedad (en días desde el vencimiento) a partir de la cual se archiva
+DIAS_ARCHIVO = 30
+
+# Ruta en uso (se cambia con configurar())
+_ruta = RUTA_ARCHIVO
+# Resumen ya leído del disco (None = todavía no se leyó)
+_resumen = None
+
+def configurar(ruta):
+    """Cambia el archivo donde se guardan las tareas archivadas"""
+    global _ruta, _resumen
+
+    _ruta = ruta
+    _resumen = None
+
+def intercambiar_estado(estado):
+    """Pone en uso el archivo de otra partición y devuelve el actual
+
+    Cada inquilino (ver inquilinos.py) archiva en su propio archivo.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior, o (ruta, None) para
+                un archivo que todavía no se abrió
+    """
+    global _ruta, _resumen
+
+    anterior = (_ruta, _resumen)
+    _ruta, _resumen = estado
+    return anterior
+
+def _ruta_resumen():
+    """Devuelve la ruta del resumen que acompaña al archivo"""
+    base = _ruta[:-len(".jsonl.gz")] if _ruta.endswith(".jsonl.gz") else _ruta
+    return base + ".resumen.json"
+
+# ============================================
+# RESUMEN
+# ============================================
+
+def obtener_resumen():
+    """Devuelve los totales de las tareas archivadas
+
+    Returns:
+        Diccionario {"total", "completadas", "por_materia": {nombre: cantidad}}
+    """
+    global _resumen
+
+    if _resumen is None:
+        try:
+            with open(_ruta_resumen(), encoding="utf-8") as archivo:
+                _resumen = json.load(archivo)
+        except FileNotFoundError:
+            _resumen = {"total": 0, "completadas": 0, "por_materia": {}}
+    # Copia: quien la reciba puede modificarla sin tocar el resumen
+    return {"total": _resumen["total"], "completadas": _resumen["completadas"],
+            "por_materia": dict(_resumen["por_materia"])}
+
+def _guardar_resumen(resumen):
+    """Escribe el resumen en un archivo temporal y lo pone en su lugar"""
+    global _resumen
+
+    temporal = _ruta_resumen() + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(resumen, archivo, ensure_ascii=False)
+    os.replace(temporal, _ruta_resumen())
+    _resumen = resumen
+
+# ============================================
+# ESCRITURA Y LECTURA
+# ============================================
+
+def guardar(tareas):
+    """Agrega tareas al archivo y actualiza el resumen
+
+    Args:
+        tareas: Diccionario {codigo: info}; cada info debe traer "materia"
+                (el nombre) además de los datos normales de la tarea
+    """
+    if not tareas:
+        return
+
+    # Un bloque gzip nuevo al final del archivo
+    with gzip.open(_ruta, "at", encoding="utf-8") as archivo:
+        for codigo, info in tareas.items():
+            archivo.write(json.dumps(dict(info, codigo=codigo), ensure_ascii=False))
+            archivo.write("\n")
+
+    resumen = obtener_resumen()
+    for info in tareas.values():
+        resumen["total"] += 1
+        if info.get("estado") == "Completada":
+            resumen["completadas"] += 1
+        materia = info.get("materia", "")
+        resumen["por_materia"][materia] = resumen["por_materia"].get(materia, 0) + 1
+    _guardar_resumen(resumen)
+
+def recorrer():
+    """Recorre las tareas archivadas sin cargarlas todas en memoria
+
+    Si una tarea aparece más de una vez (un archivado interrumpido antes de
+    sacarla de memoria) se devuelve cada vez; buscar() se queda con la última.
+
+    Yields:
+        Pares (codigo, info) en el orden en que se archivaron
+    """
+    try:
+        archivo = gzip.open(_ruta, "rt", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with archivo:
+        for linea in archivo:
+            if linea.strip():
+                info = json.loads(linea)
+                yield info["codigo"], info
+
+def buscar(consulta):
+    """Busca en las tareas archivadas
+
+    Args:
+        consulta: Expresión de texto o diccionario armado (ver consultas.py)
+
+    Returns:
+        Diccionario {codigo: info} con las tareas encontradas, en el orden pedido
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    # Importación diferida: consultas solo hace falta al buscar
+    import consultas
+    if isinstance(consulta, str):
+        consulta = consultas.parsear(consulta)
+    # filtrar() lee el archivo de a una tarea y se queda con la última copia de cada código
+    return consultas.filtrar(consulta, recorrer())
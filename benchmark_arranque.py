@@ -0,0 +1,78 @@
+"""
+BENCHMARK DE ARRANQUE
+
+UTILIDAD:
+Mide cuánto tarda el programa en arrancar, mostrar el menú principal y salir
+(python main.py respondiendo "14" al menú). Sirve para detectar cuando un
+cambio vuelve lento el arranque, por ejemplo por importar un módulo pesado al
+principio de main.py o de gestor_tareas.py en lugar de hacerlo cuando se usa.
+
+Cada medición corre en un proceso nuevo (arranque en frío del intérprete).
+Se informa también el tiempo de "python -c pass" para separar lo que cuesta
+el intérprete de lo que cuesta el programa.
+
+USO:
+    python benchmark_arranque.py
+    python benchmark_arranque.py --repeticiones 20 --limite-ms 100
+
+Termina con código 1 si la mediana supera el límite, para poder usarlo como
+control antes de integrar cambios.
+
+DEPENDENCIAS:
+- subprocess, sys, time, statistics, argparse, os: Módulos estándar de Python
+
+¿POR QUÉ NO IMPORTA main.py?
+- Importarlo en este proceso no mediría un arranque en frío
+"""
+
+# Módulos estándar para lanzar procesos y medir tiempos
+import subprocess
+import sys
+import time
+import statistics
+import argparse
+import os
+
+# Carpeta del proyecto (donde está main.py)
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+def medir(comando, entrada, repeticiones):
+    """Ejecuta un comando varias veces y devuelve los tiempos en milisegundos"""
+    tiempos = []
+    # TERM=dumb para que limpiar la pantalla no dependa de la terminal
+    entorno = dict(os.environ, TERM="dumb")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando, input=entrada, cwd=CARPETA, env=entorno,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       text=True, check=False)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def main():
+    """Mide el arranque y compara contra el límite"""
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de main.py")
+    parser.add_argument("--repeticiones", type=int, default=10,
+                        help="Cantidad de arranques a medir (default 10)")
+    parser.add_argument("--limite-ms", type=float, default=100.0,
+                        help="Mediana máxima aceptada en milisegundos (default 100)")
+    opciones = parser.parse_args()
+
+    base = medir([sys.executable, "-c", "pass"], "", opciones.repeticiones)
+    programa = medir([sys.executable, "main.py"], "14\n", opciones.repeticiones)
+
+    mediana_base = statistics.median(base)
+    mediana = statistics.median(programa)
+
+    print(f"Interprete solo:  mediana {mediana_base:6.1f} ms")
+    print(f"main.py completo: mediana {mediana:6.1f} ms "
+          f"(min {min(programa):.1f} ms, max {max(programa):.1f} ms)")
+    print(f"Costo del programa: {mediana - mediana_base:6.1f} ms")
+
+    if mediana > opciones.limite_ms:
+        print(f"\nREGRESION: el arranque supera el limite de {opciones.limite_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\nOK: por debajo del limite de {opciones.limite_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
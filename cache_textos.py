@@ -0,0 +1,280 @@
+"""
+MÓDULO DE CACHÉ DE TEXTOS
+Modo de memoria acotada: las tareas del snapshot dejan en memoria solo sus
+campos chicos y leen la descripción y las observaciones cuando se piden
+
+UTILIDAD:
+Con muchas tareas, lo que más memoria ocupa son los textos largos (tarea y
+observaciones), no el código, la materia, el estado o las fechas. En modo de
+memoria acotada, cada tarea que viene de un snapshot binario es una
+TareaCompacta: un diccionario que guarda solo los campos chicos y recuerda en
+qué registro del snapshot están sus textos. Cuando alguien lee info["tarea"]
+el texto se trae del archivo (mapeado con mmap) y queda en una caché LRU con
+un presupuesto en bytes: si se pasa, se descartan los textos usados hace más
+tiempo, que se pueden volver a leer cuando hagan falta.
+
+- El resto del programa no se entera: info["tarea"], info.get(...), dict(info),
+  "tarea" in info, items() y la comparación con otro diccionario funcionan
+  igual que con un diccionario común (dict(info) e info.copy() devuelven una
+  copia completa; info.copy() es la más rápida). info.copia_compacta() copia
+  sin leer los textos: la copia los lee del mismo registro cuando se piden
+- Si se asigna un texto (al editar la tarea) queda guardado en la tarea, igual
+  que en un diccionario común. Al guardar el snapshot vuelve a ser compacta
+- prefijo() sirve para los listados: trae solo los primeros caracteres que se
+  muestran, sin leer ni guardar en la caché el texto completo
+
+DEPENDENCIAS:
+- collections: OrderedDict para la caché LRU (igual que la caché de consultas.py)
+- threading: La caché se comparte entre los hilos (planificador, generador de
+  carga, servidor de réplicas) y se protege con un candado
+
+¿POR QUÉ NO DEPENDE DE snapshot_binario.py NI DE gestor_tareas.py?
+- snapshot_binario.py crea las TareaCompacta y gestor_tareas.py las guarda;
+  cada tarea recibe el snapshot de donde leer sus textos (_textos_en y
+  _prefijo_en), así este módulo no importa ninguno de los dos
+"""
+
+# Módulo estándar con el diccionario ordenado que se usa como LRU
+from collections import OrderedDict
+# Módulo estándar para el candado de la caché
+import threading
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Campos que se leen del snapshot cuando se piden (los demás quedan en memoria)
+CAMPOS_DIFERIDOS = ("tarea", "observaciones")
+# Presupuesto de la caché de textos en bytes (se cambia con configurar())
+PRESUPUESTO_PREDETERMINADO = 8 * 1024 * 1024
+# Bytes que se suman por entrada además de los textos (tupla, clave, objetos str)
+COSTO_POR_ENTRADA = 160
+
+# ============================================
+# CACHÉ LRU
+# ============================================
+# {(snapshot, indice): (tarea, observaciones)}; lo último usado va al final
+_cache = OrderedDict()
+# Bytes que ocupan ahora los textos de la caché
+_bytes_en_cache = 0
+# Máximo de bytes antes de descartar los textos usados hace más tiempo
+_presupuesto = PRESUPUESTO_PREDETERMINADO
+# Aciertos y fallos, para ver si el presupuesto alcanza
+_aciertos = 0
+_fallos = 0
+# Candado para modificar la caché desde varios hilos
+_candado = threading.Lock()
+
+def configurar(presupuesto_bytes):
+    """Cambia el presupuesto de la caché de textos
+
+    Args:
+        presupuesto_bytes: Máximo de bytes de textos en memoria (0 = sin caché:
+                           cada lectura va al archivo)
+    """
+    global _presupuesto
+
+    if presupuesto_bytes < 0:
+        raise ValueError("El presupuesto de memoria no puede ser negativo")
+    with _candado:
+        _presupuesto = presupuesto_bytes
+        _recortar()
+
+def _recortar():
+    """Descarta los textos usados hace más tiempo hasta entrar en el presupuesto
+
+    Se llama con el candado tomado.
+    """
+    global _bytes_en_cache
+
+    while _cache and _bytes_en_cache > _presupuesto:
+        _, (tarea, observaciones) = _cache.popitem(last=False)
+        _bytes_en_cache -= _costo(tarea, observaciones)
+
+def _costo(tarea, observaciones):
+    """Bytes aproximados que ocupa una entrada de la caché"""
+    return len(tarea) + len(observaciones) + COSTO_POR_ENTRADA
+
+def textos(origen, indice):
+    """Devuelve (tarea, observaciones) del registro, de la caché o del archivo
+
+    Args:
+        origen: Snapshot abierto donde está el registro
+        indice: Posición del registro en el snapshot
+    """
+    global _bytes_en_cache, _aciertos, _fallos
+
+    clave = (origen, indice)
+    with _candado:
+        encontrados = _cache.get(clave)
+        if encontrados is not None:
+            _cache.move_to_end(clave)
+            _aciertos += 1
+            return encontrados
+        _fallos += 1
+
+    # La lectura del archivo va fuera del candado (el mmap se puede leer en paralelo)
+    encontrados = origen._textos_en(indice)
+    with _candado:
+        if clave not in _cache:
+            _cache[clave] = encontrados
+            _bytes_en_cache += _costo(*encontrados)
+            _recortar()
+    return encontrados
+
+def _en_cache(origen, indice):
+    """Devuelve los textos si ya están en la caché (sin contar acierto ni fallo)"""
+    with _candado:
+        return _cache.get((origen, indice))
+
+def vaciar():
+    """Descarta todos los textos de la caché (por ejemplo, al cambiar de snapshot)"""
+    global _bytes_en_cache
+
+    with _candado:
+        _cache.clear()
+        _bytes_en_cache = 0
+
+def obtener_metricas():
+    """Devuelve el estado de la caché de textos
+
+    Returns:
+        Diccionario con entradas, bytes, presupuesto, aciertos y fallos
+    """
+    with _candado:
+        return {
+            "entradas": len(_cache),
+            "bytes": _bytes_en_cache,
+            "presupuesto": _presupuesto,
+            "aciertos": _aciertos,
+            "fallos": _fallos,
+        }
+
+# ============================================
+# TAREA COMPACTA
+# ============================================
+
+class TareaCompacta(dict):
+    """Tarea que guarda los campos chicos y lee sus textos del snapshot
+
+    Los campos de CAMPOS_DIFERIDOS que no estén guardados en el diccionario se
+    leen del registro _indice de _origen. Se redefine __iter__ para que
+    dict(info) y {**info} también pasen por __getitem__ y copien los textos.
+    """
+
+    __slots__ = ("_origen", "_indice")
+
+    def __init__(self, campos, origen, indice):
+        super().__init__(campos)
+        self._origen = origen
+        self._indice = indice
+
+    def _diferido(self, campo):
+        """Lee un campo diferido (tarea u observaciones) del snapshot"""
+        tarea, observaciones = textos(self._origen, self._indice)
+        return tarea if campo == "tarea" else observaciones
+
+    def _faltantes(self):
+        """Campos diferidos que no están guardados en el diccionario"""
+        return [campo for campo in CAMPOS_DIFERIDOS if not dict.__contains__(self, campo)]
+
+    def __getitem__(self, campo):
+        try:
+            return dict.__getitem__(self, campo)
+        except KeyError:
+            if campo in CAMPOS_DIFERIDOS:
+                return self._diferido(campo)
+            raise
+
+    def get(self, campo, defecto=None):
+        try:
+            return self[campo]
+        except KeyError:
+            return defecto
+
+    def __contains__(self, campo):
+        return dict.__contains__(self, campo) or campo in CAMPOS_DIFERIDOS
+
+    def __iter__(self):
+        yield from dict.__iter__(self)
+        yield from self._faltantes()
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._faltantes())
+
+    def keys(self):
+        # Una vista de verdad, así funcionan las operaciones de conjuntos (keys() | ...)
+        return dict.fromkeys(self).keys()
+
+    def items(self):
+        return [(campo, self[campo]) for campo in self]
+
+    def values(self):
+        return [self[campo] for campo in self]
+
+    def _guardados(self):
+        """Copia común de lo guardado en el diccionario (sin leer los textos)
+
+        dict.copy() y dict(self) no sirven: como __iter__ está redefinido,
+        pasan por keys() y __getitem__ y leen los textos.
+        """
+        return dict(dict.items(self))
+
+    def copy(self):
+        # Más rápido que dict(self): copia lo guardado y lee los dos textos juntos
+        copia = self._guardados()
+        faltantes = self._faltantes()
+        if faltantes:
+            copia.update(zip(CAMPOS_DIFERIDOS, textos(self._origen, self._indice)))
+            copia.update((campo, dict.__getitem__(self, campo))
+                         for campo in CAMPOS_DIFERIDOS if campo not in faltantes)
+        return copia
+
+    def copia_compacta(self):
+        """Otra TareaCompacta con los mismos datos, que lee del mismo registro"""
+        return TareaCompacta(self._guardados(), self._origen, self._indice)
+
+    def __eq__(self, otro):
+        return dict(self) == otro
+
+    def __ne__(self, otro):
+        return dict(self) != otro
+
+    # Como cualquier diccionario, no se puede usar como clave
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # Al copiar o serializar viaja como diccionario completo
+        return (dict, (dict(self),))
+
+    def prefijo(self, campo, largo):
+        """Primeros caracteres de un texto, sin leer el texto completo si no hace falta"""
+        if dict.__contains__(self, campo) or campo not in CAMPOS_DIFERIDOS:
+            return dict.get(self, campo, "")[:largo]
+        encontrados = _en_cache(self._origen, self._indice)
+        if encontrados is not None:
+            return encontrados[CAMPOS_DIFERIDOS.index(campo)][:largo]
+        return self._origen._prefijo_en(self._indice, campo, largo)
+
+    def reubicar(self, origen, indice):
+        """Pasa a leer los textos de otro snapshot y suelta los guardados
+
+        Se usa después de guardar un snapshot nuevo: los textos editados ya
+        están en el archivo y dejan de ocupar memoria.
+        """
+        self._origen = origen
+        self._indice = indice
+        for campo in CAMPOS_DIFERIDOS:
+            dict.pop(self, campo, None)
+
+def prefijo(info, campo, largo):
+    """Primeros `largo` caracteres de un texto de la tarea (para los listados)
+
+    Con una TareaCompacta lee solo esos caracteres del archivo; con un
+    diccionario común es lo mismo que info.get(campo, "")[:largo].
+    """
+    if isinstance(info, TareaCompacta):
+        return info.prefijo(campo, largo)
+    return info.get(campo, "")[:largo]
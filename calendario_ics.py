@@ -0,0 +1,342 @@
+"""
+MÓDULO DE CALENDARIO (iCalendar .ics)
+Exportar las tareas pendientes a un archivo .ics e importar calendarios
+
+UTILIDAD:
+Permite ver las tareas en cualquier aplicación de calendario (Google Calendar,
+Outlook, Thunderbird, el celular) y traer al gestor el calendario de la
+escuela. Cada tarea es un VTODO (tarea con vencimiento) o, si se prefiere, un
+VEVENT (evento que dura desde el inicio hasta el vencimiento).
+
+CORRESPONDENCIA DE CAMPOS:
+    SUMMARY       tarea
+    CATEGORIES    materia (el nombre; al importar se usa la primera)
+    DTSTART       fecha_inicio
+    DUE / DTEND   fecha_fin (DTEND es el día siguiente: en iCalendar no se incluye)
+    DESCRIPTION   observaciones
+    UID           el uid de la tarea si vino de un calendario; si no, uno
+                  armado con el código (y el inquilino): T001@gestor-tareas
+
+SIN ARMAR EL DOCUMENTO EN MEMORIA:
+- lineas_ics() es un generador: exportar() escribe cada línea apenas se
+  genera, así un calendario de decenas de miles de tareas no se arma entero
+- leer_componentes() lee el archivo línea por línea y entrega cada VTODO o
+  VEVENT apenas termina; importar() agrega las tareas de a LOTE_IMPORTACION
+  con gestor_tareas.agregar_tareas(), que publica un solo evento por lote
+
+SIN DUPLICADOS:
+importar() saltea las entradas cuyo UID ya tiene alguna tarea del inquilino
+activo (importada antes, o exportada desde este mismo gestor). Importar dos
+veces el mismo calendario no agrega nada la segunda vez. Las tareas
+archivadas no se revisan.
+
+DEPENDENCIAS:
+- datetime, hashlib, os, re: Módulos estándar de Python
+- eventos.py: Necesita particion_actual() para los UID de cada inquilino
+- gestor_tareas.py: Las tareas a exportar, agregar_tareas() y obtener_tarea()
+- gestor_materias.py: Necesita nombre_materia()
+- herramientas.py: Necesita string_a_fecha() y ahora() (el sello DTSTAMP sale
+  del reloj del programa, así un reloj fijo da siempre el mismo archivo)
+
+¿POR QUÉ UN MÓDULO APARTE?
+- gestor_tareas lo importa recién cuando se exporta o importa un calendario
+"""
+
+# Módulo estándar para fechas y el sello de hora de la exportación
+from datetime import date, timedelta, timezone
+# Módulo estándar para armar un UID a las entradas que no traen uno
+import hashlib
+# Módulo estándar para reemplazar el archivo exportado sin dejarlo a medio escribir
+import os
+# Módulo estándar para quitar los escapes de los textos
+import re
+
+# Importa la partición activa
+import eventos
+# Importa las tareas del inquilino activo
+import gestor_tareas
+# Importa los nombres de las materias
+from gestor_materias import nombre_materia
+# Importa la conversión de texto a fecha
+from herramientas import string_a_fecha, ahora
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Identificación del programa que generó el calendario
+PRODID = "-//Gestor de Tareas del Colegio//ES"
+# Dominio de los UID de las tareas que no vinieron de un calendario
+DOMINIO_UID = "gestor-tareas"
+# Componentes que se exportan e importan
+COMPONENTES = ("VTODO", "VEVENT")
+# Materia de las entradas que no traen CATEGORIES
+MATERIA_POR_DEFECTO = "Calendario"
+# Tareas que se agregan por evento al importar
+LOTE_IMPORTACION = 1000
+# Largo máximo de una línea en bytes (las más largas se parten)
+LARGO_LINEA = 75
+
+# ============================================
+# TEXTOS Y LÍNEAS
+# ============================================
+
+def _escapar(texto):
+    """Escapa un texto para un valor de iCalendar
+
+    Los saltos de línea de Windows (CRLF) y los CR sueltos quedan como un
+    salto común: un CR sin escapar cortaría la línea al leer el archivo.
+    """
+    texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    return (texto.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+def _desescapar(texto):
+    """Quita los escapes de un valor de iCalendar"""
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), texto)
+
+def _plegar(linea):
+    """Parte una línea de más de LARGO_LINEA bytes (las siguientes empiezan con espacio)"""
+    if len(linea.encode("utf-8")) <= LARGO_LINEA:
+        yield linea
+        return
+    parte, largo = "", 0
+    for caracter in linea:
+        # Se cuenta en bytes sin partir una letra de varios bytes
+        bytes_caracter = len(caracter.encode("utf-8"))
+        if largo + bytes_caracter > LARGO_LINEA:
+            yield parte
+            parte, largo = " ", 1
+        parte += caracter
+        largo += bytes_caracter
+    yield parte
+
+def _desplegar(lineas):
+    """Junta las líneas partidas (las que siguen empiezan con espacio o tab)"""
+    actual = None
+    for linea in lineas:
+        linea = linea.rstrip("\r\n")
+        if linea[:1] in (" ", "\t") and actual is not None:
+            actual += linea[1:]
+            continue
+        if actual is not None:
+            yield actual
+        actual = linea
+    if actual is not None:
+        yield actual
+
+def _propiedad(linea):
+    """Separa "NOMBRE;PARAM=X:valor" en (NOMBRE, [parámetros], valor)
+
+    Returns:
+        Tupla, o None si la línea no tiene ":" fuera de comillas
+    """
+    entre_comillas = False
+    for posicion, caracter in enumerate(linea):
+        if caracter == '"':
+            entre_comillas = not entre_comillas
+        elif caracter == ":" and not entre_comillas:
+            nombre, *parametros = linea[:posicion].split(";")
+            return nombre.upper(), [p.upper() for p in parametros], linea[posicion + 1:]
+    return None
+
+# ============================================
+# EXPORTACIÓN
+# ============================================
+
+def uid_propio(codigo, particion=None):
+    """Devuelve el UID con que se exporta una tarea que no vino de un calendario"""
+    if particion is None:
+        particion = eventos.particion_actual()
+    return f"{particion}/{codigo}@{DOMINIO_UID}" if particion else f"{codigo}@{DOMINIO_UID}"
+
+def lineas_ics(tareas, componente="VTODO"):
+    """Genera el calendario línea por línea
+
+    Args:
+        tareas: Iterable de pares (codigo, info); se recorre una sola vez
+        componente: "VTODO" (tareas) o "VEVENT" (eventos)
+
+    Yields:
+        Cada línea del archivo, sin el salto de línea
+    """
+    if componente not in COMPONENTES:
+        raise ValueError(f"Componente invalido: {componente}")
+    sello = ahora().astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    particion = eventos.particion_actual()
+
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    for codigo, info in tareas:
+        fin = string_a_fecha(info.get("fecha_fin", ""))
+        # Sin vencimiento válido no hay dónde ponerla en el calendario
+        if fin is None:
+            continue
+        inicio = min(string_a_fecha(info.get("fecha_inicio", "")) or fin, fin)
+        yield f"BEGIN:{componente}"
+        yield from _plegar(f"UID:{info.get('uid') or uid_propio(codigo, particion)}")
+        yield f"DTSTAMP:{sello}"
+        yield f"DTSTART;VALUE=DATE:{inicio:%Y%m%d}"
+        if componente == "VTODO":
+            yield f"DUE;VALUE=DATE:{fin:%Y%m%d}"
+            completada = info.get("estado") == "Completada"
+            yield "STATUS:COMPLETED" if completada else "STATUS:NEEDS-ACTION"
+        else:
+            yield f"DTEND;VALUE=DATE:{fin + timedelta(days=1):%Y%m%d}"
+        yield from _plegar("SUMMARY:" + _escapar(info.get("tarea", "")))
+        yield from _plegar("CATEGORIES:" + _escapar(nombre_materia(info.get("materia_id"))))
+        if info.get("observaciones"):
+            yield from _plegar("DESCRIPTION:" + _escapar(info["observaciones"]))
+        yield f"END:{componente}"
+    yield "END:VCALENDAR"
+
+def exportar(ruta, componente="VTODO", tareas=None):
+    """Escribe un archivo .ics con las tareas (default: las pendientes)
+
+    Escribe primero a un archivo temporal y después lo reemplaza.
+
+    Returns:
+        Cantidad de tareas exportadas
+    """
+    if tareas is None:
+        tareas = gestor_tareas.obtener_tareas_pendientes().items()
+    cantidad = 0
+    inicio_componente = f"BEGIN:{componente}"
+    temporal = ruta + ".tmp"
+    # newline="": los saltos de línea de iCalendar son siempre CRLF
+    with open(temporal, "w", encoding="utf-8", newline="") as archivo:
+        for linea in lineas_ics(tareas, componente):
+            archivo.write(linea)
+            archivo.write("\r\n")
+            if linea == inicio_componente:
+                cantidad += 1
+    os.replace(temporal, ruta)
+    return cantidad
+
+# ============================================
+# IMPORTACIÓN
+# ============================================
+
+def leer_componentes(lineas):
+    """Recorre los VTODO y VEVENT de un calendario sin leerlo entero
+
+    Los componentes anidados (alarmas, zonas horarias) se ignoran.
+
+    Args:
+        lineas: Iterable de líneas de texto (por ejemplo el archivo abierto)
+
+    Yields:
+        Pares (componente, {NOMBRE: (parámetros, valor)})
+    """
+    anidados = []
+    propiedades = None
+    for linea in _desplegar(lineas):
+        separada = _propiedad(linea)
+        if separada is None:
+            continue
+        nombre, parametros, valor = separada
+        if nombre == "BEGIN":
+            anidados.append(valor.upper())
+            if valor.upper() in COMPONENTES and len(anidados) == 2:
+                propiedades = {}
+        elif nombre == "END":
+            if anidados and anidados.pop() in COMPONENTES and propiedades is not None:
+                yield valor.upper(), propiedades
+                propiedades = None
+        elif propiedades is not None and len(anidados) == 2:
+            # Si una propiedad se repite vale la primera
+            propiedades.setdefault(nombre, (parametros, valor))
+
+def _fecha(propiedad):
+    """Convierte el valor de DTSTART, DUE o DTEND en fecha (ignora la hora)"""
+    if propiedad is None:
+        return None
+    valor = propiedad[1].strip()
+    try:
+        return date(int(valor[:4]), int(valor[4:6]), int(valor[6:8]))
+    except ValueError:
+        return None
+
+def _a_tarea(componente, propiedades):
+    """Convierte un VTODO o VEVENT en los datos para agregar_tareas()
+
+    Returns:
+        Diccionario, o None si está completado, cancelado o no tiene fechas
+    """
+    estado = propiedades.get("STATUS", ([], ""))[1].strip().upper()
+    if estado in ("COMPLETED", "CANCELLED"):
+        return None
+
+    inicio = _fecha(propiedades.get("DTSTART"))
+    if componente == "VTODO":
+        fin = _fecha(propiedades.get("DUE")) or inicio
+    else:
+        fin = _fecha(propiedades.get("DTEND"))
+        # DTEND de día completo es el día siguiente al último
+        if fin is not None and "VALUE=DATE" in propiedades["DTEND"][0]:
+            fin -= timedelta(days=1)
+        fin = fin or inicio
+    if fin is None:
+        return None
+    inicio = min(inicio or fin, fin)
+
+    tarea = _desescapar(propiedades.get("SUMMARY", ([], ""))[1]).strip() or "(sin titulo)"
+    # CATEGORIES es una lista separada por comas sin escapar
+    categorias = re.split(r"(?<!\\),", propiedades.get("CATEGORIES", ([], ""))[1])
+    materia = _desescapar(categorias[0]).strip() or MATERIA_POR_DEFECTO
+    observaciones = _desescapar(propiedades.get("DESCRIPTION", ([], ""))[1]).strip()
+
+    uid = propiedades.get("UID", ([], ""))[1].strip()
+    if not uid:
+        # Sin UID se arma uno con el contenido, así reimportar tampoco duplica
+        contenido = f"{tarea}|{materia}|{inicio}|{fin}".encode("utf-8")
+        uid = "sin-uid-" + hashlib.sha1(contenido).hexdigest()[:16]
+
+    return {"materia": materia, "tarea": tarea,
+            "fecha_inicio": inicio.strftime("%d/%m/%Y"),
+            "fecha_fin": fin.strftime("%d/%m/%Y"),
+            "observaciones": observaciones, "uid": uid}
+
+def _es_propia(uid):
+    """Indica si el UID es de una tarea exportada desde este inquilino que todavía existe"""
+    prefijo = uid_propio("", eventos.particion_actual()).split("@")[0]
+    if not uid.endswith("@" + DOMINIO_UID) or not uid.startswith(prefijo):
+        return False
+    codigo = uid[len(prefijo):-len("@" + DOMINIO_UID)]
+    # También reconoce las ocurrencias de tareas recurrentes (sin convertirlas)
+    return bool(codigo) and gestor_tareas.obtener_tarea(codigo) is not None
+
+def importar(ruta):
+    """Agrega las tareas de un archivo .ics al inquilino activo
+
+    Returns:
+        Diccionario {"agregadas", "repetidas" (UID ya importado), "omitidas"
+        (completadas, canceladas o sin fechas)}
+
+    Raises:
+        OSError: Si el archivo no se puede leer
+    """
+    # UID de las tareas que ya vinieron de un calendario
+    with eventos.bloqueo():
+        uids = {info["uid"] for info in gestor_tareas.obtener_tareas().values() if "uid" in info}
+    resultado = {"agregadas": 0, "repetidas": 0, "omitidas": 0}
+    lote = []
+
+    # utf-8-sig: algunos programas agregan una marca al comienzo del archivo
+    with open(ruta, encoding="utf-8-sig", newline="") as archivo:
+        for componente, propiedades in leer_componentes(archivo):
+            datos = _a_tarea(componente, propiedades)
+            if datos is None:
+                resultado["omitidas"] += 1
+            elif datos["uid"] in uids or _es_propia(datos["uid"]):
+                resultado["repetidas"] += 1
+            else:
+                uids.add(datos["uid"])
+                lote.append(datos)
+                if len(lote) >= LOTE_IMPORTACION:
+                    resultado["agregadas"] += len(gestor_tareas.agregar_tareas(lote))
+                    lote = []
+    if lote:
+        resultado["agregadas"] += len(gestor_tareas.agregar_tareas(lote))
+    return resultado
@@ -0,0 +1,130 @@
+"""
+MÓDULO DE CÓDIGOS
+Generador de códigos de tarea únicos, crecientes y que nunca se reutilizan
+
+UTILIDAD:
+Cada tarea recibe un código visible (T001, T002... T999, T1000...) y un número
+de secuencia entero que se guarda junto a la tarea. Los listados se ordenan por
+la secuencia, no por el texto del código: así T1000 queda después de T200 sin
+tener que interpretar cada código.
+
+GARANTÍAS:
+- Creciente: cada código nuevo tiene una secuencia mayor que todos los anteriores
+- Sin reutilización: borrar todas las tareas no reinicia el contador, y el
+  contador se guarda en el snapshot para seguir desde ahí al volver a abrir
+- Seguro con hilos: el contador se incrementa bajo un candado
+- Varios procesos: con configurar_nodo("A") los códigos quedan "A-T001",
+  "A-T002"... y no chocan con los que genera otro proceso con otro prefijo
+
+DEPENDENCIAS:
+- threading: Módulo estándar de Python para el candado del contador
+
+¿POR QUÉ NO DEPENDE DE OTROS ARCHIVOS DEL PROYECTO?
+- Es un módulo base que gestor_tareas usa al agregar tareas
+"""
+
+# Módulo estándar para el candado del contador
+import threading
+
+# ============================================
+# ESTADO DEL GENERADOR
+# ============================================
+# Próximo número de secuencia a entregar
+_siguiente = 1
+# Prefijo del proceso ("" si hay un solo proceso generando códigos)
+_nodo = ""
+# Candado que protege el contador
+_candado = threading.Lock()
+
+# Largo máximo del prefijo de nodo (el código completo debe entrar en 16 bytes)
+LARGO_MAXIMO_NODO = 6
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+
+def configurar_nodo(prefijo):
+    """Define el prefijo de este proceso para los códigos nuevos
+
+    Args:
+        prefijo: Letras o números que identifican al proceso ("" para ninguno)
+
+    Raises:
+        ValueError: Si el prefijo no es alfanumérico o es demasiado largo
+    """
+    global _nodo
+
+    prefijo = (prefijo or "").strip().upper()
+    if prefijo and (not prefijo.isalnum() or len(prefijo) > LARGO_MAXIMO_NODO):
+        raise ValueError(f"El prefijo de nodo debe ser alfanumerico y de hasta "
+                         f"{LARGO_MAXIMO_NODO} caracteres")
+    _nodo = prefijo
+
+def siguiente_secuencia():
+    """Devuelve el próximo número de secuencia (para guardarlo en el snapshot)"""
+    return _siguiente
+
+def restaurar(siguiente):
+    """Continúa la numeración desde un valor guardado
+
+    Nunca retrocede: si el contador ya va más adelante, lo deja como está.
+    """
+    global _siguiente
+
+    with _candado:
+        _siguiente = max(_siguiente, siguiente)
+
+def intercambiar_estado(estado=None):
+    """Pone en uso el contador de otra partición y devuelve el actual
+
+    Cada inquilino (ver inquilinos.py) numera sus tareas por separado; el
+    prefijo de nodo es del proceso y no cambia.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = empezar en T001)
+    """
+    global _siguiente
+
+    with _candado:
+        anterior = _siguiente
+        _siguiente = estado or 1
+    return anterior
+
+# ============================================
+# GENERACIÓN
+# ============================================
+
+def reservar_secuencia():
+    """Entrega el próximo número de secuencia sin armar un código
+
+    Lo usan las tareas que ya traen su código, como las ocurrencias de una
+    tarea recurrente (ver recurrencias.py) al convertirse en tareas.
+    """
+    global _siguiente
+
+    with _candado:
+        secuencia = _siguiente
+        _siguiente += 1
+    return secuencia
+
+def generar():
+    """Genera un código nuevo
+
+    Returns:
+        Tupla (codigo, secuencia), por ejemplo ("T001", 1) o ("A-T001", 1)
+    """
+    secuencia = reservar_secuencia()
+
+    # Mínimo 3 dígitos para mantener el formato T001; después crece solo
+    codigo = f"T{secuencia:03d}"
+    if _nodo:
+        codigo = f"{_nodo}-{codigo}"
+    return codigo, secuencia
+
+def clave_orden(par):
+    """Clave para ordenar pares (codigo, info) de tareas por secuencia
+
+    Las tareas sin secuencia (datos viejos) van al principio, por código.
+    """
+    codigo, info = par
+    return info.get("secuencia", 0), codigo
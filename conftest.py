@@ -0,0 +1,21 @@
+"""
+CONFIGURACIÓN DE LAS PRUEBAS
+Hace que los módulos del proyecto se puedan importar desde tests/
+
+UTILIDAD:
+Los módulos del proyecto están en la raíz y se importan por su nombre
+("import gestor_tareas"), igual que lo hace main.py. pytest carga este archivo
+antes que las pruebas y agrega la raíz a la ruta de importación.
+
+Las pruebas se corren desde la raíz con:
+    python -m pytest -q
+"""
+
+# Módulos estándar para armar la ruta de importación
+import os
+import sys
+
+# La raíz del proyecto es la carpeta de este archivo
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,651 @@
+"""
+MÓDULO DE CONSULTAS
+Búsquedas combinadas (materia + estado + vencimiento + texto) con orden y límite
+
+UTILIDAD:
+Las búsquedas de gestor_tareas.py buscan por un solo criterio. Este módulo
+permite combinarlos en una sola consulta, ya sea armándola con
+armar_consulta() o escribiéndola como texto:
+
+    materia:mate estado:pendiente vence>=01/03/2026 vence<=hoy+7 capitulo orden:vence limite:5
+
+CAMPOS DEL LENGUAJE:
+- materia:TEXTO          Materia con ese nombre; si no hay ninguna igual, las
+                         parecidas (tolera errores y acentos)
+- estado:VALOR           pendiente / en proceso / completada
+- vence:FECHA            Vence ese día. También vence>=, vence>, vence<=, vence<
+                         FECHA es DD/MM/AAAA, "hoy", "hoy+N" o "hoy-N"
+- texto:PALABRAS         Palabras de la descripción u observaciones (también
+                         sirve escribirlas sueltas). Cada palabra puede ser el
+                         comienzo de una palabra: "ejerc" encuentra "ejercicios"
+- orden:CAMPO            codigo (default), vence, inicio o materia; con "-" adelante
+                         ordena de mayor a menor (orden:-vence)
+- limite:N               Cantidad máxima de resultados
+Los textos con espacios van entre comillas: materia:"educacion fisica"
+
+CACHÉ DE RESULTADOS:
+ejecutar() guarda los últimos resultados en una caché LRU acotada, con la
+consulta ya normalizada como clave (da igual cómo se escribió). Se suscribe
+de forma sincrónica al bus de eventos y, por cada tarea que cambia, descarta
+solo las consultas en las que la tarea estaba o pasa a estar (su versión
+anterior o la nueva cumple los criterios). Los cambios del catálogo descartan
+las consultas por materia, y al cambiar el día se descartan las consultas
+escritas con "hoy". obtener_metricas_cache() informa aciertos y fallos.
+
+PLANIFICADOR:
+Cada criterio se resuelve con un índice de indices.py. Antes de ejecutar se
+estima cuántas tareas devuelve cada uno (sin armar los conjuntos) y se empieza
+por el más selectivo. Los siguientes se cruzan con el resultado parcial; si un
+índice es mucho más grande que lo que ya quedó, en lugar de armar su conjunto
+se revisan directamente las pocas tareas que quedan. explicar() muestra el plan.
+
+TAREAS RECURRENTES:
+Las ocurrencias de las reglas de recurrencias.py no están en los índices ni en
+la caché: ejecutar() las calcula al final, solo para el rango de vencimiento
+de la consulta (o los próximos días si no pide uno), y las mezcla con el
+resultado respetando el orden y el límite.
+
+DEPENDENCIAS:
+- heapq, shlex: Módulos estándar de Python (límite sin ordenar todo, separar la expresión)
+- collections, threading: Módulos estándar para la caché LRU y su candado
+- eventos.py: Necesita suscribir() para invalidar la caché con cada cambio
+- indices.py: Los índices por materia, estado, vencimiento y palabra
+- gestor_tareas.py: Necesita obtener_tareas() para leer los datos de cada resultado
+- gestor_materias.py: Necesita buscar_materia(), buscar_materias_parecidas() y nombre_materia()
+- codigos.py: Necesita clave_orden() para ordenar por código
+- recurrencias.py: Necesita ocurrencias() y ventana() para las tareas recurrentes
+- herramientas.py: Necesita string_a_fecha(), normalizar_texto() y fecha_de_hoy()
+  ("hoy" en las consultas es el del reloj del programa)
+
+¿POR QUÉ UN MÓDULO APARTE?
+- gestor_tareas.py lo importa recién cuando se usa la búsqueda avanzada,
+  así no pesa en el arranque; main.py y las réplicas también lo usan
+"""
+
+# Módulo estándar para quedarse con los primeros N sin ordenar todo
+import heapq
+# Módulo estándar para trabajar con fechas
+from datetime import date
+# Módulo estándar para la caché LRU (recuerda el orden de uso)
+from collections import OrderedDict
+# Módulo estándar para el candado de la caché
+import threading
+
+# Importa el bus de eventos para invalidar la caché
+import eventos
+# Importa los índices de tareas
+import indices
+# Importa los datos de las tareas
+import gestor_tareas
+# Importa la búsqueda aproximada de materias y sus nombres
+from gestor_materias import buscar_materia, buscar_materias_parecidas, nombre_materia
+# Importa el orden por código
+import codigos
+# Importa las ocurrencias de las tareas recurrentes
+import recurrencias
+# Importa la conversión de fechas y la normalización de textos
+from herramientas import string_a_fecha, normalizar_texto, fecha_de_hoy
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Palabras aceptadas para cada estado
+ESTADOS = {
+    "pendiente": "En proceso",
+    "pendientes": "En proceso",
+    "en proceso": "En proceso",
+    "proceso": "En proceso",
+    "completada": "Completada",
+    "completadas": "Completada",
+    "hecha": "Completada",
+}
+
+# Campos por los que se puede ordenar
+ORDENES = ("codigo", "vence", "inicio", "materia")
+
+# Si un índice tiene más de FACTOR_CRUCE veces las tareas que ya quedan,
+# conviene revisar esas tareas en lugar de armar y cruzar el conjunto
+FACTOR_CRUCE = 4
+
+# Cantidad máxima de consultas guardadas en la caché
+CAPACIDAD_CACHE = 128
+# Eventos con más cambios que esto vacían la caché entera (más barato que revisar uno por uno)
+MAXIMO_CAMBIOS_DETALLE = 256
+
+# Al revisar una tarea por texto, si el comienzo buscado corresponde a pocas
+# palabras se pregunta al índice por cada una; si son más, se lee el texto
+MAXIMO_PALABRAS_REVISION = 16
+
+# ============================================
+# ARMADO DE CONSULTAS
+# ============================================
+
+def _fecha_a_ordinal(texto):
+    """Convierte DD/MM/AAAA, "hoy", "hoy+N" o "hoy-N" en ordinal
+
+    Raises:
+        ValueError: Si el texto no es una fecha válida
+    """
+    texto = texto.strip().lower()
+    if texto.startswith("hoy"):
+        desplazamiento = texto[3:]
+        try:
+            dias = int(desplazamiento) if desplazamiento else 0
+        except ValueError:
+            raise ValueError(f"Fecha invalida: {texto}")
+        return fecha_de_hoy().toordinal() + dias
+
+    fecha = string_a_fecha(texto)
+    if fecha is None:
+        raise ValueError(f"Fecha invalida: {texto} (use DD/MM/AAAA)")
+    return fecha.toordinal()
+
+def armar_consulta(materia=None, estado=None, desde=None, hasta=None,
+                   texto=None, orden=None, limite=None):
+    """Arma y valida una consulta
+
+    Args:
+        materia: Nombre (o parte del nombre) de la materia
+        estado: "pendiente", "en proceso" o "completada"
+        desde: Fecha mínima de vencimiento (DD/MM/AAAA, "hoy", "hoy+N")
+        hasta: Fecha máxima de vencimiento (incluida)
+        texto: Palabras que deben aparecer en la descripción u observaciones
+        orden: Campo de ORDENES, con "-" adelante para orden descendente
+        limite: Cantidad máxima de resultados
+
+    Returns:
+        Diccionario con la consulta lista para ejecutar()
+
+    Raises:
+        ValueError: Si algún criterio no es válido
+    """
+    consulta = {"materia": None, "estado": None, "desde": None, "hasta": None,
+                "palabras": (), "orden": "codigo", "descendente": False, "limite": None,
+                "relativa": False}
+
+    if materia:
+        consulta["materia"] = materia.strip()
+
+    if estado:
+        clave = normalizar_texto(estado)
+        if clave not in ESTADOS:
+            raise ValueError(f"Estado invalido: {estado} (use pendiente o completada)")
+        consulta["estado"] = ESTADOS[clave]
+
+    if desde is not None:
+        consulta["desde"] = desde if isinstance(desde, int) else _fecha_a_ordinal(desde)
+    if hasta is not None:
+        consulta["hasta"] = hasta if isinstance(hasta, int) else _fecha_a_ordinal(hasta)
+    # Las fechas relativas ("hoy+7") cambian de valor al cambiar el día
+    consulta["relativa"] = any(isinstance(fecha, str) and fecha.strip().lower().startswith("hoy")
+                               for fecha in (desde, hasta))
+
+    if texto:
+        consulta["palabras"] = tuple(sorted(indices.palabras_de_texto(texto)))
+
+    if orden:
+        consulta["descendente"] = orden.startswith("-")
+        campo = orden.lstrip("-").lower()
+        if campo not in ORDENES:
+            raise ValueError(f"Orden invalido: {orden} (use {', '.join(ORDENES)})")
+        consulta["orden"] = campo
+
+    if limite is not None:
+        limite = int(limite)
+        if limite < 1:
+            raise ValueError("El limite debe ser mayor que cero")
+        consulta["limite"] = limite
+
+    return consulta
+
+def parsear(expresion):
+    """Convierte una expresión de texto en una consulta
+
+    Returns:
+        Diccionario con la consulta lista para ejecutar()
+
+    Raises:
+        ValueError: Si la expresión tiene campos u operadores desconocidos
+    """
+    # Importación diferida: solo hace falta al escribir consultas
+    import shlex
+
+    criterios = {"texto": []}
+    desde = None
+    hasta = None
+    relativa = False
+
+    try:
+        partes = shlex.split(expresion)
+    except ValueError:
+        raise ValueError("Falta cerrar unas comillas")
+
+    for parte in partes:
+        # Los operadores de dos caracteres van primero para no confundir ">=" con ">"
+        for operador in (">=", "<=", ">", "<", ":", "="):
+            campo, encontrado, valor = parte.partition(operador)
+            if encontrado and campo.isalpha():
+                break
+        else:
+            # Sin operador: es una palabra a buscar en el texto
+            criterios["texto"].append(parte)
+            continue
+
+        campo = campo.lower()
+        if campo == "vence":
+            ordinal = _fecha_a_ordinal(valor)
+            relativa = relativa or valor.strip().lower().startswith("hoy")
+            if operador in (":", "=", ">=", ">"):
+                minimo = ordinal + 1 if operador == ">" else ordinal
+                desde = minimo if desde is None else max(desde, minimo)
+            if operador in (":", "=", "<=", "<"):
+                maximo = ordinal - 1 if operador == "<" else ordinal
+                hasta = maximo if hasta is None else min(hasta, maximo)
+        elif operador not in (":", "="):
+            raise ValueError(f"El campo {campo} no admite el operador {operador}")
+        elif campo == "texto":
+            criterios["texto"].append(valor)
+        elif campo in ("materia", "estado", "orden", "limite"):
+            criterios[campo] = valor
+        else:
+            raise ValueError(f"Campo desconocido: {campo}")
+
+    if "limite" in criterios:
+        try:
+            criterios["limite"] = int(criterios["limite"])
+        except ValueError:
+            raise ValueError(f"Limite invalido: {criterios['limite']}")
+
+    criterios["texto"] = " ".join(criterios["texto"])
+    consulta = armar_consulta(desde=desde, hasta=hasta, **criterios)
+    consulta["relativa"] = relativa
+    return consulta
+
+# ============================================
+# PLANIFICACIÓN
+# ============================================
+
+def _materias_de(consulta):
+    """Devuelve los números de materia que acepta la consulta (None = todas)"""
+    if not consulta["materia"]:
+        return None
+    # Si el nombre coincide con una materia, solo esa; si no, las parecidas
+    exacta = buscar_materia(consulta["materia"])
+    return [exacta] if exacta is not None else buscar_materias_parecidas(consulta["materia"])
+
+def _filtros(consulta):
+    """Arma un filtro por cada criterio de la consulta
+
+    Cada filtro es un diccionario con:
+        descripcion: Texto para explicar el plan
+        estimado: Cuántas tareas devuelve el índice (calculado sin armar el conjunto)
+        conjunto: Función que devuelve los códigos que cumplen (desde el índice)
+        cumple: Función (codigo, info) que revisa si una tarea cumple (para pocas candidatas)
+    """
+    filtros = []
+
+    if consulta["materia"]:
+        numeros = _materias_de(consulta)
+        aceptadas = set(numeros)
+        filtros.append({
+            "descripcion": f"materia ~ '{consulta['materia']}' ({len(numeros)} materia(s))",
+            "estimado": sum(indices.cantidad_tareas_de_materia(n) for n in numeros),
+            "conjunto": lambda: set().union(*(indices.tareas_de_materia(n) for n in numeros)),
+            "cumple": lambda codigo, info: info.get("materia_id") in aceptadas,
+        })
+
+    if consulta["estado"]:
+        estado = consulta["estado"]
+        filtros.append({
+            "descripcion": f"estado = {estado}",
+            "estimado": indices.cantidad_tareas_con_estado(estado),
+            "conjunto": lambda: indices.tareas_con_estado(estado),
+            "cumple": lambda codigo, info: info.get("estado") == estado,
+        })
+
+    if consulta["desde"] is not None or consulta["hasta"] is not None:
+        desde = consulta["desde"]
+        hasta = consulta["hasta"]
+
+        def vence_en_rango(codigo, info):
+            ordinal = indices.ordinal_vencimiento(info)
+            return (ordinal is not None
+                    and (desde is None or ordinal >= desde)
+                    and (hasta is None or ordinal <= hasta))
+
+        limites = " y ".join(texto for texto in (
+            desde and f"desde {date.fromordinal(desde):%d/%m/%Y}",
+            hasta and f"hasta {date.fromordinal(hasta):%d/%m/%Y}") if texto)
+        filtros.append({
+            "descripcion": f"vence {limites}",
+            "estimado": indices.cantidad_tareas_que_vencen_entre(desde, hasta),
+            "conjunto": lambda: indices.tareas_que_vencen_entre(desde, hasta),
+            "cumple": vence_en_rango,
+        })
+
+    for palabra in consulta["palabras"]:
+        vocabulario = indices.palabras_que_empiezan_con(palabra)
+        if len(vocabulario) <= MAXIMO_PALABRAS_REVISION:
+            def tiene_palabra(codigo, info, vocabulario=vocabulario):
+                return indices.alguna_palabra_en_tarea(vocabulario, codigo)
+        else:
+            def tiene_palabra(codigo, info, palabra=palabra):
+                return any(p.startswith(palabra) for p in indices.palabras_de_tarea(info))
+        filtros.append({
+            "descripcion": f"texto '{palabra}*'",
+            "estimado": indices.cantidad_tareas_con_palabra(palabra),
+            "conjunto": lambda palabra=palabra: indices.tareas_con_palabra(palabra),
+            "cumple": tiene_palabra,
+        })
+
+    return filtros
+
+def planificar(consulta):
+    """Decide en qué orden y de qué forma se aplica cada criterio
+
+    Returns:
+        Lista de (filtro, modo) donde modo es "indice" (cruzar con el conjunto
+        del índice) o "revisar" (revisar una por una las tareas que quedan)
+    """
+    plan = []
+    # Del más selectivo al menos selectivo
+    filtros = sorted(_filtros(consulta), key=lambda filtro: filtro["estimado"])
+    quedan = None
+    for filtro in filtros:
+        if quedan is None or filtro["estimado"] <= FACTOR_CRUCE * quedan:
+            plan.append((filtro, "indice"))
+            quedan = filtro["estimado"] if quedan is None else min(quedan, filtro["estimado"])
+        else:
+            plan.append((filtro, "revisar"))
+    return plan
+
+def explicar(consulta):
+    """Describe el plan de una consulta (una línea por paso)"""
+    if isinstance(consulta, str):
+        consulta = parsear(consulta)
+    plan = planificar(consulta)
+    if not plan:
+        return ["recorrer todas las tareas"]
+    return [f"{modo:<8} {filtro['descripcion']} (~{filtro['estimado']} tarea(s))"
+            for filtro, modo in plan]
+
+# ============================================
+# EJECUCIÓN
+# ============================================
+
+def cumple(consulta, info, materias=None):
+    """Indica si los datos de una tarea cumplen los criterios de una consulta
+
+    Revisa la tarea directamente, sin índices: sirve para tareas que no están
+    en memoria (por ejemplo las del archivo) y para invalidar la caché.
+
+    Args:
+        consulta: Diccionario armado con armar_consulta() o parsear()
+        info: Datos de la tarea (None nunca cumple)
+        materias: Números de materia aceptados (None = calcularlos de la consulta)
+    """
+    if info is None:
+        return False
+    if materias is None:
+        materias = _materias_de(consulta)
+    if materias is not None and info.get("materia_id") not in materias:
+        return False
+    if consulta["estado"] and info.get("estado") != consulta["estado"]:
+        return False
+    if consulta["desde"] is not None or consulta["hasta"] is not None:
+        ordinal = indices.ordinal_vencimiento(info)
+        if ordinal is None:
+            return False
+        if consulta["desde"] is not None and ordinal < consulta["desde"]:
+            return False
+        if consulta["hasta"] is not None and ordinal > consulta["hasta"]:
+            return False
+    if consulta["palabras"]:
+        palabras = indices.palabras_de_tarea(info)
+        if not all(any(p.startswith(buscada) for p in palabras)
+                   for buscada in consulta["palabras"]):
+            return False
+    return True
+
+def _clave_de_orden(campo):
+    """Devuelve la función que ordena pares (codigo, info) por el campo pedido"""
+    if campo == "vence":
+        # Las tareas sin fecha válida van al final
+        return lambda par: (indices.ordinal_vencimiento(par[1]) or date.max.toordinal(),
+                            codigos.clave_orden(par))
+    if campo == "inicio":
+        def clave_inicio(par):
+            fecha = string_a_fecha(par[1].get("fecha_inicio", ""))
+            return (fecha.toordinal() if fecha else date.max.toordinal(),
+                    codigos.clave_orden(par))
+        return clave_inicio
+    if campo == "materia":
+        return lambda par: (normalizar_texto(nombre_materia(par[1].get("materia_id"))),
+                            codigos.clave_orden(par))
+    return codigos.clave_orden
+
+def _ordenar(consulta, pares):
+    """Ordena una lista de pares (codigo, info) y aplica el límite de la consulta
+
+    Returns:
+        Diccionario {codigo: info} en el orden pedido
+    """
+    clave = _clave_de_orden(consulta["orden"])
+    limite = consulta["limite"]
+
+    if limite is not None and limite < len(pares):
+        # O(n log k): no hace falta ordenar todo para quedarse con los primeros
+        elegir = heapq.nlargest if consulta["descendente"] else heapq.nsmallest
+        pares = elegir(limite, pares, key=clave)
+    else:
+        pares.sort(key=clave, reverse=consulta["descendente"])
+
+    return dict(pares)
+
+def _con_ocurrencias(consulta, resultado):
+    """Suma al resultado las ocurrencias de tareas recurrentes que cumplen la consulta
+
+    Solo se calculan las que vencen en el rango pedido (ver recurrencias.ventana).
+    """
+    # Las ocurrencias sin usar siempre están pendientes
+    if not recurrencias.hay_reglas() or consulta["estado"] == "Completada":
+        return resultado
+    materias = _materias_de(consulta)
+    desde, hasta = recurrencias.ventana(consulta["desde"], consulta["hasta"])
+    ocurrencias = [(codigo, info)
+                   for codigo, info in recurrencias.ocurrencias(desde, hasta, materias)
+                   if cumple(consulta, info, materias)]
+    if not ocurrencias:
+        return resultado
+    return _ordenar(consulta, list(resultado.items()) + ocurrencias)
+
+def _ejecutar_sin_cache(consulta):
+    """Resuelve una consulta con los índices (sin mirar la caché)"""
+    # Termina de cargar el snapshot (si lo hay) para que los índices estén completos
+    tareas = gestor_tareas.obtener_tareas()
+
+    plan = planificar(consulta)
+    if not plan:
+        candidatos = tareas.keys()
+    else:
+        candidatos = None
+        for filtro, modo in plan:
+            if modo == "indice":
+                conjunto = filtro["conjunto"]()
+                # set & set recorre el más chico de los dos
+                candidatos = set(conjunto) if candidatos is None else candidatos & conjunto
+            else:
+                candidatos = {codigo for codigo in candidatos
+                              if filtro["cumple"](codigo, tareas[codigo])}
+            if not candidatos:
+                return {}
+
+    return _ordenar(consulta, [(codigo, tareas[codigo]) for codigo in candidatos
+                               if codigo in tareas])
+
+def ejecutar(consulta, usar_cache=True):
+    """Ejecuta una consulta
+
+    Args:
+        consulta: Diccionario armado con armar_consulta() o parsear()
+        usar_cache: False para resolverla siempre con los índices
+
+    Returns:
+        Diccionario {codigo: info} con las tareas encontradas, en el orden pedido
+    """
+    # Índices, caché y reglas del mismo inquilino de principio a fin
+    with eventos.bloqueo():
+        if not usar_cache:
+            return _con_ocurrencias(consulta, _ejecutar_sin_cache(consulta))
+
+        clave = tuple(sorted(consulta.items()))
+        resultado = _leer_cache(clave)
+        if resultado is None:
+            # Primero termina de cargar el snapshot: eso publica eventos que
+            # vacían la caché, y no deben borrar el resultado recién calculado
+            gestor_tareas.obtener_tareas()
+            resultado = _ejecutar_sin_cache(consulta)
+            _guardar_cache(clave, consulta, resultado)
+        # Copia: quien la reciba puede modificarla sin tocar la caché
+        return _con_ocurrencias(consulta, dict(resultado))
+
+def consultar(expresion):
+    """Interpreta y ejecuta una expresión de consulta
+
+    Returns:
+        Diccionario {codigo: info} con las tareas encontradas, en el orden pedido
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    return ejecutar(parsear(expresion))
+
+def filtrar(consulta, pares):
+    """Aplica una consulta a tareas que no están en los índices (sin caché)
+
+    Revisa cada tarea con cumple(), así que recorre todas una vez: es para
+    fuentes que se leen a demanda, como el archivo de tareas viejas.
+
+    Args:
+        consulta: Diccionario armado con armar_consulta() o parsear()
+        pares: Iterable de (codigo, info); si un código se repite vale el último
+
+    Returns:
+        Diccionario {codigo: info} con las tareas que cumplen, en el orden pedido
+    """
+    materias = _materias_de(consulta)
+    # Solo se guardan en memoria las que cumplen
+    encontradas = {codigo: info for codigo, info in pares if cumple(consulta, info, materias)}
+    return _ordenar(consulta, list(encontradas.items()))
+
+# ============================================
+# CACHÉ DE RESULTADOS
+# ============================================
+# Consultas recientes {clave: entrada}, de la menos a la más usada
+# Cada entrada: {"consulta", "resultado", "materias" (set o None)}
+_cache = OrderedDict()
+# Candado de la caché (la usan el menú, el bus y las consultas de las réplicas)
+_candado_cache = threading.Lock()
+# Día (ordinal) en que se guardaron las consultas con "hoy"
+_dia_cache = fecha_de_hoy().toordinal()
+# Contadores para obtener_metricas_cache()
+_metricas_cache = {"aciertos": 0, "fallos": 0, "invalidaciones": 0, "expulsiones": 0}
+
+def _revisar_cambio_de_dia():
+    """Descarta las consultas con "hoy" si cambió el día (con el candado tomado)"""
+    global _dia_cache
+
+    hoy = fecha_de_hoy().toordinal()
+    if hoy != _dia_cache:
+        for clave in [c for c, entrada in _cache.items() if entrada["consulta"]["relativa"]]:
+            del _cache[clave]
+            _metricas_cache["invalidaciones"] += 1
+        _dia_cache = hoy
+
+def _leer_cache(clave):
+    """Devuelve el resultado guardado para la consulta (None si no está)"""
+    with _candado_cache:
+        _revisar_cambio_de_dia()
+        entrada = _cache.get(clave)
+        if entrada is None:
+            _metricas_cache["fallos"] += 1
+            return None
+        # Pasa a ser la más recientemente usada
+        _cache.move_to_end(clave)
+        _metricas_cache["aciertos"] += 1
+        return entrada["resultado"]
+
+def _guardar_cache(clave, consulta, resultado):
+    """Guarda un resultado y expulsa la consulta menos usada si no hay lugar"""
+    materias = _materias_de(consulta)
+    with _candado_cache:
+        _cache[clave] = {"consulta": consulta, "resultado": resultado,
+                         "materias": None if materias is None else set(materias)}
+        _cache.move_to_end(clave)
+        while len(_cache) > CAPACIDAD_CACHE:
+            _cache.popitem(last=False)
+            _metricas_cache["expulsiones"] += 1
+
+def _puede_estar(entrada, info):
+    """Indica si una versión de una tarea cumple los criterios de una consulta guardada"""
+    # Las materias de la entrada se calcularon al guardarla (None si no filtra por materia)
+    return cumple(entrada["consulta"], info, entrada["materias"])
+
+def intercambiar_estado(estado=None):
+    """Pone en uso la caché de otra partición y devuelve la actual
+
+    Cada inquilino (ver inquilinos.py) tiene su caché: al volver a uno no se
+    pierden sus consultas guardadas. Las métricas son del proceso.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = caché vacía)
+    """
+    global _cache, _dia_cache
+
+    with _candado_cache:
+        anterior = (_cache, _dia_cache)
+        _cache, _dia_cache = estado or (OrderedDict(), fecha_de_hoy().toordinal())
+    return anterior
+
+def vaciar_cache():
+    """Descarta todas las consultas guardadas"""
+    with _candado_cache:
+        _metricas_cache["invalidaciones"] += len(_cache)
+        _cache.clear()
+
+def invalidar_por_evento(evento):
+    """Descarta las consultas guardadas a las que puede afectar un evento
+
+    También la usan las réplicas, que reciben los eventos por fuera del bus local.
+    """
+    if evento["entidad"] not in ("tarea", "materia"):
+        return
+    if evento["tipo"] == "borrado_total" or len(evento["cambios"]) > MAXIMO_CAMBIOS_DETALLE:
+        vaciar_cache()
+        return
+
+    with _candado_cache:
+        if evento["entidad"] == "materia":
+            # Cambian qué materias coinciden con un nombre y el orden por materia
+            afectadas = [clave for clave, entrada in _cache.items()
+                         if entrada["consulta"]["materia"] or entrada["consulta"]["orden"] == "materia"]
+        else:
+            afectadas = [clave for clave, entrada in _cache.items()
+                         if any(_puede_estar(entrada, cambio["antes"])
+                                or _puede_estar(entrada, cambio["despues"])
+                                for cambio in evento["cambios"])]
+        for clave in afectadas:
+            del _cache[clave]
+        _metricas_cache["invalidaciones"] += len(afectadas)
+
+def obtener_metricas_cache():
+    """Devuelve aciertos, fallos, invalidaciones, expulsiones y tamaño de la caché"""
+    with _candado_cache:
+        metricas = dict(_metricas_cache)
+        metricas["entradas"] = len(_cache)
+    consultas_totales = metricas["aciertos"] + metricas["fallos"]
+    metricas["tasa_aciertos"] = metricas["aciertos"] / consultas_totales if consultas_totales else 0.0
+    return metricas
+
+# Se suscribe de forma sincrónica: la próxima consulta ya no debe ver resultados viejos
+eventos.suscribir(invalidar_por_evento, nombre="cache_consultas", sincronico=True)
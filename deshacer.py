@@ -0,0 +1,344 @@
+"""
+MÓDULO DE DESHACER
+Historial de operaciones para deshacer y rehacer cambios en tareas y materias
+
+UTILIDAD:
+Anota cada operación que cambia tareas o materias (agregar, editar, completar,
+eliminar, borrar todas, eliminar una materia con sus tareas...) y permite
+deshacerla y volver a hacerla:
+
+- deshacer(): Vuelve atrás la última operación
+- rehacer(): Vuelve a aplicar la última operación deshecha
+- agrupar(descripcion): Junta en una sola operación todo lo que se publique
+  dentro del "with" (por ejemplo una materia y sus tareas eliminadas)
+- listar(): Las últimas operaciones, para mostrarlas en el menú
+
+CÓMO SE ANOTA:
+Se suscribe al bus de eventos (ver eventos.py): cada evento trae el antes y el
+después de cada dato cambiado. No se guardan copias de tareas_colegio sino lo
+mínimo para ir y volver:
+
+- Alta: solo el código (la tarea sigue en tareas_colegio)
+- Baja: los datos que se quitaron (ya no están en tareas_colegio, así que no
+  se duplican: borrar 100.000 tareas no ocupa el doble de memoria)
+- Edición: solo los campos que cambiaron, con su valor anterior y el nuevo
+
+Deshacer aplica la operación inversa con gestor_tareas.restaurar_tareas() (o
+restaurar_materias()), que publica un único evento: los índices, la agenda,
+las réplicas y el resto se enteran como de cualquier otro cambio. Si la
+operación fue en otro inquilino, se activa ese inquilino mientras se aplica.
+
+MEMORIA ACOTADA:
+El historial es un buffer circular de CAPACIDAD_HISTORIAL operaciones y de
+hasta MAXIMO_CAMBIOS cambios en total: al pasarse se olvidan las más viejas.
+Una operación nueva descarta lo que se podía rehacer.
+
+Archivar tareas y reemplazar el catálogo completo (abrir un snapshot) no se
+pueden deshacer y vacían el historial: lo anotado ya no corresponde a los datos.
+
+DEPENDENCIAS:
+- collections: Módulo estándar de Python (deque para el buffer circular)
+- contextlib, time: Módulos estándar para agrupar()
+- eventos.py: Para anotar los cambios y tomar el bloqueo del bus
+- gestor_tareas.py, gestor_materias.py: Para aplicar los cambios al deshacer
+  (se importan recién al deshacer, porque gestor_tareas importa este módulo)
+- inquilinos.py: Solo si la operación fue en otro inquilino
+
+¿POR QUÉ UN MÓDULO APARTE?
+- Es un suscriptor más del bus, como los índices o la replicación: las
+  operaciones no tienen que saber que se pueden deshacer
+"""
+
+# Módulo estándar para el buffer circular de operaciones
+from collections import deque
+# Módulo estándar para armar agrupar() como "with"
+from contextlib import contextmanager
+# Módulo estándar para anotar el momento de las operaciones agrupadas
+import time
+
+# Importa el bus de eventos
+import eventos
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Cantidad máxima de operaciones que se pueden deshacer
+CAPACIDAD_HISTORIAL = 50
+# Cantidad máxima de cambios guardados entre todas las operaciones
+MAXIMO_CAMBIOS = 1_000_000
+# Entidades que se pueden deshacer
+ENTIDADES = ("tarea", "materia")
+# Eventos que no son operaciones del usuario (se ignoran)
+IGNORADOS = ("cargadas", "deshecha", "rehecha")
+# Eventos que no se pueden deshacer y vacían el historial
+IRREVERSIBLES = ("archivadas", "catalogo_reemplazado")
+
+# Cómo se describe cada tipo de evento en el menú
+VERBOS = {
+    "agregada": "Agregar", "agregadas": "Agregar", "editada": "Editar",
+    "completada": "Completar", "completadas": "Completar",
+    "eliminada": "Eliminar", "eliminadas": "Eliminar",
+    "borrado_total": "Borrar todas", "materia_reasignada": "Cambiar de materia",
+    "renombrada": "Renombrar",
+}
+
+# Marca de un campo que no existía (distinta de None, que es un valor válido)
+_FALTA = object()
+
+# ============================================
+# ESTADO
+# ============================================
+# Operaciones que se pueden deshacer, la más nueva al final
+_historial = deque(maxlen=CAPACIDAD_HISTORIAL)
+# Operaciones deshechas que se pueden rehacer, la última deshecha al final
+_rehacer = []
+# Cambios guardados en _historial (para MAXIMO_CAMBIOS)
+_total_cambios = 0
+# Operación que se está armando con agrupar() (o None)
+_grupo = None
+
+# Formato de una operación:
+#   {"descripcion": "Eliminar 3 tarea(s)", "momento": 1718000000.0,
+#    "partes": [(entidad, particion, [cambio, ...]), ...]}
+# y de cada cambio (tuplas, para ocupar poco):
+#   ("alta", clave, None)                  la tarea existe; al deshacer se guardan sus datos
+#   ("baja", clave, datos)                 los datos quitados, para volver a ponerlos
+#   ("campos", clave, (antes, despues))    solo los campos que cambiaron
+
+# ============================================
+# ANOTAR
+# ============================================
+
+def _compactar(cambio):
+    """Reduce un cambio del bus a lo mínimo para deshacerlo y rehacerlo"""
+    antes = cambio["antes"]
+    despues = cambio["despues"]
+    if antes is None:
+        return ("alta", cambio["clave"], None)
+    if despues is None:
+        return ("baja", cambio["clave"], antes)
+    diferencia_antes = {}
+    diferencia_despues = {}
+    for campo in antes.keys() | despues.keys():
+        valor_antes = antes.get(campo, _FALTA)
+        valor_despues = despues.get(campo, _FALTA)
+        if valor_antes != valor_despues:
+            diferencia_antes[campo] = valor_antes
+            diferencia_despues[campo] = valor_despues
+    return ("campos", cambio["clave"], (diferencia_antes, diferencia_despues))
+
+def _describir(evento):
+    """Arma la descripción de una operación de un solo evento"""
+    verbo = VERBOS.get(evento["tipo"], evento["tipo"])
+    return f"{verbo} {len(evento['cambios'])} {evento['entidad']}(s)"
+
+def _cantidad(operacion):
+    """Cantidad de cambios guardados en una operación"""
+    return sum(len(cambios) for _, _, cambios in operacion["partes"])
+
+def _guardar(operacion):
+    """Agrega una operación al historial respetando los límites de memoria"""
+    global _total_cambios
+
+    # Lo deshecho ya no se puede rehacer después de una operación nueva
+    _rehacer.clear()
+    # El deque descarta solo la más vieja, pero hay que descontar sus cambios
+    if len(_historial) == _historial.maxlen:
+        _total_cambios -= _cantidad(_historial[0])
+    _historial.append(operacion)
+    _total_cambios += _cantidad(operacion)
+    # Olvida las más viejas hasta entrar en el límite (la última siempre queda)
+    while _total_cambios > MAXIMO_CAMBIOS and len(_historial) > 1:
+        _total_cambios -= _cantidad(_historial.popleft())
+
+def vaciar():
+    """Olvida todo lo que se podía deshacer y rehacer"""
+    global _total_cambios
+
+    with eventos.bloqueo():
+        _historial.clear()
+        _rehacer.clear()
+        _total_cambios = 0
+
+def anotar_evento(evento):
+    """Anota en el historial la operación de un evento (suscriptor del bus)"""
+    if evento["entidad"] not in ENTIDADES or evento["tipo"] in IGNORADOS:
+        return
+    if evento["tipo"] in IRREVERSIBLES:
+        vaciar()
+        return
+
+    parte = (evento["entidad"], evento["particion"],
+             [_compactar(cambio) for cambio in evento["cambios"]])
+    # Dentro de agrupar() se suma a la operación en curso
+    if _grupo is not None:
+        _grupo["partes"].append(parte)
+        return
+    _guardar({"descripcion": _describir(evento), "momento": evento["momento"],
+              "partes": [parte]})
+
+# Sincrónico: la operación queda anotada antes de que termine
+eventos.suscribir(anotar_evento, nombre="deshacer", sincronico=True)
+
+@contextmanager
+def agrupar(descripcion):
+    """Junta en una sola operación todo lo que se publique dentro del "with"
+
+    Mientras dura se tiene tomado el bloqueo del bus, así otros hilos no
+    mezclan sus cambios. Dentro de otro agrupar() no hace nada: vale el de afuera.
+
+    Args:
+        descripcion: Cómo se muestra la operación en el menú
+    """
+    global _grupo
+
+    with eventos.bloqueo():
+        if _grupo is not None:
+            yield
+            return
+        _grupo = {"descripcion": descripcion, "momento": time.time(), "partes": []}
+        try:
+            yield
+        finally:
+            operacion, _grupo = _grupo, None
+            if operacion["partes"]:
+                _guardar(operacion)
+
+# ============================================
+# DESHACER Y REHACER
+# ============================================
+
+def _aplicar_campos(datos, campos):
+    """Devuelve una copia de los datos con esos campos cambiados"""
+    datos = dict(datos)
+    for campo, valor in campos.items():
+        if valor is _FALTA:
+            datos.pop(campo, None)
+        else:
+            datos[campo] = valor
+    return datos
+
+def _aplicar_parte(entidad, cambios, hacia_atras):
+    """Aplica los cambios de una parte en un sentido y los devuelve listos para el otro
+
+    Args:
+        hacia_atras: True para deshacer, False para rehacer
+
+    Returns:
+        Los cambios a guardar para aplicar la parte en el sentido contrario
+    """
+    # Importación diferida: gestor_tareas importa este módulo al cargarse
+    import gestor_tareas
+    import gestor_materias
+
+    if entidad == "tarea":
+        restaurar = gestor_tareas.restaurar_tareas
+
+        def actual(codigo):
+            return gestor_tareas.obtener_tarea(codigo)
+    else:
+        restaurar = gestor_materias.restaurar_materias
+
+        def actual(numero):
+            catalogo = gestor_materias.obtener_catalogo()
+            return {"numero": numero, "nombre": catalogo[numero]} if numero in catalogo else None
+
+    # Los cambios de un mismo evento son de claves distintas: el orden no importa
+    # (y en el orden original los índices ordenados insertan al final)
+    datos = []
+    for clase, clave, guardado in cambios:
+        # Lo que hay que quitar es lo que hoy existe; lo que hay que poner está guardado
+        quitar = (clase == "alta") == hacia_atras
+        if clase == "campos":
+            existente = actual(clave)
+            campos = guardado[0] if hacia_atras else guardado[1]
+            datos.append((clave, None if existente is None else _aplicar_campos(existente, campos)))
+        elif quitar:
+            datos.append((clave, None))
+        else:
+            datos.append((clave, guardado))
+
+    anteriores = restaurar("deshecha" if hacia_atras else "rehecha", datos)
+
+    # Los quitados se guardan para volver a ponerlos; los puestos ya no hacen falta
+    nuevos = []
+    for (clase, clave, guardado), anterior in zip(cambios, anteriores):
+        if clase == "campos":
+            nuevos.append((clase, clave, guardado))
+        elif (clase == "alta") == hacia_atras:
+            nuevos.append((clase, clave, anterior))
+        else:
+            nuevos.append((clase, clave, None))
+    return nuevos
+
+def _aplicar(operacion, hacia_atras):
+    """Aplica todas las partes de una operación en un sentido"""
+    partes = operacion["partes"]
+    indices_partes = range(len(partes) - 1, -1, -1) if hacia_atras else range(len(partes))
+    for posicion in indices_partes:
+        entidad, particion, cambios = partes[posicion]
+        if particion == eventos.particion_actual():
+            cambios = _aplicar_parte(entidad, cambios, hacia_atras)
+        else:
+            # La operación fue en otro inquilino: se aplica ahí
+            import inquilinos
+            with inquilinos.usar(particion):
+                cambios = _aplicar_parte(entidad, cambios, hacia_atras)
+        partes[posicion] = (entidad, particion, cambios)
+
+def deshacer():
+    """Deshace la última operación
+
+    Returns:
+        La descripción de la operación deshecha
+
+    Raises:
+        ValueError: Si no hay nada para deshacer
+    """
+    global _total_cambios
+
+    with eventos.bloqueo():
+        if not _historial:
+            raise ValueError("No hay operaciones para deshacer")
+        operacion = _historial.pop()
+        _total_cambios -= _cantidad(operacion)
+        _aplicar(operacion, hacia_atras=True)
+        _rehacer.append(operacion)
+    return operacion["descripcion"]
+
+def rehacer():
+    """Vuelve a aplicar la última operación deshecha
+
+    Returns:
+        La descripción de la operación
+
+    Raises:
+        ValueError: Si no hay nada para rehacer
+    """
+    global _total_cambios
+
+    with eventos.bloqueo():
+        if not _rehacer:
+            raise ValueError("No hay operaciones para rehacer")
+        operacion = _rehacer.pop()
+        _aplicar(operacion, hacia_atras=False)
+        # Vuelve al historial sin descartar el resto de lo que se puede rehacer
+        if len(_historial) == _historial.maxlen:
+            _total_cambios -= _cantidad(_historial[0])
+        _historial.append(operacion)
+        _total_cambios += _cantidad(operacion)
+    return operacion["descripcion"]
+
+def listar(cantidad=10):
+    """Devuelve las últimas operaciones que se pueden deshacer y rehacer
+
+    Returns:
+        Tupla (para_deshacer, para_rehacer), cada una lista de (descripcion,
+        momento) empezando por la próxima que se aplicaría
+    """
+    with eventos.bloqueo():
+        para_deshacer = [(operacion["descripcion"], operacion["momento"])
+                         for operacion in list(_historial)[-cantidad:]][::-1]
+        para_rehacer = [(operacion["descripcion"], operacion["momento"])
+                        for operacion in _rehacer[-cantidad:]][::-1]
+    return para_deshacer, para_rehacer
@@ -0,0 +1,304 @@
+"""
+MÓDULO DE EVENTOS
+Bus de publicación/suscripción para los cambios en las tareas
+
+UTILIDAD:
+Cada vez que una tarea cambia (se agrega, edita, completa o elimina) gestor_tareas
+publica un evento en este bus. Así las estructuras derivadas (índices, caché,
+recordatorios, replicación, métricas) se actualizan de forma incremental con el
+cambio concreto, en lugar de recalcular todo desde el diccionario completo.
+
+FORMATO DE UN EVENTO:
+    {
+        "secuencia": 17,             # Número creciente, sin huecos ni repetidos
+        "tipo": "editada",           # Qué operación lo generó
+        "entidad": "tarea",          # Sobre qué tipo de dato se hizo el cambio
+        "particion": "",             # Inquilino al que pertenece el dato ("" = el general)
+        "momento": 1718000000.0,     # time.time() de la publicación
+        "autor": "ana",              # Quién hizo el cambio ("" si no se sabe)
+        "cambios": [                 # Uno o más cambios (varios en operaciones masivas)
+            {"clave": "T001", "antes": {...}, "despues": {...}}
+        ]
+    }
+
+"antes" es None cuando el dato se crea y "despues" es None cuando se elimina.
+Ambos son copias, los suscriptores pueden guardarlos sin riesgo.
+
+"particion" es el inquilino activo al publicar (ver inquilinos.py): dos
+inquilinos pueden tener una tarea con el mismo código, así que quien guarde
+datos de varios inquilinos debe usar la partición junto con la clave.
+
+"autor" es el que se indicó con como_autor() en el hilo (o la tarea de
+asyncio) que publica: cada usuario de un servidor puede tener el suyo.
+
+TIPOS DE SUSCRIPTORES:
+- Sincrónicos: se ejecutan dentro de publicar(), antes de que la operación
+  termine. Sirven para índices que deben estar al día en la próxima consulta.
+- Asincrónicos (default): cada uno tiene una cola acotada y un hilo propio.
+  Si la cola se llena, quien publicó espera (contrapresión) en lugar de
+  perder eventos o acumular memoria sin límite.
+
+ENTREGA A LOS ASINCRÓNICOS:
+publicar() no encola con el bloqueo del bus tomado: anota el evento y las
+colas lo reciben cuando el hilo suelta su último "with bloqueo()" (publicar
+dentro de un bloqueo más grande, como deshacer.agrupar, entrega al final).
+Así un suscriptor lento frena solo a quien publicó, no a todos los que
+esperan el bloqueo (servicio, deshacer, cambios de inquilino, réplicas).
+Un solo hilo a la vez pasa los eventos a las colas, así llegan en el orden
+de su secuencia.
+
+DEPENDENCIAS:
+- threading, queue, time: Módulos estándar de Python
+- collections: Módulo estándar para los eventos que esperan entrar a las colas
+- contextvars, contextlib: Módulos estándar para el autor de cada hilo o tarea
+
+¿POR QUÉ NO DEPENDE DE OTROS ARCHIVOS DEL PROYECTO?
+- Es un módulo base: gestor_tareas publica y los demás módulos se suscriben,
+  por eso no debe importar a ninguno de ellos
+"""
+
+# Módulo estándar para los hilos de los suscriptores y el candado
+import threading
+# Módulo estándar para las colas acotadas
+import queue
+# Módulo estándar para los eventos que esperan entrar a las colas
+from collections import deque
+# Módulo estándar para registrar el momento de cada evento
+import time
+# Módulo estándar para el autor propio de cada hilo o tarea de asyncio
+from contextvars import ContextVar
+# Módulo estándar para armar como_autor() como "with"
+from contextlib import contextmanager
+
+# ============================================
+# ESTADO DEL BUS
+# ============================================
+# Último número de secuencia publicado
+_secuencia = 0
+# Candado que garantiza que la secuencia y el orden de entrega coincidan
+_candado = threading.RLock()
+# Funciones que se llaman dentro de publicar()
+_sincronicos = []
+# Suscriptores asincrónicos {funcion: {"nombre", "cola", "hilo"}}
+_asincronicos = {}
+# Eventos publicados que todavía no pasaron a las colas de los asincrónicos
+_por_entregar = deque()
+# Candado que hace que un solo hilo a la vez pase eventos a las colas
+_candado_entrega = threading.Lock()
+# Datos de cada hilo: cuántos "with bloqueo()" tiene abiertos y si es suscriptor
+_hilo = threading.local()
+# Inquilino activo, se anota en cada evento ("" si hay uno solo)
+_particion = ""
+# Autor que se anota en cada evento (cada hilo o tarea de asyncio tiene el suyo)
+_autor = ContextVar("autor", default="")
+# Autor de los hilos que no indicaron uno (ver configurar_autor)
+_autor_por_defecto = ""
+
+# Capacidad por defecto de la cola de cada suscriptor asincrónico
+CAPACIDAD_COLA = 1000
+
+# ============================================
+# SUSCRIPCIÓN
+# ============================================
+
+def _consumir(funcion, cola, nombre):
+    """Bucle del hilo de un suscriptor asincrónico"""
+    # No pasa eventos a las colas: podría quedarse esperando en la suya (ver _entregar)
+    _hilo.suscriptor = True
+    while True:
+        evento = cola.get()
+        try:
+            # None es la señal para terminar el hilo
+            if evento is None:
+                return
+            funcion(evento)
+        except Exception as error:
+            # Un error en un suscriptor no debe detener su hilo
+            print(f"\nError en suscriptor '{nombre}': {error}")
+        finally:
+            cola.task_done()
+
+def suscribir(funcion, nombre=None, sincronico=False, capacidad=CAPACIDAD_COLA):
+    """Registra una función que recibirá cada evento publicado
+
+    Args:
+        funcion: Callable que recibe el diccionario del evento
+        nombre: Nombre descriptivo (para el hilo y los mensajes de error)
+        sincronico: True para ejecutarla dentro de publicar() (default False)
+        capacidad: Tamaño máximo de la cola si es asincrónico (default 1000)
+    """
+    if nombre is None:
+        nombre = getattr(funcion, "__name__", "suscriptor")
+
+    with _candado:
+        if sincronico:
+            if funcion not in _sincronicos:
+                _sincronicos.append(funcion)
+            return
+
+        if funcion in _asincronicos:
+            return
+
+        cola = queue.Queue(maxsize=capacidad)
+        # daemon=True para que no impida cerrar el programa
+        hilo = threading.Thread(target=_consumir, args=(funcion, cola, nombre),
+                                name=f"eventos-{nombre}", daemon=True)
+        _asincronicos[funcion] = {"nombre": nombre, "cola": cola, "hilo": hilo}
+        hilo.start()
+
+def desuscribir(funcion):
+    """Quita un suscriptor; si es asincrónico espera que vacíe su cola"""
+    with _candado:
+        if funcion in _sincronicos:
+            _sincronicos.remove(funcion)
+            return
+        suscriptor = _asincronicos.pop(funcion, None)
+
+    if suscriptor:
+        suscriptor["cola"].put(None)
+        suscriptor["hilo"].join()
+
+# ============================================
+# PUBLICACIÓN
+# ============================================
+
+def cambio(clave, antes, despues):
+    """Arma un cambio individual para incluir en un evento
+
+    Args:
+        clave: Identificador del dato (código de tarea, id de materia...)
+        antes: Copia del dato antes del cambio (None si se creó)
+        despues: Copia del dato después del cambio (None si se eliminó)
+    """
+    return {"clave": clave, "antes": antes, "despues": despues}
+
+def publicar(tipo, cambios, entidad="tarea"):
+    """Publica un evento con uno o más cambios
+
+    Args:
+        tipo: Operación que generó el evento ("agregada", "editada"...)
+        cambios: Lista de cambios armados con cambio()
+        entidad: Tipo de dato afectado (default "tarea")
+
+    Returns:
+        El evento publicado
+    """
+    global _secuencia
+
+    with bloqueo():
+        _secuencia += 1
+        evento = {
+            "secuencia": _secuencia,
+            "tipo": tipo,
+            "entidad": entidad,
+            "particion": _particion,
+            "momento": time.time(),
+            "autor": _autor.get() or _autor_por_defecto,
+            "cambios": cambios,
+        }
+
+        # Primero los sincrónicos, para que los índices queden al día
+        for funcion in _sincronicos:
+            try:
+                funcion(evento)
+            except Exception as error:
+                print(f"\nError en suscriptor sincronico: {error}")
+
+        # Los asincrónicos lo reciben al soltar el bloqueo (ver _entregar)
+        if _asincronicos:
+            _por_entregar.append(evento)
+
+    return evento
+
+def _entregar():
+    """Pasa los eventos anotados a las colas de los asincrónicos, en orden
+
+    Se llama sin el bloqueo del bus: si una cola está llena, put() espera
+    (contrapresión) sin frenar a los que solo necesitan el bloqueo. Cada hilo
+    que publicó la llama al soltar el bloqueo, así ningún evento queda sin
+    entregar; los hilos de los suscriptores no, porque podrían esperar por
+    su propia cola llena (lo que publiquen sale con la próxima entrega).
+    """
+    if getattr(_hilo, "suscriptor", False):
+        return
+    with _candado_entrega:
+        while True:
+            with _candado:
+                if not _por_entregar:
+                    return
+                evento = _por_entregar.popleft()
+                colas = [suscriptor["cola"] for suscriptor in _asincronicos.values()]
+            for cola in colas:
+                cola.put(evento)
+
+def cambiar_particion(particion):
+    """Define el inquilino que se anota en los eventos siguientes
+
+    Lo llama inquilinos.py al cambiar de inquilino, con el bus bloqueado.
+    """
+    global _particion
+
+    with _candado:
+        _particion = particion
+
+def configurar_autor(autor):
+    """Define el autor de los cambios de los hilos que no usan como_autor()
+
+    Lo llama main.py con el usuario del programa (opción --autor).
+    """
+    global _autor_por_defecto
+
+    _autor_por_defecto = autor or ""
+
+@contextmanager
+def como_autor(autor):
+    """Anota ese autor en los eventos que se publiquen dentro del "with"
+
+    Vale solo para el hilo (o la tarea de asyncio) que lo usa; las llamadas
+    de servicio.asincrono lo heredan, porque asyncio.to_thread copia el contexto.
+    """
+    marca = _autor.set(autor or "")
+    try:
+        yield
+    finally:
+        _autor.reset(marca)
+
+def particion_actual():
+    """Devuelve el inquilino que se anota en los eventos ("" = el general)"""
+    return _particion
+
+def ultima_secuencia():
+    """Devuelve el número de secuencia del último evento publicado"""
+    return _secuencia
+
+@contextmanager
+def bloqueo():
+    """Toma el candado del bus mientras dura el "with" (se puede anidar)
+
+    Mientras se tiene tomado nadie puede publicar, así se pueden leer datos
+    consistentes con ultima_secuencia() (por ejemplo para una foto completa).
+    Al soltar el último del hilo, lo que se publicó adentro pasa a las colas
+    de los asincrónicos (ver _entregar).
+    """
+    _hilo.profundidad = getattr(_hilo, "profundidad", 0) + 1
+    try:
+        with _candado:
+            yield
+    finally:
+        _hilo.profundidad -= 1
+        if not _hilo.profundidad:
+            _entregar()
+
+def esperar_pendientes():
+    """Espera a que todos los suscriptores asincrónicos vacíen sus colas"""
+    # Primero termina de pasar a las colas lo que ya se publicó
+    _entregar()
+    for suscriptor in list(_asincronicos.values()):
+        suscriptor["cola"].join()
+
+def obtener_metricas():
+    """Devuelve el tamaño actual de la cola de cada suscriptor asincrónico"""
+    return {
+        suscriptor["nombre"]: suscriptor["cola"].qsize()
+        for suscriptor in list(_asincronicos.values())
+    }
@@ -0,0 +1,373 @@
+"""
+GENERADOR DE CARGA
+
+UTILIDAD:
+Simula muchos alumnos usando el gestor al mismo tiempo para saber hasta dónde
+aguanta antes de que empiecen las clases. Cada usuario simulado es un hilo que
+repite operaciones a través de servicio.py (la misma puerta de entrada que
+usaría un servidor) con una mezcla configurable:
+
+- lectura: listar las más urgentes, las pendientes o hacer una búsqueda
+- escritura: agregar o editar una tarea
+- cierre: completar o eliminar una tarea
+
+Al final informa, por etapa, las operaciones por segundo, la latencia (p50,
+p95, p99 y máxima, en milisegundos), los conflictos (otro usuario eliminó la
+tarea antes: es esperable) y los errores (cualquier otra excepción).
+
+USO:
+    python generador_carga.py
+    python generador_carga.py --usuarios 1,2,4,8,16,32 --duracion 5
+    python generador_carga.py --usuarios 50 --tasa 500 --mezcla lectura=80,escritura=15,cierre=5
+    python generador_carga.py --hoy 01/03/2027 --semilla 7
+
+Con varias cantidades de usuarios (--usuarios 1,2,4...) corre una etapa por
+cada una, sobre los mismos datos, e indica el punto de quiebre: la primera
+etapa cuyo p99 supera --limite-p99-ms o con errores. Con --tasa cada usuario
+espera para no pasar de su parte de esa tasa total (operaciones por segundo);
+sin --tasa cada uno va lo más rápido que puede. Con --hoy el reloj del programa
+queda fijo en ese día (ver herramientas.fijar_reloj): junto con --semilla, las
+mismas tareas, vencimientos y resultados de "vence<=hoy+7" en cada corrida.
+
+Termina con código 1 si alguna etapa supera el límite, como benchmark_arranque.py.
+
+DEPENDENCIAS:
+- argparse, random, threading, time, datetime, sys: Módulos estándar de Python
+- servicio.py: Las operaciones que se miden
+- gestor_tareas.py: Para cargar las tareas iniciales de una vez y listar
+  las más urgentes
+- herramientas.py: fecha_de_hoy() para las fechas de las tareas generadas y
+  fijar_reloj() para --hoy
+
+¿POR QUÉ HILOS Y NO PROCESOS?
+- Los datos viven en memoria de un proceso: varios usuarios de un mismo
+  servidor comparten las tareas y el bloqueo del bus, y eso es lo que se mide
+"""
+
+# Módulos estándar para las opciones, el azar, los hilos y los tiempos
+import argparse
+import random
+import threading
+import time
+import sys
+from datetime import timedelta
+
+# Importa las operaciones que se miden
+import servicio
+# Importa la carga en lote y el listado de urgentes
+import gestor_tareas
+# Importa el reloj del programa (para fijar "hoy")
+from herramientas import fecha_de_hoy, fijar_reloj
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Mezcla de operaciones por defecto (porcentajes)
+MEZCLA = "lectura=80,escritura=15,cierre=5"
+# Materias con las que se crean las tareas simuladas
+MATERIAS = ("Matematicas", "Lengua", "Historia", "Geografia", "Ingles", "Fisica")
+# Búsquedas que hacen los usuarios simulados
+CONSULTAS = (
+    "estado:pendiente orden:vence limite:20",
+    "materia:mate estado:pendiente",
+    "vence<=hoy+7 orden:vence",
+    "practico",
+    "materia:historia orden:-vence limite:10",
+)
+# Palabras para armar descripciones de tareas
+PALABRAS = ("practico", "resumen", "ejercicios", "lectura", "informe", "mapa", "prueba")
+
+# ============================================
+# TAREAS EN JUEGO (compartidas entre usuarios)
+# ============================================
+# Códigos de las tareas que existen; se elige al azar entre ellos
+_codigos = []
+# Posición de cada código en _codigos, para quitarlo en O(1)
+_posiciones = {}
+# Candado de las dos estructuras anteriores
+_candado = threading.Lock()
+
+def _sumar_codigo(codigo):
+    """Anota una tarea nueva para que otros usuarios puedan elegirla"""
+    with _candado:
+        _posiciones[codigo] = len(_codigos)
+        _codigos.append(codigo)
+
+def _quitar_codigo(codigo):
+    """Deja de ofrecer una tarea eliminada (cambia el último a su lugar)"""
+    with _candado:
+        posicion = _posiciones.pop(codigo, None)
+        if posicion is None:
+            return
+        ultimo = _codigos.pop()
+        if ultimo != codigo:
+            _codigos[posicion] = ultimo
+            _posiciones[ultimo] = posicion
+
+def _elegir_codigo(azar):
+    """Devuelve el código de una tarea cualquiera (o None si no hay)"""
+    with _candado:
+        return azar.choice(_codigos) if _codigos else None
+
+# ============================================
+# OPERACIONES
+# ============================================
+
+def _fecha(dias):
+    """Devuelve la fecha de dentro de `dias` días en formato DD/MM/AAAA"""
+    return (fecha_de_hoy() + timedelta(days=dias)).strftime("%d/%m/%Y")
+
+def _datos_tarea(azar):
+    """Arma los datos de una tarea al azar"""
+    inicio = azar.randint(-10, 20)
+    return {"materia": azar.choice(MATERIAS),
+            "tarea": f"{azar.choice(PALABRAS)} {azar.randint(1, 999)}",
+            "fecha_inicio": _fecha(inicio),
+            "fecha_fin": _fecha(inicio + azar.randint(0, 15))}
+
+def _listar(azar):
+    """Lista las más urgentes o todas las pendientes"""
+    if azar.random() < 0.5:
+        gestor_tareas.obtener_tareas_mas_urgentes(10)
+    else:
+        servicio.consultar("estado:pendiente")
+
+def _buscar(azar):
+    """Hace una de las búsquedas de CONSULTAS"""
+    servicio.consultar(azar.choice(CONSULTAS))
+
+def _agregar(azar):
+    """Agrega una tarea"""
+    datos = _datos_tarea(azar)
+    tarea = servicio.agregar(datos["materia"], datos["tarea"], datos["fecha_inicio"],
+                             datos["fecha_fin"])
+    _sumar_codigo(tarea["codigo"])
+
+def _editar(azar):
+    """Cambia la descripción o el vencimiento de una tarea"""
+    codigo = _elegir_codigo(azar)
+    if codigo is None:
+        return _agregar(azar)
+    if azar.random() < 0.5:
+        servicio.editar(codigo, observaciones=f"revisado {azar.randint(1, 99)}")
+    else:
+        servicio.editar(codigo, tarea=f"{azar.choice(PALABRAS)} {azar.randint(1, 999)}")
+
+def _completar(azar):
+    """Completa una tarea"""
+    codigo = _elegir_codigo(azar)
+    if codigo is not None:
+        servicio.completar(codigo)
+
+def _eliminar(azar):
+    """Elimina una tarea"""
+    codigo = _elegir_codigo(azar)
+    if codigo is not None:
+        # Se quita antes: así otro usuario deja de elegirla cuanto antes
+        _quitar_codigo(codigo)
+        servicio.eliminar(codigo)
+
+# Operaciones de cada grupo de la mezcla (se elige una al azar dentro del grupo)
+GRUPOS = {
+    "lectura": (("listar", _listar), ("buscar", _buscar)),
+    "escritura": (("agregar", _agregar), ("editar", _editar)),
+    "cierre": (("completar", _completar), ("eliminar", _eliminar)),
+}
+
+def leer_mezcla(texto):
+    """Interpreta "lectura=80,escritura=15,cierre=5"
+
+    Returns:
+        Tupla (grupos, pesos) para random.choices()
+
+    Raises:
+        ValueError: Si un grupo no existe o un peso no es un número positivo
+    """
+    grupos, pesos = [], []
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in GRUPOS:
+            raise ValueError(f"Grupo desconocido: {nombre} (use {', '.join(GRUPOS)})")
+        try:
+            peso = float(peso)
+        except ValueError:
+            raise ValueError(f"Peso invalido para {nombre}: {peso}")
+        if peso < 0:
+            raise ValueError(f"Peso invalido para {nombre}: {peso}")
+        grupos.append(nombre)
+        pesos.append(peso)
+    if not any(pesos):
+        raise ValueError("La mezcla no tiene ninguna operacion")
+    return grupos, pesos
+
+# ============================================
+# SIMULACIÓN
+# ============================================
+
+def _usuario(numero, semilla, mezcla, fin, intervalo, resultados):
+    """Bucle de un usuario simulado: elige, ejecuta y mide operaciones hasta `fin`
+
+    Args:
+        intervalo: Segundos entre operaciones de este usuario (0 = sin esperar)
+        resultados: Diccionario propio del usuario {operacion: {"latencias", "conflictos", "errores"}}
+    """
+    azar = random.Random(semilla * 1000 + numero)
+    grupos, pesos = mezcla
+    proxima = time.perf_counter()
+    while True:
+        if intervalo:
+            # Respeta su parte de la tasa: espera hasta la próxima operación
+            espera = proxima - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            proxima += intervalo
+        if time.perf_counter() >= fin:
+            return
+
+        nombre, operacion = azar.choice(GRUPOS[azar.choices(grupos, pesos)[0]])
+        medida = resultados.setdefault(nombre, {"latencias": [], "conflictos": 0, "errores": {}})
+        inicio = time.perf_counter()
+        try:
+            operacion(azar)
+        except ValueError:
+            # Otro usuario eliminó la tarea elegida: es parte de la carga real
+            medida["conflictos"] += 1
+        except Exception as error:
+            tipo = type(error).__name__
+            medida["errores"][tipo] = medida["errores"].get(tipo, 0) + 1
+        medida["latencias"].append(time.perf_counter() - inicio)
+
+def correr_etapa(usuarios, duracion, tasa, mezcla, semilla):
+    """Corre una etapa con esa cantidad de usuarios simultáneos
+
+    Returns:
+        Tupla (segundos que duró, {operacion: medidas juntando a todos los usuarios})
+    """
+    intervalo = usuarios / tasa if tasa else 0
+    resultados = [{} for _ in range(usuarios)]
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    hilos = [threading.Thread(target=_usuario, name=f"usuario-{numero}",
+                              args=(numero, semilla, mezcla, fin, intervalo, resultados[numero]))
+             for numero in range(usuarios)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    # Junta las medidas de todos los usuarios
+    total = {}
+    for propio in resultados:
+        for nombre, medida in propio.items():
+            junta = total.setdefault(nombre, {"latencias": [], "conflictos": 0, "errores": {}})
+            junta["latencias"].extend(medida["latencias"])
+            junta["conflictos"] += medida["conflictos"]
+            for tipo, cantidad in medida["errores"].items():
+                junta["errores"][tipo] = junta["errores"].get(tipo, 0) + cantidad
+    return segundos, total
+
+def percentil(ordenadas, porcentaje):
+    """Devuelve el percentil de una lista ya ordenada (método del más cercano)"""
+    if not ordenadas:
+        return 0.0
+    posicion = max(0, min(len(ordenadas) - 1, round(porcentaje / 100 * len(ordenadas) + 0.5) - 1))
+    return ordenadas[posicion]
+
+def resumir(latencias):
+    """Devuelve (p50, p95, p99, máxima) en milisegundos"""
+    ordenadas = sorted(latencias)
+    return tuple(percentil(ordenadas, porcentaje) * 1000 for porcentaje in (50, 95, 99, 100))
+
+def mostrar_etapa(usuarios, segundos, total):
+    """Imprime el detalle por operación de una etapa
+
+    Returns:
+        Tupla (operaciones por segundo, p99 en ms, cantidad de errores)
+    """
+    todas = [latencia for medida in total.values() for latencia in medida["latencias"]]
+    errores = sum(sum(medida["errores"].values()) for medida in total.values())
+    conflictos = sum(medida["conflictos"] for medida in total.values())
+    p50, p95, p99, maxima = resumir(todas)
+    por_segundo = len(todas) / segundos if segundos else 0.0
+
+    print(f"\n{usuarios} usuario(s): {len(todas)} operaciones en {segundos:.1f} s "
+          f"= {por_segundo:.0f} op/s, {conflictos} conflicto(s), {errores} error(es)")
+    print(f"  {'operacion':<10} {'cantidad':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for nombre in sorted(total):
+        medida = total[nombre]
+        p50_op, p95_op, p99_op, maxima_op = resumir(medida["latencias"])
+        print(f"  {nombre:<10} {len(medida['latencias']):>8} {p50_op:>8.2f} {p95_op:>8.2f} "
+              f"{p99_op:>8.2f} {maxima_op:>8.2f}")
+        for tipo, cantidad in medida["errores"].items():
+            print(f"      error {tipo}: {cantidad}")
+    print(f"  {'total':<10} {len(todas):>8} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {maxima:>8.2f}")
+    return por_segundo, p99, errores
+
+def cargar_tareas_iniciales(cantidad, semilla):
+    """Agrega de una vez las tareas con las que empiezan los usuarios"""
+    azar = random.Random(semilla)
+    for codigo in gestor_tareas.agregar_tareas(_datos_tarea(azar) for _ in range(cantidad)):
+        _sumar_codigo(codigo)
+
+def main():
+    """Corre las etapas pedidas y busca el punto de quiebre"""
+    parser = argparse.ArgumentParser(description="Generador de carga del gestor de tareas")
+    parser.add_argument("--usuarios", default="1,2,4,8,16",
+                        help="Usuarios simultáneos; varias cantidades separadas por comas "
+                             "corren una etapa cada una (default 1,2,4,8,16)")
+    parser.add_argument("--duracion", type=float, default=5.0,
+                        help="Segundos de cada etapa (default 5)")
+    parser.add_argument("--tasa", type=float, default=0.0,
+                        help="Operaciones por segundo entre todos los usuarios (default: sin límite)")
+    parser.add_argument("--mezcla", default=MEZCLA,
+                        help=f"Porcentaje de cada grupo de operaciones (default {MEZCLA})")
+    parser.add_argument("--tareas-iniciales", type=int, default=2000,
+                        help="Tareas cargadas antes de empezar (default 2000)")
+    parser.add_argument("--semilla", type=int, default=1,
+                        help="Semilla del azar, para repetir la misma carga (default 1)")
+    parser.add_argument("--limite-p99-ms", type=float, default=50.0,
+                        help="p99 máximo aceptado en milisegundos (default 50)")
+    parser.add_argument("--hoy", metavar="DD/MM/AAAA",
+                        help="Fija el día de hoy, para repetir la misma carga (default: el real)")
+    opciones = parser.parse_args()
+
+    try:
+        mezcla = leer_mezcla(opciones.mezcla)
+        etapas = [int(cantidad) for cantidad in opciones.usuarios.split(",")]
+        if any(cantidad < 1 for cantidad in etapas):
+            raise ValueError("La cantidad de usuarios debe ser al menos 1")
+        if opciones.hoy:
+            fijar_reloj(opciones.hoy)
+    except ValueError as error:
+        parser.error(str(error))
+
+    cargar_tareas_iniciales(opciones.tareas_iniciales, opciones.semilla)
+    print(f"Tareas iniciales: {opciones.tareas_iniciales}  Mezcla: {opciones.mezcla}  "
+          f"Tasa: {opciones.tasa or 'sin limite'} op/s  Etapas de {opciones.duracion:g} s")
+
+    filas = []
+    for usuarios in etapas:
+        segundos, total = correr_etapa(usuarios, opciones.duracion, opciones.tasa, mezcla,
+                                       opciones.semilla)
+        filas.append((usuarios, *mostrar_etapa(usuarios, segundos, total)))
+
+    print(f"\n{'usuarios':>8} {'op/s':>10} {'p99 ms':>8} {'errores':>8}")
+    quiebre = None
+    for usuarios, por_segundo, p99, errores in filas:
+        marca = ""
+        if quiebre is None and (p99 > opciones.limite_p99_ms or errores):
+            quiebre = usuarios
+            marca = "  <- punto de quiebre"
+        print(f"{usuarios:>8} {por_segundo:>10.0f} {p99:>8.2f} {errores:>8}{marca}")
+    print(f"Tareas al terminar: {len(gestor_tareas.obtener_tareas())}")
+
+    if quiebre is not None:
+        print(f"\nQUIEBRE: con {quiebre} usuario(s) el p99 supera {opciones.limite_p99_ms:g} ms "
+              f"o hay errores")
+        sys.exit(1)
+    print(f"\nOK: todas las etapas por debajo de {opciones.limite_p99_ms:g} ms de p99 y sin errores")
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,62 @@ Este archivo contiene toda la lógica relacionada con las materias escolares.
 Incluye el catálogo base, funciones de selección y visualización, y todas las
 operaciones de gestión (crear, leer, actualizar, eliminar).
 
+Junto al catálogo se mantiene un índice inverso {nombre_normalizado: numero}
+y el próximo número libre, así saber si una materia ya existe o agregar una
+nueva cuesta O(1) aunque el catálogo tenga miles de materias. Por eso MATERIAS
+no se modifica directamente: todo cambio pasa por _registrar(), _renombrar()
+o _quitar(), que mantienen el índice al día.
+
+También se mantiene un índice de trigramas sobre los nombres para búsquedas
+tolerantes a errores ("matematica" encuentra "Matematicas", "ingl" encuentra
+"Ingles"). Lo usan la búsqueda de tareas por materia y seleccionar_materia(),
+que acepta tanto el número como el nombre (aproximado) de la materia.
+
+NÚMEROS ESTABLES Y ORDEN DE PANTALLA:
+El número (id) de cada materia no cambia nunca y no se reutiliza aunque la
+materia se elimine, así las tareas y los snapshots pueden guardarlo sin riesgo.
+La numeración que ve el usuario (1, 2, 3...) es otra cosa: es la posición en
+una vista ordenada que se arma recién cuando hace falta mostrarla. Eliminar
+una materia es O(1): solo la quita del diccionario y marca la vista como vieja.
+
+Las tareas guardan el número de su materia (materia_id), no el nombre. Por eso
+renombrar una materia es O(1), y al eliminarla se puede elegir qué pasa con sus
+tareas: bloquear la eliminación, eliminarlas también (cascada) o pasarlas a
+otra materia (reasignar).
+
 DEPENDENCIAS:
 - herramientas.py: Proporciona funciones de interfaz (limpiar_pantalla, pausar, linea_separadora)
-
-¿POR QUÉ ESTA DEPENDENCIA?
+  y normalizar_texto() para comparar nombres sin mayúsculas ni acentos
+- eventos.py: Necesario para publicar los cambios del catálogo (réplicas, etc.)
+- indices.py: Necesario para saber qué tareas usa cada materia sin recorrerlas
+- trigramas.py: Necesario para buscar materias por nombre aproximado
+- gestor_tareas.py: Solo al eliminar con cascada o reasignar. Se importa dentro
+  de la función porque gestor_tareas importa este módulo al cargarse
+- deshacer.py: Al eliminar una materia, para que se deshaga junto con sus
+  tareas; restaurar_materias() es la que aplica los cambios al deshacer
+
+¿POR QUÉ ESTAS DEPENDENCIAS?
 - herramientas.py centraliza las funciones de interfaz para consistencia en todo el sistema
+- eventos.py e indices.py no importan ningún gestor, así no hay ciclos
 """
 
 # Importa funciones de interfaz
-from herramientas import limpiar_pantalla, pausar, linea_separadora
+from herramientas import limpiar_pantalla, pausar, linea_separadora, normalizar_texto
+# Importa el bus de eventos para publicar los cambios del catálogo
+import eventos
+# Importa el índice de tareas por materia
+import indices
+# Importa el índice de trigramas para la búsqueda aproximada
+from trigramas import IndiceTrigramas
 
 # ============================================
 # CATÁLOGO BASE DE MATERIAS
 # ============================================
 
 # Diccionario con las materias escolares más comunes
-# La clave es un número para facilitar la selección
+# La clave es el número estable de la materia (nunca cambia ni se reutiliza)
 # El valor es el nombre de la materia
+# El orden del diccionario (de inserción) es el orden en que se muestran
 MATERIAS = {
     1: "Matematicas",
     2: "Lengua",
@@ -39,6 +78,415 @@ MATERIAS = {
     13: "Biologia"
 }
 
+# Índice inverso {nombre_normalizado: numero} para búsquedas O(1)
+_indice_nombres = {}
+# Índice de trigramas de los nombres para búsquedas aproximadas
+_indice_parecidos = IndiceTrigramas()
+# Próximo número libre (se calcula una vez y se mantiene, nunca baja)
+_siguiente_numero = 1
+# Vista ordenada [numero, ...]: la posición i-1 es la materia que se muestra como i
+# None si cambió el catálogo y hay que volver a armarla
+_vista = None
+
+# Ejecuta una función en cada partición de tareas que usa este catálogo y
+# devuelve la lista de resultados. Con un solo inquilino es solo la activa;
+# inquilinos.py la reemplaza (configurar_particiones) para incluir a todos
+# los inquilinos que comparten el catálogo
+_recorrer_particiones = lambda funcion: [funcion()]
+
+# Largo mínimo del nombre de una materia
+LARGO_MINIMO_NOMBRE = 2
+
+# Qué hacer con las tareas de una materia que se elimina
+MODOS_ELIMINACION = ("bloquear", "cascada", "reasignar")
+
+# ============================================
+# ÍNDICE DEL CATÁLOGO
+# ============================================
+
+def _reconstruir_indice(siguiente_numero=None):
+    """Recalcula el índice inverso y el próximo número desde MATERIAS
+
+    Solo hace falta cuando el catálogo se reemplaza completo.
+
+    Args:
+        siguiente_numero: Próximo número guardado (por ejemplo en un snapshot),
+                          para no reutilizar números de materias ya eliminadas
+    """
+    global _siguiente_numero, _vista
+
+    _indice_nombres.clear()
+    _indice_parecidos.limpiar()
+    for numero, nombre in MATERIAS.items():
+        _indice_nombres[normalizar_texto(nombre)] = numero
+        _indice_parecidos.agregar(numero, nombre)
+    _siguiente_numero = max(max(MATERIAS, default=0) + 1, siguiente_numero or 1)
+    _vista = None
+
+def _registrar(numero, nombre):
+    """Agrega una materia al catálogo y al índice"""
+    global _siguiente_numero
+
+    MATERIAS[numero] = nombre
+    _indice_nombres[normalizar_texto(nombre)] = numero
+    _indice_parecidos.agregar(numero, nombre)
+    if numero >= _siguiente_numero:
+        _siguiente_numero = numero + 1
+    # Las nuevas van al final: si la vista está armada, basta con agregarla
+    if _vista is not None:
+        _vista.append(numero)
+
+def _renombrar(numero, nombre):
+    """Cambia el nombre de una materia manteniendo el índice"""
+    _indice_nombres.pop(normalizar_texto(MATERIAS[numero]), None)
+    MATERIAS[numero] = nombre
+    _indice_nombres[normalizar_texto(nombre)] = numero
+    _indice_parecidos.agregar(numero, nombre)
+
+def _quitar(numero):
+    """Quita una materia del catálogo y del índice (O(1))"""
+    global _vista
+
+    nombre = MATERIAS.pop(numero)
+    _indice_nombres.pop(normalizar_texto(nombre), None)
+    _indice_parecidos.quitar(numero)
+    # No se renumera nada: la vista se vuelve a armar cuando se muestre
+    _vista = None
+    return nombre
+
+def vista_ordenada():
+    """Devuelve la lista de números de materia en el orden en que se muestran
+
+    La posición 0 se muestra como 1, la 1 como 2, etc. Se arma una sola vez
+    después de cada eliminación; agregar o renombrar no la invalidan.
+    """
+    global _vista
+
+    with eventos.bloqueo():
+        if _vista is None:
+            _vista = list(MATERIAS)
+        return _vista
+
+def materia_en_posicion(posicion):
+    """Traduce la posición que ve el usuario (desde 1) al número de la materia
+
+    Returns:
+        El número de la materia, o None si la posición no existe
+    """
+    with eventos.bloqueo():
+        vista = vista_ordenada()
+        if 1 <= posicion <= len(vista):
+            return vista[posicion - 1]
+        return None
+
+def _dato(numero):
+    """Arma la copia de una materia que viaja en los eventos"""
+    return {"numero": numero, "nombre": MATERIAS[numero]}
+
+def _publicar_catalogo():
+    """Publica el catálogo completo (después de reemplazarlo)"""
+    eventos.publicar("catalogo_reemplazado",
+                     [eventos.cambio(numero, None, _dato(numero)) for numero in MATERIAS],
+                     entidad="materia")
+
+def reemplazar_catalogo(materias, publicar=True, siguiente_numero=None):
+    """Reemplaza todo el catálogo (por ejemplo al abrir un snapshot)
+
+    Args:
+        materias: Diccionario {numero: nombre}
+        publicar: False para no publicar el evento (lo usan las réplicas)
+        siguiente_numero: Próximo número libre guardado junto al catálogo
+    """
+    with eventos.bloqueo():
+        MATERIAS.clear()
+        MATERIAS.update(materias)
+        _reconstruir_indice(siguiente_numero)
+        if publicar:
+            _publicar_catalogo()
+
+def sincronizar_materia(numero, nombre):
+    """Aplica un cambio recibido de otro proceso, sin volver a publicarlo
+
+    Args:
+        numero: Número de la materia
+        nombre: Nombre nuevo, o None si la materia se eliminó
+    """
+    with eventos.bloqueo():
+        if numero in MATERIAS:
+            if nombre is None:
+                _quitar(numero)
+            else:
+                _renombrar(numero, nombre)
+        elif nombre is not None:
+            _registrar(numero, nombre)
+
+def restaurar_materias(tipo, datos):
+    """Deja cada materia con los datos indicados publicando un único evento
+
+    La usa deshacer.py para deshacer y rehacer operaciones. Los números no se
+    reutilizan, así que una materia eliminada vuelve con el mismo número.
+
+    Args:
+        tipo: Tipo del evento a publicar ("deshecha", "rehecha")
+        datos: Lista de (numero, {"numero", "nombre"}), con None para eliminarla
+
+    Returns:
+        Lista con los datos que tenía cada materia antes (None si no existía)
+    """
+    with eventos.bloqueo():
+        anteriores = []
+        cambios = []
+        for numero, dato in datos:
+            antes = _dato(numero) if numero in MATERIAS else None
+            sincronizar_materia(numero, None if dato is None else dato["nombre"])
+            anteriores.append(antes)
+            if antes is not None or dato is not None:
+                cambios.append(eventos.cambio(numero, antes, None if dato is None else _dato(numero)))
+        if cambios:
+            eventos.publicar(tipo, cambios, entidad="materia")
+    return anteriores
+
+def configurar_particiones(recorrer):
+    """Define cómo recorrer las particiones de tareas que usan el catálogo activo
+
+    Args:
+        recorrer: Función que recibe una función sin argumentos, la ejecuta
+                  en cada partición y devuelve la lista de resultados
+    """
+    global _recorrer_particiones
+
+    _recorrer_particiones = recorrer
+
+def obtener_catalogo():
+    """Devuelve el catálogo en uso {numero: nombre} (sin copiarlo)"""
+    with eventos.bloqueo():
+        return MATERIAS
+
+def intercambiar_estado(estado=None):
+    """Pone en uso el catálogo de otra partición y devuelve el actual
+
+    Lo usa inquilinos.py para los inquilinos con catálogo propio; los que
+    comparten catálogo no lo cambian. Por eso MATERIAS se consulta siempre
+    como gestor_materias.MATERIAS o con obtener_catalogo(), y las funciones
+    públicas lo leen con el bus bloqueado (un hilo que cambia de inquilino
+    lo hace dentro de un solo bloqueo, y nunca a mitad de una de ellas).
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = catálogo vacío)
+    """
+    global MATERIAS, _indice_nombres, _indice_parecidos, _siguiente_numero, _vista
+
+    anterior = (MATERIAS, _indice_nombres, _indice_parecidos, _siguiente_numero, _vista)
+    if estado is None:
+        estado = ({}, {}, IndiceTrigramas(), 1, None)
+    MATERIAS, _indice_nombres, _indice_parecidos, _siguiente_numero, _vista = estado
+    return anterior
+
+def nombre_materia(materia_id):
+    """Devuelve el nombre de una materia a partir de su número"""
+    with eventos.bloqueo():
+        return MATERIAS.get(materia_id, "(sin materia)")
+
+def buscar_materia(nombre):
+    """Busca una materia por nombre sin importar mayúsculas ni acentos
+
+    Returns:
+        El número de la materia, o None si no existe
+    """
+    with eventos.bloqueo():
+        return _indice_nombres.get(normalizar_texto(nombre))
+
+def buscar_materias_parecidas(texto, limite=None):
+    """Busca materias cuyo nombre se parece al texto (tolera errores y acentos)
+
+    Args:
+        texto: Nombre completo, parcial o con errores ("ingl", "matematica")
+        limite: Cantidad máxima de resultados (None = todas las que se parecen)
+
+    Returns:
+        Lista de números de materia, de la más parecida a la menos parecida
+    """
+    with eventos.bloqueo():
+        return [numero for numero, _ in _indice_parecidos.buscar(texto, limite)]
+
+def existe_materia(nombre):
+    """Indica si ya hay una materia con ese nombre (O(1))"""
+    with eventos.bloqueo():
+        return normalizar_texto(nombre) in _indice_nombres
+
+def validar_nombre_materia(nombre):
+    """Valida el nombre de una materia nueva o renombrada
+
+    Raises:
+        ValueError: Si el nombre es muy corto o ya existe
+    """
+    if not nombre or len(nombre.strip()) < LARGO_MINIMO_NOMBRE:
+        raise ValueError(f"El nombre debe tener al menos {LARGO_MINIMO_NOMBRE} caracteres")
+    if existe_materia(nombre):
+        raise ValueError(f"La materia '{nombre}' ya existe en el catalogo")
+
+def crear_materia(nombre):
+    """Agrega una materia al catálogo sin interacción con el usuario
+
+    Args:
+        nombre: Nombre de la nueva materia
+
+    Returns:
+        El número asignado
+
+    Raises:
+        ValueError: Si el nombre es muy corto o ya existe
+    """
+    with eventos.bloqueo():
+        numero = _crear(nombre)
+        eventos.publicar("agregada", [eventos.cambio(numero, None, _dato(numero))],
+                         entidad="materia")
+        return numero
+
+def _crear(nombre):
+    """Valida y registra una materia nueva, sin publicar el evento"""
+    nombre = nombre.strip()
+    validar_nombre_materia(nombre)
+    numero = obtener_siguiente_numero()
+    _registrar(numero, nombre)
+    return numero
+
+def obtener_o_crear_materia(nombre):
+    """Devuelve el número de una materia, creándola si no existe
+
+    Lo usa gestor_tareas al agregar una tarea con una materia personalizada.
+
+    Raises:
+        ValueError: Si el nombre es muy corto
+    """
+    with eventos.bloqueo():
+        numero = buscar_materia(nombre)
+        if numero is None:
+            numero = crear_materia(nombre)
+        return numero
+
+def agregar_materias_lote(nombres):
+    """Agrega muchas materias de una vez (por ejemplo el catálogo de una escuela)
+
+    Cada nombre se valida en O(1) contra el índice, incluidos los repetidos
+    dentro del mismo lote.
+
+    Args:
+        nombres: Iterable con los nombres a agregar
+
+    Returns:
+        Tupla (creadas, omitidas): creadas es {numero: nombre} y omitidas es una
+        lista de (nombre, motivo) para los nombres inválidos o repetidos
+    """
+    with eventos.bloqueo():
+        creadas = {}
+        omitidas = []
+        for nombre in nombres:
+            try:
+                numero = _crear(nombre)
+                creadas[numero] = MATERIAS[numero]
+            except ValueError as error:
+                omitidas.append((nombre, str(error)))
+
+        # Un solo evento para todo el lote
+        if creadas:
+            eventos.publicar("agregadas",
+                             [eventos.cambio(numero, None, _dato(numero)) for numero in creadas],
+                             entidad="materia")
+        return creadas, omitidas
+
+def renombrar_materia(numero, nuevo_nombre):
+    """Cambia el nombre de una materia
+
+    Las tareas guardan el número, así que no hace falta tocar ninguna.
+
+    Raises:
+        ValueError: Si la materia no existe, el nombre es corto o choca con otra
+    """
+    with eventos.bloqueo():
+        if numero not in MATERIAS:
+            raise ValueError("Numero de materia invalido")
+        nuevo_nombre = nuevo_nombre.strip()
+        if len(nuevo_nombre) < LARGO_MINIMO_NOMBRE:
+            raise ValueError(f"El nombre debe tener al menos {LARGO_MINIMO_NOMBRE} caracteres")
+        # Se permite cambiar solo mayúsculas o acentos de la misma materia
+        existente = buscar_materia(nuevo_nombre)
+        if existente is not None and existente != numero:
+            raise ValueError(f"La materia '{nuevo_nombre}' ya existe en el catalogo")
+
+        antes = _dato(numero)
+        _renombrar(numero, nuevo_nombre)
+        eventos.publicar("renombrada", [eventos.cambio(numero, antes, _dato(numero))],
+                         entidad="materia")
+
+def contar_tareas_de_materia(numero):
+    """Cuenta las tareas de una materia (de todos los que comparten el catálogo)"""
+    # Importación diferida: gestor_tareas importa este módulo al cargarse
+    import gestor_tareas
+
+    def contar():
+        # Si hay un snapshot a medio cargar, el índice necesita todas las tareas
+        gestor_tareas.obtener_tareas()
+        return indices.cantidad_tareas_de_materia(numero)
+
+    # El activo y los demás inquilinos se recorren sin que nadie cambie de inquilino
+    with eventos.bloqueo():
+        return sum(_recorrer_particiones(contar))
+
+def eliminar_materia_por_numero(numero, modo="bloquear", destino=None):
+    """Elimina una materia resolviendo qué pasa con sus tareas
+
+    Args:
+        numero: Número de la materia a eliminar
+        modo: "bloquear" (no elimina si tiene tareas), "cascada" (elimina
+              también sus tareas) o "reasignar" (pasa sus tareas a destino)
+        destino: Número de la materia que recibe las tareas si modo="reasignar"
+
+    Returns:
+        Cantidad de tareas afectadas
+
+    Raises:
+        ValueError: Si la materia no existe, el modo no es válido o la
+                    eliminación queda bloqueada por tener tareas
+    """
+    # Importación diferida: gestor_tareas importa este módulo al cargarse
+    import gestor_tareas
+    import deshacer
+
+    if modo not in MODOS_ELIMINACION:
+        raise ValueError(f"Modo invalido: {modo}")
+
+    def resolver():
+        codigos = indices.tareas_de_materia(numero)
+        if modo == "cascada":
+            gestor_tareas.eliminar_tareas(codigos)
+        else:
+            gestor_tareas.cambiar_materia_tareas(codigos, destino)
+
+    with eventos.bloqueo():
+        if numero not in MATERIAS:
+            raise ValueError("Numero de materia invalido")
+
+        # Con un catálogo compartido cuentan las tareas de todos los que lo usan
+        afectadas = contar_tareas_de_materia(numero)
+        if afectadas:
+            if modo == "bloquear":
+                raise ValueError(f"La materia tiene {afectadas} tarea(s) asociada(s)")
+            if modo == "reasignar" and (destino not in MATERIAS or destino == numero):
+                raise ValueError("Materia de destino invalida")
+
+        # La materia y sus tareas (de todos los inquilinos) se deshacen juntas
+        with deshacer.agrupar(f"Eliminar materia {MATERIAS[numero]}"):
+            if afectadas:
+                _recorrer_particiones(resolver)
+            antes = _dato(numero)
+            _quitar(numero)
+            eventos.publicar("eliminada", [eventos.cambio(numero, antes, None)], entidad="materia")
+        return afectadas
+
+# Arma el índice del catálogo base al importar el módulo
+_reconstruir_indice()
+
 # ============================================
 # FUNCIONES DE VISUALIZACIÓN Y SELECCIÓN
 # ============================================
@@ -49,16 +497,46 @@ def mostrar_materias():
     print("\nMATERIAS DISPONIBLES:")
     # Dibuja una línea decorativa de 30 caracteres con guiones
     linea_separadora(30, "-")
-    # Itera sobre el diccionario de materias
-    for num, materia in MATERIAS.items():
-        # Imprime cada materia con su número (formato de 2 dígitos)
-        print(f"{num:2}. {materia}")
-    # Agrega la opción de materia personalizada al final
-    # El número es el total de materias + 1
-    print(f"{len(MATERIAS) + 1:2}. Otra materia (personalizada)")
+    # Con el bus bloqueado la lista es toda del mismo catálogo
+    with eventos.bloqueo():
+        # Itera sobre la vista ordenada; el número que se muestra es la posición
+        for posicion, numero in enumerate(vista_ordenada(), 1):
+            # Imprime cada materia con su posición (formato de 2 dígitos)
+            print(f"{posicion:2}. {nombre_materia(numero)}")
+        # Agrega la opción de materia personalizada al final
+        # El número es el total de materias + 1
+        print(f"{len(obtener_catalogo()) + 1:2}. Otra materia (personalizada)")
     # Dibuja línea decorativa inferior
     linea_separadora(30, "-")
 
+def _elegir_por_nombre(texto):
+    """Busca una materia por nombre aproximado y, si hay dudas, pregunta cuál
+
+    Returns:
+        El nombre de la materia elegida, o None si no se eligió ninguna
+    """
+    # Si el nombre coincide exactamente (sin mayúsculas ni acentos), no pregunta
+    exacta = buscar_materia(texto)
+    if exacta is not None:
+        return nombre_materia(exacta)
+
+    parecidas = buscar_materias_parecidas(texto, limite=5)
+    if not parecidas:
+        print("No se encontro ninguna materia parecida")
+        return None
+    if len(parecidas) == 1:
+        print(f"Materia: {nombre_materia(parecidas[0])}")
+        return nombre_materia(parecidas[0])
+
+    # Varias candidatas: muestra las más parecidas primero
+    print("\nMaterias parecidas:")
+    for posicion, numero in enumerate(parecidas, 1):
+        print(f"{posicion:2}. {nombre_materia(numero)}")
+    eleccion = input(f"Elija una (1-{len(parecidas)}, ENTER para volver): ").strip()
+    if eleccion.isdigit() and 1 <= int(eleccion) <= len(parecidas):
+        return nombre_materia(parecidas[int(eleccion) - 1])
+    return None
+
 def seleccionar_materia():
     """Permite al usuario seleccionar una materia"""
     # Primero muestra la lista de materias disponibles
@@ -67,22 +545,35 @@ def seleccionar_materia():
     # Bucle infinito hasta que el usuario seleccione una opción válida
     while True:
         try:
-            # Solicita al usuario que ingrese un número
-            opcion = input("\nSeleccione materia (numero): ").strip()
+            # Solicita al usuario que ingrese un número o un nombre
+            opcion = input("\nSeleccione materia (numero o nombre): ").strip()
+
+            # Si escribió texto, busca la materia por nombre aproximado
+            if opcion and not opcion.isdigit():
+                materia = _elegir_por_nombre(opcion)
+                if materia is not None:
+                    return materia
+                continue
+
             # Convierte el texto a número entero
             num = int(opcion)
 
-            # Verifica si el número corresponde a una materia predefinida
-            if num in MATERIAS:
+            # Verifica si el número corresponde a una materia del catálogo
+            numero = materia_en_posicion(num)
+            if numero is not None:
                 # Retorna el nombre de la materia seleccionada
-                return MATERIAS[num]
+                return nombre_materia(numero)
 
             # Verifica si eligió la opción de materia personalizada
-            elif num == len(MATERIAS) + 1:
+            elif num == len(obtener_catalogo()) + 1:
                 # Pide al usuario que ingrese el nombre de la materia
                 materia_custom = input("Nombre de la materia: ").strip()
                 # Valida que tenga al menos 2 caracteres
-                if materia_custom and len(materia_custom) >= 2:
+                if materia_custom and len(materia_custom) >= LARGO_MINIMO_NOMBRE:
+                    # Si ya existe en el catálogo (escrita distinto), usa ese nombre
+                    existente = buscar_materia(materia_custom)
+                    if existente is not None:
+                        return nombre_materia(existente)
                     # Retorna el nombre personalizado
                     return materia_custom
                 else:
@@ -93,8 +584,8 @@ def seleccionar_materia():
                 print("Numero invalido")
 
         except ValueError:
-            # Captura el error si el usuario no ingresó un número
-            print("Por favor ingrese un numero")
+            # Captura el error si el usuario no ingresó nada
+            print("Por favor ingrese un numero o un nombre")
         except KeyboardInterrupt:
             # Captura Ctrl+C para cancelar la selección
             print("\nOperacion cancelada")
@@ -107,11 +598,9 @@ def seleccionar_materia():
 
 def obtener_siguiente_numero():
     """Obtiene el siguiente número disponible para una nueva materia"""
-    # Si no hay materias, empezar desde 1
-    if not MATERIAS:
-        return 1
-    # Obtener el número más alto y sumar 1
-    return max(MATERIAS.keys()) + 1
+    with eventos.bloqueo():
+        # Se mantiene actualizado en _registrar(), no hace falta recorrer MATERIAS
+        return _siguiente_numero
 
 def agregar_materia():
     """Agrega una nueva materia al catálogo"""
@@ -122,22 +611,13 @@ def agregar_materia():
     print("\nAGREGAR NUEVA MATERIA")
     nombre = input("Nombre de la materia: ").strip()
 
-    # Valida que no esté vacío y tenga al menos 2 caracteres
-    if not nombre or len(nombre) < 2:
-        print("El nombre debe tener al menos 2 caracteres")
-        return False
-
-    # Verifica que no exista ya
-    if nombre in MATERIAS.values():
-        print(f"La materia '{nombre}' ya existe en el catalogo")
+    # Valida el largo y que no exista ya (sin importar mayúsculas ni acentos)
+    try:
+        nuevo_numero = crear_materia(nombre)
+    except ValueError as error:
+        print(error)
         return False
 
-    # Obtiene el siguiente número disponible
-    nuevo_numero = obtener_siguiente_numero()
-
-    # Agrega la materia al diccionario
-    MATERIAS[nuevo_numero] = nombre
-
     print(f"\nMateria '{nombre}' agregada con el numero {nuevo_numero}")
     return True
 
@@ -147,21 +627,21 @@ def editar_materia():
     mostrar_materias()
 
     # Si no hay materias, no hay nada que editar
-    if not MATERIAS:
+    if not obtener_catalogo():
         print("\nNo hay materias para editar")
         return False
 
     try:
-        # Solicita el número de la materia a editar
-        num = int(input("\nNumero de la materia a editar: ").strip())
+        # Solicita el número de la materia a editar (su posición en la lista)
+        num = materia_en_posicion(int(input("\nNumero de la materia a editar: ").strip()))
 
         # Verifica que el número exista
-        if num not in MATERIAS:
+        if num is None:
             print("Numero de materia invalido")
             return False
 
         # Muestra la materia actual
-        print(f"Materia actual: {MATERIAS[num]}")
+        print(f"Materia actual: {nombre_materia(num)}")
 
         # Solicita el nuevo nombre
         nuevo_nombre = input("Nuevo nombre (ENTER para cancelar): ").strip()
@@ -171,15 +651,14 @@ def editar_materia():
             print("Operacion cancelada")
             return False
 
-        # Valida longitud mínima
-        if len(nuevo_nombre) < 2:
-            print("El nombre debe tener al menos 2 caracteres")
+        # Actualiza el nombre (valida largo y que no choque con otra materia)
+        nombre_anterior = nombre_materia(num)
+        try:
+            renombrar_materia(num, nuevo_nombre)
+        except ValueError as error:
+            print(error)
             return False
 
-        # Actualiza el nombre
-        nombre_anterior = MATERIAS[num]
-        MATERIAS[num] = nuevo_nombre
-
         print(f"\nMateria '{nombre_anterior}' cambiada a '{nuevo_nombre}'")
         return True
 
@@ -193,33 +672,54 @@ def eliminar_materia():
     mostrar_materias()
 
     # Si no hay materias, no hay nada que eliminar
-    if not MATERIAS:
+    if not obtener_catalogo():
         print("\nNo hay materias para eliminar")
         return False
 
     try:
-        # Solicita el número de la materia a eliminar
-        num = int(input("\nNumero de la materia a eliminar: ").strip())
+        # Solicita el número de la materia a eliminar (su posición en la lista)
+        num = materia_en_posicion(int(input("\nNumero de la materia a eliminar: ").strip()))
 
         # Verifica que el número exista
-        if num not in MATERIAS:
+        if num is None:
             print("Numero de materia invalido")
             return False
 
         # Muestra la materia que se va a eliminar
-        materia_eliminar = MATERIAS[num]
+        materia_eliminar = nombre_materia(num)
         print(f"Se eliminara: {materia_eliminar}")
 
+        # La cantidad de tareas sale directo del índice (de cada inquilino que la usa)
+        cantidad = contar_tareas_de_materia(num)
+        modo, destino = "bloquear", None
+        if cantidad:
+            print(f"La materia tiene {cantidad} tarea(s) asociada(s). Que desea hacer?")
+            print("1. Eliminar tambien sus tareas")
+            print("2. Pasar sus tareas a otra materia")
+            print("3. Cancelar")
+            eleccion = input("Opcion (1-3): ").strip()
+            if eleccion == "1":
+                modo = "cascada"
+            elif eleccion == "2":
+                modo = "reasignar"
+                destino = materia_en_posicion(
+                    int(input("Numero de la materia que recibe las tareas: ").strip()))
+            else:
+                print("Operacion cancelada")
+                return False
+
         # Pide confirmación
         confirmar = input("Esta seguro? (S/N): ").upper()
 
         if confirmar == "S":
-            # Elimina la materia
-            del MATERIAS[num]
+            try:
+                afectadas = eliminar_materia_por_numero(num, modo, destino)
+            except ValueError as error:
+                print(error)
+                return False
             print(f"\nMateria '{materia_eliminar}' eliminada")
-
-            # Reorganiza los números si es necesario
-            reorganizar_numeros()
+            if afectadas:
+                print(f"Tareas afectadas: {afectadas}")
             return True
         else:
             print("Operacion cancelada")
@@ -229,22 +729,6 @@ def eliminar_materia():
         print("Por favor ingrese un numero valido")
         return False
 
-def reorganizar_numeros():
-    """Reorganiza los números de las materias para que sean consecutivos"""
-    # Si no hay materias o solo hay una, no hay nada que reorganizar
-    if len(MATERIAS) <= 1:
-        return
-
-    # Crea una lista temporal con los valores actuales
-    materias_temp = list(MATERIAS.values())
-
-    # Limpia el diccionario
-    MATERIAS.clear()
-
-    # Reasigna con números consecutivos
-    for i, materia in enumerate(materias_temp, 1):
-        MATERIAS[i] = materia
-
 def mostrar_catalogo_completo():
     """Muestra todas las materias sin la opción personalizada"""
     # Limpia la pantalla
@@ -253,16 +737,18 @@ def mostrar_catalogo_completo():
     print("         CATALOGO DE MATERIAS")
     linea_separadora()
 
-    if not MATERIAS:
+    if not obtener_catalogo():
         print("\nNo hay materias en el catalogo")
         print("Use la opcion 'Agregar materia' para comenzar")
     else:
         print("\nMaterias disponibles:")
         linea_separadora(40, "-")
-        for num, materia in sorted(MATERIAS.items()):
-            print(f"  {num:2}. {materia}")
+        with eventos.bloqueo():
+            for posicion, numero in enumerate(vista_ordenada(), 1):
+                print(f"  {posicion:2}. {nombre_materia(numero)}")
+            total = len(obtener_catalogo())
         linea_separadora(40, "-")
-        print(f"\nTotal: {len(MATERIAS)} materia(s)")
+        print(f"\nTotal: {total} materia(s)")
 
 # ============================================
 # SUBMENÚ DE GESTIÓN
@@ -8,13 +8,57 @@ eliminar), la visualización de datos y el sistema de menús.
 
 DEPENDENCIAS:
 - gestor_materias.py: Necesario para seleccionar_materia() y submenu_gestionar_materias(),
-  maneja todo lo relacionado con el catálogo de materias
+  maneja todo lo relacionado con el catálogo de materias. Las tareas guardan
+  el número de su materia (materia_id) y el nombre se obtiene de ahí
+- indices.py: Necesario para buscar por materia sin recorrer todas las tareas
+- codigos.py: Necesario para generar los códigos de las tareas (nunca se
+  reutilizan) y su número de secuencia, que es el que ordena los listados
+- eventos.py: Necesario para publicar cada cambio en las tareas (agregar,
+  editar, completar, eliminar, borrar todas), así los módulos que mantienen
+  estructuras derivadas (recordatorios, índices...) se actualizan solos
+- snapshot_binario.py: Necesario para guardar y abrir el snapshot binario de
+  tareas y materias; las tareas del snapshot se cargan recién cuando se piden.
+  Se importa dentro de las funciones que lo usan, para no demorar el arranque
+- cache_textos.py: Para el modo de memoria acotada (configurar_memoria_acotada):
+  las tareas del snapshot quedan en memoria sin sus textos, que se leen del
+  archivo a través de una caché LRU. Los listados usan su prefijo() para
+  traer solo los caracteres que muestran
+- consultas.py: Necesario para la búsqueda avanzada (varios criterios juntos)
+  y para los listados de pendientes, completadas y por vencimiento, que así
+  se resuelven con los índices y quedan en su caché. También se importa
+  recién cuando se usa
+- archivo.py: Necesario para mover las tareas viejas a un archivo comprimido
+  en disco, buscarlas ahí y sumar sus totales a las estadísticas. Se importa
+  recién cuando se usa
+- recurrencias.py: Necesario para las tareas recurrentes: las reglas se
+  guardan una vez y sus ocurrencias se suman a los listados y búsquedas por
+  fecha sin guardarse como tareas. Una ocurrencia pasa a ser una tarea normal
+  (con el mismo código) cuando se la completa, edita o elimina.
+  Se importa recién cuando se usa
+- calendario_ics.py: Para exportar las tareas pendientes a un archivo .ics e
+  importar calendarios (con agregar_tareas). Se importa recién cuando se usa
+- agenda.py: Para la agenda de la semana y del mes (tareas en curso y que
+  vencen cada día). Se importa recién cuando se abre
+- deshacer.py: Anota cada operación escuchando el bus para poder deshacerla
+  y rehacerla; restaurar_tareas() es la que aplica los cambios al deshacer
+- historial.py: Guarda las versiones de cada tarea (qué cambió, cuándo y
+  quién) para ver el historial de una tarea y qué estaba pendiente en una
+  fecha pasada. Se guarda al lado del snapshot
+- servicio.py: Los menús agregan, editan, completan, eliminan, borran,
+  cargan los ejemplos y consultan tareas a través de él (valida los datos y
+  hace cada cambio de una sola vez); los menús solo preguntan y muestran.
+  Se importa recién cuando se usa
+- inquilinos.py: Solo para el submenú de escuelas, cursos y alumnos. Cada
+  inquilino tiene sus propias tareas: este módulo siempre trabaja sobre las
+  del inquilino activo, sin saber que hay otros
 - herramientas.py: Proporciona funciones auxiliares para:
   * limpiar_pantalla(): Limpia la consola para mejor visualización
   * pausar(): Detiene el flujo hasta que el usuario presione Enter
   * linea_separadora(): Dibuja líneas decorativas en la interfaz
   * validar_fecha(): Verifica que las fechas tengan formato DD/MM/AAAA
   * calcular_dias_restantes(): Calcula días hasta el vencimiento
+  * ahora(), fecha_de_hoy(), mismo_instante(): El reloj del programa (se
+    puede fijar), leído una sola vez por listado
   * obtener_indicador_urgencia(): Genera indicadores como [HOY], [MANANA], etc.
   * string_a_fecha(): Convierte texto a objeto fecha para comparaciones
 """
@@ -22,12 +66,35 @@ DEPENDENCIAS:
 # Importación de funciones desde gestor_materias (todo está consolidado ahí)
 from gestor_materias import seleccionar_materia, submenu_gestionar_materias
 
+# Importación del bus de eventos donde se publican los cambios en las tareas
+import eventos
+# Importación del generador de códigos de tarea
+import codigos
+# Importación del historial para deshacer (se anota solo, escuchando el bus)
+import deshacer
+# Importación de las versiones de cada tarea (también se anotan solas)
+import historial
+# Importación del catálogo para guardarlo y restaurarlo junto con las tareas,
+# y de las funciones que traducen entre nombre y número de materia
+from gestor_materias import (
+    obtener_catalogo, reemplazar_catalogo, obtener_o_crear_materia, nombre_materia,
+    obtener_siguiente_numero, buscar_materias_parecidas
+)
+# Importación de los índices derivados de las tareas
+import indices
+# Módulo estándar para quedarse con las primeras sin ordenar todas
+import heapq
+# Importación de la caché de textos del modo de memoria acotada (y del recorte
+# de textos de los listados, que lee solo lo que se muestra)
+import cache_textos
+
 # Importación de todas las utilidades necesarias para la interfaz y fechas
 from herramientas import (
     limpiar_pantalla, pausar, linea_separadora,
     validar_fecha, calcular_dias_restantes,
     obtener_indicador_urgencia, formatear_fecha_corta,
-    string_a_fecha
+    string_a_fecha, formatear_hora, formatear_momento,
+    ahora, fecha_de_hoy, mismo_instante
 )
 
 # ============================================
@@ -35,25 +102,33 @@ from herramientas import (
 # ============================================
 # Diccionario principal que almacena todas las tareas {codigo: datos_tarea}
 tareas_colegio = {}
-# Contador para generar códigos únicos T001, T002, T003...
-siguiente_numero = 1
+# Snapshot binario abierto cuyas tareas todavía no se cargaron todas (o None)
+_snapshot = None
+# Códigos del snapshot ya resueltos (cargados o eliminados), para no releerlos
+_codigos_resueltos = set()
+# True: las tareas del snapshot dejan sus textos en el archivo (ver cache_textos.py)
+_memoria_acotada = False
+# Tareas por evento "cargadas" en modo de memoria acotada (así ningún evento
+# tiene todas las tareas, aunque sean compactas)
+TAREAS_POR_EVENTO_DE_CARGA = 10000
 
 # ============================================
 # TAREAS DE EJEMPLO
 # ============================================
 
-def cargar_tareas_ejemplo():
-    """Carga un conjunto de tareas de ejemplo al iniciar el sistema
+def tareas_de_ejemplo():
+    """Arma los datos de las tareas de ejemplo, con fechas relativas a hoy
 
-    Como el sistema no tiene persistencia, estas tareas ayudan a:
-    - Demostrar la funcionalidad del sistema
-    - Facilitar las pruebas
-    - Dar contexto de uso al usuario
+    No agrega nada: las agrega servicio.cargar_ejemplos().
+
+    Returns:
+        Lista de diccionarios con materia, tarea, fecha_inicio, fecha_fin,
+        observaciones y estado
     """
-    from datetime import datetime, timedelta
+    from datetime import timedelta
 
-    # Obtiene la fecha actual para crear fechas relativas
-    hoy = datetime.now()
+    # Obtiene la fecha actual (del reloj del programa) para crear fechas relativas
+    hoy = ahora()
 
     # Función auxiliar para formatear fechas
     def fecha_str(dias_desde_hoy):
@@ -142,108 +217,587 @@ def cargar_tareas_ejemplo():
         }
     ]
 
-    # Agrega cada tarea usando la función existente
+    return tareas_ejemplo
+
+def cargar_tareas_ejemplo():
+    """Carga un conjunto de tareas de ejemplo al iniciar el sistema
+
+    Se cargan a pedido (opción del menú principal o python main.py --ejemplos)
+    y ayudan a:
+    - Demostrar la funcionalidad del sistema
+    - Facilitar las pruebas
+    - Dar contexto de uso al usuario
+    """
+    # Importación diferida: servicio importa este módulo
+    import servicio
+
+    # Se agregan todas de una vez (y se deshacen de una vez)
     print("Cargando tareas de ejemplo...")
-    for tarea_data in tareas_ejemplo:
-        agregar_tarea(
-            tarea_data["materia"],
-            tarea_data["tarea"],
-            tarea_data["fecha_inicio"],
-            tarea_data["fecha_fin"],
-            tarea_data["observaciones"]
-        )
-        # Si la tarea debe estar completada, la marca como tal
-        if tarea_data["estado"] == "Completada":
-            # Obtiene el último código agregado
-            ultimo_codigo = f"T{siguiente_numero - 1:03d}"
-            marcar_completada(ultimo_codigo)
-
-    print(f"Se cargaron {len(tareas_ejemplo)} tareas de ejemplo.")
+    agregadas = servicio.cargar_ejemplos()
+    print(f"Se cargaron {len(agregadas)} tareas de ejemplo.")
 
 # ============================================
 # FUNCIONES DE GESTIÓN DE TAREAS
 # ============================================
 
+def intercambiar_estado(estado=None):
+    """Pone en uso las tareas de otra partición y devuelve las actuales
+
+    Lo usa inquilinos.py: cada inquilino tiene su propio diccionario de tareas
+    (y su snapshot a medio cargar), y cambiar de inquilino no copia nada.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = sin tareas)
+    """
+    global tareas_colegio, _snapshot, _codigos_resueltos
+
+    anterior = (tareas_colegio, _snapshot, _codigos_resueltos)
+    tareas_colegio, _snapshot, _codigos_resueltos = estado or ({}, None, set())
+    return anterior
+
+def tarea_de_estado(estado, codigo):
+    """Busca una tarea entre las de otra partición, sin ponerlas en uso
+
+    Lo usa inquilinos.py para leer una tarea de un inquilino que no está
+    activo. No cambia nada: si la tarea sigue en el snapshot solo la lee, y
+    las ocurrencias de tareas recurrentes no se calculan.
+
+    Args:
+        estado: Lo que devolvió intercambiar_estado() (None = sin tareas)
+        codigo: Código de la tarea
+
+    Returns:
+        Los datos de la tarea, o None si no existe
+    """
+    if estado is None:
+        return None
+    tareas, snapshot, resueltos = estado
+    info = tareas.get(codigo)
+    if info is None and snapshot is not None and codigo not in resueltos:
+        info = snapshot.buscar(codigo, _memoria_acotada)
+    return info
+
 def obtener_tareas():
     """Devuelve todas las tareas"""
-    # Retorna el diccionario completo de tareas
-    return tareas_colegio
+    with eventos.bloqueo():
+        # Si hay un snapshot abierto, primero termina de cargar sus tareas
+        if _snapshot is not None:
+            _cargar_resto_del_snapshot()
+        # Retorna el diccionario completo de tareas
+        return tareas_colegio
 
 def generar_codigo():
-    """Genera un código único con formato T001, T002, etc."""
-    # Accede a la variable global para poder modificarla
-    global siguiente_numero
-    # Formatea el número con 3 dígitos (001, 002, 003...)
-    codigo = f"T{siguiente_numero:03d}"
-    # Incrementa el contador para el próximo código
-    siguiente_numero += 1
-    # Devuelve el código generado
+    """Genera un código único con formato T001, T002, etc.
+
+    Returns:
+        Tupla (codigo, secuencia); la secuencia es la que ordena los listados
+    """
+    # El contador vive en codigos.py: es creciente, no se reutiliza y usa candado
+    # (con el bus bloqueado, para que sea el contador del inquilino activo)
+    with eventos.bloqueo():
+        return codigos.generar()
+
+def agregar_tarea(materia, tarea, fecha_inicio, fecha_fin, observaciones="", uid=""):
+    """Agrega una nueva tarea con todos los campos requeridos
+
+    Args:
+        materia: Número de la materia, o su nombre (si el nombre no está en
+                 el catálogo se agrega como materia nueva)
+        uid: Identificador del calendario de donde se importó (ver calendario_ics.py)
+    """
+    with eventos.bloqueo():
+        codigo = _crear_tarea(materia, tarea, fecha_inicio, fecha_fin, observaciones, uid)
+
+        # Publica el alta con una copia de los datos
+        eventos.publicar("agregada", [eventos.cambio(codigo, None, dict(tareas_colegio[codigo]))])
+
+    # Retorna el código asignado para confirmar al usuario
     return codigo
 
-def agregar_tarea(materia, tarea, fecha_inicio, fecha_fin, observaciones=""):
-    """Agrega una nueva tarea con todos los campos requeridos"""
+def _crear_tarea(materia, tarea, fecha_inicio, fecha_fin, observaciones, uid):
+    """Guarda una tarea nueva en tareas_colegio (sin publicar el evento)
+
+    Returns:
+        El código asignado
+    """
+    # Traduce el nombre al número de la materia
+    if isinstance(materia, int):
+        materia_id = materia
+    else:
+        materia_id = obtener_o_crear_materia(materia)
+
     # Genera un código único para esta nueva tarea
-    codigo = generar_codigo()
+    codigo, secuencia = generar_codigo()
 
     # Crea un diccionario con todos los datos de la tarea
     tareas_colegio[codigo] = {
-        "materia": materia,              # Nombre de la asignatura
+        "materia_id": materia_id,        # Número de la asignatura en MATERIAS
         "tarea": tarea,                  # Descripción de la tarea
         "fecha_inicio": fecha_inicio,    # Cuándo comenzar (DD/MM/AAAA)
         "fecha_fin": fecha_fin,          # Fecha de vencimiento (DD/MM/AAAA)
         "estado": "En proceso",          # Estado inicial (puede ser "Completada" después)
         "codigo": codigo,                # Código único de identificación
+        "secuencia": secuencia,          # Orden de creación (para ordenar listados)
         "observaciones": observaciones   # Notas adicionales (opcional)
     }
-
-    # Retorna el código asignado para confirmar al usuario
+    # Solo las importadas de un calendario guardan su UID
+    if uid:
+        tareas_colegio[codigo]["uid"] = uid
     return codigo
 
-def obtener_tarea(codigo):
-    """Obtiene una tarea por su código"""
-    # Busca el código en el diccionario, devuelve None si no existe
-    return tareas_colegio.get(codigo, None)
+def obtener_tarea(codigo, materializar=False):
+    """Obtiene una tarea por su código
+
+    Args:
+        materializar: Si el código es de una ocurrencia de una tarea recurrente,
+                      False (default) solo devuelve sus datos, sin cambiar nada
+                      (para mostrarla o consultarla desde una réplica), y True
+                      la convierte en tarea (solo las operaciones que la cambian)
+    """
+    with eventos.bloqueo():
+        # Busca el código en el diccionario
+        info = tareas_colegio.get(codigo, None)
+        # Si no está cargada, la busca en el snapshot (sin cargar las demás)
+        if info is None and _snapshot is not None and codigo not in _codigos_resueltos:
+            info = _snapshot.buscar(codigo, _memoria_acotada)
+            _codigos_resueltos.add(codigo)
+            if info is not None:
+                tareas_colegio[codigo] = info
+        # Si es una ocurrencia de una tarea recurrente, pasa a ser una tarea normal
+        if info is None and codigo.startswith("R"):
+            if materializar:
+                info = _materializar_ocurrencia(codigo)
+            else:
+                # Importación diferida: sin reglas no hace falta
+                import recurrencias
+                info = recurrencias.ocurrencia(codigo)
+        return info
+
+def _materializar_ocurrencia(codigo):
+    """Convierte una ocurrencia de una tarea recurrente en una tarea con el mismo código
+
+    Desde ahí se completa, edita o elimina como cualquier otra, y la regla
+    deja de calcular ese día (ver recurrencias.py).
+
+    Returns:
+        Los datos de la nueva tarea, o None si el código no es de una ocurrencia
+    """
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    with eventos.bloqueo():
+        info = recurrencias.ocurrencia(codigo)
+        if info is None:
+            return None
+        # Queda ordenada como si se hubiera agregado ahora
+        info["secuencia"] = codigos.reservar_secuencia()
+        tareas_colegio[codigo] = info
+        eventos.publicar("agregada", [eventos.cambio(codigo, None, dict(info))])
+    return info
+
+def agregar_tarea_recurrente(materia, tarea, primer_vencimiento, hasta=None, cada=None,
+                             dias_semana=None, duracion=0, observaciones=""):
+    """Agrega una tarea que se repite (se guarda una sola regla, ver recurrencias.py)
+
+    Args:
+        materia: Número de la materia, o su nombre (si no existe se crea)
+        primer_vencimiento: Primera fecha de vencimiento (DD/MM/AAAA)
+        hasta: Última fecha posible (DD/MM/AAAA), o None para no terminar
+        cada: Días entre ocurrencias (7 = semanal)
+        dias_semana: Días de la semana (0 = lunes) en lugar de "cada"
+        duracion: Días entre el inicio y el vencimiento de cada ocurrencia
+
+    Returns:
+        El número de la regla
+
+    Raises:
+        ValueError: Si las fechas o la frecuencia no son válidas
+    """
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    with eventos.bloqueo():
+        # Traduce el nombre al número de la materia
+        materia_id = materia if isinstance(materia, int) else obtener_o_crear_materia(materia)
+        return recurrencias.crear_regla(materia_id, tarea, primer_vencimiento, hasta, cada,
+                                        dias_semana, duracion, observaciones)
+
+def _ocurrencias_entre(desde, hasta):
+    """Devuelve las ocurrencias de tareas recurrentes que vencen en [desde, hasta] (ordinales)"""
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+    with eventos.bloqueo():
+        if not recurrencias.hay_reglas():
+            return {}
+        return dict(recurrencias.ocurrencias(desde, hasta))
 
 def marcar_completada(codigo):
     """Marca una tarea como completada"""
-    # Verifica si el código existe en el diccionario
-    if codigo in tareas_colegio:
-        # Cambia el estado de "En proceso" a "Completada"
-        tareas_colegio[codigo]["estado"] = "Completada"
-        # Retorna True indicando éxito
-        return True
+    with eventos.bloqueo():
+        # Verifica si el código existe (obtener_tarea también mira el snapshot)
+        if obtener_tarea(codigo, materializar=True) is not None:
+            # Guarda una copia del estado anterior para el evento
+            antes = dict(tareas_colegio[codigo])
+            # Cambia el estado de "En proceso" a "Completada"
+            tareas_colegio[codigo]["estado"] = "Completada"
+            # Solo publica si realmente cambió el estado
+            if antes["estado"] != "Completada":
+                eventos.publicar("completada", [eventos.cambio(codigo, antes, dict(tareas_colegio[codigo]))])
+            # Retorna True indicando éxito
+            return True
     # Retorna False si no encontró la tarea
     return False
 
 def eliminar_tarea(codigo):
     """Elimina una tarea"""
-    # Verifica si el código existe
-    if codigo in tareas_colegio:
-        # Elimina la entrada del diccionario
-        del tareas_colegio[codigo]
-        # Retorna True indicando éxito
-        return True
+    with eventos.bloqueo():
+        # Verifica si el código existe (obtener_tarea también mira el snapshot)
+        if obtener_tarea(codigo, materializar=True) is not None:
+            # Elimina la entrada del diccionario (pop devuelve los datos borrados)
+            antes = tareas_colegio.pop(codigo)
+            # Publica la baja; la tarea ya no está en el diccionario, no hace falta copiarla
+            eventos.publicar("eliminada", [eventos.cambio(codigo, antes, None)])
+            # Retorna True indicando éxito
+            return True
     # Retorna False si no encontró la tarea
     return False
 
+def editar_tarea(codigo, cambios):
+    """Cambia varios campos de una tarea de una sola vez (un único evento)
+
+    No valida los valores: eso lo hace servicio.editar(), que es por donde
+    pasan los menús.
+
+    Args:
+        cambios: Diccionario {campo: valor nuevo}; "materia" es el número o el
+                 nombre de la materia (se guarda como materia_id)
+
+    Returns:
+        True si la tarea existe (aunque nada haya cambiado), False si no
+    """
+    with eventos.bloqueo():
+        # obtener_tarea también mira el snapshot y las ocurrencias recurrentes
+        info = obtener_tarea(codigo, materializar=True)
+        if info is None:
+            return False
+        # Guarda una copia del estado anterior para el evento
+        antes = dict(info)
+        for campo, valor in cambios.items():
+            if campo == "materia":
+                # Traduce el nombre al número de la materia
+                info["materia_id"] = valor if isinstance(valor, int) else obtener_o_crear_materia(valor)
+            else:
+                info[campo] = valor
+        # Solo publica si realmente cambió algo
+        if info != antes:
+            eventos.publicar("editada", [eventos.cambio(codigo, antes, dict(info))])
+    return True
+
+# ============================================
+# OPERACIONES EN LOTE
+# ============================================
+# Cada operación en lote toma una sola vez el candado del bus, aplica todos los
+# cambios y publica un único evento: el WAL de replicación guarda un solo
+# registro, los índices se actualizan en una sola pasada y nadie ve el lote
+# a medio aplicar (por ejemplo una foto para una réplica).
+
+def agregar_tareas(tareas):
+    """Agrega varias tareas publicando un único evento
+
+    Args:
+        tareas: Iterable de diccionarios con materia, tarea, fecha_inicio,
+                fecha_fin y, opcionales, observaciones y uid (ver agregar_tarea)
+
+    Returns:
+        Lista con los códigos asignados, en el mismo orden
+    """
+    with eventos.bloqueo():
+        nuevos = [_crear_tarea(datos["materia"], datos["tarea"], datos["fecha_inicio"],
+                               datos["fecha_fin"], datos.get("observaciones", ""),
+                               datos.get("uid", ""))
+                  for datos in tareas]
+        if nuevos:
+            eventos.publicar("agregadas", [eventos.cambio(codigo, None, dict(tareas_colegio[codigo]))
+                                           for codigo in nuevos])
+    return nuevos
+
+def completar_tareas(lista_codigos):
+    """Marca varias tareas como completadas publicando un único evento
+
+    Args:
+        lista_codigos: Códigos de las tareas
+
+    Returns:
+        Cantidad de tareas que cambiaron de estado
+    """
+    with eventos.bloqueo():
+        cambios = []
+        for codigo in lista_codigos:
+            info = obtener_tarea(codigo, materializar=True)
+            if info is not None and info["estado"] != "Completada":
+                antes = dict(info)
+                info["estado"] = "Completada"
+                cambios.append(eventos.cambio(codigo, antes, dict(info)))
+        if cambios:
+            eventos.publicar("completadas", cambios)
+    return len(cambios)
+
+def eliminar_tareas(lista_codigos):
+    """Elimina varias tareas publicando un único evento
+
+    Args:
+        lista_codigos: Códigos de las tareas
+
+    Returns:
+        Cantidad de tareas eliminadas
+    """
+    with eventos.bloqueo():
+        cambios = []
+        for codigo in lista_codigos:
+            if obtener_tarea(codigo, materializar=True) is not None:
+                cambios.append(eventos.cambio(codigo, tareas_colegio.pop(codigo), None))
+        if cambios:
+            eventos.publicar("eliminadas", cambios)
+    return len(cambios)
+
+def borrar_todas():
+    """Borra todas las tareas publicando un único evento "borrado_total"
+
+    El contador de códigos no se reinicia: los códigos nunca se reutilizan.
+
+    Returns:
+        Cantidad de tareas borradas
+    """
+    global tareas_colegio
+
+    with eventos.bloqueo():
+        # obtener_tareas() termina de cargar el snapshot, si lo hay
+        cambios = [eventos.cambio(codigo, info, None) for codigo, info in obtener_tareas().items()]
+        if cambios:
+            tareas_colegio = {}
+            eventos.publicar("borrado_total", cambios)
+    return len(cambios)
+
+def _copia_de_tarea(info):
+    """Copia los datos de una tarea (una TareaCompacta sigue siendo compacta)"""
+    if isinstance(info, cache_textos.TareaCompacta):
+        return info.copia_compacta()
+    return dict(info)
+
+def restaurar_tareas(tipo, datos):
+    """Deja cada tarea con los datos indicados publicando un único evento
+
+    La usa deshacer.py para deshacer y rehacer operaciones: los datos se
+    guardan con su código y secuencia originales. En tareas_colegio queda una
+    copia, así lo que guardaron deshacer.py y el historial no cambia cuando
+    después se edita la tarea.
+
+    Args:
+        tipo: Tipo del evento a publicar ("deshecha", "rehecha")
+        datos: Lista de (codigo, datos), con datos None para eliminar la tarea
+
+    Returns:
+        Lista con los datos que tenía cada tarea antes (None si no existía)
+    """
+    with eventos.bloqueo():
+        anteriores = []
+        cambios = []
+        for codigo, info in datos:
+            # Sin materializar: una ocurrencia que no es tarea no tiene datos previos
+            obtener_tarea(codigo)
+            antes = tareas_colegio.pop(codigo, None)
+            if info is not None:
+                tareas_colegio[codigo] = _copia_de_tarea(info)
+            anteriores.append(antes)
+            if antes is not None or info is not None:
+                cambios.append(eventos.cambio(codigo, antes, None if info is None else dict(info)))
+        if cambios:
+            eventos.publicar(tipo, cambios)
+    return anteriores
+
+def cambiar_materia_tareas(lista_codigos, materia):
+    """Pasa varias tareas a otra materia publicando un único evento
+
+    Args:
+        lista_codigos: Códigos de las tareas
+        materia: Número de la materia, o su nombre (si no existe se crea)
+
+    Returns:
+        Cantidad de tareas modificadas
+    """
+    with eventos.bloqueo():
+        # Traduce el nombre al número de la materia
+        materia_id = materia if isinstance(materia, int) else obtener_o_crear_materia(materia)
+        cambios = []
+        for codigo in lista_codigos:
+            info = obtener_tarea(codigo, materializar=True)
+            if info is not None and info["materia_id"] != materia_id:
+                antes = dict(info)
+                info["materia_id"] = materia_id
+                cambios.append(eventos.cambio(codigo, antes, dict(info)))
+        if cambios:
+            eventos.publicar("materia_reasignada", cambios)
+    return len(cambios)
+
+def archivar_tareas_viejas(dias=None):
+    """Mueve al archivo comprimido las tareas que vencieron hace más de `dias` días
+
+    Incluye tanto las completadas como las que quedaron pendientes: ninguna de
+    las dos se mira en el día a día. Como las tareas no guardan cuándo se
+    completaron, la antigüedad se cuenta desde la fecha de vencimiento. Salen
+    de tareas_colegio (y de los índices) con un único evento "archivadas".
+
+    Args:
+        dias: Antigüedad mínima en días (default archivo.DIAS_ARCHIVO)
+
+    Returns:
+        Cantidad de tareas archivadas
+    """
+    # Importación diferida: el archivo solo se usa si se archiva
+    import archivo
+
+    if dias is None:
+        dias = archivo.DIAS_ARCHIVO
+    limite = fecha_de_hoy().toordinal() - dias
+
+    with eventos.bloqueo():
+        # Termina de cargar el snapshot (si lo hay) para que los índices estén completos
+        obtener_tareas()
+        viejas = {codigo: tareas_colegio[codigo]
+                  for codigo in indices.tareas_que_vencen_entre(None, limite - 1)}
+        if not viejas:
+            return 0
+        # Primero se escriben en disco: si algo falla, siguen en memoria
+        archivo.guardar({codigo: dict(info, materia=nombre_materia(info.get("materia_id")))
+                         for codigo, info in viejas.items()})
+        cambios = [eventos.cambio(codigo, tareas_colegio.pop(codigo), None)
+                   for codigo in viejas]
+        eventos.publicar("archivadas", cambios)
+    return len(cambios)
+
+def buscar_en_archivo(consulta):
+    """Busca entre las tareas archivadas (lee el archivo, no usa índices)
+
+    Args:
+        consulta: Expresión de texto o diccionario armado (ver consultas.py)
+
+    Returns:
+        Diccionario {codigo: info} con las tareas encontradas, en el orden pedido
+    """
+    # Importación diferida: el archivo solo se usa si se busca en él
+    import archivo
+    # El archivo abierto es el del inquilino activo
+    with eventos.bloqueo():
+        return archivo.buscar(consulta)
+
+def _codigos_de_consulta(consulta):
+    """Devuelve los códigos de las tareas que cumplen una consulta (texto o armada)"""
+    # Importación diferida: consultas importa este módulo
+    import consultas
+    if isinstance(consulta, str):
+        consulta = consultas.parsear(consulta)
+    return list(consultas.ejecutar(consulta))
+
+def completar_por_consulta(consulta):
+    """Completa todas las tareas que cumplen la consulta (ver consultas.py)
+
+    Returns:
+        Cantidad de tareas que cambiaron de estado
+    """
+    # La consulta y el cambio sobre las mismas tareas, sin nada en el medio
+    with eventos.bloqueo():
+        return completar_tareas(_codigos_de_consulta(consulta))
+
+def eliminar_por_consulta(consulta):
+    """Elimina todas las tareas que cumplen la consulta (ver consultas.py)
+
+    Ejemplo de limpieza de fin de curso: "estado:completada vence<31/12/2025"
+
+    Returns:
+        Cantidad de tareas eliminadas
+    """
+    with eventos.bloqueo():
+        return eliminar_tareas(_codigos_de_consulta(consulta))
+
+def cambiar_materia_por_consulta(consulta, materia):
+    """Pasa a otra materia todas las tareas que cumplen la consulta
+
+    Returns:
+        Cantidad de tareas modificadas
+    """
+    with eventos.bloqueo():
+        return cambiar_materia_tareas(_codigos_de_consulta(consulta), materia)
+
 def obtener_tareas_pendientes():
     """Devuelve solo las tareas en proceso"""
-    # Crea un nuevo diccionario filtrando solo las tareas con estado "En proceso"
-    return {cod: info for cod, info in tareas_colegio.items()
-            if info.get("estado") == "En proceso"}
+    # Importación diferida: consultas importa este módulo
+    import consultas
+    # Usa el índice por estado (y la caché de consultas si se repite)
+    return consultas.ejecutar(consultas.armar_consulta(estado="En proceso"))
 
 def obtener_tareas_completadas():
     """Devuelve solo las tareas completadas"""
-    # Crea un nuevo diccionario filtrando solo las tareas con estado "Completada"
-    return {cod: info for cod, info in tareas_colegio.items()
-            if info.get("estado") == "Completada"}
+    # Importación diferida: consultas importa este módulo
+    import consultas
+    # Usa el índice por estado (y la caché de consultas si se repite)
+    return consultas.ejecutar(consultas.armar_consulta(estado="Completada"))
+
+def obtener_tareas_mas_urgentes(cantidad=5):
+    """Devuelve las tareas pendientes que vencen antes (las vencidas primero)
+
+    Recorre el índice de vencimientos en orden y se queda con las primeras
+    pendientes, así cuesta O(cantidad + completadas salteadas) en lugar de
+    ordenar todas las tareas. Las tareas sin fecha válida no se incluyen.
+    También compiten las ocurrencias de tareas recurrentes de los próximos días.
+
+    Args:
+        cantidad: Cantidad máxima de tareas a devolver (default 5)
+
+    Returns:
+        Diccionario {codigo: info} de la más urgente a la menos urgente
+    """
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    with eventos.bloqueo():
+        # Termina de cargar el snapshot (si lo hay) para que los índices estén completos
+        tareas = obtener_tareas()
+        pendientes = indices.tareas_con_estado("En proceso")
+
+        urgentes = {}
+        for _, codigos_del_dia in indices.vencimientos_en_orden():
+            if len(urgentes) >= cantidad:
+                break
+            # Dentro del mismo día, las primeras en orden de creación
+            del_dia = [(codigo, tareas[codigo]) for codigo in codigos_del_dia & pendientes]
+            for codigo, info in heapq.nsmallest(cantidad - len(urgentes), del_dia,
+                                                key=codigos.clave_orden):
+                urgentes[codigo] = info
+        if recurrencias.hay_reglas():
+            desde, hasta = recurrencias.ventana()
+            candidatas = list(urgentes.items()) + list(recurrencias.ocurrencias(desde, hasta))
+            urgentes = dict(heapq.nsmallest(
+                cantidad, candidatas,
+                key=lambda par: (indices.ordinal_vencimiento(par[1]), codigos.clave_orden(par))))
+        return urgentes
 
 def obtener_estadisticas():
-    """Calcula estadísticas de las tareas"""
-    # Cuenta el total de tareas en el diccionario
-    total = len(tareas_colegio)
-    # Cuenta cuántas tareas están completadas usando una expresión generadora
-    completadas = sum(1 for t in tareas_colegio.values() if t.get("estado") == "Completada")
+    """Calcula estadísticas de las tareas
+
+    Incluye las tareas archivadas (sus totales salen del resumen del archivo),
+    así archivar no cambia los números.
+    """
+    # Importación diferida: el archivo solo se lee si existe el resumen
+    import archivo
+
+    with eventos.bloqueo():
+        # Cuenta las tareas en memoria con los índices, sin recorrerlas
+        activas = len(obtener_tareas())
+        completadas = indices.cantidad_tareas_con_estado("Completada")
+        # Suma las archivadas
+        archivadas = archivo.obtener_resumen()
+    total = activas + archivadas["total"]
+    completadas += archivadas["completadas"]
     # Calcula las pendientes por diferencia
     pendientes = total - completadas
 
@@ -258,66 +812,264 @@ def obtener_estadisticas():
         "total": total,
         "completadas": completadas,
         "pendientes": pendientes,
-        "porcentaje_completado": porcentaje
+        "porcentaje_completado": porcentaje,
+        "archivadas": archivadas["total"]
     }
 
 def obtener_tareas_ordenadas_por_fecha():
-    """Devuelve las tareas ordenadas por fecha de vencimiento (más urgentes primero)"""
-    # Lista temporal para almacenar tuplas (fecha, código, info)
-    tareas_lista = []
-
-    # Recorre todas las tareas del diccionario
-    for codigo, info in tareas_colegio.items():
-        # Convierte la fecha de texto a objeto fecha para poder ordenar
-        fecha = string_a_fecha(info.get("fecha_fin", ""))
-        # Si la fecha es inválida, la pone al final con una fecha muy lejana
-        if fecha is None:
-            fecha = string_a_fecha("31/12/9999")
-        # Agrega la tupla a la lista
-        tareas_lista.append((fecha, codigo, info))
-
-    # Ordena la lista por el primer elemento de cada tupla (la fecha)
-    tareas_lista.sort(key=lambda x: x[0])
-
-    # Reconstruye un diccionario ordenado usando comprensión de diccionarios
-    return {codigo: info for fecha, codigo, info in tareas_lista}
+    """Devuelve las tareas ordenadas por fecha de vencimiento (más urgentes primero)
+
+    Las tareas con fecha inválida quedan al final.
+    """
+    # Importación diferida: consultas importa este módulo
+    import consultas
+    # Ordena por vencimiento (y queda en la caché de consultas si se repite)
+    return consultas.ejecutar(consultas.armar_consulta(orden="vence"))
+
+# ============================================
+# SNAPSHOT BINARIO
+# ============================================
+
+def _ruta_recurrencias(ruta):
+    """Devuelve el archivo donde se guardan las reglas de recurrencia junto a un snapshot"""
+    return ruta + ".recurrencias.json"
+
+def _ruta_historial(ruta):
+    """Devuelve el archivo donde se guarda el historial de versiones junto a un snapshot"""
+    return ruta + ".historial.jsonl.gz"
+
+def guardar_snapshot(ruta):
+    """Guarda todas las tareas y el catálogo de materias en un snapshot binario
+
+    Las reglas de las tareas recurrentes, si las hay, van en un archivo JSON
+    al lado (ver _ruta_recurrencias), y el historial de versiones en otro
+    (ver _ruta_historial).
+    """
+    # Importación diferida: solo se necesitan al guardar
+    import snapshot_binario
+    import recurrencias
+    import os
+
+    # Con el bus bloqueado nadie cambia las tareas entre escribirlas y reubicarlas
+    # (ni cambia de inquilino antes de guardar las reglas y el historial)
+    with eventos.bloqueo():
+        # Termina de cargar el snapshot actual (y lo cierra, puede ser el mismo archivo)
+        tareas = obtener_tareas()
+        # En memoria acotada, las tareas pasan a leer sus textos del archivo
+        # nuevo antes de reemplazar el viejo (ver snapshot_binario.py)
+        reubicar = None
+        if _memoria_acotada:
+            def reubicar(snapshot):
+                _reubicar_tareas(snapshot, tareas)
+        snapshot_binario.guardar_snapshot(ruta, tareas, obtener_catalogo(),
+                                          codigos.siguiente_secuencia(),
+                                          obtener_siguiente_numero(), reubicar)
+
+        if recurrencias.hay_reglas():
+            recurrencias.guardar(_ruta_recurrencias(ruta))
+        elif os.path.exists(_ruta_recurrencias(ruta)):
+            # Un archivo viejo no debe revivir reglas eliminadas
+            os.remove(_ruta_recurrencias(ruta))
+
+        if historial.hay_historial():
+            historial.guardar(_ruta_historial(ruta))
+        elif os.path.exists(_ruta_historial(ruta)):
+            os.remove(_ruta_historial(ruta))
+
+def cargar_snapshot(ruta):
+    """Abre un snapshot binario sin cargar sus tareas
+
+    El catálogo de materias y el contador de códigos se restauran enseguida.
+    Cada tarea se lee del archivo recién cuando obtener_tarea() la pide, y el
+    resto se carga de una vez la primera vez que se recorren todas.
+
+    Args:
+        ruta: Ruta del archivo generado con guardar_snapshot()
+
+    Raises:
+        ValueError: Si el archivo no es un snapshot válido
+    """
+    global _snapshot, _codigos_resueltos, tareas_colegio
+
+    # Importación diferida: solo se necesitan si hay un snapshot
+    import snapshot_binario
+    import recurrencias
+    import os
+
+    snapshot = snapshot_binario.abrir_snapshot(ruta)
+
+    # Todo el estado cambia junto, para el mismo inquilino
+    with eventos.bloqueo():
+        # Descarta las tareas actuales y cualquier snapshot anterior (en memoria
+        # acotada no se cierra: sus tareas compactas todavía leen de ahí hasta que
+        # se descartan, y el archivo se libera solo cuando ya nadie lo usa)
+        if _snapshot is not None and not _memoria_acotada:
+            _snapshot.cerrar()
+        if tareas_colegio:
+            cambios = [eventos.cambio(codigo, info, None) for codigo, info in tareas_colegio.items()]
+            tareas_colegio = {}
+            eventos.publicar("borrado_total", cambios)
+
+        # El catálogo es chico: se restaura completo, sin reutilizar números eliminados
+        reemplazar_catalogo(snapshot.materias(), siguiente_numero=snapshot.siguiente_materia)
+
+        _snapshot = snapshot
+        _codigos_resueltos = set()
+        # El contador de códigos sigue desde el guardado (nunca retrocede)
+        codigos.restaurar(snapshot.siguiente_numero)
+
+        # Las reglas de recurrencia guardadas junto al snapshot (o ninguna)
+        if os.path.exists(_ruta_recurrencias(ruta)):
+            recurrencias.cargar(_ruta_recurrencias(ruta))
+        else:
+            recurrencias.reemplazar({"siguiente": 1, "reglas": []})
+
+        # El historial de versiones guardado junto al snapshot (o ninguno)
+        if os.path.exists(_ruta_historial(ruta)):
+            historial.cargar(_ruta_historial(ruta))
+        else:
+            historial.vaciar()
+
+def _cargar_resto_del_snapshot():
+    """Carga todas las tareas del snapshot que todavía no se leyeron
+
+    Publica un único evento con todas ellas para que los índices, recordatorios
+    y réplicas se enteren de su existencia, y luego cierra el snapshot.
+
+    En memoria acotada las tareas se cargan compactas y el snapshot queda
+    abierto (es de donde leen sus textos). El evento lleva copias compactas,
+    sin los textos (la cola de los recordatorios se acota por cantidad de
+    eventos, no de bytes), y se publica de a tandas de TAREAS_POR_EVENTO_DE_CARGA.
+    """
+    global _snapshot
+
+    snapshot = _snapshot
+    _snapshot = None
+    for info in snapshot.tareas(_memoria_acotada):
+        if info["codigo"] not in _codigos_resueltos:
+            tareas_colegio[info["codigo"]] = info
+
+    if not _memoria_acotada:
+        snapshot.cerrar()
+        if tareas_colegio:
+            eventos.publicar("cargadas", [eventos.cambio(codigo, None, dict(info))
+                                          for codigo, info in tareas_colegio.items()])
+        return
+
+    codigos_cargados = list(tareas_colegio)
+    for inicio in range(0, len(codigos_cargados), TAREAS_POR_EVENTO_DE_CARGA):
+        tanda = codigos_cargados[inicio:inicio + TAREAS_POR_EVENTO_DE_CARGA]
+        eventos.publicar("cargadas", [eventos.cambio(codigo, None,
+                                                     _copia_de_tarea(tareas_colegio[codigo]))
+                                      for codigo in tanda])
+
+def _reubicar_tareas(snapshot, tareas):
+    """Hace que las tareas lean sus textos del snapshot recién guardado
+
+    El archivo tiene los registros ordenados por código, así que la posición
+    de cada tarea es su lugar en ese orden. Los textos que se habían editado
+    (y las tareas creadas o restauradas completas) ya están en el archivo y
+    se sueltan de la memoria.
+    """
+    orden = sorted(tareas, key=lambda c: c.encode("utf-8"))
+    for indice, codigo in enumerate(orden):
+        info = tareas[codigo]
+        if isinstance(info, cache_textos.TareaCompacta):
+            info.reubicar(snapshot, indice)
+        else:
+            # Mismos datos, sin los textos: no cambia nada que publicar
+            tareas[codigo] = snapshot.buscar(codigo, compacta=True)
+    # Los textos en caché son del archivo anterior
+    cache_textos.vaciar()
+
+def configurar_memoria_acotada(presupuesto_bytes):
+    """Activa el modo de memoria acotada para los snapshots que se abran después
+
+    Las tareas del snapshot quedan en memoria solo con sus campos chicos
+    (código, materia, estado, fechas) y la descripción y las observaciones se
+    leen del archivo cuando se piden, a través de una caché LRU.
+
+    Args:
+        presupuesto_bytes: Máximo de bytes de textos en la caché, o None para
+                           volver a cargar las tareas completas
+    """
+    global _memoria_acotada
+
+    if presupuesto_bytes is not None:
+        cache_textos.configurar(presupuesto_bytes)
+    _memoria_acotada = presupuesto_bytes is not None
 
 # ============================================
 # FUNCIONES DE BÚSQUEDA
 # ============================================
 
 def buscar_por_materia(materia_buscar):
-    """Busca tareas que contengan la materia especificada"""
-    # Crea un diccionario con las tareas que coinciden con la materia
-    # La búsqueda no distingue mayúsculas/minúsculas
-    return {cod: info for cod, info in tareas_colegio.items()
-            if materia_buscar.lower() in info.get("materia", "").lower()}
+    """Busca tareas cuya materia se parece a la especificada
+
+    No distingue mayúsculas ni acentos y tolera errores de tipeo o nombres
+    incompletos ("matematica", "ingl").
+    """
+    with eventos.bloqueo():
+        # Primero busca en el índice de trigramas del catálogo las materias parecidas...
+        materias = buscar_materias_parecidas(materia_buscar)
+        # ...y después toma sus tareas del índice, sin recorrer las demás
+        tareas = obtener_tareas()
+        return {cod: tareas[cod] for numero in materias
+                for cod in indices.tareas_de_materia(numero)}
 
 def buscar_por_fecha_vencimiento(fecha_buscar):
     """Busca tareas por fecha de vencimiento exacta"""
-    # Filtra tareas que tengan exactamente esa fecha de vencimiento
-    return {cod: info for cod, info in tareas_colegio.items()
-            if info.get("fecha_fin", "") == fecha_buscar}
+    with eventos.bloqueo():
+        # Filtra tareas que tengan exactamente esa fecha de vencimiento
+        encontradas = {cod: info for cod, info in obtener_tareas().items()
+                       if info.get("fecha_fin", "") == fecha_buscar}
+        # Suma las ocurrencias de tareas recurrentes que vencen ese día
+        fecha = string_a_fecha(fecha_buscar)
+        if fecha is not None:
+            encontradas.update(_ocurrencias_entre(fecha.toordinal(), fecha.toordinal()))
+        return encontradas
 
 def buscar_por_fecha_inicio(fecha_buscar):
     """Busca tareas por fecha de inicio exacta"""
-    # Filtra tareas que tengan exactamente esa fecha de inicio
-    return {cod: info for cod, info in tareas_colegio.items()
-            if info.get("fecha_inicio", "") == fecha_buscar}
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    with eventos.bloqueo():
+        # Filtra tareas que tengan exactamente esa fecha de inicio
+        encontradas = {cod: info for cod, info in obtener_tareas().items()
+                       if info.get("fecha_inicio", "") == fecha_buscar}
+        # Suma las ocurrencias de tareas recurrentes que empiezan ese día: vencen
+        # a lo sumo duracion_maxima() días después
+        fecha = string_a_fecha(fecha_buscar)
+        if fecha is not None and recurrencias.hay_reglas():
+            desde = fecha.toordinal()
+            encontradas.update(
+                (cod, info) for cod, info
+                in _ocurrencias_entre(desde, desde + recurrencias.duracion_maxima()).items()
+                if info["fecha_inicio"] == fecha_buscar)
+        return encontradas
 
 def buscar_por_estado(estado_buscar):
     """Busca tareas por estado (En proceso o Completada)"""
-    # Filtra tareas que tengan el estado especificado
-    return {cod: info for cod, info in tareas_colegio.items()
-            if info.get("estado", "") == estado_buscar}
+    # Importación diferida: consultas importa este módulo
+    import consultas
+    try:
+        consulta = consultas.armar_consulta(estado=estado_buscar)
+    except ValueError:
+        # Un estado desconocido no tiene tareas
+        return {}
+    # Usa el índice por estado (y la caché de consultas si se repite)
+    return consultas.ejecutar(consulta)
 
 def buscar_por_codigo(codigo_buscar):
     """Busca una tarea por código exacto"""
     # Convierte a mayúsculas para hacer la búsqueda
     codigo_upper = codigo_buscar.upper()
-    # Si existe el código, retorna un diccionario con esa tarea
-    if codigo_upper in tareas_colegio:
-        return {codigo_upper: tareas_colegio[codigo_upper]}
+    # Si existe el código, retorna un diccionario con esa tarea (sin
+    # convertir en tarea una ocurrencia de una tarea recurrente: solo se mira)
+    info = obtener_tarea(codigo_upper)
+    if info is not None:
+        return {codigo_upper: info}
     # Si no existe, retorna diccionario vacío
     return {}
 
@@ -325,11 +1077,16 @@ def buscar_por_codigo(codigo_buscar):
 # FUNCIONES DE VISUALIZACIÓN
 # ============================================
 
-def mostrar_lista_tareas(tareas_dict=None, titulo="LISTA DE TAREAS"):
-    """Muestra una lista de tareas en formato tabla con indicadores de urgencia"""
+def mostrar_lista_tareas(tareas_dict=None, titulo="LISTA DE TAREAS", ordenar=True):
+    """Muestra una lista de tareas en formato tabla con indicadores de urgencia
+
+    Args:
+        ordenar: True para ordenar por código; False si tareas_dict ya viene
+                 en el orden en que se quiere mostrar (por fecha, consultas...)
+    """
     # Si no se pasa un diccionario específico, usa todas las tareas
     if tareas_dict is None:
-        tareas_dict = tareas_colegio
+        tareas_dict = obtener_tareas()
 
     # Limpia la consola para una visualización limpia
     limpiar_pantalla()
@@ -350,26 +1107,33 @@ def mostrar_lista_tareas(tareas_dict=None, titulo="LISTA DE TAREAS"):
     # Línea separadora más delgada para los encabezados
     linea_separadora(80, "-")
 
-    # Itera sobre las tareas ordenadas por código
-    for codigo, info in sorted(tareas_dict.items()):
-        # Extrae y trunca la materia a 14 caracteres máximo
-        materia = info.get("materia", "")[:14]
-        # Extrae y trunca la descripción a 24 caracteres máximo
-        tarea = info.get("tarea", "")[:24]
-        # Obtiene el estado actual de la tarea
-        estado = info.get("estado", "En proceso")
-
-        # Calcula cuántos días faltan para el vencimiento
-        dias = calcular_dias_restantes(info.get("fecha_fin", ""))
-        # Obtiene el indicador textual ([HOY], [MANANA], etc.)
-        urgencia = obtener_indicador_urgencia(dias)
-
-        # Si la tarea está completada, sobrescribe el indicador
-        if estado == "Completada":
-            urgencia = "COMPLETADA"
-
-        # Imprime la fila con formato de columnas alineadas
-        print(f"{codigo:<8} {materia:<15} {tarea:<25} {urgencia:<15} {estado:<12}")
+    # Ordena por orden de creación (T200 antes que T1000) salvo que ya venga ordenado
+    filas = sorted(tareas_dict.items(), key=codigos.clave_orden) if ordenar else tareas_dict.items()
+
+    # Todas las filas cuentan los días contra el mismo "hoy" (el reloj se lee una
+    # vez), y con el bus bloqueado las materias son las del mismo inquilino
+    with eventos.bloqueo(), mismo_instante():
+        # Itera sobre las tareas
+        for codigo, info in filas:
+            # Extrae y trunca la materia a 14 caracteres máximo
+            materia = nombre_materia(info.get("materia_id"))[:14]
+            # Extrae y trunca la descripción a 24 caracteres máximo (en memoria
+            # acotada lee del archivo solo esos caracteres)
+            tarea = cache_textos.prefijo(info, "tarea", 24)
+            # Obtiene el estado actual de la tarea
+            estado = info.get("estado", "En proceso")
+
+            # Calcula cuántos días faltan para el vencimiento
+            dias = calcular_dias_restantes(info.get("fecha_fin", ""))
+            # Obtiene el indicador textual ([HOY], [MANANA], etc.)
+            urgencia = obtener_indicador_urgencia(dias)
+
+            # Si la tarea está completada, sobrescribe el indicador
+            if estado == "Completada":
+                urgencia = "COMPLETADA"
+
+            # Imprime la fila con formato de columnas alineadas
+            print(f"{codigo:<8} {materia:<15} {tarea:<25} {urgencia:<15} {estado:<12}")
 
     # Muestra el total de tareas al final
     print(f"\nTotal: {len(tareas_dict)} tarea(s)")
@@ -386,7 +1150,7 @@ def mostrar_detalle_tarea(codigo):
     print(f"  DETALLE DE TAREA")
     linea_separadora(50)
     print(f"Codigo: {codigo}")
-    print(f"Materia: {tarea['materia']}")
+    print(f"Materia: {nombre_materia(tarea['materia_id'])}")
     print(f"Tarea: {tarea['tarea']}")
     print(f"Fecha inicio: {tarea['fecha_inicio']}")
     print(f"Fecha fin: {tarea['fecha_fin']}")
@@ -465,23 +1229,43 @@ def opcion_agregar_tarea():
     # Campo opcional para notas adicionales
     observaciones = input("Observaciones o notas (opcional): ").strip()
 
-    # Llama a la función que guarda la tarea en el diccionario
-    codigo = agregar_tarea(materia, tarea, fecha_inicio, fecha_fin, observaciones)
+    # Importación diferida: el servicio valida y guarda la tarea
+    import servicio
+    try:
+        tarea_info = servicio.agregar(materia, tarea, fecha_inicio, fecha_fin, observaciones)
+    except ValueError as error:
+        print(error)
+        return
 
     # Muestra confirmación con el código asignado
     print("\nTarea agregada exitosamente")
-    print(f"Codigo asignado: {codigo}")
+    print(f"Codigo asignado: {tarea_info['codigo']}")
 
 def opcion_ver_detalle():
     """Muestra el detalle de una tarea"""
     mostrar_lista_tareas()
 
-    if not tareas_colegio:
+    if not obtener_tareas():
         return
 
     codigo = input("\nIngrese el codigo de la tarea: ").strip().upper()
     mostrar_detalle_tarea(codigo)
 
+def opcion_ver_mas_urgentes():
+    """Muestra las tareas pendientes que vencen antes"""
+    cantidad = input("\nCuantas tareas mostrar? [5]: ").strip()
+    if not cantidad:
+        cantidad = 5
+    elif cantidad.isdigit() and int(cantidad) > 0:
+        cantidad = int(cantidad)
+    else:
+        print("Cantidad invalida")
+        return
+
+    urgentes = obtener_tareas_mas_urgentes(cantidad)
+    # Ya vienen de la más urgente a la menos urgente
+    mostrar_lista_tareas(urgentes, f"LAS {cantidad} MAS URGENTES", ordenar=False)
+
 def opcion_marcar_completada():
     """Marca una tarea como completada"""
     pendientes = obtener_tareas_pendientes()
@@ -490,102 +1274,138 @@ def opcion_marcar_completada():
     if not pendientes:
         return
 
+    # Importación diferida: el servicio hace el cambio
+    import servicio
+
     codigo = input("\nCodigo de la tarea a completar: ").strip().upper()
-    if marcar_completada(codigo):
+    try:
+        servicio.completar(codigo)
         print("\nTarea completada! Bien hecho!")
-    else:
+    except ValueError:
         print("No se pudo completar la tarea (codigo invalido)")
 
-def opcion_editar_tarea():
-    """Edita una tarea existente"""
-    mostrar_lista_tareas()
-
-    if not tareas_colegio:
-        return
-
-    codigo = input("\nCodigo de la tarea a editar: ").strip().upper()
-    tarea_info = obtener_tarea(codigo)
+def _pedir_cambios(tarea_info):
+    """Pregunta los campos nuevos de una tarea (ENTER mantiene el valor actual)
 
-    if not tarea_info:
-        print("No existe una tarea con ese codigo")
-        return
+    No cambia la tarea: devuelve lo que hay que pasarle a servicio.editar().
+    La usan opcion_editar_tarea() y acciones_post_busqueda().
 
+    Returns:
+        Diccionario {campo: valor nuevo} solo con lo que el usuario cambió
+    """
+    cambios = {}
     print("\n(Presione ENTER para mantener el valor actual)")
 
-    # Editar campos
     nueva_tarea = input(f"Tarea [{tarea_info['tarea']}]: ").strip()
     if nueva_tarea:
-        tarea_info['tarea'] = nueva_tarea
+        cambios['tarea'] = nueva_tarea
 
     nueva_fecha_inicio = input(f"Fecha inicio [{tarea_info['fecha_inicio']}]: ").strip()
     if nueva_fecha_inicio:
         if validar_fecha(nueva_fecha_inicio):
-            tarea_info['fecha_inicio'] = nueva_fecha_inicio
+            cambios['fecha_inicio'] = nueva_fecha_inicio
         else:
             print("Formato invalido. Se mantiene la fecha actual")
 
     nueva_fecha_fin = input(f"Fecha vencimiento [{tarea_info['fecha_fin']}]: ").strip()
     if nueva_fecha_fin:
         if validar_fecha(nueva_fecha_fin):
-            # Validar que no sea anterior a fecha inicio
-            fecha_inicio_actual = tarea_info.get('fecha_inicio', '')
+            # Validar que no sea anterior a la fecha de inicio (la nueva, si se cambió)
+            fecha_inicio_actual = cambios.get('fecha_inicio', tarea_info.get('fecha_inicio', ''))
             if fecha_inicio_actual and string_a_fecha(nueva_fecha_fin) < string_a_fecha(fecha_inicio_actual):
                 print("La fecha de vencimiento no puede ser anterior a la fecha de inicio")
             else:
-                tarea_info['fecha_fin'] = nueva_fecha_fin
+                cambios['fecha_fin'] = nueva_fecha_fin
         else:
             print("Formato invalido. Se mantiene la fecha actual")
 
     nuevas_obs = input(f"Observaciones [{tarea_info.get('observaciones', '')}]: ").strip()
     if nuevas_obs:
-        tarea_info['observaciones'] = nuevas_obs
+        cambios['observaciones'] = nuevas_obs
 
     # Preguntar si quiere cambiar el estado
     if tarea_info['estado'] == "En proceso":
         cambiar_estado = input("Marcar como completada? (S/N): ").upper()
         if cambiar_estado == "S":
-            tarea_info['estado'] = "Completada"
+            cambios['estado'] = "Completada"
     else:
         cambiar_estado = input("Marcar como en proceso? (S/N): ").upper()
         if cambiar_estado == "S":
-            tarea_info['estado'] = "En proceso"
+            cambios['estado'] = "En proceso"
+
+    return cambios
+
+def _editar_con_preguntas(codigo):
+    """Pide los cambios de una tarea y los aplica todos juntos con el servicio"""
+    # Importación diferida: el servicio valida y hace el cambio
+    import servicio
+
+    # Solo muestra la tarea: no cambia nada hasta tener todas las respuestas
+    tarea_info = servicio.obtener(codigo)
+    if not tarea_info:
+        print("No existe una tarea con ese codigo")
+        return
+
+    cambios = _pedir_cambios(tarea_info)
+    try:
+        servicio.editar(codigo, **cambios)
+    except ValueError as error:
+        print(error)
+        return
 
     print("\nTarea actualizada correctamente")
 
+def opcion_editar_tarea():
+    """Edita una tarea existente"""
+    mostrar_lista_tareas()
+
+    if not obtener_tareas():
+        return
+
+    codigo = input("\nCodigo de la tarea a editar: ").strip().upper()
+    _editar_con_preguntas(codigo)
+
 def opcion_eliminar_tarea():
     """Elimina una tarea"""
     mostrar_lista_tareas()
 
-    if not tareas_colegio:
+    if not obtener_tareas():
         return
 
+    # Importación diferida: el servicio hace el cambio
+    import servicio
+
     codigo = input("\nCodigo de la tarea a eliminar: ").strip().upper()
 
-    if codigo not in tareas_colegio:
+    # También encuentra las del snapshot y las ocurrencias de tareas recurrentes
+    if servicio.obtener(codigo) is None:
         print("No existe una tarea con ese codigo")
         return
 
     confirmar = input("Esta seguro? (S/N): ").upper()
     if confirmar == "S":
-        if eliminar_tarea(codigo):
+        try:
+            servicio.eliminar(codigo)
             print("\nTarea eliminada")
+        except ValueError as error:
+            print(error)
     else:
         print("Operacion cancelada")
 
 def opcion_borrar_todas():
     """Borra todas las tareas"""
-    global tareas_colegio, siguiente_numero
-
-    if not tareas_colegio:
+    cantidad = len(obtener_tareas())
+    if not cantidad:
         print("\nNo hay tareas para borrar")
         return
 
-    print(f"\nSe eliminaran {len(tareas_colegio)} tarea(s)")
+    print(f"\nSe eliminaran {cantidad} tarea(s)")
     confirmar = input("Esta seguro? (S/N): ").upper()
 
     if confirmar == "S":
-        tareas_colegio = {}
-        siguiente_numero = 1
+        # Importación diferida: el servicio hace el cambio
+        import servicio
+        servicio.borrar_todas()
         print("\nTodas las tareas fueron eliminadas")
     else:
         print("Operacion cancelada")
@@ -594,18 +1414,19 @@ def opcion_borrar_todas():
 # FUNCIONES DE OPCIONES DE BÚSQUEDA
 # ============================================
 
-def acciones_post_busqueda(resultados, titulo_busqueda):
+def acciones_post_busqueda(resultados, titulo_busqueda, ordenar=True):
     """Muestra opciones de acción después de una búsqueda exitosa
 
     Args:
         resultados: Diccionario con las tareas encontradas
         titulo_busqueda: Título descriptivo de la búsqueda realizada
+        ordenar: False si los resultados ya vienen en el orden a mostrar
 
     Returns:
         True si el usuario quiere volver a buscar, False si quiere volver al menú
     """
     # Primero muestra los resultados
-    mostrar_lista_tareas(resultados, titulo_busqueda)
+    mostrar_lista_tareas(resultados, titulo_busqueda, ordenar)
 
     # Si no hay resultados, no muestra opciones
     if not resultados:
@@ -622,53 +1443,10 @@ def acciones_post_busqueda(resultados, titulo_busqueda):
     opcion = input("\nSeleccione una opcion (A-D): ").strip().upper()
 
     if opcion == "A":
-        # Editar tarea
+        # Editar tarea (las mismas preguntas que opcion_editar_tarea)
         codigo = input("\nIngrese el codigo de la tarea a editar: ").strip().upper()
         if codigo in resultados:
-            # Obtiene la tarea del diccionario global
-            tarea_info = obtener_tarea(codigo)
-            if tarea_info:
-                print("\n(Presione ENTER para mantener el valor actual)")
-
-                # Editar campos
-                nueva_tarea = input(f"Tarea [{tarea_info['tarea']}]: ").strip()
-                if nueva_tarea:
-                    tarea_info['tarea'] = nueva_tarea
-
-                nueva_fecha_inicio = input(f"Fecha inicio [{tarea_info['fecha_inicio']}]: ").strip()
-                if nueva_fecha_inicio:
-                    if validar_fecha(nueva_fecha_inicio):
-                        tarea_info['fecha_inicio'] = nueva_fecha_inicio
-                    else:
-                        print("Formato invalido. Se mantiene la fecha actual")
-
-                nueva_fecha_fin = input(f"Fecha vencimiento [{tarea_info['fecha_fin']}]: ").strip()
-                if nueva_fecha_fin:
-                    if validar_fecha(nueva_fecha_fin):
-                        # Validar que no sea anterior a fecha inicio
-                        fecha_inicio_actual = tarea_info.get('fecha_inicio', '')
-                        if fecha_inicio_actual and string_a_fecha(nueva_fecha_fin) < string_a_fecha(fecha_inicio_actual):
-                            print("La fecha de vencimiento no puede ser anterior a la fecha de inicio")
-                        else:
-                            tarea_info['fecha_fin'] = nueva_fecha_fin
-                    else:
-                        print("Formato invalido. Se mantiene la fecha actual")
-
-                nuevas_obs = input(f"Observaciones [{tarea_info.get('observaciones', '')}]: ").strip()
-                if nuevas_obs:
-                    tarea_info['observaciones'] = nuevas_obs
-
-                # Preguntar si quiere cambiar el estado
-                if tarea_info['estado'] == "En proceso":
-                    cambiar_estado = input("Marcar como completada? (S/N): ").upper()
-                    if cambiar_estado == "S":
-                        tarea_info['estado'] = "Completada"
-                else:
-                    cambiar_estado = input("Marcar como en proceso? (S/N): ").upper()
-                    if cambiar_estado == "S":
-                        tarea_info['estado'] = "En proceso"
-
-                print("\nTarea actualizada correctamente")
+            _editar_con_preguntas(codigo)
         else:
             print("Ese codigo no esta en los resultados de la busqueda")
 
@@ -680,8 +1458,13 @@ def acciones_post_busqueda(resultados, titulo_busqueda):
         if codigo in resultados:
             confirmar = input("Esta seguro? (S/N): ").upper()
             if confirmar == "S":
-                if eliminar_tarea(codigo):
+                # Importación diferida: el servicio hace el cambio
+                import servicio
+                try:
+                    servicio.eliminar(codigo)
                     print("\nTarea eliminada")
+                except ValueError as error:
+                    print(error)
             else:
                 print("Operacion cancelada")
         else:
@@ -837,15 +1620,160 @@ def opcion_buscar_por_codigo():
             if otra != "S":
                 return
 
+def opcion_busqueda_avanzada():
+    """Busca tareas combinando criterios con el lenguaje de consultas"""
+    # Importación diferida: solo se necesita si se usa esta opción
+    import servicio
+
+    print("\nCombine criterios separados por espacios, por ejemplo:")
+    print("  materia:mate estado:pendiente vence<=hoy+7 orden:vence limite:5")
+    print("Campos: materia, estado, vence (:, >=, <=, >, <), texto, orden, limite")
+    print("Las palabras sueltas se buscan en la descripcion y las observaciones")
+
+    while True:
+        # Solicita la consulta
+        expresion = input("\nConsulta: ").strip()
+        if not expresion:
+            print("Debe ingresar una consulta")
+            return
+
+        # Interpreta y ejecuta la consulta
+        try:
+            resultados = servicio.consultar(expresion)
+        except ValueError as error:
+            print(f"Consulta invalida: {error}")
+            continue
+
+        # Muestra los resultados (en el orden de la consulta) y acciones
+        if resultados:
+            volver_a_buscar = acciones_post_busqueda(resultados, f"CONSULTA: {expresion}",
+                                                     ordenar=False)
+            if not volver_a_buscar:
+                return  # Volver al menú de búsqueda
+        else:
+            print("\nNo hay tareas que cumplan la consulta")
+            # Preguntar si quiere buscar otra vez
+            otra = input("\nDesea hacer otra consulta? (S/N): ").upper()
+            if otra != "S":
+                return
+
+def opcion_buscar_en_archivo():
+    """Busca entre las tareas archivadas con el lenguaje de consultas"""
+    print("\nLas tareas archivadas se buscan con el mismo lenguaje de consultas,")
+    print("por ejemplo: materia:historia ensayo orden:-vence limite:10")
+    print("(deje vacio para ver todas las archivadas)")
+
+    expresion = input("\nConsulta: ").strip()
+    try:
+        resultados = buscar_en_archivo(expresion)
+    except ValueError as error:
+        print(f"Consulta invalida: {error}")
+        return
+
+    if resultados:
+        # Solo lectura: las tareas archivadas ya no se editan ni completan
+        mostrar_lista_tareas(resultados, "TAREAS ARCHIVADAS", ordenar=False)
+    else:
+        print("\nNo hay tareas archivadas que cumplan la consulta")
+
+def _mostrar_cambio(cambio, con_codigo=False):
+    """Imprime una versión del historial: cuándo, quién y qué campos cambiaron"""
+    momento = formatear_momento(cambio["momento"])
+    autor = cambio["autor"] or "(sin autor)"
+    codigo = f"{cambio['codigo']:<8} " if con_codigo else ""
+    print(f"\n{momento}  {codigo}{cambio['tipo']:<12} {autor}")
+    for campo, (antes, despues) in sorted(cambio["campos"].items()):
+        # La secuencia es interna: no le dice nada al usuario
+        if campo == "secuencia":
+            continue
+        if campo == "materia_id":
+            campo = "materia"
+            antes = None if antes is None else nombre_materia(antes)
+            despues = None if despues is None else nombre_materia(despues)
+        print(f"    {campo}: {'-' if antes is None else antes} -> {'-' if despues is None else despues}")
+
+def opcion_historial_tarea():
+    """Muestra todas las versiones de una tarea: qué cambió, cuándo y quién"""
+    codigo = input("\nCodigo de la tarea: ").strip().upper()
+    versiones = historial.historial_de(codigo)
+    if not versiones:
+        print("Esa tarea no tiene cambios registrados")
+        return
+
+    print(f"\nHISTORIAL DE {codigo} ({len(versiones)} cambio(s))")
+    linea_separadora(60)
+    for cambio in versiones:
+        _mostrar_cambio(cambio)
+
+def opcion_pendientes_en_fecha():
+    """Muestra las tareas que estaban pendientes al terminar un día pasado"""
+    fecha = input("\nFecha (DD/MM/AAAA): ").strip()
+    try:
+        pendientes = historial.pendientes_en(fecha)
+    except ValueError as error:
+        print(error)
+        return
+    # Solo lectura: son las tareas como estaban ese día, no como están ahora
+    mostrar_lista_tareas(pendientes, f"PENDIENTES AL {fecha}")
+
+def opcion_cambios_entre_fechas():
+    """Muestra quién cambió qué entre dos días"""
+    desde = input("\nDesde (DD/MM/AAAA): ").strip()
+    hasta = input("Hasta (DD/MM/AAAA) [hoy]: ").strip()
+    try:
+        # Desde el comienzo del primer día hasta el final del último
+        cambios = historial.cambios_entre(historial.inicio_del_dia(desde),
+                                          historial.fin_del_dia(hasta) if hasta else None)
+    except ValueError as error:
+        print(error)
+        return
+    if not cambios:
+        print("No hubo cambios en esas fechas")
+        return
+
+    print(f"\n{len(cambios)} cambio(s)")
+    linea_separadora(60)
+    for cambio in cambios:
+        _mostrar_cambio(cambio, con_codigo=True)
+
+def opcion_ver_agenda_semana():
+    """Muestra cuántas tareas hay en curso y cuántas vencen cada día de una semana"""
+    # Importación diferida: la agenda arma su estructura recién cuando se usa
+    import agenda
+
+    texto = input("\nFecha de la semana a ver (DD/MM/AAAA, Enter = esta semana): ").strip()
+    if texto and not validar_fecha(texto):
+        print("Formato invalido. Use DD/MM/AAAA (ej: 15/11/2024)")
+        return
+    agenda.mostrar_semana(string_a_fecha(texto) if texto else None)
+
+def opcion_ver_agenda_mes():
+    """Muestra el calendario de un mes con la carga de tareas de cada día"""
+    # Importación diferida: la agenda arma su estructura recién cuando se usa
+    import agenda
+
+    texto = input("\nMes a ver (MM/AAAA, Enter = este mes): ").strip()
+    if not texto:
+        agenda.mostrar_mes()
+        return
+    mes, _, anio = texto.partition("/")
+    if not (mes.isdigit() and anio.isdigit() and 1 <= int(mes) <= 12 and len(anio) == 4):
+        print("Formato invalido. Use MM/AAAA (ej: 11/2024)")
+        return
+    agenda.mostrar_mes(int(anio), int(mes))
+
 def submenu_ver_tareas():
     """Submenú para ver tareas"""
     opciones = {
         "1": ("Ver todas las tareas", lambda: mostrar_lista_tareas()),
         "2": ("Ver tareas pendientes", lambda: mostrar_lista_tareas(obtener_tareas_pendientes(), "TAREAS PENDIENTES")),
         "3": ("Ver tareas completadas", lambda: mostrar_lista_tareas(obtener_tareas_completadas(), "TAREAS COMPLETADAS")),
-        "4": ("Ver tareas por fecha de vencimiento", lambda: mostrar_lista_tareas(obtener_tareas_ordenadas_por_fecha(), "TAREAS POR FECHA DE VENCIMIENTO")),
-        "5": ("Ver detalle de una tarea", opcion_ver_detalle),
-        "6": ("Volver al menu principal", None),
+        "4": ("Ver tareas por fecha de vencimiento", lambda: mostrar_lista_tareas(obtener_tareas_ordenadas_por_fecha(), "TAREAS POR FECHA DE VENCIMIENTO", ordenar=False)),
+        "5": ("Ver las mas urgentes (que hago primero?)", opcion_ver_mas_urgentes),
+        "6": ("Ver detalle de una tarea", opcion_ver_detalle),
+        "7": ("Ver agenda de la semana", opcion_ver_agenda_semana),
+        "8": ("Ver agenda del mes", opcion_ver_agenda_mes),
+        "9": ("Volver al menu principal", None),
     }
 
     while True:
@@ -859,9 +1787,9 @@ def submenu_ver_tareas():
 
         linea_separadora()
 
-        opcion = input("\nSeleccione una opcion (1-6): ").strip()
+        opcion = input("\nSeleccione una opcion (1-9): ").strip()
 
-        if opcion == "6":
+        if opcion == "9":
             break
 
         if opcion in opciones and opciones[opcion][1]:
@@ -884,7 +1812,12 @@ def submenu_buscar_tareas():
         "3": ("Buscar por fecha inicio", opcion_buscar_por_fecha_inicio),
         "4": ("Buscar por estado", opcion_buscar_por_estado),
         "5": ("Buscar por codigo", opcion_buscar_por_codigo),
-        "6": ("Volver al menu principal", None),
+        "6": ("Busqueda avanzada", opcion_busqueda_avanzada),
+        "7": ("Buscar en el archivo", opcion_buscar_en_archivo),
+        "8": ("Historial de una tarea", opcion_historial_tarea),
+        "9": ("Pendientes en una fecha pasada", opcion_pendientes_en_fecha),
+        "10": ("Cambios entre dos fechas", opcion_cambios_entre_fechas),
+        "11": ("Volver al menu principal", None),
     }
 
     # Bucle del submenú
@@ -897,15 +1830,15 @@ def submenu_buscar_tareas():
 
         # Muestra todas las opciones
         for num, (descripcion, _) in opciones.items():
-            print(f"{num}. {descripcion}")
+            print(f"{num:>2}. {descripcion}")
 
         linea_separadora()
 
         # Solicita la opción al usuario
-        opcion = input("\nSeleccione una opcion (1-6): ").strip()
+        opcion = input("\nSeleccione una opcion (1-11): ").strip()
 
         # Si es volver, sale del bucle
-        if opcion == "6":
+        if opcion == "11":
             break
 
         # Ejecuta la opción seleccionada si es válida
@@ -920,6 +1853,354 @@ def submenu_buscar_tareas():
             print("\nOpcion no valida")
             pausar()
 
+def _pedir_tareas_de_consulta(accion):
+    """Pide una consulta, muestra qué tareas abarca y pide confirmación
+
+    Args:
+        accion: Texto de la operación para la confirmación ("eliminar", ...)
+
+    Returns:
+        Lista de códigos confirmados, o None si se canceló
+    """
+    # Importación diferida: consultas importa este módulo
+    import consultas
+
+    print("\nEscriba una consulta como en la busqueda avanzada, por ejemplo:")
+    print("  estado:completada vence<01/03/2026")
+    expresion = input("\nConsulta: ").strip()
+    if not expresion:
+        print("Debe ingresar una consulta")
+        return None
+
+    try:
+        resultados = consultas.consultar(expresion)
+    except ValueError as error:
+        print(f"Consulta invalida: {error}")
+        return None
+
+    mostrar_lista_tareas(resultados, f"CONSULTA: {expresion}", ordenar=False)
+    if not resultados:
+        return None
+
+    confirmar = input(f"\nSe van a {accion} {len(resultados)} tarea(s). Esta seguro? (S/N): ").upper()
+    if confirmar != "S":
+        print("Operacion cancelada")
+        return None
+    return list(resultados)
+
+def opcion_completar_varias():
+    """Completa varias tareas indicando sus códigos"""
+    texto = input("\nCodigos a completar (separados por coma o espacio): ").strip().upper()
+    codigos_pedidos = texto.replace(",", " ").split()
+    if not codigos_pedidos:
+        print("Debe ingresar al menos un codigo")
+        return
+    cantidad = completar_tareas(codigos_pedidos)
+    print(f"\nSe completaron {cantidad} tarea(s)")
+
+def opcion_completar_por_consulta():
+    """Completa todas las tareas que cumplen una consulta"""
+    codigos_elegidos = _pedir_tareas_de_consulta("completar")
+    if codigos_elegidos:
+        print(f"\nSe completaron {completar_tareas(codigos_elegidos)} tarea(s)")
+
+def opcion_eliminar_por_consulta():
+    """Elimina todas las tareas que cumplen una consulta"""
+    codigos_elegidos = _pedir_tareas_de_consulta("eliminar")
+    if codigos_elegidos:
+        print(f"\nSe eliminaron {eliminar_tareas(codigos_elegidos)} tarea(s)")
+
+def opcion_cambiar_materia_por_consulta():
+    """Pasa a otra materia todas las tareas que cumplen una consulta"""
+    codigos_elegidos = _pedir_tareas_de_consulta("cambiar de materia")
+    if not codigos_elegidos:
+        return
+    print("\nMateria de destino:")
+    materia = seleccionar_materia()
+    if materia is None:
+        return
+    print(f"\nSe cambiaron {cambiar_materia_tareas(codigos_elegidos, materia)} tarea(s) a {materia}")
+
+def opcion_archivar_tareas_viejas():
+    """Mueve al archivo comprimido las tareas vencidas hace tiempo"""
+    # Importación diferida: solo se necesita el valor por defecto
+    import archivo
+
+    print("\nSe archivan las tareas (completadas o no) que vencieron hace mas")
+    print("de los dias indicados. Siguen apareciendo en 'Buscar en el archivo'")
+    print("y en las estadisticas.")
+    texto = input(f"\nDias de antiguedad (Enter = {archivo.DIAS_ARCHIVO}): ").strip()
+    if not texto:
+        dias = archivo.DIAS_ARCHIVO
+    elif texto.isdigit():
+        dias = int(texto)
+    else:
+        print("Debe ingresar un numero de dias")
+        return
+    print(f"\nSe archivaron {archivar_tareas_viejas(dias)} tarea(s)")
+
+def opcion_exportar_ics():
+    """Exporta las tareas pendientes a un archivo de calendario (.ics)"""
+    # Importación diferida: solo se necesita al exportar
+    import calendario_ics
+
+    ruta = input("\nArchivo a generar (Enter = tareas.ics): ").strip() or "tareas.ics"
+    print("1. Como tareas (VTODO)")
+    print("2. Como eventos (VEVENT)")
+    forma = input("Seleccione (Enter = 1): ").strip() or "1"
+    if forma not in ("1", "2"):
+        print("Opcion no valida")
+        return
+    cantidad = calendario_ics.exportar(ruta, "VTODO" if forma == "1" else "VEVENT")
+    print(f"\nSe exportaron {cantidad} tarea(s) a {ruta}")
+
+def opcion_importar_ics():
+    """Agrega las tareas de un archivo de calendario (.ics)"""
+    # Importación diferida: solo se necesita al importar
+    import calendario_ics
+
+    ruta = input("\nArchivo a importar (.ics): ").strip()
+    if not ruta:
+        print("Operacion cancelada")
+        return
+    try:
+        resultado = calendario_ics.importar(ruta)
+    except OSError as error:
+        print(f"No se pudo leer el archivo: {error}")
+        return
+    print(f"\nSe agregaron {resultado['agregadas']} tarea(s)")
+    if resultado["repetidas"]:
+        print(f"Ya estaban: {resultado['repetidas']} (mismo UID)")
+    if resultado["omitidas"]:
+        print(f"Omitidas: {resultado['omitidas']} (completadas, canceladas o sin fecha)")
+
+def submenu_operaciones_lote():
+    """Submenú para cambiar muchas tareas de una vez"""
+    opciones = {
+        "1": ("Completar varias tareas (por codigo)", opcion_completar_varias),
+        "2": ("Completar las tareas de una consulta", opcion_completar_por_consulta),
+        "3": ("Eliminar las tareas de una consulta", opcion_eliminar_por_consulta),
+        "4": ("Cambiar de materia las tareas de una consulta", opcion_cambiar_materia_por_consulta),
+        "5": ("Archivar tareas viejas", opcion_archivar_tareas_viejas),
+        "6": ("Exportar pendientes a calendario (.ics)", opcion_exportar_ics),
+        "7": ("Importar calendario (.ics)", opcion_importar_ics),
+        "8": ("Volver al menu principal", None),
+    }
+
+    while True:
+        limpiar_pantalla()
+        linea_separadora()
+        print("         OPERACIONES EN LOTE - SUBMENU")
+        linea_separadora()
+
+        for num, (descripcion, _) in opciones.items():
+            print(f"{num}. {descripcion}")
+
+        linea_separadora()
+
+        opcion = input("\nSeleccione una opcion (1-8): ").strip()
+
+        if opcion == "8":
+            break
+
+        if opcion in opciones and opciones[opcion][1]:
+            try:
+                opciones[opcion][1]()
+                pausar()
+            except Exception as e:
+                print(f"\nError: {e}")
+                pausar()
+        else:
+            print("\nOpcion no valida")
+            pausar()
+
+def opcion_agregar_tarea_recurrente():
+    """Agrega una tarea que se repite (cada semana, cada N dias o ciertos dias)"""
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    limpiar_pantalla()
+    linea_separadora(50)
+    print("  AGREGAR TAREA RECURRENTE")
+    linea_separadora(50)
+
+    materia = seleccionar_materia()
+    if not materia:
+        print("Operacion cancelada")
+        return
+
+    tarea = input("\nDescripcion de la tarea: ").strip()
+    if not tarea:
+        print("La descripcion es obligatoria")
+        return
+
+    primer_vencimiento = input("Primer vencimiento (DD/MM/AAAA): ").strip()
+    if not validar_fecha(primer_vencimiento):
+        print("Formato invalido. Use DD/MM/AAAA (ej: 15/11/2024)")
+        return
+
+    print("\nComo se repite?")
+    print("1. Cada semana")
+    print("2. Cada N dias")
+    print("3. Ciertos dias de la semana")
+    forma = input("Seleccione (1-3): ").strip()
+    cada = dias_semana = None
+    if forma == "1":
+        cada = 7
+    elif forma == "2":
+        texto = input("Cada cuantos dias?: ").strip()
+        if not texto.isdigit() or int(texto) < 1:
+            print("Debe ingresar un numero de dias")
+            return
+        cada = int(texto)
+    elif forma == "3":
+        dias_semana = recurrencias.leer_dias_semana(
+            input("Dias (ej: lunes, miercoles): "))
+    else:
+        print("Opcion no valida")
+        return
+
+    hasta = input("Hasta (DD/MM/AAAA, Enter = sin fin): ").strip() or None
+    texto = input("Dias para hacerla antes de cada vencimiento [0]: ").strip()
+    if texto and not texto.isdigit():
+        print("Debe ingresar un numero de dias")
+        return
+    observaciones = input("Observaciones o notas (opcional): ").strip()
+
+    try:
+        numero = agregar_tarea_recurrente(materia, tarea, primer_vencimiento, hasta, cada,
+                                          dias_semana, int(texto or 0), observaciones)
+    except ValueError as error:
+        print(f"\n{error}")
+        return
+    regla = recurrencias.listar_reglas()[numero]
+    print(f"\nTarea recurrente agregada (regla {numero}): {recurrencias.describir(regla)}")
+    print("Sus proximas ocurrencias aparecen entre las tareas pendientes")
+
+def opcion_ver_reglas_recurrentes():
+    """Muestra las reglas de las tareas recurrentes"""
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    limpiar_pantalla()
+    linea_separadora()
+    print("  TAREAS RECURRENTES")
+    linea_separadora()
+
+    reglas = recurrencias.listar_reglas()
+    if not reglas:
+        print("\nNo hay tareas recurrentes\n")
+        return
+    print(f"{'REGLA':<6} {'MATERIA':<15} {'TAREA':<25} {'SE REPITE'}")
+    linea_separadora(80, "-")
+    for numero, regla in reglas.items():
+        print(f"{numero:<6} {nombre_materia(regla['materia_id'])[:14]:<15} "
+              f"{regla['tarea'][:24]:<25} {recurrencias.describir(regla)}")
+    print(f"\nTotal: {len(reglas)} regla(s)")
+
+def opcion_ver_proximas_ocurrencias():
+    """Muestra las ocurrencias de tareas recurrentes de los próximos días"""
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    desde, hasta = recurrencias.ventana()
+    proximas = sorted(_ocurrencias_entre(desde, hasta).items(),
+                      key=lambda par: (indices.ordinal_vencimiento(par[1]), par[0]))
+    mostrar_lista_tareas(dict(proximas),
+                         f"OCURRENCIAS DE LOS PROXIMOS {recurrencias.HORIZONTE_DIAS} DIAS",
+                         ordenar=False)
+
+def opcion_eliminar_regla_recurrente():
+    """Elimina una regla de tarea recurrente"""
+    # Importación diferida: sin reglas no hace falta
+    import recurrencias
+
+    opcion_ver_reglas_recurrentes()
+    if not recurrencias.hay_reglas():
+        return
+
+    texto = input("\nNumero de regla a eliminar: ").strip()
+    if not texto.isdigit():
+        print("Debe ingresar un numero de regla")
+        return
+    print("Las ocurrencias ya completadas o editadas se mantienen como tareas")
+    if input("Esta seguro? (S/N): ").upper() != "S":
+        print("Operacion cancelada")
+        return
+    if recurrencias.eliminar_regla(int(texto)):
+        print("\nTarea recurrente eliminada")
+    else:
+        print("No existe una regla con ese numero")
+
+def submenu_tareas_recurrentes():
+    """Submenú para las tareas que se repiten"""
+    opciones = {
+        "1": ("Agregar tarea recurrente", opcion_agregar_tarea_recurrente),
+        "2": ("Ver tareas recurrentes", opcion_ver_reglas_recurrentes),
+        "3": ("Ver proximas ocurrencias", opcion_ver_proximas_ocurrencias),
+        "4": ("Eliminar tarea recurrente", opcion_eliminar_regla_recurrente),
+        "5": ("Volver al menu principal", None),
+    }
+
+    while True:
+        limpiar_pantalla()
+        linea_separadora()
+        print("         TAREAS RECURRENTES - SUBMENU")
+        linea_separadora()
+
+        for num, (descripcion, _) in opciones.items():
+            print(f"{num}. {descripcion}")
+
+        linea_separadora()
+
+        opcion = input("\nSeleccione una opcion (1-5): ").strip()
+
+        if opcion == "5":
+            break
+
+        if opcion in opciones and opciones[opcion][1]:
+            try:
+                opciones[opcion][1]()
+                pausar()
+            except Exception as e:
+                print(f"\nError: {e}")
+                pausar()
+        else:
+            print("\nOpcion no valida")
+            pausar()
+
+def opcion_inquilinos():
+    """Abre el submenú de escuelas, cursos y alumnos"""
+    # Importación diferida: con un solo alumno no hace falta
+    import inquilinos
+    inquilinos.submenu_inquilinos()
+
+def opcion_deshacer():
+    """Muestra las últimas operaciones y permite deshacerlas o rehacerlas"""
+    while True:
+        para_deshacer, para_rehacer = deshacer.listar(5)
+
+        print("\nPara deshacer (la primera es la proxima):")
+        for descripcion, momento in para_deshacer:
+            print(f"  {formatear_hora(momento)}  {descripcion}")
+        if not para_deshacer:
+            print("  (nada)")
+        if para_rehacer:
+            print("Para rehacer:")
+            for descripcion, momento in para_rehacer:
+                print(f"  {formatear_hora(momento)}  {descripcion}")
+
+        opcion = input("\nD. Deshacer  R. Rehacer  V. Volver: ").strip().upper()
+        try:
+            if opcion == "D":
+                print(f"\nDeshecho: {deshacer.deshacer()}")
+            elif opcion == "R":
+                print(f"\nRehecho: {deshacer.rehacer()}")
+            else:
+                return
+        except ValueError as error:
+            print(f"\n{error}")
+
 def ejecutar_menu_principal():
     """Ejecuta el menú principal del programa"""
     opciones = {
@@ -931,31 +2212,39 @@ def ejecutar_menu_principal():
         "6": ("Editar tarea", opcion_editar_tarea),
         "7": ("Eliminar tarea", opcion_eliminar_tarea),
         "8": ("Borrar todas las tareas", opcion_borrar_todas),
-        "9": ("Salir", None),
+        "9": ("Operaciones en lote", submenu_operaciones_lote),
+        "10": ("Cargar tareas de ejemplo", cargar_tareas_ejemplo),
+        "11": ("Escuelas, cursos y alumnos", opcion_inquilinos),
+        "12": ("Tareas recurrentes", submenu_tareas_recurrentes),
+        "13": ("Deshacer / rehacer", opcion_deshacer),
+        "14": ("Salir", None),
     }
 
     while True:
         limpiar_pantalla()
         linea_separadora()
         print("         GESTOR DE TAREAS DEL COLEGIO")
+        # Si hay varios inquilinos, muestra cuál está activo
+        if eventos.particion_actual():
+            print(f"         Inquilino: {eventos.particion_actual()}")
         linea_separadora()
         print("\n                MENU PRINCIPAL\n")
 
         for num, (descripcion, _) in opciones.items():
-            print(f"  {num}. {descripcion}")
+            print(f"  {num:>2}. {descripcion}")
 
         print()
         linea_separadora()
 
-        opcion = input("\nSeleccione una opcion (1-9): ").strip()
+        opcion = input("\nSeleccione una opcion (1-14): ").strip()
 
-        if opcion == "9":
+        if opcion == "14":
             break
 
         if opcion in opciones and opciones[opcion][1]:
             try:
                 opciones[opcion][1]()
-                if opcion not in ["1", "3", "4"]:  # No pausar después de los submenús
+                if opcion not in ["1", "3", "4", "9", "11", "12", "13"]:  # No pausar después de los submenús
                     pausar()
             except Exception as e:
                 print(f"\nError: {e}")
@@ -5,14 +5,24 @@ Funciones comunes usadas en todo el sistema
 UTILIDAD:
 Este archivo centraliza todas las funciones auxiliares que son usadas por
 múltiples módulos. Incluye funciones de interfaz (limpiar pantalla, pausar),
-funciones de formato (líneas separadoras), y funciones de manejo de fechas
-(validación, cálculo de días, indicadores de urgencia).
+funciones de formato (líneas separadoras), funciones de manejo de fechas
+(validación, cálculo de días, indicadores de urgencia y de carga de un día)
+y la normalización de textos para comparar sin importar mayúsculas ni acentos.
+
+También tiene el reloj del programa: todos los módulos preguntan la fecha y la
+hora con fecha_de_hoy() y ahora(), nunca con date.today() ni datetime.now().
+Así fijar_reloj() puede fijar "hoy" (para benchmarks y pruebas que tienen que
+dar siempre lo mismo) y mismo_instante() lee el reloj una sola vez para toda
+una pantalla o un pedido, en lugar de una vez por fila.
 
 DEPENDENCIAS:
 - os: Módulo estándar de Python para operaciones del sistema operativo,
   usado para limpiar la pantalla según el sistema (Windows/Linux/Mac)
 - datetime: Módulo estándar de Python para trabajar con fechas,
   usado para validar formatos, calcular días restantes y comparar fechas
+- unicodedata: Módulo estándar de Python para quitar acentos al normalizar textos
+- contextvars, contextlib: Módulos estándar para el instante de mismo_instante(),
+  propio de cada hilo (igual que el autor en eventos.py)
 
 ¿POR QUÉ NO DEPENDE DE OTROS ARCHIVOS DEL PROYECTO?
 - herramientas.py es el módulo base que otros archivos usan
@@ -24,6 +34,11 @@ DEPENDENCIAS:
 import os
 # Módulos estándar para trabajar con fechas y horas
 from datetime import datetime, date
+# Módulo estándar para descomponer letras acentuadas
+import unicodedata
+# Módulos estándar para fijar el instante de una pantalla o un pedido
+import contextvars
+from contextlib import contextmanager
 
 def limpiar_pantalla():
     """Limpia la pantalla del terminal"""
@@ -55,6 +70,89 @@ def titulo_centrado(texto, ancho=60):
     # Usa el método center() para centrar el texto en el ancho especificado
     print(texto.center(ancho))
 
+# ============================================
+# FUNCIONES DE TEXTO
+# ============================================
+
+def normalizar_texto(texto):
+    """Normaliza un texto para compararlo sin mayúsculas, acentos ni espacios extra
+
+    Ejemplo: "  Matemáticas  Avanzadas" -> "matematicas avanzadas"
+    """
+    # NFKD separa cada letra de su acento ("á" -> "a" + acento)
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    # Descarta los acentos (caracteres combinables)
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    # casefold() es como lower() pero también cubre casos como la "ß"
+    # split() + join() une los espacios repetidos y quita los de los extremos
+    return " ".join(sin_acentos.casefold().split())
+
+# ============================================
+# RELOJ
+# ============================================
+# Momento fijado con fijar_reloj() (None = el reloj del sistema)
+_reloj_fijo = None
+# Momento leído al empezar la pantalla o el pedido en curso (ver mismo_instante());
+# es una ContextVar para que cada hilo tenga el suyo
+_instante = contextvars.ContextVar("instante", default=None)
+
+def ahora():
+    """Devuelve la fecha y hora actual (datetime) según el reloj del programa
+
+    Dentro de mismo_instante() devuelve siempre el mismo momento; si el reloj
+    está fijo, el momento fijado; si no, el del sistema.
+    """
+    instante = _instante.get()
+    if instante is not None:
+        return instante
+    if _reloj_fijo is not None:
+        return _reloj_fijo
+    return datetime.now()
+
+def fecha_de_hoy():
+    """Devuelve la fecha de hoy (date) según el reloj del programa"""
+    return ahora().date()
+
+def fijar_reloj(momento=None):
+    """Fija la fecha y hora que ve todo el programa
+
+    Args:
+        momento: datetime, date (a las 00:00) o texto DD/MM/AAAA; None vuelve
+                 al reloj del sistema
+
+    Raises:
+        ValueError: Si el texto no es una fecha válida
+    """
+    global _reloj_fijo
+
+    if isinstance(momento, str):
+        fecha = string_a_fecha(momento)
+        if fecha is None:
+            raise ValueError(f"Fecha invalida: {momento} (use DD/MM/AAAA)")
+        momento = fecha
+    # datetime es subclase de date: solo las fechas sin hora se pasan a las 00:00
+    if isinstance(momento, date) and not isinstance(momento, datetime):
+        momento = datetime.combine(momento, datetime.min.time())
+    _reloj_fijo = momento
+
+@contextmanager
+def mismo_instante():
+    """Lee el reloj una vez y usa ese momento en todo el bloque
+
+    Para una pantalla o un pedido: todas las filas calculan sus días restantes
+    contra el mismo "hoy" (aunque el día cambie en el medio) y el reloj del
+    sistema no se consulta una vez por fila. Si ya hay un bloque abierto, se
+    sigue usando el momento de ese.
+    """
+    if _instante.get() is not None:
+        yield
+        return
+    marca = _instante.set(ahora())
+    try:
+        yield
+    finally:
+        _instante.reset(marca)
+
 # ============================================
 # FUNCIONES DE FECHA
 # ============================================
@@ -86,6 +184,8 @@ def string_a_fecha(fecha_str):
 def calcular_dias_restantes(fecha_fin_str):
     """Calcula días restantes hasta la fecha de vencimiento
 
+    "Hoy" sale del reloj del programa (ver fecha_de_hoy() y mismo_instante())
+
     Returns:
         int: días restantes (negativo si ya venció)
         None: si la fecha no es válida
@@ -97,7 +197,7 @@ def calcular_dias_restantes(fecha_fin_str):
         return None
 
     # Obtiene la fecha de hoy
-    hoy = date.today()
+    hoy = fecha_de_hoy()
     # Calcula la diferencia en días
     diferencia = (fecha_fin - hoy).days
     # Retorna el número de días (negativo si ya pasó)
@@ -138,6 +238,32 @@ def obtener_indicador_urgencia(dias_restantes):
     else:
         return f"{dias_restantes} dias"
 
+# Un día está sobrecargado si vencen al menos SOBRECARGA_VENCEN tareas o hay
+# al menos SOBRECARGA_ACTIVAS en curso; "cargado" con CARGADO_* (ver agenda.py)
+SOBRECARGA_VENCEN = 3
+SOBRECARGA_ACTIVAS = 6
+CARGADO_VENCEN = 2
+CARGADO_ACTIVAS = 4
+
+def obtener_indicador_carga(activas, vencen):
+    """Devuelve un indicador textual según la carga de tareas de un día
+
+    Es la urgencia vista desde el día en lugar de desde la tarea: cuántas
+    tareas hay en curso (entre su inicio y su vencimiento) y cuántas vencen.
+
+    Returns:
+        str: "[SOBRECARGA]", "(cargado)" o "" si el día está tranquilo
+    """
+    # Sobrecargado: demasiadas entregas o demasiadas tareas en curso a la vez
+    if vencen >= SOBRECARGA_VENCEN or activas >= SOBRECARGA_ACTIVAS:
+        return "[SOBRECARGA]"
+    # Cargado: conviene adelantar trabajo de ese día
+    elif vencen >= CARGADO_VENCEN or activas >= CARGADO_ACTIVAS:
+        return "(cargado)"
+    # Tranquilo (sin símbolos)
+    else:
+        return ""
+
 def formatear_fecha_corta(fecha_str):
     """Convierte DD/MM/AAAA a formato más corto DD/MM"""
     try:
@@ -151,4 +277,12 @@ def formatear_fecha_corta(fecha_str):
         return fecha_str
     except:
         # Si hay cualquier error, retorna el string original
-        return fecha_str
\ No newline at end of file
+        return fecha_str
+
+def formatear_hora(momento):
+    """Convierte un time.time() a HH:MM (hora local)"""
+    return datetime.fromtimestamp(momento).strftime("%H:%M")
+
+def formatear_momento(momento):
+    """Convierte un time.time() a DD/MM/AAAA HH:MM (hora local)"""
+    return datetime.fromtimestamp(momento).strftime("%d/%m/%Y %H:%M")
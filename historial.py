@@ -0,0 +1,345 @@
+"""
+MÓDULO DE HISTORIAL
+Versiones de cada tarea: qué cambió, cuándo y quién lo cambió
+
+UTILIDAD:
+Editar una tarea pisa sus campos; este módulo guarda cada versión para poder
+responder preguntas sobre el pasado:
+
+- version_en(codigo, momento): Cómo estaba una tarea en ese momento
+- pendientes_en(fecha): Qué tareas estaban pendientes ese día (al terminar el día)
+- historial_de(codigo): Todas las versiones de una tarea, campo por campo
+- cambios_entre(desde, hasta): Quién cambió qué entre dos momentos
+
+CÓMO SE GUARDA:
+Se suscribe al bus de eventos (ver eventos.py), que anota el autor de cada
+cambio (eventos.como_autor). Cada tarea tiene su cadena de versiones, y cada
+versión guarda lo necesario para volver a como estaba la tarea ANTES de ese
+cambio (la versión actual es la propia tarea, en tareas_colegio):
+
+- Delta: solo los campos que cambiaron, con su valor anterior
+- Punto de control: la tarea entera como estaba antes. Al crearla es None
+  (no existía) y al eliminarla son los datos quitados, que ya no están en
+  tareas_colegio (no se copian). Al editar se guarda uno cada
+  CADA_PUNTO_DE_CONTROL versiones, o si cambian los campos que tiene
+
+Así crear una tarea, cambiarla por primera vez (aunque venga de un snapshot)
+o borrar miles de una vez no copia ninguna tarea.
+
+Para saber cómo estaba una tarea se busca (bisect) cuántas versiones hubo
+hasta el momento pedido, se parte del primer punto de control posterior (o
+de la tarea actual, si no hay ninguno) y se deshacen los deltas hasta ahí:
+nunca más de CADA_PUNTO_DE_CONTROL pasos, por larga que sea la historia. Los
+textos no se copian: las versiones comparten los mismos strings que la tarea.
+
+Cada tarea tiene además la lista de los momentos de sus versiones, y hay un
+índice por momento (_momentos, ordenado) con el código y la versión de cada
+cambio, así cambios_entre() va directo al primer cambio del rango en lugar de
+recorrer todas las tareas.
+
+Las tareas que ya existían antes de empezar el historial (abiertas de un
+snapshot sin historial) se consideran existentes desde siempre.
+
+Cada inquilino tiene su propio historial (intercambiar_estado) y se guarda al
+lado de su snapshot (ver gestor_tareas.guardar_snapshot).
+
+DEPENDENCIAS:
+- bisect: Módulo estándar para buscar por momento
+- datetime: Módulo estándar para pasar de fecha a momento
+- gzip, json, os: Módulos estándar para guardar el historial (se importan al guardar)
+- eventos.py: Para anotar cada cambio con su autor
+- gestor_tareas.py: Para la versión actual de cada tarea (se importa al
+  consultar, porque gestor_tareas importa este módulo)
+- herramientas.py: Necesita string_a_fecha()
+
+¿POR QUÉ UN MÓDULO APARTE?
+- Es un suscriptor más del bus, como deshacer.py: las operaciones no tienen
+  que saber que quedan registradas
+"""
+
+# Módulo estándar para buscar por momento en listas ordenadas
+import bisect
+# Módulo estándar para pasar de una fecha al momento en que termina ese día
+from datetime import datetime, time as hora
+
+# Importa el bus de eventos
+import eventos
+# Importa la conversión de fechas
+from herramientas import string_a_fecha
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Cada cuántas versiones de una tarea se guarda la tarea completa
+CADA_PUNTO_DE_CONTROL = 16
+# Eventos que no son cambios (las tareas ya existían)
+IGNORADOS = ("cargadas",)
+
+# ============================================
+# ESTADO (del inquilino activo)
+# ============================================
+# Versiones de cada tarea {codigo: [(momento, autor, tipo, completa, datos), ...]}
+# datos es cómo estaba la tarea antes de ese cambio:
+# completa=True: la tarea entera (None si no existía)
+# completa=False: solo los campos que cambiaron, con su valor anterior
+_versiones = {}
+# Momentos de las versiones de cada tarea {codigo: [momento, ...]}, para
+# buscar con bisect (en la misma posición que en _versiones)
+_momentos_por_tarea = {}
+# Índice por momento: _momentos está ordenado y en la misma posición de
+# _codigos y _numeros están la tarea y el número de versión de ese cambio
+_momentos = []
+_codigos = []
+_numeros = []
+
+# ============================================
+# ANOTAR
+# ============================================
+
+def intercambiar_estado(estado=None):
+    """Pone en uso el historial de otra partición y devuelve el actual
+
+    Lo usa inquilinos.py: cada inquilino tiene su propio historial.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = historial vacío)
+    """
+    global _versiones, _momentos_por_tarea, _momentos, _codigos, _numeros
+
+    anterior = (_versiones, _momentos_por_tarea, _momentos, _codigos, _numeros)
+    _versiones, _momentos_por_tarea, _momentos, _codigos, _numeros = estado or ({}, {}, [], [], [])
+    return anterior
+
+def _desde_punto_de_control(versiones):
+    """Cuenta las versiones desde el último punto de control"""
+    cantidad = 0
+    for version in reversed(versiones):
+        if version[3]:
+            return cantidad
+        cantidad += 1
+    return cantidad
+
+def _nueva_version(momento, autor, tipo, antes, despues, versiones):
+    """Arma la versión de un cambio (o None si no cambió nada)"""
+    if antes is None or despues is None:
+        # Alta (None) o baja: "antes" es una copia o la tarea quitada, que ya
+        # nadie modifica (ver eventos.py y gestor_tareas.restaurar_tareas)
+        return (momento, autor, tipo, True, antes)
+    if (antes.keys() != despues.keys()
+            or _desde_punto_de_control(versiones) + 1 >= CADA_PUNTO_DE_CONTROL):
+        return (momento, autor, tipo, True, antes)
+    delta = {campo: antes[campo] for campo, valor in despues.items() if antes[campo] != valor}
+    if not delta:
+        return None
+    return (momento, autor, tipo, False, delta)
+
+def anotar_evento(evento):
+    """Agrega una versión por cada tarea que cambió (suscriptor del bus)"""
+    if evento["entidad"] != "tarea" or evento["tipo"] in IGNORADOS:
+        return
+
+    # El índice debe quedar ordenado aunque el reloj retroceda un poco
+    momento = max(evento["momento"], _momentos[-1]) if _momentos else evento["momento"]
+    autor = evento.get("autor", "")
+    for cambio in evento["cambios"]:
+        codigo = cambio["clave"]
+        versiones = _versiones.get(codigo, ())
+        version = _nueva_version(momento, autor, evento["tipo"], cambio["antes"],
+                                 cambio["despues"], versiones)
+        if version is None:
+            continue
+        if not versiones:
+            versiones = _versiones[codigo] = []
+            _momentos_por_tarea[codigo] = []
+        versiones.append(version)
+        _momentos_por_tarea[codigo].append(momento)
+        _momentos.append(momento)
+        _codigos.append(codigo)
+        _numeros.append(len(versiones) - 1)
+
+# Sincrónico: la versión queda anotada antes de que termine la operación
+eventos.suscribir(anotar_evento, nombre="historial", sincronico=True)
+
+# ============================================
+# CONSULTAS
+# ============================================
+
+def _estado(codigo, cantidad):
+    """Reconstruye la tarea tal como quedó después de sus primeras `cantidad` versiones
+
+    Returns:
+        Copia de la tarea, o None si entonces no existía (o estaba eliminada)
+    """
+    versiones = _versiones[codigo]
+    # Avanza hasta el primer punto de control desde ahí (guarda cómo estaba
+    # la tarea justo antes de esa versión)...
+    inicio = cantidad
+    while inicio < len(versiones) and not versiones[inicio][3]:
+        inicio += 1
+    if inicio < len(versiones):
+        tarea = versiones[inicio][4]
+    else:
+        # ...o, si no hay ninguno, parte de cómo está ahora
+        # Importación diferida: gestor_tareas importa este módulo al cargarse
+        import gestor_tareas
+        tarea = gestor_tareas.obtener_tarea(codigo)
+    if tarea is None:
+        return None
+    # ...y deshace los deltas hasta volver a esa versión
+    tarea = dict(tarea)
+    for posicion in range(inicio - 1, cantidad - 1, -1):
+        tarea.update(versiones[posicion][4])
+    return tarea
+
+def version_en(codigo, momento):
+    """Devuelve cómo estaba una tarea en un momento
+
+    Args:
+        momento: time.time() del momento pedido
+
+    Returns:
+        Copia de la tarea, o None si no existía (o estaba eliminada)
+    """
+    momentos = _momentos_por_tarea.get(codigo)
+    if momentos is None:
+        # Nunca cambió desde que hay historial: está como ahora
+        import gestor_tareas
+        info = gestor_tareas.obtener_tarea(codigo)
+        return None if info is None else dict(info)
+    return _estado(codigo, bisect.bisect_right(momentos, momento))
+
+def _dia(fecha):
+    """Convierte DD/MM/AAAA a date
+
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    dia = string_a_fecha(fecha)
+    if dia is None:
+        raise ValueError(f"Fecha invalida: {fecha} (use DD/MM/AAAA)")
+    return dia
+
+def inicio_del_dia(fecha):
+    """Devuelve el momento (time.time()) en que empieza un día DD/MM/AAAA"""
+    return datetime.combine(_dia(fecha), hora.min).timestamp()
+
+def fin_del_dia(fecha):
+    """Devuelve el momento (time.time()) en que termina un día DD/MM/AAAA"""
+    return datetime.combine(_dia(fecha), hora.max).timestamp()
+
+def pendientes_en(fecha):
+    """Devuelve las tareas que estaban pendientes al terminar ese día
+
+    Args:
+        fecha: Día (DD/MM/AAAA)
+
+    Returns:
+        Diccionario {codigo: copia de la tarea como estaba ese día}
+    """
+    # Importación diferida: gestor_tareas importa este módulo al cargarse
+    import gestor_tareas
+
+    momento = fin_del_dia(fecha)
+    resultado = {}
+    with eventos.bloqueo():
+        # Las que nunca cambiaron están como ahora
+        for codigo, info in gestor_tareas.obtener_tareas().items():
+            if codigo not in _versiones and info["estado"] == "En proceso":
+                resultado[codigo] = dict(info)
+        # Las demás se reconstruyen desde su cadena de versiones
+        for codigo in _versiones:
+            info = version_en(codigo, momento)
+            if info is not None and info["estado"] == "En proceso":
+                resultado[codigo] = info
+    return resultado
+
+def _diferencias(antes, despues):
+    """Devuelve {campo: (valor antes, valor después)} de los campos que cambiaron"""
+    antes = antes or {}
+    despues = despues or {}
+    return {campo: (antes.get(campo), despues.get(campo))
+            for campo in antes.keys() | despues.keys()
+            if antes.get(campo) != despues.get(campo)}
+
+def _describir(codigo, numero):
+    """Arma la descripción de la versión número `numero` de una tarea"""
+    momento, autor, tipo, _, _ = _versiones[codigo][numero]
+    return {"codigo": codigo, "momento": momento, "autor": autor, "tipo": tipo,
+            "campos": _diferencias(_estado(codigo, numero), _estado(codigo, numero + 1))}
+
+def historial_de(codigo):
+    """Devuelve todas las versiones de una tarea, de la más vieja a la más nueva
+
+    Returns:
+        Lista de {codigo, momento, autor, tipo, campos}, con campos
+        {campo: (valor antes, valor después)} (vacía si nunca cambió)
+    """
+    with eventos.bloqueo():
+        return [_describir(codigo, numero) for numero in range(len(_versiones.get(codigo, ())))]
+
+def cambios_entre(desde, hasta=None):
+    """Devuelve quién cambió qué entre dos momentos, en orden
+
+    Args:
+        desde, hasta: time.time() de los extremos (hasta=None: hasta ahora)
+
+    Returns:
+        Lista de {codigo, momento, autor, tipo, campos} (ver historial_de)
+    """
+    with eventos.bloqueo():
+        inicio = bisect.bisect_left(_momentos, desde)
+        fin = len(_momentos) if hasta is None else bisect.bisect_right(_momentos, hasta)
+        return [_describir(_codigos[posicion], _numeros[posicion])
+                for posicion in range(inicio, fin)]
+
+# ============================================
+# GUARDAR Y ABRIR
+# ============================================
+
+def hay_historial():
+    """Indica si hay alguna versión guardada"""
+    return bool(_versiones)
+
+def vaciar():
+    """Olvida todas las versiones (por ejemplo al abrir un snapshot sin historial)"""
+    with eventos.bloqueo():
+        intercambiar_estado(None)
+
+def guardar(ruta):
+    """Guarda el historial en un archivo de texto comprimido, una versión por línea"""
+    # Importación diferida: solo se necesitan al guardar
+    import gzip
+    import json
+    import os
+
+    temporal = ruta + ".tmp"
+    with eventos.bloqueo(), gzip.open(temporal, "wt", encoding="utf-8") as archivo:
+        for codigo, versiones in _versiones.items():
+            for version in versiones:
+                archivo.write(json.dumps([codigo, *version], ensure_ascii=False))
+                archivo.write("\n")
+    os.replace(temporal, ruta)
+
+def cargar(ruta):
+    """Reemplaza el historial por el guardado con guardar()"""
+    # Importación diferida: solo se necesitan al abrir
+    import gzip
+    import json
+
+    versiones_por_tarea = {}
+    with gzip.open(ruta, "rt", encoding="utf-8") as archivo:
+        for linea in archivo:
+            codigo, *version = json.loads(linea)
+            versiones_por_tarea.setdefault(codigo, []).append(tuple(version))
+
+    # Rearma los momentos de cada tarea y el índice por momento
+    momentos_por_tarea = {codigo: [version[0] for version in versiones]
+                          for codigo, versiones in versiones_por_tarea.items()}
+    indice = sorted((version[0], codigo, numero)
+                    for codigo, versiones in versiones_por_tarea.items()
+                    for numero, version in enumerate(versiones))
+    with eventos.bloqueo():
+        intercambiar_estado((versiones_por_tarea, momentos_por_tarea,
+                             [momento for momento, _, _ in indice],
+                             [codigo for _, codigo, _ in indice],
+                             [numero for _, _, numero in indice]))
@@ -0,0 +1,312 @@
+"""
+MÓDULO DE ÍNDICES
+Estructuras derivadas de las tareas, actualizadas con cada evento
+
+UTILIDAD:
+Mantiene índices que permiten responder consultas sin recorrer todas las tareas.
+Se suscribe de forma sincrónica al bus de eventos, así cada índice ya está al
+día cuando termina la operación que cambió una tarea.
+
+ÍNDICES:
+- Tareas por materia {materia_id: set(codigos)}: para saber qué tareas usan
+  una materia (renombrar, eliminar con cascada o reasignar, contar afectadas)
+- Tareas por estado {estado: set(codigos)}
+- Tareas por vencimiento {ordinal: set(codigos)} más la lista ordenada de los
+  ordinales usados, así un rango de fechas se resuelve con búsqueda binaria
+- Tareas por palabra {palabra_normalizada: set(codigos)} con las palabras de
+  la descripción y las observaciones, más el vocabulario ordenado para buscar
+  por comienzo de palabra ("ejerc" encuentra "ejercicios") con búsqueda binaria
+
+Las consultas combinadas (consultas.py) eligen el índice más selectivo y
+cruzan los conjuntos de códigos en lugar de recorrer todas las tareas.
+
+DEPENDENCIAS:
+- eventos.py: Necesita suscribir() para recibir cada cambio en las tareas
+- bisect: Módulo estándar de Python para mantener ordenados los vencimientos
+  y el vocabulario
+- herramientas.py: Necesita normalizar_texto() y string_a_fecha()
+
+¿POR QUÉ NO DEPENDE DE gestor_tareas.py NI DE gestor_materias.py?
+- Todo lo que necesita le llega en los eventos; así ambos gestores pueden
+  consultarlo sin dependencias circulares
+"""
+
+# Módulo estándar para insertar y buscar en listas ordenadas
+import bisect
+
+# Importa el bus de eventos
+import eventos
+# Importa la normalización de textos y la conversión de fechas
+from herramientas import normalizar_texto, string_a_fecha
+
+# ============================================
+# ESTADO DE LOS ÍNDICES
+# ============================================
+# Códigos de las tareas de cada materia {materia_id: set(codigos)}
+_tareas_por_materia = {}
+# Códigos de las tareas en cada estado {estado: set(codigos)}
+_tareas_por_estado = {}
+# Códigos de las tareas que vencen cada día {ordinal: set(codigos)}
+_tareas_por_vencimiento = {}
+# Ordinales presentes en _tareas_por_vencimiento, de menor a mayor
+_vencimientos_ordenados = []
+# Códigos de las tareas que contienen cada palabra {palabra: set(codigos)}
+_tareas_por_palabra = {}
+# Palabras presentes en _tareas_por_palabra, en orden alfabético
+_vocabulario_ordenado = []
+# Ordinal de cada fecha ya convertida {"DD/MM/AAAA": ordinal o None}
+_ordinales = {}
+
+# ============================================
+# CLAVES DE CADA TAREA
+# ============================================
+
+def ordinal_vencimiento(info):
+    """Devuelve el ordinal de la fecha de vencimiento (None si no es válida)"""
+    fecha_str = info.get("fecha_fin", "")
+    if fecha_str not in _ordinales:
+        fecha = string_a_fecha(fecha_str)
+        _ordinales[fecha_str] = fecha.toordinal() if fecha else None
+    return _ordinales[fecha_str]
+
+# Tabla que cambia por espacios los signos ASCII (todo lo que no es letra o número)
+_SEPARADORES_ASCII = str.maketrans({chr(c): " " for c in range(128) if not chr(c).isalnum()})
+
+def palabras_de_texto(texto):
+    """Separa un texto en palabras normalizadas (sin acentos ni signos)"""
+    # Camino rápido: sin acentos alcanza con minúsculas y translate (se indexa cada tarea)
+    if texto.isascii():
+        return set(texto.lower().translate(_SEPARADORES_ASCII).split())
+    limpio = "".join(c if c.isalnum() else " " for c in normalizar_texto(texto))
+    return set(limpio.split())
+
+def palabras_de_tarea(info):
+    """Devuelve las palabras de la descripción y las observaciones de una tarea"""
+    return palabras_de_texto(f"{info.get('tarea', '')} {info.get('observaciones', '')}")
+
+# ============================================
+# MANTENIMIENTO
+# ============================================
+
+def _quitar_de(indice, clave, codigo):
+    """Quita un código de una lista del índice (y la lista si queda vacía)"""
+    codigos = indice.get(clave)
+    if codigos is not None:
+        codigos.discard(codigo)
+        if not codigos:
+            del indice[clave]
+
+def _agregar_vencimiento(ordinal, codigo):
+    """Agrega un código al índice de vencimientos"""
+    if ordinal is None:
+        return
+    if ordinal not in _tareas_por_vencimiento:
+        bisect.insort(_vencimientos_ordenados, ordinal)
+        _tareas_por_vencimiento[ordinal] = set()
+    _tareas_por_vencimiento[ordinal].add(codigo)
+
+def _quitar_vencimiento(ordinal, codigo):
+    """Quita un código del índice de vencimientos"""
+    if ordinal is None:
+        return
+    _quitar_de(_tareas_por_vencimiento, ordinal, codigo)
+    if ordinal not in _tareas_por_vencimiento:
+        posicion = bisect.bisect_left(_vencimientos_ordenados, ordinal)
+        if posicion < len(_vencimientos_ordenados) and _vencimientos_ordenados[posicion] == ordinal:
+            del _vencimientos_ordenados[posicion]
+
+def _agregar_palabra(palabra, codigo):
+    """Agrega un código al índice de palabras"""
+    if palabra not in _tareas_por_palabra:
+        bisect.insort(_vocabulario_ordenado, palabra)
+        _tareas_por_palabra[palabra] = set()
+    _tareas_por_palabra[palabra].add(codigo)
+
+def _quitar_palabra(palabra, codigo):
+    """Quita un código del índice de palabras"""
+    _quitar_de(_tareas_por_palabra, palabra, codigo)
+    if palabra not in _tareas_por_palabra:
+        posicion = bisect.bisect_left(_vocabulario_ordenado, palabra)
+        if posicion < len(_vocabulario_ordenado) and _vocabulario_ordenado[posicion] == palabra:
+            del _vocabulario_ordenado[posicion]
+
+def _agregar(codigo, info):
+    """Agrega una tarea a todos los índices"""
+    _tareas_por_materia.setdefault(info.get("materia_id"), set()).add(codigo)
+    _tareas_por_estado.setdefault(info.get("estado"), set()).add(codigo)
+    _agregar_vencimiento(ordinal_vencimiento(info), codigo)
+    for palabra in palabras_de_tarea(info):
+        _agregar_palabra(palabra, codigo)
+
+def _actualizar(codigo, antes, despues):
+    """Mueve una tarea solo en los índices cuya clave cambió"""
+    if antes.get("materia_id") != despues.get("materia_id"):
+        _quitar_de(_tareas_por_materia, antes.get("materia_id"), codigo)
+        _tareas_por_materia.setdefault(despues.get("materia_id"), set()).add(codigo)
+
+    if antes.get("estado") != despues.get("estado"):
+        _quitar_de(_tareas_por_estado, antes.get("estado"), codigo)
+        _tareas_por_estado.setdefault(despues.get("estado"), set()).add(codigo)
+
+    if antes.get("fecha_fin") != despues.get("fecha_fin"):
+        _quitar_vencimiento(ordinal_vencimiento(antes), codigo)
+        _agregar_vencimiento(ordinal_vencimiento(despues), codigo)
+
+    if (antes.get("tarea") != despues.get("tarea")
+            or antes.get("observaciones") != despues.get("observaciones")):
+        palabras_antes = palabras_de_tarea(antes)
+        palabras_despues = palabras_de_tarea(despues)
+        for palabra in palabras_antes - palabras_despues:
+            _quitar_palabra(palabra, codigo)
+        for palabra in palabras_despues - palabras_antes:
+            _agregar_palabra(palabra, codigo)
+
+def _quitar(codigo, info):
+    """Quita una tarea de todos los índices"""
+    _quitar_de(_tareas_por_materia, info.get("materia_id"), codigo)
+    _quitar_de(_tareas_por_estado, info.get("estado"), codigo)
+    _quitar_vencimiento(ordinal_vencimiento(info), codigo)
+    for palabra in palabras_de_tarea(info):
+        _quitar_palabra(palabra, codigo)
+
+def limpiar():
+    """Vacía todos los índices"""
+    _tareas_por_materia.clear()
+    _tareas_por_estado.clear()
+    _tareas_por_vencimiento.clear()
+    _vencimientos_ordenados.clear()
+    _tareas_por_palabra.clear()
+    _vocabulario_ordenado.clear()
+
+def aplicar_evento(evento):
+    """Actualiza los índices con los cambios de un evento de tareas
+
+    También la usan las réplicas, que reciben los eventos del primario por
+    fuera del bus local.
+    """
+    if evento["entidad"] != "tarea":
+        return
+
+    if evento["tipo"] == "borrado_total":
+        limpiar()
+        return
+
+    for cambio in evento["cambios"]:
+        codigo = cambio["clave"]
+        antes = cambio["antes"]
+        despues = cambio["despues"]
+
+        if antes and despues:
+            _actualizar(codigo, antes, despues)
+        elif despues:
+            _agregar(codigo, despues)
+        elif antes:
+            _quitar(codigo, antes)
+
+def reconstruir(tareas):
+    """Rearma todos los índices desde un diccionario de tareas completo"""
+    limpiar()
+    for codigo, info in tareas.items():
+        _agregar(codigo, info)
+
+def intercambiar_estado(estado=None):
+    """Pone en uso los índices de otra partición y devuelve los actuales
+
+    Lo usa inquilinos.py: cada inquilino tiene sus propios índices y cambiar
+    de inquilino no recorre ni copia nada.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = índices vacíos)
+    """
+    global _tareas_por_materia, _tareas_por_estado, _tareas_por_vencimiento
+    global _vencimientos_ordenados, _tareas_por_palabra, _vocabulario_ordenado
+
+    anterior = (_tareas_por_materia, _tareas_por_estado, _tareas_por_vencimiento,
+                _vencimientos_ordenados, _tareas_por_palabra, _vocabulario_ordenado)
+    (_tareas_por_materia, _tareas_por_estado, _tareas_por_vencimiento,
+     _vencimientos_ordenados, _tareas_por_palabra,
+     _vocabulario_ordenado) = estado or ({}, {}, {}, [], {}, [])
+    return anterior
+
+# Se suscribe al importar, de forma sincrónica para que nunca quede atrasado
+eventos.suscribir(aplicar_evento, nombre="indices", sincronico=True)
+
+# ============================================
+# CONSULTAS
+# ============================================
+# Las funciones que devuelven el conjunto del índice (sin copiarlo) son para
+# leer y cruzar enseguida: quien lo necesite guardar debe hacer su propia copia
+
+def tareas_de_materia(materia_id):
+    """Devuelve una copia del conjunto de códigos de las tareas de una materia"""
+    return set(_tareas_por_materia.get(materia_id, ()))
+
+def cantidad_tareas_de_materia(materia_id):
+    """Devuelve cuántas tareas usan una materia (O(1))"""
+    return len(_tareas_por_materia.get(materia_id, ()))
+
+def tareas_con_estado(estado):
+    """Devuelve el conjunto (sin copiar) de códigos de las tareas en ese estado"""
+    return _tareas_por_estado.get(estado, frozenset())
+
+def cantidad_tareas_con_estado(estado):
+    """Devuelve cuántas tareas están en ese estado (O(1))"""
+    return len(_tareas_por_estado.get(estado, ()))
+
+def _rango_vencimientos(desde, hasta):
+    """Devuelve los ordinales usados entre desde y hasta (None = sin límite)"""
+    inicio = 0 if desde is None else bisect.bisect_left(_vencimientos_ordenados, desde)
+    fin = (len(_vencimientos_ordenados) if hasta is None
+           else bisect.bisect_right(_vencimientos_ordenados, hasta))
+    return _vencimientos_ordenados[inicio:fin]
+
+def tareas_que_vencen_entre(desde, hasta):
+    """Devuelve los códigos de las tareas que vencen en un rango de ordinales
+
+    Args:
+        desde: Ordinal mínimo incluido (None = sin límite)
+        hasta: Ordinal máximo incluido (None = sin límite)
+    """
+    codigos = set()
+    for ordinal in _rango_vencimientos(desde, hasta):
+        codigos.update(_tareas_por_vencimiento[ordinal])
+    return codigos
+
+def vencimientos_en_orden():
+    """Recorre los días con vencimientos, del más próximo al más lejano
+
+    Devuelve pares (ordinal, conjunto de códigos) sin copiar los conjuntos:
+    sirve para tomar las primeras tareas sin armar ni ordenar todo el resto.
+    """
+    for ordinal in list(_vencimientos_ordenados):
+        codigos = _tareas_por_vencimiento.get(ordinal)
+        if codigos:
+            yield ordinal, codigos
+
+def cantidad_tareas_que_vencen_entre(desde, hasta):
+    """Devuelve cuántas tareas vencen en un rango de ordinales (sin armar el conjunto)"""
+    return sum(len(_tareas_por_vencimiento[ordinal])
+               for ordinal in _rango_vencimientos(desde, hasta))
+
+def palabras_que_empiezan_con(prefijo):
+    """Devuelve las palabras indexadas que empiezan con el prefijo (normalizado)"""
+    # Las palabras con ese comienzo están juntas en el vocabulario ordenado
+    inicio = bisect.bisect_left(_vocabulario_ordenado, prefijo)
+    fin = bisect.bisect_left(_vocabulario_ordenado, prefijo + "\U0010ffff")
+    return _vocabulario_ordenado[inicio:fin]
+
+def tareas_con_palabra(prefijo):
+    """Devuelve los códigos de las tareas con alguna palabra que empiece con el prefijo"""
+    codigos = set()
+    for palabra in palabras_que_empiezan_con(prefijo):
+        codigos.update(_tareas_por_palabra[palabra])
+    return codigos
+
+def alguna_palabra_en_tarea(palabras, codigo):
+    """Indica si la tarea contiene alguna de las palabras (ya indexadas), sin releer su texto"""
+    return any(codigo in _tareas_por_palabra.get(palabra, ()) for palabra in palabras)
+
+def cantidad_tareas_con_palabra(prefijo):
+    """Devuelve una cota superior de las tareas con alguna palabra que empiece con el prefijo"""
+    return sum(len(_tareas_por_palabra[palabra])
+               for palabra in palabras_que_empiezan_con(prefijo))
@@ -0,0 +1,507 @@
+"""
+MÓDULO DE INQUILINOS
+Varias escuelas, cursos y alumnos en el mismo proceso, cada uno con sus datos
+
+UTILIDAD:
+El resto del sistema trabaja sobre un solo conjunto de tareas (tareas_colegio,
+los índices, el contador de códigos, la caché de consultas, el archivo). Este
+módulo permite tener muchos: cada inquilino es una partición con su propio
+conjunto, y en cada momento hay uno activo. Cambiar de inquilino no copia
+datos: cada módulo entrega sus estructuras con intercambiar_estado() y recibe
+las del inquilino que entra, así que todas las funciones de siempre (listar,
+buscar, consultar, estadísticas) solo ven las tareas del inquilino activo.
+
+JERARQUÍA:
+    (general)                 inquilino "" que existe siempre (un solo alumno)
+    └── escuela               ej. "sanmartin"
+        └── curso             ej. "sanmartin/3a"
+            └── alumno        ej. "sanmartin/3a/ana" (también puede colgar de la escuela)
+
+Cada uno tiene sus propias tareas; un curso puede tener las tareas comunes
+a todo el curso y cada alumno las suyas. Los códigos se numeran por separado
+(T001 puede existir en dos inquilinos distintos).
+
+CATÁLOGO DE MATERIAS:
+Por defecto un inquilino comparte el catálogo de su padre: una materia que
+agrega un alumno la ven todos los que usan ese catálogo. Con catálogo propio
+empieza con una copia del catálogo del padre y desde ahí cambia por separado.
+Al eliminar una materia de un catálogo compartido se revisan las tareas de
+todos los inquilinos que lo usan.
+
+REPORTES:
+Las funciones por inquilino nunca miran a otros inquilinos. Lo que cruza
+inquilinos (totales de un curso o una escuela) está en reportes.py, que
+activa cada inquilino de a uno con usar().
+
+HILOS:
+Cambiar de inquilino reemplaza variables de cada módulo, así que se hace
+con el bus bloqueado (eventos.bloqueo()), y las funciones públicas que leen
+o cambian esas variables (gestor_tareas, gestor_materias, recurrencias,
+consultas, historial...) también las usan con el bus bloqueado. Los hilos
+de fondo (recordatorios, réplicas, deshacer) que pasan por otro inquilino
+lo hacen con usar(), que vuelve al anterior antes de soltar el bloqueo: para
+cualquier otro hilo el cambio nunca existió, y una operación no puede
+empezar en un inquilino y terminar en otro. activar() sí cambia el
+inquilino para todos, por eso solo lo usan el menú y main.py.
+
+EVENTOS:
+Cada evento lleva la partición activa al publicarse (ver eventos.py). Las
+altas de inquilinos se publican con entidad "inquilino", así las réplicas
+arman la misma jerarquía.
+
+DEPENDENCIAS:
+- contextlib, json, os: Módulos estándar de Python
+- eventos.py: El bloqueo del bus (nadie publica durante un cambio de
+  inquilino) y la partición que se anota en los eventos
+- gestor_tareas.py, indices.py, codigos.py, consultas.py, archivo.py,
+  recurrencias.py, historial.py: Las estructuras que se intercambian al cambiar de inquilino
+- gestor_materias.py: El catálogo (propio o compartido) de cada inquilino
+
+¿POR QUÉ UN MÓDULO APARTE?
+- Con un solo alumno no hace falta: main.py y el menú lo importan recién
+  cuando se usan inquilinos
+"""
+
+# Módulo estándar para el "with usar(inquilino):"
+from contextlib import contextmanager
+# Módulo estándar para guardar la lista de inquilinos
+import json
+# Módulo estándar para las rutas de los archivos de cada inquilino
+import os
+
+# Importa el bus de eventos
+import eventos
+# Importa los módulos cuyo estado es de cada inquilino
+import gestor_tareas
+import gestor_materias
+import indices
+import codigos
+import consultas
+import archivo
+import recurrencias
+import historial
+# Importa las utilidades de la interfaz
+from herramientas import limpiar_pantalla, pausar, linea_separadora
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Identificador del inquilino general (el único si no se usan inquilinos)
+GENERAL = ""
+# Tipos de inquilino y de qué tipos puede colgar cada uno
+PADRES_VALIDOS = {
+    "escuela": ("general",),
+    "curso": ("escuela",),
+    "alumno": ("curso", "escuela"),
+}
+# Archivo con la lista de inquilinos (dentro del directorio de datos)
+ARCHIVO_INQUILINOS = "inquilinos.json"
+# Largo máximo de la clave de un inquilino (la parte después de la última "/")
+LARGO_MAXIMO_CLAVE = 20
+
+# ============================================
+# ESTADO
+# ============================================
+# Inquilinos en orden de alta (cada padre antes que sus hijos)
+# {id: {"id", "tipo", "nombre", "padre", "catalogo"}}; "catalogo" es el id
+# del inquilino dueño del catálogo que usa (él mismo si tiene catálogo propio)
+_inquilinos = {GENERAL: {"id": GENERAL, "tipo": "general", "nombre": "General",
+                         "padre": None, "catalogo": GENERAL}}
+# Inquilino activo
+_activo = GENERAL
+# Estado guardado de los inquilinos que no están activos
+# {id: {"tareas", "indices", "codigos", "consultas", "archivo", "recurrencias", "historial"}}
+# El del activo no está acá: vive en los propios módulos
+_particiones = {}
+# Catálogos que no están en uso {id_dueño: estado de gestor_materias}
+_catalogos = {}
+# Directorio donde se guardan los snapshots y archivos de cada inquilino
+_directorio = ""
+
+def _nombre_de_archivo(inquilino):
+    """Convierte el id en un nombre de archivo ("sanmartin/3a" -> "sanmartin__3a")"""
+    return inquilino.replace("/", "__") if inquilino else "general"
+
+def ruta_snapshot(inquilino):
+    """Devuelve la ruta del snapshot binario de un inquilino"""
+    return os.path.join(_directorio, _nombre_de_archivo(inquilino) + ".snap")
+
+def _ruta_archivo(inquilino):
+    """Devuelve la ruta del archivo de tareas viejas de un inquilino"""
+    if not inquilino:
+        return os.path.join(_directorio, archivo.RUTA_ARCHIVO)
+    base = archivo.RUTA_ARCHIVO[:-len(".jsonl.gz")]
+    return os.path.join(_directorio, f"{base}-{_nombre_de_archivo(inquilino)}.jsonl.gz")
+
+# ============================================
+# CAMBIO DE INQUILINO
+# ============================================
+
+def activo():
+    """Devuelve el id del inquilino activo ("" = el general)"""
+    return _activo
+
+def activar(inquilino):
+    """Pone en uso las tareas, índices, códigos y catálogo de un inquilino
+
+    No copia datos: solo intercambia las estructuras de cada módulo.
+
+    Raises:
+        ValueError: Si el inquilino no existe
+    """
+    global _activo
+
+    if inquilino not in _inquilinos:
+        raise ValueError(f"No existe el inquilino '{inquilino}'")
+
+    # Con el bus bloqueado nadie publica ni lee índices a medio cambiar
+    with eventos.bloqueo():
+        if inquilino == _activo:
+            return
+        entrante = _particiones.pop(inquilino)
+        _particiones[_activo] = {
+            "tareas": gestor_tareas.intercambiar_estado(entrante["tareas"]),
+            "indices": indices.intercambiar_estado(entrante["indices"]),
+            "codigos": codigos.intercambiar_estado(entrante["codigos"]),
+            "consultas": consultas.intercambiar_estado(entrante["consultas"]),
+            "archivo": archivo.intercambiar_estado(entrante["archivo"]),
+            "recurrencias": recurrencias.intercambiar_estado(entrante["recurrencias"]),
+            "historial": historial.intercambiar_estado(entrante["historial"]),
+        }
+        # Si comparten catálogo, el catálogo queda como está
+        catalogo_saliente = _inquilinos[_activo]["catalogo"]
+        catalogo_entrante = _inquilinos[inquilino]["catalogo"]
+        if catalogo_saliente != catalogo_entrante:
+            _catalogos[catalogo_saliente] = gestor_materias.intercambiar_estado(
+                _catalogos.pop(catalogo_entrante))
+        _activo = inquilino
+        eventos.cambiar_particion(inquilino)
+
+@contextmanager
+def usar(inquilino):
+    """Activa un inquilino mientras dura el "with" y después vuelve al anterior
+
+    Mientras dura se tiene tomado el bloqueo del bus: otros hilos no pueden
+    publicar cambios ni cambiar de inquilino.
+    """
+    with eventos.bloqueo():
+        anterior = _activo
+        activar(inquilino)
+        try:
+            yield
+        finally:
+            activar(anterior)
+
+def obtener_tarea(inquilino, codigo):
+    """Busca una tarea de cualquier inquilino sin cambiar el activo
+
+    Es para los hilos que solo leen (como recordatorios.py): no pasan por
+    usar(), así que ni por un momento cambian las variables de los módulos.
+
+    Returns:
+        Los datos de la tarea, o None si el inquilino o la tarea no existen
+    """
+    with eventos.bloqueo():
+        if inquilino == _activo:
+            return gestor_tareas.obtener_tarea(codigo)
+        if inquilino not in _particiones:
+            return None
+        return gestor_tareas.tarea_de_estado(_particiones[inquilino]["tareas"], codigo)
+
+def _en_particiones_del_catalogo(funcion):
+    """Ejecuta una función en el activo y en cada inquilino que comparte su catálogo"""
+    dueno = _inquilinos[_activo]["catalogo"]
+    resultados = [funcion()]
+    for inquilino, info in list(_inquilinos.items()):
+        if inquilino != _activo and info["catalogo"] == dueno:
+            with usar(inquilino):
+                resultados.append(funcion())
+    return resultados
+
+# gestor_materias revisa las tareas de todos los que comparten el catálogo
+gestor_materias.configurar_particiones(_en_particiones_del_catalogo)
+
+def invalidar_por_evento(evento):
+    """Descarta las consultas guardadas de quienes comparten un catálogo que cambió
+
+    También la usan las réplicas, que reciben los eventos por fuera del bus local.
+    """
+    if evento["entidad"] != "materia":
+        return
+    # La caché del activo ya la invalida consultas; las guardadas se descartan
+    dueno = _inquilinos[_activo]["catalogo"]
+    for inquilino, estado in _particiones.items():
+        if _inquilinos[inquilino]["catalogo"] == dueno:
+            estado["consultas"] = None
+
+# Sincrónico: debe correr antes de que otro cambio de inquilino use esas cachés
+eventos.suscribir(invalidar_por_evento, nombre="inquilinos", sincronico=True)
+
+# ============================================
+# ALTA Y CONSULTA DE INQUILINOS
+# ============================================
+
+def _validar_clave(clave):
+    """Valida la parte propia del id de un inquilino
+
+    Raises:
+        ValueError: Si tiene caracteres que no sirven para un nombre de archivo
+    """
+    if not clave or len(clave) > LARGO_MAXIMO_CLAVE:
+        raise ValueError(f"La clave debe tener entre 1 y {LARGO_MAXIMO_CLAVE} caracteres")
+    if not all(c.isascii() and (c.isalnum() or c in "-_") for c in clave):
+        raise ValueError("La clave solo puede tener letras, numeros, '-' y '_'")
+
+def _registrar(info):
+    """Agrega un inquilino ya validado, con sus estructuras vacías"""
+    inquilino = info["id"]
+    if info["catalogo"] == inquilino:
+        # Catálogo propio: empieza como una copia del catálogo del padre
+        with usar(info["padre"]):
+            materias = dict(gestor_materias.obtener_catalogo())
+            siguiente = gestor_materias.obtener_siguiente_numero()
+            anterior = gestor_materias.intercambiar_estado(None)
+            gestor_materias.reemplazar_catalogo(materias, publicar=False,
+                                                siguiente_numero=siguiente)
+            _catalogos[inquilino] = gestor_materias.intercambiar_estado(anterior)
+
+    _inquilinos[inquilino] = dict(info)
+    _particiones[inquilino] = {"tareas": None, "indices": None, "codigos": None,
+                               "consultas": None, "recurrencias": None, "historial": None,
+                               "archivo": (_ruta_archivo(inquilino), None)}
+
+def crear(clave, tipo, padre=GENERAL, nombre=None, catalogo_propio=False):
+    """Da de alta un inquilino
+
+    Args:
+        clave: Identificador corto ("sanmartin", "3a", "ana")
+        tipo: "escuela", "curso" o "alumno"
+        padre: Id del inquilino del que depende ("" = el general)
+        nombre: Nombre para mostrar (default: la clave)
+        catalogo_propio: True para no compartir el catálogo de materias del padre
+
+    Returns:
+        El id del inquilino (el del padre, "/" y la clave)
+
+    Raises:
+        ValueError: Si la clave, el tipo o el padre no son válidos, o ya existe
+    """
+    clave = clave.strip().lower()
+    _validar_clave(clave)
+    if tipo not in PADRES_VALIDOS:
+        raise ValueError(f"Tipo invalido: {tipo}")
+    if padre not in _inquilinos:
+        raise ValueError(f"No existe el inquilino '{padre}'")
+    if _inquilinos[padre]["tipo"] not in PADRES_VALIDOS[tipo]:
+        raise ValueError(f"Un {tipo} no puede depender de un {_inquilinos[padre]['tipo']}")
+
+    inquilino = f"{padre}/{clave}" if padre else clave
+    if inquilino in _inquilinos:
+        raise ValueError(f"Ya existe el inquilino '{inquilino}'")
+
+    info = {"id": inquilino, "tipo": tipo, "nombre": nombre or clave, "padre": padre,
+            "catalogo": inquilino if catalogo_propio else _inquilinos[padre]["catalogo"]}
+    with eventos.bloqueo():
+        _registrar(info)
+        eventos.publicar("agregado", [eventos.cambio(inquilino, None, dict(info))],
+                         entidad="inquilino")
+    return inquilino
+
+def sincronizar(info):
+    """Agrega un inquilino recibido de otro proceso, sin volver a publicarlo"""
+    with eventos.bloqueo():
+        if info["id"] not in _inquilinos:
+            _registrar(info)
+
+def obtener(inquilino):
+    """Devuelve una copia de los datos de un inquilino (None si no existe)"""
+    info = _inquilinos.get(inquilino)
+    return dict(info) if info is not None else None
+
+def listar(raiz=GENERAL):
+    """Devuelve los ids de un inquilino y de todos los que dependen de él
+
+    Args:
+        raiz: Id del inquilino de arriba ("" = todos)
+
+    Returns:
+        Lista de ids, cada padre antes que sus hijos
+    """
+    if not raiz:
+        return list(_inquilinos)
+    prefijo = f"{raiz}/"
+    return [inquilino for inquilino in _inquilinos
+            if inquilino == raiz or inquilino.startswith(prefijo)]
+
+def exportar():
+    """Devuelve la lista de inquilinos para guardarla o enviarla a una réplica"""
+    return [dict(info) for info in _inquilinos.values()]
+
+# ============================================
+# GUARDAR Y ABRIR
+# ============================================
+
+def guardar(directorio=None):
+    """Guarda la lista de inquilinos y un snapshot binario de cada uno
+
+    Args:
+        directorio: Donde guardar (default: el de la última llamada a cargar())
+    """
+    if directorio is None:
+        directorio = _directorio
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+
+    ruta = os.path.join(directorio, ARCHIVO_INQUILINOS)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as salida:
+        json.dump({"inquilinos": exportar()}, salida, ensure_ascii=False, indent=1)
+    os.replace(temporal, ruta)
+
+    for inquilino in list(_inquilinos):
+        with usar(inquilino):
+            gestor_tareas.guardar_snapshot(os.path.join(
+                directorio, os.path.basename(ruta_snapshot(inquilino))))
+
+def cargar(directorio):
+    """Abre los inquilinos guardados con guardar()
+
+    Los archivos de tareas viejas de cada inquilino también van a ese
+    directorio. Si todavía no hay nada guardado, solo queda configurado.
+    Las tareas de cada inquilino se leen a demanda (ver cargar_snapshot).
+    """
+    global _directorio
+
+    _directorio = directorio
+    with eventos.bloqueo():
+        # Las rutas de archivo de los que ya existen pasan al directorio
+        archivo.configurar(_ruta_archivo(_activo))
+        for inquilino, estado in _particiones.items():
+            estado["archivo"] = (_ruta_archivo(inquilino), None)
+
+    ruta = os.path.join(directorio, ARCHIVO_INQUILINOS)
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, encoding="utf-8") as entrada:
+        guardados = json.load(entrada)["inquilinos"]
+
+    with eventos.bloqueo():
+        for info in guardados:
+            if info["id"] not in _inquilinos:
+                _registrar(info)
+                eventos.publicar("agregado", [eventos.cambio(info["id"], None, dict(info))],
+                                 entidad="inquilino")
+
+    for inquilino in list(_inquilinos):
+        if os.path.exists(ruta_snapshot(inquilino)):
+            with usar(inquilino):
+                gestor_tareas.cargar_snapshot(ruta_snapshot(inquilino))
+
+# ============================================
+# INTERFAZ
+# ============================================
+
+def mostrar_inquilinos():
+    """Muestra la jerarquía de inquilinos, marcando el activo"""
+    print("\nINQUILINOS:")
+    for inquilino, info in _inquilinos.items():
+        nivel = inquilino.count("/") + (1 if inquilino else 0)
+        marca = "*" if inquilino == _activo else " "
+        catalogo = "catalogo propio" if info["catalogo"] == inquilino and inquilino else ""
+        print(f" {marca} {'  ' * nivel}{info['nombre']} ({info['tipo']}"
+              f"{', ' + catalogo if catalogo else ''}) [{inquilino or 'general'}]")
+
+def _pedir_inquilino(mensaje):
+    """Pide el id de un inquilino existente (Enter o "general" = el general)
+
+    Returns:
+        El id, o None si no existe
+    """
+    texto = input(mensaje).strip().lower()
+    inquilino = "" if texto in ("", "general") else texto
+    if inquilino not in _inquilinos:
+        print(f"No existe el inquilino '{texto}'")
+        return None
+    return inquilino
+
+def opcion_cambiar_inquilino():
+    """Cambia el inquilino activo"""
+    mostrar_inquilinos()
+    inquilino = _pedir_inquilino("\nId del inquilino (Enter = general): ")
+    if inquilino is not None:
+        activar(inquilino)
+        print(f"\nInquilino activo: {_inquilinos[inquilino]['nombre']}")
+
+def opcion_agregar_inquilino():
+    """Da de alta una escuela, un curso o un alumno"""
+    print("\nTipos: escuela, curso, alumno")
+    tipo = input("Tipo: ").strip().lower()
+    if tipo not in PADRES_VALIDOS:
+        print("Tipo invalido")
+        return
+
+    padre = ""
+    if tipo != "escuela":
+        mostrar_inquilinos()
+        padre = _pedir_inquilino("\nId del inquilino del que depende: ")
+        if padre is None:
+            return
+
+    clave = input("Clave (letras, numeros, '-' o '_'): ").strip()
+    nombre = input("Nombre para mostrar (Enter = la clave): ").strip()
+    propio = input("Usar un catalogo de materias propio? (S/N): ").upper() == "S"
+
+    try:
+        inquilino = crear(clave, tipo, padre, nombre or None, propio)
+    except ValueError as error:
+        print(f"\nError: {error}")
+        return
+    print(f"\nInquilino '{inquilino}' agregado")
+
+def opcion_reporte():
+    """Muestra los totales de un inquilino y de los que dependen de él"""
+    # Importación diferida: el reporte solo se arma a pedido
+    import reportes
+
+    mostrar_inquilinos()
+    raiz = _pedir_inquilino("\nId del inquilino a resumir (Enter = todos): ")
+    if raiz is not None:
+        reportes.mostrar_reporte(raiz)
+
+def submenu_inquilinos():
+    """Submenú para manejar escuelas, cursos y alumnos"""
+    opciones = {
+        "1": ("Ver inquilinos", mostrar_inquilinos),
+        "2": ("Cambiar de inquilino", opcion_cambiar_inquilino),
+        "3": ("Agregar escuela, curso o alumno", opcion_agregar_inquilino),
+        "4": ("Reporte de varios inquilinos", opcion_reporte),
+        "5": ("Volver al menu principal", None),
+    }
+
+    while True:
+        limpiar_pantalla()
+        linea_separadora()
+        print("         INQUILINOS - SUBMENU")
+        print(f"  Activo: {_inquilinos[_activo]['nombre']}")
+        linea_separadora()
+
+        for num, (descripcion, _) in opciones.items():
+            print(f"{num}. {descripcion}")
+
+        linea_separadora()
+
+        opcion = input("\nSeleccione una opcion (1-5): ").strip()
+
+        if opcion == "5":
+            break
+
+        if opcion in opciones and opciones[opcion][1]:
+            try:
+                opciones[opcion][1]()
+                pausar()
+            except Exception as e:
+                print(f"\nError: {e}")
+                pausar()
+        else:
+            print("\nOpcion no valida")
+            pausar()
@@ -6,32 +6,230 @@ Este archivo es el punto de entrada del programa. Su única responsabilidad es
 iniciar el sistema, manejar errores generales y mostrar el mensaje de despedida.
 Es el archivo que se ejecuta directamente: python main.py
 
+OPCIONES DE LÍNEA DE COMANDOS:
+    --ejemplos          Carga las tareas de ejemplo al iniciar
+    --snapshot RUTA     Abre las tareas de ese snapshot binario y las guarda al salir
+    --primario H:P      Acepta seguidores de solo lectura en esa dirección
+    --consulta EXPR     Muestra las tareas que cumplen la consulta y termina, sin
+                        abrir el menú (ej. --consulta "estado:pendiente vence<=hoy+7")
+    --nodo PREFIJO      Antepone ese prefijo a los códigos nuevos (A-T001...), para
+                        que varios procesos no generen el mismo código
+    --archivar DIAS     Al iniciar, mueve al archivo comprimido las tareas que
+                        vencieron hace más de DIAS días (ver archivo.py)
+    --inquilinos DIR    Abre las escuelas, cursos y alumnos guardados en ese
+                        directorio y los guarda al salir (reemplaza a --snapshot)
+    --inquilino ID      Empieza con ese inquilino activo (ej. sanmartin/3a/ana)
+    --importar-ics RUTA Al iniciar, agrega las tareas de ese calendario .ics
+                        (las que ya se importaron antes no se repiten)
+    --exportar-ics RUTA Escribe las tareas pendientes en ese calendario .ics y
+                        termina, sin abrir el menú
+    --autor NOMBRE      Quién queda registrado en el historial como autor de
+                        los cambios (default: el usuario del sistema)
+    --hoy DD/MM/AAAA    Fija el día de hoy para todo el programa (urgencias,
+                        avisos, agenda, consultas con "hoy"); para pruebas y
+                        benchmarks que tienen que dar siempre lo mismo
+    --memoria-acotada MB
+                        Las tareas del snapshot (o de los inquilinos) quedan en
+                        memoria sin sus textos, que se leen del archivo a través
+                        de una caché de MB megabytes (ver cache_textos.py)
+
+ARRANQUE RÁPIDO:
+Todo lo que no hace falta para mostrar el menú se importa recién cuando se usa
+(argparse solo si hay opciones, replicacion solo con --primario, etc.) y las
+tareas de ejemplo se cargan solo si se piden. benchmark_arranque.py controla
+que el arranque siga por debajo de los 100 ms.
+
 DEPENDENCIAS:
 - gestor_tareas.py: Necesita ejecutar_menu_principal() que contiene toda la
   lógica del programa y el sistema de menús
 - herramientas.py: Necesita mostrar_despedida() para mostrar el mensaje final al salir
+- recordatorios.py: Necesita iniciar_planificador() para emitir en segundo plano
+  los avisos de vencimiento al archivo recordatorios.log
+- replicacion.py: Solo si se usa --primario, para aceptar seguidores de lectura
+- consultas.py: Solo si se usa --consulta
+- inquilinos.py: Solo si se usa --inquilinos o --inquilino
+- calendario_ics.py: Solo si se usa --importar-ics o --exportar-ics
 
 ¿POR QUÉ ESTAS DEPENDENCIAS?
 - gestor_tareas.py maneja toda la lógica, por eso main.py solo lo llama
 - herramientas.py tiene la función de despedida para mantener main.py simple
 """
 
-# Importa la función principal que ejecuta todo el sistema de menús
-# y la función para cargar tareas de ejemplo
-from gestor_tareas import ejecutar_menu_principal, cargar_tareas_ejemplo
-# Importa la función que muestra el mensaje de despedida
-from herramientas import mostrar_despedida
+# Módulo estándar para leer los argumentos de línea de comandos
+import sys
+
+# Archivo donde se registran los avisos de vencimiento
+ARCHIVO_RECORDATORIOS = "recordatorios.log"
+
+def leer_argumentos(argumentos=None):
+    """Lee las opciones de línea de comandos
+
+    Args:
+        argumentos: Lista de argumentos (default: los de sys.argv)
+    """
+    if argumentos is None:
+        argumentos = sys.argv[1:]
+
+    # Importación diferida: argparse es de lo más pesado del arranque
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gestor de tareas del colegio")
+    parser.add_argument("--ejemplos", action="store_true",
+                        help="Carga las tareas de ejemplo al iniciar")
+    parser.add_argument("--snapshot", metavar="RUTA",
+                        help="Abre las tareas de ese snapshot binario y las guarda al salir")
+    parser.add_argument("--primario", metavar="HOST:PUERTO",
+                        help="Acepta seguidores de solo lectura en esa dirección")
+    parser.add_argument("--consulta", metavar="EXPR",
+                        help="Muestra las tareas que cumplen la consulta y termina")
+    parser.add_argument("--nodo", metavar="PREFIJO",
+                        help="Prefijo de los códigos nuevos de este proceso (ej. A)")
+    parser.add_argument("--archivar", metavar="DIAS", type=int,
+                        help="Archiva al iniciar las tareas vencidas hace más de DIAS días")
+    parser.add_argument("--inquilinos", metavar="DIR",
+                        help="Directorio con los inquilinos guardados (se guardan al salir)")
+    parser.add_argument("--inquilino", metavar="ID",
+                        help="Inquilino activo al iniciar (ej. sanmartin/3a/ana)")
+    parser.add_argument("--importar-ics", metavar="RUTA",
+                        help="Agrega al iniciar las tareas de ese calendario .ics")
+    parser.add_argument("--exportar-ics", metavar="RUTA",
+                        help="Escribe las tareas pendientes en ese calendario .ics y termina")
+    parser.add_argument("--autor", metavar="NOMBRE",
+                        help="Autor de los cambios en el historial (default: el usuario del sistema)")
+    parser.add_argument("--hoy", metavar="DD/MM/AAAA",
+                        help="Fija el dia de hoy (para pruebas y benchmarks reproducibles)")
+    parser.add_argument("--memoria-acotada", metavar="MB", type=float,
+                        help="Deja los textos de las tareas en el snapshot, con una cache de MB megabytes")
+    return parser.parse_args(argumentos)
+
+def imprimir_consulta(expresion):
+    """Imprime el resultado de una consulta, una tarea por línea separada por tabs
+
+    Returns:
+        Código de salida: 0 si la consulta es válida, 2 si no
+    """
+    import consultas
+    from gestor_materias import nombre_materia
+
+    try:
+        resultados = consultas.consultar(expresion)
+    except ValueError as error:
+        print(f"Consulta invalida: {error}", file=sys.stderr)
+        return 2
+
+    for codigo, info in resultados.items():
+        print("\t".join((codigo, nombre_materia(info.get("materia_id")),
+                         info.get("fecha_fin", ""), info.get("estado", ""),
+                         info.get("tarea", ""))))
+    return 0
 
 def main():
     """Función principal del programa"""
+    # Sin argumentos no hace falta armar el parser
+    if len(sys.argv) > 1:
+        opciones = leer_argumentos()
+    else:
+        opciones = None
+
+    # Importa la lógica del programa recién cuando se va a usar
+    import gestor_tareas
+    # Importa la función que muestra el mensaje de despedida
+    from herramientas import mostrar_despedida
+    # Importa el planificador antes de cargar datos, así se entera de todas las tareas
+    import recordatorios
+
     try:
-        # Carga las tareas de ejemplo al iniciar
-        # Como no hay persistencia, esto da contexto y demuestra funcionalidad
-        cargar_tareas_ejemplo()
+        # Los cambios quedan en el historial a nombre de este usuario
+        import os
+        import eventos
+        eventos.configurar_autor((opciones and opciones.autor)
+                                 or os.environ.get("USER") or os.environ.get("USERNAME", ""))
+
+        # Si se pidió, todo el programa ve ese día como hoy (antes de cargar
+        # datos, así los avisos y las urgencias ya salen con ese día)
+        if opciones and opciones.hoy:
+            from herramientas import fijar_reloj
+            try:
+                fijar_reloj(opciones.hoy)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                sys.exit(2)
+
+        # Si se pidió, los códigos nuevos llevan el prefijo de este proceso
+        if opciones and opciones.nodo:
+            import codigos
+            codigos.configurar_nodo(opciones.nodo)
+
+        # Si se pidió, empieza a aceptar seguidores antes de cargar datos
+        if opciones and opciones.primario:
+            import replicacion
+            host, puerto = opciones.primario.rsplit(":", 1)
+            replicacion.iniciar_primario((host, int(puerto)))
+
+        # Si se pidió, las tareas que se abran dejan sus textos en el archivo
+        if opciones and opciones.memoria_acotada is not None:
+            gestor_tareas.configurar_memoria_acotada(int(opciones.memoria_acotada * 1024 * 1024))
+
+        # Si se usan inquilinos, abre los guardados (sus tareas se leen a demanda)
+        if opciones and opciones.inquilinos:
+            import inquilinos
+            inquilinos.cargar(opciones.inquilinos)
+        # Si no, y hay un snapshot guardado, lo abre (sus tareas se leen a demanda)
+        elif opciones and opciones.snapshot:
+            if os.path.exists(opciones.snapshot):
+                gestor_tareas.cargar_snapshot(opciones.snapshot)
+
+        # Todo lo que sigue trabaja sobre el inquilino elegido
+        if opciones and opciones.inquilino:
+            import inquilinos
+            try:
+                inquilinos.activar(opciones.inquilino)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                sys.exit(2)
+
+        # Las tareas de ejemplo solo se cargan si se piden
+        # (también están en el menú principal)
+        if opciones and opciones.ejemplos:
+            gestor_tareas.cargar_tareas_ejemplo()
+
+        # Si se pidió, saca de memoria las tareas viejas antes de empezar
+        if opciones and opciones.archivar is not None:
+            gestor_tareas.archivar_tareas_viejas(opciones.archivar)
+
+        # Si se pidió, trae las tareas de un calendario
+        if opciones and opciones.importar_ics:
+            import calendario_ics
+            resultado = calendario_ics.importar(opciones.importar_ics)
+            print(f"Calendario importado: {resultado['agregadas']} agregada(s), "
+                  f"{resultado['repetidas']} repetida(s), {resultado['omitidas']} omitida(s)")
+
+        # Modo no interactivo: escribe el calendario y termina sin abrir el menú
+        if opciones and opciones.exportar_ics:
+            import calendario_ics
+            cantidad = calendario_ics.exportar(opciones.exportar_ics)
+            print(f"Se exportaron {cantidad} tarea(s) a {opciones.exportar_ics}")
+            sys.exit(0)
+
+        # Modo no interactivo: responde la consulta y termina sin abrir el menú
+        if opciones and opciones.consulta:
+            sys.exit(imprimir_consulta(opciones.consulta))
+
+        # Inicia el planificador de avisos en segundo plano
+        # Los avisos van a un archivo para no interferir con el menú
+        recordatorios.agregar_destino(recordatorios.destino_archivo_log(ARCHIVO_RECORDATORIOS))
+        recordatorios.iniciar_planificador()
 
         # Ejecuta el menú principal (toda la lógica del programa)
-        ejecutar_menu_principal()
-        # Cuando el usuario sale normalmente (opción 9), muestra despedida
+        gestor_tareas.ejecutar_menu_principal()
+        # Detiene el planificador antes de salir
+        recordatorios.detener_planificador()
+        # Guarda los inquilinos, o las tareas si se indicó un snapshot
+        if opciones and opciones.inquilinos:
+            inquilinos.guardar()
+        elif opciones and opciones.snapshot:
+            gestor_tareas.guardar_snapshot(opciones.snapshot)
+        # Cuando el usuario sale normalmente (opción 14), muestra despedida
         mostrar_despedida()
 
     except KeyboardInterrupt:
@@ -47,4 +245,4 @@ def main():
 # No se ejecuta si el archivo es importado desde otro módulo
 if __name__ == "__main__":
     # Llama a la función principal para iniciar el programa
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,343 @@
+"""
+MÓDULO DE RECORDATORIOS
+Planificador en segundo plano de avisos de vencimiento
+
+UTILIDAD:
+Este archivo mantiene una cola de prioridad (min-heap) con las fechas de aviso
+de las tareas pendientes. Un hilo en segundo plano se despierta periódicamente,
+saca del heap solo los avisos que ya corresponden y los envía a los destinos
+registrados (archivo de log, funciones callback, etc.).
+
+Cada tarea pasa por tres avisos como máximo:
+- "vence_manana": el día anterior a la fecha de vencimiento
+- "vence_hoy": el mismo día del vencimiento
+- "vencida": el día siguiente al vencimiento
+
+Nunca recorre tareas_colegio: se suscribe (de forma asincrónica) al bus de
+eventos y recibe cada tarea que se agrega, se edita, se completa o se elimina.
+Atiende a todos los inquilinos a la vez (ver inquilinos.py): cada tarea se
+identifica con su inquilino y su código.
+Las entradas viejas del heap no se borran (sería O(n)), se invalidan con un
+número de versión y se descartan al salir del heap.
+
+De cada tarea programada guarda solo la versión y la fecha de vencimiento:
+la descripción se busca en gestor_tareas recién al emitir el aviso. Así los
+textos de miles de tareas pendientes no quedan duplicados acá (y en memoria
+acotada siguen sin estar en memoria, ver cache_textos.py).
+
+DEPENDENCIAS:
+- heapq: Módulo estándar de Python para manejar la cola de prioridad
+- threading: Módulo estándar para el hilo en segundo plano y el candado
+- herramientas.py: Necesita string_a_fecha() para convertir la fecha de vencimiento,
+  y fecha_de_hoy() y ahora() para saber qué avisos corresponden (con el reloj
+  fijo, los avisos salen siempre iguales)
+- eventos.py: Necesita suscribir() para enterarse de los cambios en las tareas
+- gestor_tareas.py: Necesita obtener_tarea() para la descripción de cada aviso
+  (se importa al emitir, porque gestor_tareas importa este módulo)
+- inquilinos.py: Solo si el aviso es de una tarea de otro inquilino, para
+  leerla sin cambiar el inquilino activo (inquilinos.obtener_tarea)
+
+¿POR QUÉ NO RECORRE LAS TAREAS DE gestor_tareas.py?
+- Qué tareas programar y cuándo le llega en los eventos: solo pide la
+  descripción de las pocas tareas que tienen un aviso ese día
+"""
+
+# Módulo estándar para la cola de prioridad (min-heap)
+import heapq
+# Módulo estándar para el hilo en segundo plano y la sincronización
+import threading
+# Módulo estándar para trabajar con fechas
+from datetime import date, datetime, timedelta
+
+# Importa la conversión de texto a fecha
+from herramientas import string_a_fecha, ahora, fecha_de_hoy
+# Importa el bus de eventos para seguir los cambios en las tareas
+import eventos
+
+# ============================================
+# ESTADO DEL PLANIFICADOR
+# ============================================
+# Heap con tuplas (ordinal_del_aviso, codigo, version)
+_heap_avisos = []
+# Entradas vigentes {clave: (version, ordinal_fecha_fin)}
+# La clave es el código, o "inquilino:codigo" si la tarea no es del general
+_vigentes = {}
+# Contador para versionar cada reprogramación de una tarea
+_siguiente_version = 1
+# Funciones que reciben cada aviso emitido
+_destinos = []
+# Candado que protege el heap y las entradas vigentes
+_candado = threading.Lock()
+# Evento para despertar al hilo antes de tiempo (o para detenerlo)
+_despertar = threading.Event()
+# Hilo en segundo plano (None si no está corriendo)
+_hilo = None
+# Indica si el hilo debe seguir corriendo
+_corriendo = False
+
+# ============================================
+# DESTINOS DE LOS AVISOS
+# ============================================
+
+def agregar_destino(funcion):
+    """Registra una función que recibirá cada aviso emitido
+
+    Args:
+        funcion: Callable que recibe un diccionario con el aviso
+    """
+    _destinos.append(funcion)
+
+def quitar_destino(funcion):
+    """Quita un destino previamente registrado"""
+    if funcion in _destinos:
+        _destinos.remove(funcion)
+
+def destino_archivo_log(ruta):
+    """Crea un destino que agrega cada aviso como una línea en un archivo
+
+    Args:
+        ruta: Ruta del archivo de log
+
+    Returns:
+        Función lista para pasar a agregar_destino()
+    """
+    def escribir(aviso):
+        # Abre en modo "a" para agregar al final sin borrar lo anterior
+        with open(ruta, "a", encoding="utf-8") as archivo:
+            momento = ahora().strftime("%d/%m/%Y %H:%M")
+            archivo.write(f"{momento} [{aviso['tipo'].upper()}] {aviso['codigo']} "
+                          f"{aviso['descripcion']} (vence {aviso['fecha_fin']})\n")
+    return escribir
+
+def _emitir(aviso):
+    """Envía un aviso a todos los destinos registrados"""
+    for destino in list(_destinos):
+        try:
+            destino(aviso)
+        except Exception as error:
+            # Un destino con errores no debe frenar a los demás
+            print(f"\nError en destino de recordatorios: {error}")
+
+# ============================================
+# PROGRAMACIÓN DE TAREAS
+# ============================================
+
+def programar_tarea(codigo, info):
+    """Programa (o reprograma) los avisos de una tarea
+
+    Se llama al agregar o editar una tarea. Si la tarea está completada o su
+    fecha no es válida, se cancelan sus avisos.
+
+    Args:
+        codigo: Código de la tarea
+        info: Diccionario con los datos de la tarea
+    """
+    global _siguiente_version
+
+    # Las tareas completadas no generan avisos
+    if info.get("estado") == "Completada":
+        cancelar_tarea(codigo)
+        return
+
+    fecha_fin = string_a_fecha(info.get("fecha_fin", ""))
+    if fecha_fin is None:
+        cancelar_tarea(codigo)
+        return
+
+    ordinal_fin = fecha_fin.toordinal()
+    with _candado:
+        # Si la fecha no cambió, las entradas del heap siguen siendo válidas
+        vigente = _vigentes.get(codigo)
+        if vigente and vigente[1] == ordinal_fin:
+            return
+
+        version = _siguiente_version
+        _siguiente_version += 1
+        _vigentes[codigo] = (version, ordinal_fin)
+        # El primer aviso es el día anterior al vencimiento
+        heapq.heappush(_heap_avisos, (ordinal_fin - 1, codigo, version))
+        # Si el aviso ya corresponde, despierta al hilo para que no espere
+        despertar_ahora = ordinal_fin - 1 <= fecha_de_hoy().toordinal()
+
+    if despertar_ahora:
+        _despertar.set()
+
+def cancelar_tarea(codigo):
+    """Cancela los avisos pendientes de una tarea (completada o eliminada)"""
+    with _candado:
+        # Al quitarla de vigentes, sus entradas del heap quedan obsoletas
+        _vigentes.pop(codigo, None)
+
+def cancelar_todas():
+    """Cancela todos los avisos (por ejemplo al borrar todas las tareas)"""
+    with _candado:
+        _vigentes.clear()
+        _heap_avisos.clear()
+
+def cantidad_programadas():
+    """Devuelve cuántas tareas tienen avisos programados"""
+    return len(_vigentes)
+
+def _clave(evento, codigo):
+    """Identifica la tarea de un evento entre las de todos los inquilinos
+
+    Con un solo inquilino es el código; si no, "inquilino:codigo", que es
+    también lo que se ve en los avisos.
+    """
+    particion = evento.get("particion", "")
+    return f"{particion}:{codigo}" if particion else codigo
+
+def _cancelar_particion(particion):
+    """Cancela los avisos de todas las tareas de un inquilino (borrado total)"""
+    with _candado:
+        if particion:
+            prefijo = f"{particion}:"
+            claves = [clave for clave in _vigentes if clave.startswith(prefijo)]
+        else:
+            claves = [clave for clave in _vigentes if ":" not in clave]
+        if len(claves) == len(_vigentes):
+            # Eran todas: es más rápido vaciar el heap de una vez
+            _vigentes.clear()
+            _heap_avisos.clear()
+        else:
+            # Sus entradas del heap quedan obsoletas y se descartan al salir
+            for clave in claves:
+                del _vigentes[clave]
+
+def _descripcion(clave):
+    """Busca la descripción actual de la tarea de un aviso ("" si ya no existe)"""
+    # Importación diferida: gestor_tareas importa este módulo al cargarse
+    import gestor_tareas
+
+    particion, _, codigo = clave.rpartition(":")
+    # Con el bus bloqueado nadie cambia de inquilino mientras se busca
+    with eventos.bloqueo():
+        if particion == eventos.particion_actual():
+            info = gestor_tareas.obtener_tarea(codigo)
+        else:
+            # La tarea es de otro inquilino: se lee de sus datos guardados,
+            # sin activarlo (este hilo solo lee)
+            import inquilinos
+            info = inquilinos.obtener_tarea(particion, codigo)
+        return "" if info is None else info.get("tarea", "")
+
+def _aplicar_evento(evento):
+    """Actualiza los avisos a partir de un evento del bus"""
+    if evento["entidad"] != "tarea":
+        return
+
+    # Si se borró todo, se cancelan de una vez las de ese inquilino
+    if evento["tipo"] == "borrado_total":
+        _cancelar_particion(evento.get("particion", ""))
+        return
+
+    for cambio in evento["cambios"]:
+        if cambio["despues"] is None:
+            cancelar_tarea(_clave(evento, cambio["clave"]))
+        else:
+            programar_tarea(_clave(evento, cambio["clave"]), cambio["despues"])
+
+# Se suscribe al importar el módulo, sin bloquear a quien publica
+eventos.suscribir(_aplicar_evento, nombre="recordatorios")
+
+# ============================================
+# PROCESAMIENTO DE AVISOS
+# ============================================
+
+def revisar_vencimientos(hoy=None):
+    """Emite los avisos que corresponden a la fecha indicada
+
+    Solo saca del heap las entradas cuyo aviso ya llegó, por lo que el costo
+    depende de los avisos emitidos y no de la cantidad total de tareas.
+
+    Args:
+        hoy: Fecha a usar como "hoy" (default: la fecha actual)
+
+    Returns:
+        Lista con los avisos emitidos
+    """
+    if hoy is None:
+        hoy = fecha_de_hoy()
+    ordinal_hoy = hoy.toordinal()
+
+    avisos = []
+    with _candado:
+        while _heap_avisos and _heap_avisos[0][0] <= ordinal_hoy:
+            _, codigo, version = heapq.heappop(_heap_avisos)
+
+            # Descarta entradas de tareas canceladas o reprogramadas
+            vigente = _vigentes.get(codigo)
+            if not vigente or vigente[0] != version:
+                continue
+
+            _, ordinal_fin = vigente
+            dias = ordinal_fin - ordinal_hoy
+
+            if dias >= 1:
+                tipo = "vence_manana"
+                # El próximo aviso es el día del vencimiento
+                heapq.heappush(_heap_avisos, (ordinal_fin, codigo, version))
+            elif dias == 0:
+                tipo = "vence_hoy"
+                # El próximo aviso es el día siguiente, ya vencida
+                heapq.heappush(_heap_avisos, (ordinal_fin + 1, codigo, version))
+            else:
+                tipo = "vencida"
+                # Último aviso: la tarea deja de estar programada
+                del _vigentes[codigo]
+
+            avisos.append({
+                "tipo": tipo,
+                "codigo": codigo,
+                "fecha_fin": date.fromordinal(ordinal_fin).strftime("%d/%m/%Y"),
+                "dias": dias,
+            })
+
+    # Busca las descripciones y emite fuera del candado, para que los
+    # destinos puedan tardar
+    for aviso in avisos:
+        aviso["descripcion"] = _descripcion(aviso["codigo"])
+        _emitir(aviso)
+    return avisos
+
+def _segundos_hasta_medianoche():
+    """Calcula cuántos segundos faltan para el próximo cambio de día"""
+    momento = ahora()
+    manana = datetime.combine(momento.date() + timedelta(days=1), datetime.min.time())
+    return (manana - momento).total_seconds()
+
+def _bucle_planificador(intervalo):
+    """Bucle del hilo: revisa vencimientos y duerme hasta el próximo evento"""
+    while _corriendo:
+        revisar_vencimientos()
+        # Duerme hasta medianoche (o el intervalo máximo) salvo que lo despierten
+        _despertar.wait(timeout=min(intervalo, _segundos_hasta_medianoche() + 1))
+        _despertar.clear()
+
+def iniciar_planificador(intervalo=300):
+    """Inicia el hilo en segundo plano que emite los avisos
+
+    Args:
+        intervalo: Máximo de segundos que duerme entre revisiones (default 300)
+    """
+    global _hilo, _corriendo
+
+    # Si ya está corriendo no hace nada
+    if _hilo is not None and _hilo.is_alive():
+        return
+
+    _corriendo = True
+    # daemon=True para que no impida cerrar el programa
+    _hilo = threading.Thread(target=_bucle_planificador, args=(intervalo,),
+                             name="recordatorios", daemon=True)
+    _hilo.start()
+
+def detener_planificador():
+    """Detiene el hilo en segundo plano"""
+    global _hilo, _corriendo
+
+    _corriendo = False
+    _despertar.set()
+    if _hilo is not None:
+        _hilo.join(timeout=2)
+    _hilo = None
@@ -0,0 +1,421 @@
+"""
+MÓDULO DE RECURRENCIAS
+Tareas que se repiten (cada semana, cada N días o ciertos días de la semana)
+
+UTILIDAD:
+Una regla se guarda una sola vez ("Ejercicios de Matematicas todos los lunes y
+miércoles hasta el 30/11") y sus ocurrencias no existen como tareas hasta que
+alguien las pide:
+
+- Al listar o consultar un rango de fechas, ocurrencias() calcula solo las
+  fechas que caen en ese rango. Las fechas salen por aritmética (saltando
+  directo a la primera del rango), así que una regla de todo el año cuesta
+  lo mismo que una de un mes: el costo depende de cuántas ocurrencias caen
+  en el rango pedido, no de cuántas tiene la regla.
+- Cada ocurrencia se muestra como una tarea pendiente con un código que dice
+  de qué regla y qué día es: R3-20261027 (regla 3, vence el 27/10/2026).
+- Cuando se la usa por su código (completar, editar, eliminar) gestor_tareas
+  la convierte en una tarea normal con ese mismo código. Desde ahí ya no se
+  calcula: la regla anota ese día en sus "materializadas". Si se deshace esa
+  operación (ver deshacer.py), el día vuelve a ser una ocurrencia.
+
+Las ocurrencias pasadas que nadie usó solo aparecen si la consulta pide ese
+rango de fechas; sin rango se muestran las de los próximos HORIZONTE_DIAS.
+Borrar todas las tareas no borra las reglas.
+
+REGLA:
+    {"id": 3, "materia_id": 1, "tarea": "Ejercicios", "observaciones": "",
+     "inicio": ordinal, "hasta": ordinal o None, "cada": 7 o None,
+     "dias_semana": (0, 2) o (), "duracion": 2, "materializadas": set()}
+- "inicio" es el primer vencimiento y "hasta" el último posible (None = sin fin)
+- "cada" N días desde "inicio", o bien "dias_semana" (0 = lunes ... 6 = domingo)
+- "duracion": días entre fecha_inicio y fecha_fin de cada ocurrencia
+
+DEPENDENCIAS:
+- datetime: Módulo estándar de Python para los días de la semana
+- json: Módulo estándar para guardar las reglas junto al snapshot
+- eventos.py: Publica las altas y bajas de reglas (entidad "recurrencia") y
+  se entera de qué ocurrencias se convirtieron en tareas
+- herramientas.py: Necesita string_a_fecha(), normalizar_texto() y fecha_de_hoy()
+
+¿POR QUÉ NO DEPENDE DE gestor_tareas.py?
+- gestor_tareas y consultas lo usan para sumar las ocurrencias a sus
+  resultados; las tareas que necesita conocer le llegan en los eventos
+"""
+
+# Módulo estándar para trabajar con fechas
+from datetime import date
+# Módulo estándar para guardar las reglas
+import json
+
+# Importa el bus de eventos
+import eventos
+# Importa la conversión de texto a fecha y la normalización de textos
+from herramientas import string_a_fecha, normalizar_texto, fecha_de_hoy
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Días hacia adelante que se muestran cuando la consulta no pide un rango
+HORIZONTE_DIAS = 14
+# Prefijo de los códigos de las ocurrencias
+PREFIJO = "R"
+# Nombres aceptados para los días de la semana (la posición es el número)
+DIAS_SEMANA = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+# Secuencia de las ocurrencias sin materializar: van después de todas las tareas
+SECUENCIA_OCURRENCIA = float("inf")
+
+# ============================================
+# ESTADO
+# ============================================
+# Reglas {id: regla}
+_reglas = {}
+# Próximo número de regla (nunca se reutiliza)
+_siguiente_regla = 1
+
+def intercambiar_estado(estado=None):
+    """Pone en uso las reglas de otra partición y devuelve las actuales
+
+    Cada inquilino (ver inquilinos.py) tiene sus propias reglas.
+
+    Args:
+        estado: Lo que devolvió una llamada anterior (None = sin reglas)
+    """
+    global _reglas, _siguiente_regla
+
+    anterior = (_reglas, _siguiente_regla)
+    _reglas, _siguiente_regla = estado or ({}, 1)
+    return anterior
+
+def hay_reglas():
+    """Indica si hay alguna regla (si no, no hace falta calcular nada)"""
+    with eventos.bloqueo():
+        return bool(_reglas)
+
+def duracion_maxima():
+    """Devuelve la mayor duración (días entre inicio y vencimiento) de las reglas
+
+    Sirve para saber hasta qué vencimiento hay que calcular ocurrencias que
+    ya están en curso en un día dado (ver agenda.py).
+    """
+    with eventos.bloqueo():
+        return max((regla["duracion"] for regla in _reglas.values()), default=0)
+
+# ============================================
+# CÁLCULO DE FECHAS
+# ============================================
+
+def _fechas(regla, desde, hasta):
+    """Genera los vencimientos de una regla dentro de [desde, hasta] (ordinales)
+
+    No recorre las ocurrencias anteriores a desde: salta directo a la primera.
+    """
+    desde = max(desde, regla["inicio"])
+    if regla["hasta"] is not None:
+        hasta = min(hasta, regla["hasta"])
+    if desde > hasta:
+        return
+
+    if regla["cada"]:
+        paso = regla["cada"]
+        # Primera ocurrencia >= desde (división redondeando hacia arriba)
+        primera = regla["inicio"] - (regla["inicio"] - desde) // paso * paso
+        yield from range(primera, hasta + 1, paso)
+    else:
+        # Lunes de la semana de desde; de ahí, semana por semana
+        lunes = desde - date.fromordinal(desde).weekday()
+        for semana in range(lunes, hasta + 1, 7):
+            for dia in regla["dias_semana"]:
+                ordinal = semana + dia
+                if desde <= ordinal <= hasta:
+                    yield ordinal
+
+def _codigo(regla, ordinal):
+    """Código de una ocurrencia: R<regla>-<AAAAMMDD>"""
+    return f"{PREFIJO}{regla['id']}-{date.fromordinal(ordinal):%Y%m%d}"
+
+def _ocurrencia(regla, ordinal):
+    """Arma los datos de tarea de una ocurrencia"""
+    codigo = _codigo(regla, ordinal)
+    return {
+        "materia_id": regla["materia_id"],
+        "tarea": regla["tarea"],
+        "fecha_inicio": date.fromordinal(ordinal - regla["duracion"]).strftime("%d/%m/%Y"),
+        "fecha_fin": date.fromordinal(ordinal).strftime("%d/%m/%Y"),
+        "estado": "En proceso",
+        "codigo": codigo,
+        "secuencia": SECUENCIA_OCURRENCIA,
+        "observaciones": regla["observaciones"],
+    }
+
+def _leer_codigo(codigo):
+    """Separa un código de ocurrencia en (regla, ordinal); None si no es uno válido"""
+    if not codigo.startswith(PREFIJO) or "-" not in codigo:
+        return None
+    numero, _, fecha = codigo[len(PREFIJO):].partition("-")
+    if not numero.isdigit() or len(fecha) != 8 or not fecha.isdigit():
+        return None
+    regla = _reglas.get(int(numero))
+    if regla is None:
+        return None
+    try:
+        ordinal = date(int(fecha[:4]), int(fecha[4:6]), int(fecha[6:])).toordinal()
+    except ValueError:
+        return None
+    return regla, ordinal
+
+def ocurrencias(desde, hasta, materias=None):
+    """Genera las ocurrencias sin materializar que vencen en [desde, hasta]
+
+    Args:
+        desde, hasta: Ordinales de vencimiento (incluidos)
+        materias: Números de materia aceptados (None = todas)
+
+    Yields:
+        Pares (codigo, info) con los datos de tarea de cada ocurrencia
+
+    Es un generador: quien lo recorre debe tener el bus bloqueado mientras
+    tanto (como gestor_tareas y consultas), así las reglas son siempre las
+    del mismo inquilino.
+    """
+    for regla in list(_reglas.values()):
+        if materias is not None and regla["materia_id"] not in materias:
+            continue
+        for ordinal in _fechas(regla, desde, hasta):
+            if ordinal not in regla["materializadas"]:
+                ocurrencia = _ocurrencia(regla, ordinal)
+                yield ocurrencia["codigo"], ocurrencia
+
+def ventana(desde=None, hasta=None):
+    """Completa el rango de fechas en que se calculan ocurrencias
+
+    Sin fechas: de hoy a HORIZONTE_DIAS adelante. Con una sola, el otro
+    extremo queda a HORIZONTE_DIAS (o en hoy, si el rango llega hasta hoy).
+
+    Returns:
+        Tupla (desde, hasta) en ordinales
+    """
+    hoy = fecha_de_hoy().toordinal()
+    if desde is None:
+        desde = hoy if hasta is None or hasta >= hoy else hasta - HORIZONTE_DIAS
+    if hasta is None:
+        hasta = desde + HORIZONTE_DIAS
+    return desde, hasta
+
+def ocurrencia(codigo):
+    """Devuelve los datos de una ocurrencia todavía sin materializar
+
+    Returns:
+        Diccionario con los datos de la tarea, o None si el código no es de
+        una ocurrencia pendiente de alguna regla
+    """
+    with eventos.bloqueo():
+        leido = _leer_codigo(codigo)
+        if leido is None:
+            return None
+        regla, ordinal = leido
+        if ordinal in regla["materializadas"] or not any(_fechas(regla, ordinal, ordinal)):
+            return None
+        return _ocurrencia(regla, ordinal)
+
+# ============================================
+# ALTA Y BAJA DE REGLAS
+# ============================================
+
+def _dato(regla):
+    """Copia de una regla para los eventos y para guardarla (sin las materializadas)"""
+    dato = {clave: valor for clave, valor in regla.items() if clave != "materializadas"}
+    dato["dias_semana"] = list(regla["dias_semana"])
+    return dato
+
+def _desde_dato(dato, materializadas=()):
+    """Arma una regla a partir de una copia hecha con _dato()"""
+    regla = dict(dato)
+    regla["dias_semana"] = tuple(dato["dias_semana"])
+    regla["materializadas"] = set(materializadas)
+    return regla
+
+def _a_ordinal(fecha, campo):
+    """Convierte DD/MM/AAAA en ordinal
+
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    convertida = string_a_fecha(fecha)
+    if convertida is None:
+        raise ValueError(f"{campo} invalida: {fecha} (use DD/MM/AAAA)")
+    return convertida.toordinal()
+
+def crear_regla(materia_id, tarea, primer_vencimiento, hasta=None, cada=None,
+                dias_semana=None, duracion=0, observaciones=""):
+    """Agrega una regla de repetición
+
+    Args:
+        materia_id: Número de la materia
+        tarea: Descripción de cada ocurrencia
+        primer_vencimiento: Fecha (DD/MM/AAAA) desde la que se repite
+        hasta: Última fecha posible (DD/MM/AAAA), o None para no terminar
+        cada: Días entre ocurrencias (7 = semanal)
+        dias_semana: Días de la semana (0 = lunes) en lugar de "cada"
+        duracion: Días entre el inicio y el vencimiento de cada ocurrencia
+        observaciones: Notas de cada ocurrencia
+
+    Returns:
+        El número de la regla
+
+    Raises:
+        ValueError: Si las fechas, la frecuencia o la duración no son válidas
+    """
+    global _siguiente_regla
+
+    inicio = _a_ordinal(primer_vencimiento, "Fecha de inicio")
+    fin = _a_ordinal(hasta, "Fecha final") if hasta else None
+    if fin is not None and fin < inicio:
+        raise ValueError("La fecha final es anterior a la de inicio")
+    if bool(cada) == bool(dias_semana):
+        raise ValueError("Indique cada cuantos dias o que dias de la semana (uno de los dos)")
+    if cada is not None and cada < 1:
+        raise ValueError("La cantidad de dias debe ser mayor que cero")
+    dias = tuple(sorted(set(dias_semana or ())))
+    if any(not 0 <= dia <= 6 for dia in dias):
+        raise ValueError("Dia de la semana invalido")
+    if duracion < 0:
+        raise ValueError("La duracion no puede ser negativa")
+
+    with eventos.bloqueo():
+        numero = _siguiente_regla
+        _siguiente_regla += 1
+        regla = {"id": numero, "materia_id": materia_id, "tarea": tarea,
+                 "observaciones": observaciones, "inicio": inicio, "hasta": fin,
+                 "cada": cada, "dias_semana": dias, "duracion": duracion,
+                 "materializadas": set()}
+        _reglas[numero] = regla
+        eventos.publicar("agregada", [eventos.cambio(numero, None, _dato(regla))],
+                         entidad="recurrencia")
+    return numero
+
+def eliminar_regla(numero):
+    """Quita una regla (las ocurrencias ya convertidas en tareas se mantienen)
+
+    Returns:
+        True si la regla existía
+    """
+    with eventos.bloqueo():
+        regla = _reglas.pop(numero, None)
+        if regla is None:
+            return False
+        eventos.publicar("eliminada", [eventos.cambio(numero, _dato(regla), None)],
+                         entidad="recurrencia")
+    return True
+
+def listar_reglas():
+    """Devuelve una copia de las reglas {id: regla}"""
+    with eventos.bloqueo():
+        return {numero: _dato(regla) for numero, regla in _reglas.items()}
+
+def leer_dias_semana(texto):
+    """Convierte "lunes, miércoles" (o "lun mie") en números de día (0 = lunes)
+
+    Raises:
+        ValueError: Si algún día no se reconoce
+    """
+    dias = set()
+    for palabra in normalizar_texto(texto.replace(",", " ")).split():
+        coinciden = [numero for numero, nombre in enumerate(DIAS_SEMANA)
+                     if nombre.startswith(palabra)]
+        if len(coinciden) != 1:
+            raise ValueError(f"Dia de la semana no reconocido: {palabra}")
+        dias.add(coinciden[0])
+    if not dias:
+        raise ValueError("Indique al menos un dia de la semana")
+    return tuple(sorted(dias))
+
+def describir(regla):
+    """Describe en palabras cuándo se repite una regla"""
+    if regla["cada"] == 7:
+        frecuencia = "cada semana"
+    elif regla["cada"]:
+        frecuencia = f"cada {regla['cada']} dias"
+    else:
+        frecuencia = "los " + ", ".join(DIAS_SEMANA[dia] for dia in regla["dias_semana"])
+    desde = date.fromordinal(regla["inicio"]).strftime("%d/%m/%Y")
+    hasta = (date.fromordinal(regla["hasta"]).strftime("%d/%m/%Y")
+             if regla["hasta"] is not None else "sin fin")
+    return f"{frecuencia}, del {desde} al {hasta}"
+
+# ============================================
+# EVENTOS
+# ============================================
+
+def _marcar_materializadas(evento):
+    """Anota los días cuyas ocurrencias se convirtieron en tareas
+
+    Deshacer la operación que materializó una ocurrencia quita la tarea: ese
+    día vuelve a ser una ocurrencia de la regla. Eliminar la tarea (o
+    rehacer su eliminación) no: la ocurrencia no debe volver a aparecer.
+    """
+    if evento["entidad"] != "tarea" or not _reglas:
+        return
+    deshecha = evento["tipo"] == "deshecha"
+    for cambio in evento["cambios"]:
+        if cambio["antes"] is None and cambio["despues"] is not None:
+            agregada = True
+        elif deshecha and cambio["antes"] is not None and cambio["despues"] is None:
+            agregada = False
+        else:
+            continue
+        leido = _leer_codigo(cambio["clave"])
+        if leido is not None:
+            regla, ordinal = leido
+            if agregada:
+                regla["materializadas"].add(ordinal)
+            else:
+                regla["materializadas"].discard(ordinal)
+
+# Sincrónico: al terminar agregar_tarea la ocurrencia ya no se vuelve a calcular
+eventos.suscribir(_marcar_materializadas, nombre="recurrencias", sincronico=True)
+
+def aplicar_evento(evento):
+    """Aplica un evento recibido de otro proceso (lo usan las réplicas)"""
+    with eventos.bloqueo():
+        if evento["entidad"] == "tarea":
+            _marcar_materializadas(evento)
+        elif evento["entidad"] == "recurrencia":
+            for cambio in evento["cambios"]:
+                if cambio["despues"] is None:
+                    _reglas.pop(cambio["clave"], None)
+                elif cambio["clave"] not in _reglas:
+                    _reglas[cambio["clave"]] = _desde_dato(cambio["despues"])
+
+# ============================================
+# GUARDAR Y ABRIR
+# ============================================
+
+def exportar():
+    """Devuelve las reglas y el contador para guardarlos o enviarlos a una réplica"""
+    with eventos.bloqueo():
+        return {"siguiente": _siguiente_regla,
+                "reglas": [dict(_dato(regla), materializadas=sorted(regla["materializadas"]))
+                           for regla in _reglas.values()]}
+
+def reemplazar(datos):
+    """Reemplaza todas las reglas por las exportadas con exportar()"""
+    global _siguiente_regla
+
+    with eventos.bloqueo():
+        _reglas.clear()
+        for dato in datos["reglas"]:
+            _reglas[dato["id"]] = _desde_dato(
+                {clave: valor for clave, valor in dato.items() if clave != "materializadas"},
+                dato["materializadas"])
+        _siguiente_regla = max(_siguiente_regla, datos["siguiente"])
+
+def guardar(ruta):
+    """Guarda las reglas en un archivo JSON"""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(exportar(), archivo, ensure_ascii=False)
+
+def cargar(ruta):
+    """Abre las reglas guardadas con guardar()"""
+    with open(ruta, encoding="utf-8") as archivo:
+        reemplazar(json.load(archivo))
@@ -0,0 +1,481 @@
+"""
+MÓDULO DE REPLICACIÓN
+Réplicas de solo lectura alimentadas por el registro de cambios del primario
+
+UTILIDAD:
+Permite tener uno o más procesos "seguidores" con una copia de las tareas, para
+atender consultas pesadas (búsquedas, listados, estadísticas) sin competir con
+el proceso que las modifica (el "primario").
+
+PROTOCOLO (sobre multiprocessing.connection, socket local con clave):
+1. El seguidor se conecta y envía {"desde": N, "corrida": C}, la última
+   secuencia que aplicó (0 si recién arranca) y la corrida del primario de
+   la que viene (None si recién arranca).
+2. Si la corrida es la actual y el primario todavía tiene en su registro
+   (WAL) todos los eventos posteriores a N, se los envía uno por uno. Si no,
+   envía primero una foto completa {"tipo": "snapshot", "secuencia": S,
+   "corrida": C, "inquilinos": [...], "particiones": {inquilino: {"tareas":
+   {...}, "materias": {...}, "siguiente_materia": M, "recurrencias": {...}}}}
+   y sigue desde S.
+3. Luego le va enviando cada evento nuevo. Si no hay novedades, cada tanto envía
+   un {"tipo": "latido", "secuencia": S, "momento": t} con la última secuencia
+   del primario, para medir el retraso.
+4. Si la conexión se corta, el seguidor se reconecta enviando su última
+   secuencia aplicada y se pone al día (catch-up).
+
+CORRIDA:
+Las secuencias vuelven a empezar cada vez que arranca el primario, así que
+una secuencia sola no alcanza para saber desde dónde seguir: un seguidor que
+venía más adelantado que el primario reiniciado esperaría eventos que nunca
+llegan. Cada arranque del primario tiene un identificador propio (la
+corrida), que viaja en la foto; si el seguidor trae otra, o una secuencia
+mayor que la última del primario, recibe una foto nueva.
+
+Los eventos traen el estado completo "despues" de cada tarea, por lo que
+aplicarlos es idempotente: recibir dos veces el mismo cambio no rompe la réplica.
+
+El seguidor guarda su réplica en el propio tareas_colegio (y MATERIAS) de su
+proceso, y mantiene sus propios índices, así puede responder con las mismas
+funciones buscar_por_*() y obtener_*() de gestor_tareas.
+
+Con varios inquilinos (ver inquilinos.py) el seguidor arma la misma
+jerarquía: cada evento se aplica en la partición que trae anotada, y las
+consultas de lectura pueden indicar sobre qué inquilino se hacen.
+
+USO DEL SEGUIDOR (en otro proceso o en otra terminal):
+    python replicacion.py --primario localhost:6000 --escuchar localhost:6001
+
+DEPENDENCIAS:
+- multiprocessing.connection: Módulo estándar de Python para los sockets locales
+- threading, collections, itertools, time: Módulos estándar de Python
+- eventos.py: Necesita suscribir() para llenar el WAL y el bloqueo del bus para
+  sacar fotos consistentes con la secuencia
+- gestor_tareas.py: Necesita tareas_colegio (la foto del primario y la réplica
+  del seguidor) y las funciones de búsqueda y listado que atiende el seguidor
+- gestor_materias.py: Necesita MATERIAS y las funciones para replicar el catálogo
+- indices.py: El seguidor aplica los eventos a sus índices, que no reciben
+  eventos del bus local
+- consultas.py: Para atender consultas combinadas (consultar) en el seguidor
+- inquilinos.py: Para sacar la foto de todos los inquilinos y aplicar cada
+  evento en la partición que corresponde
+- recurrencias.py: Las reglas de tareas recurrentes viajan en la foto y en
+  los eventos, así el seguidor suma las mismas ocurrencias a sus consultas
+"""
+
+# Módulo estándar para sockets locales con autenticación
+from multiprocessing.connection import Listener, Client
+# Módulo estándar para los hilos de atención
+import threading
+# Módulo estándar para el WAL acotado
+from collections import deque
+# Módulo estándar para recorrer el WAL desde una posición
+from itertools import islice
+# Módulo estándar para medir tiempos
+import time
+# Módulos estándar para leer opciones de línea de comandos y variables de entorno
+import argparse
+import os
+
+# Importa el bus de eventos (fuente del registro de cambios)
+import eventos
+# Importa el módulo de tareas (foto del primario y funciones de lectura)
+import gestor_tareas
+# Importa el catálogo de materias (se replica junto con las tareas)
+import gestor_materias
+# Importa los índices para mantenerlos al día en el seguidor
+import indices
+# Importa el motor de consultas que también atiende el seguidor
+import consultas
+# Importa el manejo de inquilinos (cada uno se replica en su partición)
+import inquilinos
+# Importa las reglas de tareas recurrentes (se replican junto con las tareas)
+import recurrencias
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Clave compartida entre primario y seguidores
+CLAVE = os.environ.get("GESTOR_CLAVE_REPLICACION", "gestor-tareas").encode()
+# Cantidad máxima de eventos que guarda el WAL en memoria
+CAPACIDAD_WAL = 10000
+# Segundos entre latidos cuando no hay eventos nuevos
+INTERVALO_LATIDO = 1.0
+# Segundos de espera antes de reintentar una conexión caída
+ESPERA_RECONEXION = 1.0
+
+# ============================================
+# LADO PRIMARIO
+# ============================================
+# Registro de los últimos eventos publicados (write-ahead log en memoria)
+_wal = deque(maxlen=CAPACIDAD_WAL)
+# Condición para avisar a los hilos de los seguidores que hay eventos nuevos
+_hay_eventos = threading.Condition()
+# Listener del primario (None si no está iniciado)
+_listener_primario = None
+# Identificador de este arranque del primario (ver CORRIDA)
+_corrida = os.urandom(8).hex()
+
+def _registrar_en_wal(evento):
+    """Suscriptor sincrónico: agrega cada evento al WAL en orden"""
+    with _hay_eventos:
+        _wal.append(evento)
+        _hay_eventos.notify_all()
+
+def _eventos_desde(secuencia):
+    """Devuelve los eventos posteriores a una secuencia
+
+    Returns:
+        Lista de eventos, o None si el WAL ya no los tiene o la secuencia es
+        posterior a la última publicada (hace falta snapshot)
+    """
+    with eventos.bloqueo(), _hay_eventos:
+        if secuencia > eventos.ultima_secuencia():
+            return None
+        if secuencia == eventos.ultima_secuencia():
+            return []
+        if not _wal or secuencia < _wal[0]["secuencia"] - 1:
+            return None
+        # Las secuencias del WAL son consecutivas: la posición se calcula directo
+        return list(islice(_wal, secuencia - _wal[0]["secuencia"] + 1, None))
+
+def _tomar_snapshot():
+    """Saca una foto de todas las tareas (de cada inquilino) junto con su número de secuencia"""
+    # Con el bus bloqueado no se puede publicar nada mientras se copia
+    with eventos.bloqueo():
+        particiones = {}
+        for inquilino in inquilinos.listar():
+            with inquilinos.usar(inquilino):
+                particiones[inquilino] = {
+                    "tareas": {codigo: dict(info) for codigo, info
+                               in list(gestor_tareas.obtener_tareas().items())},
+                    "materias": dict(gestor_materias.obtener_catalogo()),
+                    "siguiente_materia": gestor_materias.obtener_siguiente_numero(),
+                    "recurrencias": recurrencias.exportar(),
+                }
+        lista = inquilinos.exportar()
+        # Al final: terminar de cargar un snapshot publica eventos, y la foto
+        # ya los incluye (el seguidor no debe recibirlos otra vez)
+        secuencia = eventos.ultima_secuencia()
+    return {"tipo": "snapshot", "secuencia": secuencia, "corrida": _corrida,
+            "inquilinos": lista, "particiones": particiones}
+
+def _atender_seguidor(conexion):
+    """Hilo que mantiene al día a un seguidor conectado"""
+    try:
+        pedido = conexion.recv()
+        cursor = pedido.get("desde", 0)
+        # Las secuencias de otra corrida del primario no sirven (ver CORRIDA)
+        misma_corrida = pedido.get("corrida") == _corrida
+
+        while True:
+            pendientes = _eventos_desde(cursor) if misma_corrida else None
+
+            # El seguidor quedó muy atrás, recién arranca o viene de otra
+            # corrida: foto completa
+            if pendientes is None:
+                snapshot = _tomar_snapshot()
+                conexion.send(snapshot)
+                cursor = snapshot["secuencia"]
+                misma_corrida = True
+                continue
+
+            for evento in pendientes:
+                conexion.send(evento)
+                cursor = evento["secuencia"]
+
+            # Sin novedades: espera un evento nuevo o, si no llega, envía un
+            # latido con la última secuencia del primario
+            if not pendientes:
+                with _hay_eventos:
+                    notificado = _hay_eventos.wait(timeout=INTERVALO_LATIDO)
+                if not notificado:
+                    conexion.send({"tipo": "latido", "secuencia": eventos.ultima_secuencia(),
+                                   "momento": time.time()})
+    except (EOFError, OSError):
+        # El seguidor se desconectó; volverá a conectarse con su secuencia
+        pass
+    finally:
+        conexion.close()
+
+def _aceptar_seguidores(listener):
+    """Hilo que acepta conexiones de seguidores nuevos"""
+    while True:
+        try:
+            conexion = listener.accept()
+        except (OSError, EOFError):
+            # El listener se cerró o falló la autenticación de un cliente
+            if listener is not _listener_primario:
+                return
+            continue
+        threading.Thread(target=_atender_seguidor, args=(conexion,),
+                         name="replicacion-seguidor", daemon=True).start()
+
+def iniciar_primario(direccion=("localhost", 6000)):
+    """Empieza a registrar cambios y a aceptar seguidores
+
+    Args:
+        direccion: Tupla (host, puerto) donde escuchar (default localhost:6000)
+    """
+    global _listener_primario
+
+    if _listener_primario is not None:
+        return
+
+    # Sincrónico para que el WAL tenga exactamente el orden de la secuencia
+    eventos.suscribir(_registrar_en_wal, nombre="replicacion", sincronico=True)
+    _listener_primario = Listener(direccion, authkey=CLAVE)
+    threading.Thread(target=_aceptar_seguidores, args=(_listener_primario,),
+                     name="replicacion-primario", daemon=True).start()
+
+def detener_primario():
+    """Deja de aceptar seguidores y de registrar cambios"""
+    global _listener_primario
+
+    if _listener_primario is None:
+        return
+    listener = _listener_primario
+    _listener_primario = None
+    listener.close()
+    eventos.desuscribir(_registrar_en_wal)
+
+# ============================================
+# LADO SEGUIDOR
+# ============================================
+# Candado que separa la aplicación de eventos de las consultas
+_candado_replica = threading.Lock()
+# Métricas de replicación del seguidor
+_metricas = {
+    "secuencia_aplicada": 0,
+    "secuencia_primario": 0,
+    "momento_ultimo_evento": 0.0,
+    "snapshots_recibidos": 0,
+    "eventos_aplicados": 0,
+    "reconexiones": 0,
+}
+# Corrida del primario de la que vino la última foto (None si no llegó ninguna)
+_corrida_primario = None
+
+# Funciones de gestor_tareas que el seguidor puede atender (ninguna cambia
+# datos: obtener_tarea no convierte en tarea una ocurrencia recurrente)
+FUNCIONES_LECTURA = {
+    "obtener_tarea": gestor_tareas.obtener_tarea,
+    "obtener_tareas": gestor_tareas.obtener_tareas,
+    "obtener_tareas_pendientes": gestor_tareas.obtener_tareas_pendientes,
+    "obtener_tareas_completadas": gestor_tareas.obtener_tareas_completadas,
+    "obtener_tareas_ordenadas_por_fecha": gestor_tareas.obtener_tareas_ordenadas_por_fecha,
+    "obtener_tareas_mas_urgentes": gestor_tareas.obtener_tareas_mas_urgentes,
+    "obtener_estadisticas": gestor_tareas.obtener_estadisticas,
+    "buscar_por_materia": gestor_tareas.buscar_por_materia,
+    "buscar_por_fecha_vencimiento": gestor_tareas.buscar_por_fecha_vencimiento,
+    "buscar_por_fecha_inicio": gestor_tareas.buscar_por_fecha_inicio,
+    "buscar_por_estado": gestor_tareas.buscar_por_estado,
+    "buscar_por_codigo": gestor_tareas.buscar_por_codigo,
+    "consultar": consultas.consultar,
+    "obtener_metricas_cache": consultas.obtener_metricas_cache,
+}
+
+def _aplicar_cambios(mensaje):
+    """Aplica un evento de tareas, materias o recurrencias a la partición activa de la réplica"""
+    replica = gestor_tareas.tareas_colegio
+
+    if mensaje["entidad"] == "tarea":
+        for cambio in mensaje["cambios"]:
+            if cambio["despues"] is None:
+                replica.pop(cambio["clave"], None)
+            else:
+                replica[cambio["clave"]] = cambio["despues"]
+        indices.aplicar_evento(mensaje)
+        # Las ocurrencias que pasaron a ser tareas dejan de calcularse
+        recurrencias.aplicar_evento(mensaje)
+    elif mensaje["entidad"] == "recurrencia":
+        recurrencias.aplicar_evento(mensaje)
+    elif mensaje["entidad"] == "materia":
+        if mensaje["tipo"] == "catalogo_reemplazado":
+            gestor_materias.reemplazar_catalogo(
+                {c["clave"]: c["despues"]["nombre"] for c in mensaje["cambios"]},
+                publicar=False)
+        else:
+            for cambio in mensaje["cambios"]:
+                despues = cambio["despues"]
+                gestor_materias.sincronizar_materia(
+                    cambio["clave"], despues["nombre"] if despues else None)
+    # La caché de consultas tampoco recibe los eventos del bus local
+    consultas.invalidar_por_evento(mensaje)
+    inquilinos.invalidar_por_evento(mensaje)
+
+def _aplicar_mensaje(mensaje):
+    """Aplica a la réplica un mensaje recibido del primario"""
+    global _corrida_primario
+
+    with _candado_replica:
+        if mensaje["tipo"] == "snapshot":
+            # Primero la jerarquía, después las tareas de cada inquilino
+            for info in mensaje["inquilinos"]:
+                inquilinos.sincronizar(info)
+            for inquilino, particion in mensaje["particiones"].items():
+                with inquilinos.usar(inquilino):
+                    # Reemplaza el contenido sin cambiar el objeto diccionario
+                    replica = gestor_tareas.tareas_colegio
+                    replica.clear()
+                    replica.update(particion["tareas"])
+                    gestor_materias.reemplazar_catalogo(
+                        particion["materias"], publicar=False,
+                        siguiente_numero=particion["siguiente_materia"])
+                    indices.reconstruir(replica)
+                    recurrencias.reemplazar(particion["recurrencias"])
+                    consultas.vaciar_cache()
+            _metricas["snapshots_recibidos"] += 1
+            # Desde acá se sigue la numeración de esta corrida del primario
+            _corrida_primario = mensaje["corrida"]
+            _metricas["secuencia_primario"] = mensaje["secuencia"]
+        elif mensaje["tipo"] == "latido":
+            _metricas["secuencia_primario"] = mensaje["secuencia"]
+            return
+        else:
+            if mensaje["entidad"] == "inquilino":
+                for cambio in mensaje["cambios"]:
+                    inquilinos.sincronizar(cambio["despues"])
+            else:
+                # Cada evento se aplica en la partición donde se publicó
+                with inquilinos.usar(mensaje.get("particion", inquilinos.GENERAL)):
+                    _aplicar_cambios(mensaje)
+            _metricas["eventos_aplicados"] += 1
+            _metricas["momento_ultimo_evento"] = mensaje["momento"]
+
+        _metricas["secuencia_aplicada"] = mensaje["secuencia"]
+        _metricas["secuencia_primario"] = max(_metricas["secuencia_primario"],
+                                              mensaje["secuencia"])
+
+def seguir_primario(direccion=("localhost", 6000)):
+    """Bucle del seguidor: se conecta, se pone al día y aplica cada evento
+
+    No termina nunca; si la conexión se corta, se reconecta desde la última
+    secuencia aplicada.
+    """
+    while True:
+        try:
+            conexion = Client(direccion, authkey=CLAVE)
+        except OSError:
+            time.sleep(ESPERA_RECONEXION)
+            continue
+
+        try:
+            conexion.send({"desde": _metricas["secuencia_aplicada"],
+                           "corrida": _corrida_primario})
+            while True:
+                _aplicar_mensaje(conexion.recv())
+        except (EOFError, OSError):
+            _metricas["reconexiones"] += 1
+            time.sleep(ESPERA_RECONEXION)
+        finally:
+            conexion.close()
+
+def obtener_metricas():
+    """Devuelve las métricas de replicación del seguidor, incluido el retraso"""
+    metricas = dict(_metricas)
+    metricas["retraso_eventos"] = metricas["secuencia_primario"] - metricas["secuencia_aplicada"]
+    # El retraso en segundos solo tiene sentido si hay eventos sin aplicar
+    if metricas["retraso_eventos"] > 0 and metricas["momento_ultimo_evento"]:
+        metricas["retraso_segundos"] = time.time() - metricas["momento_ultimo_evento"]
+    else:
+        metricas["retraso_segundos"] = 0.0
+    # Suma las tareas de todos los inquilinos
+    tareas = 0
+    with _candado_replica:
+        for inquilino in inquilinos.listar():
+            with inquilinos.usar(inquilino):
+                tareas += len(gestor_tareas.tareas_colegio)
+    metricas["tareas_en_replica"] = tareas
+    return metricas
+
+def consultar(nombre, argumentos, inquilino=inquilinos.GENERAL):
+    """Ejecuta una función de lectura sobre la réplica
+
+    Args:
+        nombre: Nombre de la función (ver FUNCIONES_LECTURA) o "metricas"
+        argumentos: Tupla de argumentos de la función
+        inquilino: Inquilino sobre el que se consulta ("" = el general)
+
+    Returns:
+        Tupla ("ok", resultado) o ("error", mensaje)
+    """
+    if nombre == "metricas":
+        return "ok", obtener_metricas()
+    if nombre not in FUNCIONES_LECTURA:
+        return "error", f"Consulta no permitida: {nombre}"
+    if inquilinos.obtener(inquilino) is None:
+        return "error", f"No existe el inquilino '{inquilino}'"
+    with _candado_replica, inquilinos.usar(inquilino):
+        return "ok", FUNCIONES_LECTURA[nombre](*argumentos)
+
+def _atender_cliente(conexion):
+    """Hilo que responde las consultas de un cliente del seguidor"""
+    try:
+        while True:
+            # (nombre, argumentos) o (nombre, argumentos, inquilino)
+            nombre, argumentos, *inquilino = conexion.recv()
+            try:
+                conexion.send(consultar(nombre, argumentos, *inquilino))
+            except Exception as error:
+                conexion.send(("error", str(error)))
+    except (EOFError, OSError):
+        pass
+    finally:
+        conexion.close()
+
+def atender_consultas(direccion=("localhost", 6001)):
+    """Bucle que acepta clientes de lectura en la dirección indicada"""
+    with Listener(direccion, authkey=CLAVE) as listener:
+        while True:
+            try:
+                conexion = listener.accept()
+            except (OSError, EOFError):
+                continue
+            threading.Thread(target=_atender_cliente, args=(conexion,),
+                             name="replicacion-cliente", daemon=True).start()
+
+# ============================================
+# CLIENTE DE LECTURA
+# ============================================
+
+def consultar_seguidor(direccion, nombre, *argumentos, inquilino=inquilinos.GENERAL):
+    """Envía una consulta de lectura a un seguidor y devuelve el resultado
+
+    Args:
+        direccion: Tupla (host, puerto) del seguidor
+        nombre: Nombre de la función (ej: "buscar_por_materia" o "metricas")
+        *argumentos: Argumentos de la función
+        inquilino: Inquilino sobre el que se consulta ("" = el general)
+
+    Raises:
+        ValueError: Si el seguidor rechaza la consulta
+    """
+    with Client(direccion, authkey=CLAVE) as conexion:
+        conexion.send((nombre, argumentos, inquilino))
+        estado, resultado = conexion.recv()
+    if estado != "ok":
+        raise ValueError(resultado)
+    return resultado
+
+def _leer_direccion(texto):
+    """Convierte "host:puerto" en una tupla (host, puerto)"""
+    host, puerto = texto.rsplit(":", 1)
+    return host, int(puerto)
+
+def main():
+    """Arranca un proceso seguidor desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Seguidor de solo lectura del gestor de tareas")
+    parser.add_argument("--primario", default="localhost:6000",
+                        help="Dirección host:puerto del primario")
+    parser.add_argument("--escuchar", default="localhost:6001",
+                        help="Dirección host:puerto donde atender consultas")
+    opciones = parser.parse_args()
+
+    # La replicación corre en un hilo; el hilo principal atiende las consultas
+    threading.Thread(target=seguir_primario, args=(_leer_direccion(opciones.primario),),
+                     name="replicacion-seguidor", daemon=True).start()
+    print(f"Seguidor atendiendo consultas en {opciones.escuchar}")
+    atender_consultas(_leer_direccion(opciones.escuchar))
+
+if __name__ == "__main__":
+    main()
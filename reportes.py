@@ -0,0 +1,120 @@
+"""
+MÓDULO DE REPORTES
+Totales que cruzan varios inquilinos (un curso entero, una escuela, todo)
+
+UTILIDAD:
+Las funciones de gestor_tareas y consultas solo ven al inquilino activo. Este
+módulo es el único camino para sumar datos de varios: activa cada inquilino
+de a uno (inquilinos.usar), le pide sus números con las funciones de siempre
+y los junta. Solo lee, nunca modifica tareas.
+
+- estadisticas_por_inquilino(): las estadísticas de cada inquilino por separado
+- estadisticas_agregadas(): la suma de todos (incluidas las tareas archivadas)
+- pendientes_por_materia(): tareas pendientes por nombre de materia; se junta
+  por nombre porque los inquilinos con catálogo propio numeran distinto
+
+DEPENDENCIAS:
+- inquilinos.py: Necesita listar(), obtener() y usar() para recorrer los inquilinos
+- gestor_tareas.py: Necesita obtener_estadisticas() y obtener_tareas()
+- gestor_materias.py: Necesita nombre_materia()
+- indices.py: Necesita tareas_con_estado() para no recorrer las completadas
+- herramientas.py: Para mostrar el reporte en pantalla, con la fecha del reloj
+  del programa (leída una sola vez para todo el reporte)
+
+¿POR QUÉ UN MÓDULO APARTE?
+- Separa lo que mira varios inquilinos de lo que mira uno solo: si una
+  función no está acá, no toca datos de otros inquilinos
+"""
+
+# Importa el manejo de inquilinos
+import inquilinos
+# Importa las estadísticas y las tareas del inquilino activo
+import gestor_tareas
+# Importa los nombres de las materias
+from gestor_materias import nombre_materia
+# Importa el índice por estado
+import indices
+# Importa las utilidades de la interfaz
+from herramientas import limpiar_pantalla, linea_separadora, mismo_instante, fecha_de_hoy
+
+def estadisticas_por_inquilino(raiz=inquilinos.GENERAL):
+    """Devuelve las estadísticas de un inquilino y de los que dependen de él
+
+    Args:
+        raiz: Id del inquilino de arriba ("" = todos)
+
+    Returns:
+        Diccionario {id: estadisticas} (ver gestor_tareas.obtener_estadisticas)
+    """
+    resultado = {}
+    for inquilino in inquilinos.listar(raiz):
+        with inquilinos.usar(inquilino):
+            resultado[inquilino] = gestor_tareas.obtener_estadisticas()
+    return resultado
+
+def estadisticas_agregadas(raiz=inquilinos.GENERAL):
+    """Suma las estadísticas de un inquilino y de todos los que dependen de él
+
+    Returns:
+        Diccionario con total, completadas, pendientes, archivadas,
+        porcentaje_completado e inquilinos (cuántos se sumaron)
+    """
+    por_inquilino = estadisticas_por_inquilino(raiz)
+    suma = {"total": 0, "completadas": 0, "pendientes": 0, "archivadas": 0}
+    for estadisticas in por_inquilino.values():
+        for clave in suma:
+            suma[clave] += estadisticas[clave]
+    suma["porcentaje_completado"] = (suma["completadas"] / suma["total"] * 100
+                                     if suma["total"] else 0)
+    suma["inquilinos"] = len(por_inquilino)
+    return suma
+
+def pendientes_por_materia(raiz=inquilinos.GENERAL):
+    """Cuenta las tareas pendientes por materia en varios inquilinos
+
+    Returns:
+        Lista de (nombre_materia, cantidad), de la que más tiene a la que menos
+    """
+    cantidades = {}
+    for inquilino in inquilinos.listar(raiz):
+        with inquilinos.usar(inquilino):
+            tareas = gestor_tareas.obtener_tareas()
+            for codigo in indices.tareas_con_estado("En proceso"):
+                materia = nombre_materia(tareas[codigo].get("materia_id"))
+                cantidades[materia] = cantidades.get(materia, 0) + 1
+    return sorted(cantidades.items(), key=lambda par: (-par[1], par[0]))
+
+def mostrar_reporte(raiz=inquilinos.GENERAL):
+    """Muestra en pantalla los totales de un inquilino y de los que dependen de él"""
+    # Todo el reporte es del mismo instante, aunque recorrer los inquilinos tarde
+    with mismo_instante():
+        _mostrar_reporte(raiz)
+
+def _mostrar_reporte(raiz):
+    """Arma el reporte de mostrar_reporte() (con el reloj ya leído)"""
+    por_inquilino = estadisticas_por_inquilino(raiz)
+    total = estadisticas_agregadas(raiz)
+
+    limpiar_pantalla()
+    linea_separadora()
+    titulo = inquilinos.obtener(raiz)["nombre"] if raiz else "TODOS LOS INQUILINOS"
+    print(f"  REPORTE: {titulo}")
+    print(f"  Al {fecha_de_hoy():%d/%m/%Y}")
+    linea_separadora()
+
+    print(f"{'INQUILINO':<30} {'TOTAL':>7} {'HECHAS':>7} {'PEND.':>7} {'ARCH.':>7}")
+    linea_separadora(80, "-")
+    for inquilino, estadisticas in por_inquilino.items():
+        print(f"{(inquilino or 'general')[:30]:<30} {estadisticas['total']:>7} "
+              f"{estadisticas['completadas']:>7} {estadisticas['pendientes']:>7} "
+              f"{estadisticas['archivadas']:>7}")
+    linea_separadora(80, "-")
+    print(f"{'TOTAL (' + str(total['inquilinos']) + ' inquilinos)':<30} {total['total']:>7} "
+          f"{total['completadas']:>7} {total['pendientes']:>7} {total['archivadas']:>7}")
+    print(f"\nCompletado: {total['porcentaje_completado']:.1f}%")
+
+    materias = pendientes_por_materia(raiz)
+    if materias:
+        print("\nPendientes por materia:")
+        for materia, cantidad in materias[:10]:
+            print(f"  {materia:<25} {cantidad:>5}")
@@ -0,0 +1,288 @@
+"""
+MÓDULO DE SERVICIO
+Operaciones sobre las tareas sin input() ni print(), sincrónicas y asincrónicas
+
+UTILIDAD:
+Es la forma de usar el gestor desde otro programa: un servidor de red, un
+proceso por lotes, una prueba. Cada función recibe datos, los valida, hace el
+cambio y devuelve datos; nunca pregunta ni imprime nada. Los menús de
+gestor_tareas.py son un cliente más: piden los datos por teclado, llaman a
+estas funciones y muestran el resultado o el error.
+
+- agregar(), editar(), completar(), eliminar(), borrar_todas(),
+  cargar_ejemplos(): un cambio cada una
+- obtener(), consultar(), historial(), pendientes_en(): lecturas
+- Los errores (datos inválidos, código inexistente) se informan con ValueError
+  y un mensaje listo para mostrar
+- Devuelven copias: quien las recibe puede modificarlas sin tocar las tareas
+
+AUTOR:
+Los cambios quedan en el historial a nombre de quien se indique con
+eventos.como_autor("ana") alrededor de las llamadas (cada hilo o tarea de
+asyncio con el suyo).
+
+ATÓMICAS:
+Cada operación se hace completa con el bloqueo del bus tomado (ver eventos.py):
+otro hilo nunca ve una tarea a medio editar. Antes, editar desde el menú
+cambiaba los campos de a uno entre pregunta y pregunta. Las lecturas también
+toman el bloqueo mientras copian lo que devuelven, así no ven un cambio a
+medio hacer ni las tareas de otro inquilino. Los menús hacen sus cambios por
+acá, incluidos borrar todas y cargar las tareas de ejemplo.
+
+ASINCRÓNICAS:
+servicio.asincrono tiene las mismas funciones para usar con asyncio:
+
+    tarea = await servicio.asincrono.agregar("Matematica", "Ejercicios", "01/11/2026", "05/11/2026")
+
+Cada llamada corre la función sincrónica en un hilo aparte (asyncio.to_thread),
+así una consulta grande no frena el bucle de eventos mientras lo atiende.
+
+DEPENDENCIAS:
+- asyncio: Módulo estándar de Python (se importa recién al usar servicio.asincrono)
+- types: Módulo estándar para agrupar las funciones asincrónicas
+- eventos.py: El bloqueo del bus que hace atómica cada operación
+- deshacer.py: Cada operación queda como una sola en el historial (editar una
+  ocurrencia de una tarea recurrente primero la convierte en tarea)
+- gestor_tareas.py: Las tareas y las funciones que las modifican
+- consultas.py: Para consultar() con el lenguaje de consultas
+- historial.py: Para historial() y pendientes_en()
+- herramientas.py: Necesita validar_fecha() y string_a_fecha(), y mismo_instante()
+  para que cada consulta lea el reloj una sola vez
+
+¿POR QUÉ UN MÓDULO APARTE?
+- gestor_tareas guarda las tareas y mantiene los menús; este módulo es la
+  puerta de entrada sin interfaz, y se importa recién cuando se usa
+"""
+
+# Módulo estándar para agrupar las funciones asincrónicas
+from types import SimpleNamespace
+
+# Importa el bus de eventos (su bloqueo)
+import eventos
+# Importa el historial, para que cada operación se deshaga de una vez
+import deshacer
+# Importa las tareas y sus operaciones
+import gestor_tareas
+# Importa el lenguaje de consultas
+import consultas
+# Importa las versiones de las tareas (con otro nombre: historial() es una operación)
+import historial as _historial
+# Importa la validación de fechas
+from herramientas import validar_fecha, string_a_fecha, mismo_instante
+
+# ============================================
+# CONFIGURACIÓN
+# ============================================
+# Campos que se pueden cambiar con editar()
+CAMPOS_EDITABLES = ("materia", "tarea", "fecha_inicio", "fecha_fin", "observaciones", "estado")
+# Estados posibles de una tarea
+ESTADOS = ("En proceso", "Completada")
+
+# ============================================
+# VALIDACIÓN
+# ============================================
+
+def _validar_fechas(fecha_inicio, fecha_fin):
+    """Verifica el formato de las fechas y que el vencimiento no sea anterior al inicio
+
+    Raises:
+        ValueError: Con el mensaje para mostrar
+    """
+    for fecha in (fecha_inicio, fecha_fin):
+        if not validar_fecha(fecha):
+            raise ValueError(f"Fecha invalida: {fecha} (use DD/MM/AAAA)")
+    if string_a_fecha(fecha_fin) < string_a_fecha(fecha_inicio):
+        raise ValueError("La fecha de vencimiento no puede ser anterior a la fecha de inicio")
+
+def _buscar(codigo):
+    """Devuelve la tarea para cambiarla (una ocurrencia recurrente pasa a ser tarea)
+
+    Raises:
+        ValueError: Si no existe
+    """
+    info = gestor_tareas.obtener_tarea(codigo, materializar=True)
+    if info is None:
+        raise ValueError(f"No existe una tarea con el codigo {codigo}")
+    return info
+
+# ============================================
+# OPERACIONES
+# ============================================
+
+def obtener(codigo):
+    """Devuelve una copia de una tarea, o None si no existe (no la modifica)"""
+    with eventos.bloqueo():
+        info = gestor_tareas.obtener_tarea(codigo.upper())
+        return None if info is None else dict(info)
+
+def agregar(materia, tarea, fecha_inicio, fecha_fin, observaciones=""):
+    """Agrega una tarea
+
+    Args:
+        materia: Número de la materia, o su nombre (si no existe se crea)
+
+    Returns:
+        Copia de la tarea agregada (con su código)
+
+    Raises:
+        ValueError: Si falta la materia o la descripción, o las fechas no son válidas
+    """
+    if not materia:
+        raise ValueError("La materia es obligatoria")
+    if not tarea or not tarea.strip():
+        raise ValueError("La descripcion es obligatoria")
+    _validar_fechas(fecha_inicio, fecha_fin)
+    with deshacer.agrupar("Agregar tarea"):
+        # Sin observaciones (None) queda el texto vacío, como en agregar_tarea
+        codigo = gestor_tareas.agregar_tarea(materia, tarea.strip(), fecha_inicio, fecha_fin,
+                                             (observaciones or "").strip())
+        return dict(gestor_tareas.obtener_tarea(codigo))
+
+def editar(codigo, **cambios):
+    """Cambia algunos campos de una tarea
+
+    Ejemplo: editar("T001", fecha_fin="20/11/2026", estado="Completada")
+
+    Args:
+        cambios: Campos de CAMPOS_EDITABLES con su valor nuevo; "materia" es el
+                 número o el nombre de la materia
+
+    Returns:
+        Copia de la tarea ya editada
+
+    Raises:
+        ValueError: Si la tarea no existe o algún valor no es válido
+    """
+    desconocidos = set(cambios) - set(CAMPOS_EDITABLES)
+    if desconocidos:
+        raise ValueError(f"Campo(s) no editable(s): {', '.join(sorted(desconocidos))}")
+    # Los textos se guardan sin espacios de más, igual que en agregar()
+    if "tarea" in cambios:
+        cambios["tarea"] = (cambios["tarea"] or "").strip()
+        if not cambios["tarea"]:
+            raise ValueError("La descripcion es obligatoria")
+    if "observaciones" in cambios:
+        cambios["observaciones"] = (cambios["observaciones"] or "").strip()
+    if "estado" in cambios and cambios["estado"] not in ESTADOS:
+        raise ValueError(f"Estado invalido: {cambios['estado']}")
+    if "materia" in cambios and not cambios["materia"]:
+        raise ValueError("La materia es obligatoria")
+
+    codigo = codigo.upper()
+    with deshacer.agrupar(f"Editar {codigo}"):
+        info = _buscar(codigo)
+        if "fecha_inicio" in cambios or "fecha_fin" in cambios:
+            _validar_fechas(cambios.get("fecha_inicio", info["fecha_inicio"]),
+                            cambios.get("fecha_fin", info["fecha_fin"]))
+        gestor_tareas.editar_tarea(codigo, cambios)
+        return dict(info)
+
+def completar(codigo):
+    """Marca una tarea como completada
+
+    Returns:
+        Copia de la tarea
+
+    Raises:
+        ValueError: Si la tarea no existe
+    """
+    codigo = codigo.upper()
+    with deshacer.agrupar(f"Completar {codigo}"):
+        info = _buscar(codigo)
+        gestor_tareas.marcar_completada(codigo)
+        return dict(info)
+
+def eliminar(codigo):
+    """Elimina una tarea
+
+    Returns:
+        Copia de la tarea eliminada
+
+    Raises:
+        ValueError: Si la tarea no existe
+    """
+    codigo = codigo.upper()
+    with deshacer.agrupar(f"Eliminar {codigo}"):
+        info = dict(_buscar(codigo))
+        gestor_tareas.eliminar_tarea(codigo)
+        return info
+
+def borrar_todas():
+    """Borra todas las tareas del inquilino activo (se deshace de una vez)
+
+    Returns:
+        Cantidad de tareas borradas
+    """
+    with deshacer.agrupar("Borrar todas"):
+        return gestor_tareas.borrar_todas()
+
+def cargar_ejemplos():
+    """Agrega las tareas de ejemplo (algunas ya completadas), se deshace de una vez
+
+    Returns:
+        Lista con las copias de las tareas agregadas
+    """
+    with deshacer.agrupar("Cargar tareas de ejemplo"):
+        agregadas = []
+        for datos in gestor_tareas.tareas_de_ejemplo():
+            codigo = gestor_tareas.agregar_tarea(datos["materia"], datos["tarea"],
+                                                 datos["fecha_inicio"], datos["fecha_fin"],
+                                                 datos["observaciones"])
+            if datos["estado"] == "Completada":
+                gestor_tareas.marcar_completada(codigo)
+            agregadas.append(dict(gestor_tareas.obtener_tarea(codigo)))
+        return agregadas
+
+def consultar(consulta):
+    """Busca tareas con el lenguaje de consultas (ver consultas.py)
+
+    Args:
+        consulta: Expresión de texto ("materia:mate vence<=hoy+7") o
+                  diccionario armado con consultas.armar_consulta()
+
+    Returns:
+        Diccionario {codigo: copia de la tarea} en el orden pedido
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    # "hoy" es el mismo al leer la expresión y al revisar la caché de consultas
+    with mismo_instante():
+        if isinstance(consulta, str):
+            consulta = consultas.parsear(consulta)
+        with eventos.bloqueo():
+            return {codigo: dict(info) for codigo, info in consultas.ejecutar(consulta).items()}
+
+def historial(codigo):
+    """Devuelve los cambios de una tarea: qué cambió, cuándo y quién (ver historial.py)"""
+    with eventos.bloqueo():
+        return _historial.historial_de(codigo.upper())
+
+def pendientes_en(fecha):
+    """Devuelve las tareas pendientes al terminar ese día, como estaban entonces
+
+    Raises:
+        ValueError: Si la fecha no es válida
+    """
+    with eventos.bloqueo():
+        return _historial.pendientes_en(fecha)
+
+# ============================================
+# INTERFAZ ASINCRÓNICA
+# ============================================
+
+def _asincrona(funcion):
+    """Arma la versión para asyncio de una operación (corre en otro hilo)"""
+    async def asincrona(*argumentos, **opciones):
+        # Importación diferida: asyncio solo hace falta si se usa esta interfaz
+        import asyncio
+        return await asyncio.to_thread(funcion, *argumentos, **opciones)
+
+    asincrona.__name__ = funcion.__name__
+    asincrona.__doc__ = funcion.__doc__
+    return asincrona
+
+# Las mismas operaciones para usar con await (servicio.asincrono.agregar(...))
+asincrono = SimpleNamespace(**{funcion.__name__: _asincrona(funcion) for funcion in (
+    obtener, agregar, editar, completar, eliminar, borrar_todas, cargar_ejemplos, consultar,
+    historial, pendientes_en)})
@@ -0,0 +1,422 @@
+"""
+MÓDULO DE SNAPSHOT BINARIO
+Formato binario compacto para guardar y abrir rápidamente tareas y materias
+
+UTILIDAD:
+Guardar las tareas en JSON obliga a leer y convertir todo el archivo al
+arrancar, aunque después solo se consulte una tarea. Este formato usa registros
+de ancho fijo más un "heap" de textos, y se abre con mmap: el sistema operativo
+trae a memoria solo las páginas que se leen, y cada tarea se convierte en
+diccionario recién cuando alguien la pide.
+
+ESTRUCTURA DEL ARCHIVO:
+    [cabecera][registros de tareas][registros de materias][heap de textos]
+
+- Cabecera: firma "GTSB", versión, cantidades, posiciones de cada sección, el
+  siguiente número de código de tarea y el siguiente número de materia (para
+  no reutilizar números de materias eliminadas).
+- Registro de tarea (64 bytes): código (16 bytes), número de materia, posición
+  y largo de tarea, observaciones y UID de calendario (vacío si la tarea no
+  se importó de un .ics) dentro del heap, fechas como ordinales (0 = sin fecha),
+  estado (0 = En proceso, 1 = Completada) y número de secuencia del código.
+  Están ordenados por código, así una búsqueda binaria encuentra cualquier
+  tarea en O(log n) sin leer las demás.
+- Registro de materia (12 bytes): número, posición y largo del nombre.
+- Heap: todos los textos en UTF-8, uno detrás del otro. Los textos repetidos
+  se guardan una sola vez.
+
+ARCHIVOS ABIERTOS:
+En memoria acotada el snapshot queda abierto (las tareas leen de ahí sus
+textos) y se vuelve a guardar sobre el mismo archivo. Windows no deja
+reemplazar un archivo abierto o mapeado, así que guardar_snapshot():
+- Mapea el archivo nuevo y hace que las tareas lean de él (reubicar) antes
+  de reemplazar el viejo; lo suelta solo durante el reemplazo.
+- Si algún snapshot abierto todavía usa el archivo viejo (lo usan, por
+  ejemplo, tareas eliminadas que guardan deshacer.py o el historial), lo
+  pasa a una copia temporal, que se borra cuando ya nadie lo usa.
+
+DEPENDENCIAS:
+- struct: Módulo estándar de Python para empaquetar los registros binarios
+- mmap: Módulo estándar para mapear el archivo en memoria
+- os, datetime: Módulos estándar para reemplazar el archivo y convertir fechas
+- threading, weakref: Módulos estándar para cambiar el mapa de un snapshot
+  abierto sin cortar las lecturas de otros hilos, y para saber cuáles siguen abiertos
+- shutil, tempfile: Módulos estándar para las copias de los snapshots viejos
+  (se importan recién cuando hace falta una)
+- herramientas.py: Necesita string_a_fecha() para pasar las fechas a ordinales
+- cache_textos.py: En modo de memoria acotada, cada tarea se lee como una
+  TareaCompacta que trae sus textos del heap recién cuando se piden
+
+¿POR QUÉ NO DEPENDE DE gestor_tareas.py?
+- gestor_tareas.py usa este módulo para cargar y guardar; recibe y devuelve
+  diccionarios comunes para no generar una dependencia circular
+"""
+
+# Módulo estándar para empaquetar y desempaquetar datos binarios
+import struct
+# Módulo estándar para mapear archivos en memoria
+import mmap
+# Módulo estándar para reemplazar el archivo de forma atómica
+import os
+# Módulo estándar para convertir ordinales en fechas
+from datetime import date
+# Módulo estándar para el candado de cada snapshot abierto
+import threading
+# Módulo estándar para seguir los snapshots abiertos sin retenerlos
+import weakref
+
+# Importa la conversión de texto a fecha
+from herramientas import string_a_fecha
+# Importa la tarea que lee sus textos del heap cuando se piden
+from cache_textos import TareaCompacta
+
+# ============================================
+# FORMATO
+# ============================================
+# Firma al comienzo del archivo para reconocer el formato
+FIRMA = b"GTSB"
+# Versión del formato (cambiarla si cambia la estructura)
+VERSION = 5
+# Cabecera: firma, versión, cantidad de tareas, cantidad de materias,
+# posición de tareas, posición de materias, posición del heap, siguiente número
+# de tarea, siguiente número de materia
+CABECERA = struct.Struct("<4sHxxIIQQQII")
+# Registro de tarea: código, materia, (pos, largo) x3, fecha inicio, fecha fin,
+# estado, secuencia
+REGISTRO_TAREA = struct.Struct("<16sIIIIIIIiiB3xQ")
+# Registro de materia: número, posición y largo del nombre
+REGISTRO_MATERIA = struct.Struct("<III")
+# Largo máximo del código de una tarea
+LARGO_CODIGO = 16
+
+# Estados guardados como un byte
+ESTADOS = ["En proceso", "Completada"]
+
+# Snapshots abiertos (se van solos de acá cuando ya nadie los usa)
+_abiertos = weakref.WeakSet()
+
+# ============================================
+# ESCRITURA
+# ============================================
+
+def _fecha_a_ordinal(fecha_str):
+    """Convierte DD/MM/AAAA en ordinal (0 si no es una fecha válida)"""
+    fecha = string_a_fecha(fecha_str or "")
+    return fecha.toordinal() if fecha else 0
+
+def _ordinal_a_fecha(ordinal):
+    """Convierte un ordinal en DD/MM/AAAA ("" si es 0)"""
+    return date.fromordinal(ordinal).strftime("%d/%m/%Y") if ordinal else ""
+
+def guardar_snapshot(ruta, tareas, materias, siguiente_numero, siguiente_materia=0,
+                     reubicar=None):
+    """Guarda tareas y materias en un archivo binario
+
+    Escribe primero a un archivo temporal y después lo reemplaza, así un corte
+    a mitad de camino no deja un snapshot roto.
+
+    Args:
+        ruta: Ruta del archivo a generar
+        tareas: Diccionario {codigo: datos_tarea}
+        materias: Diccionario {numero: nombre}
+        siguiente_numero: Próximo número a usar para generar códigos
+        siguiente_materia: Próximo número de materia (0 = calcularlo del catálogo)
+        reubicar: Función que recibe el snapshot nuevo ya abierto, para que las
+                  tareas compactas lean de él antes de reemplazar el viejo
+
+    Returns:
+        El snapshot nuevo abierto si se pasó reubicar, o None
+    """
+    heap = bytearray()
+    # Posición de cada texto ya guardado, para no repetirlo
+    textos_guardados = {}
+
+    def guardar_texto(texto):
+        # Devuelve (posición, largo) del texto dentro del heap
+        if texto not in textos_guardados:
+            datos = texto.encode("utf-8")
+            textos_guardados[texto] = (len(heap), len(datos))
+            heap.extend(datos)
+        return textos_guardados[texto]
+
+    # Ordinal de cada fecha ya convertida (hay muchas fechas repetidas)
+    ordinales = {}
+
+    def ordinal(fecha_str):
+        if fecha_str not in ordinales:
+            ordinales[fecha_str] = _fecha_a_ordinal(fecha_str)
+        return ordinales[fecha_str]
+
+    registros_tareas = bytearray()
+    # Ordenado por código (en bytes) para permitir la búsqueda binaria
+    for codigo in sorted(tareas, key=lambda c: c.encode("utf-8")):
+        info = tareas[codigo]
+        codigo_bytes = codigo.encode("utf-8")
+        if len(codigo_bytes) > LARGO_CODIGO:
+            raise ValueError(f"Codigo demasiado largo para el snapshot: {codigo}")
+        registros_tareas.extend(REGISTRO_TAREA.pack(
+            codigo_bytes,
+            info.get("materia_id", 0),
+            *guardar_texto(info.get("tarea", "")),
+            *guardar_texto(info.get("observaciones", "")),
+            *guardar_texto(info.get("uid", "")),
+            ordinal(info.get("fecha_inicio")),
+            ordinal(info.get("fecha_fin")),
+            1 if info.get("estado") == "Completada" else 0,
+            info.get("secuencia", 0),
+        ))
+
+    registros_materias = bytearray()
+    for numero, nombre in materias.items():
+        registros_materias.extend(REGISTRO_MATERIA.pack(numero, *guardar_texto(nombre)))
+
+    # Calcula dónde empieza cada sección
+    posicion_tareas = CABECERA.size
+    posicion_materias = posicion_tareas + len(registros_tareas)
+    posicion_heap = posicion_materias + len(registros_materias)
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(CABECERA.pack(FIRMA, VERSION, len(tareas), len(materias),
+                                    posicion_tareas, posicion_materias,
+                                    posicion_heap, siguiente_numero,
+                                    siguiente_materia))
+        archivo.write(registros_tareas)
+        archivo.write(registros_materias)
+        archivo.write(heap)
+
+    if reubicar is None:
+        _liberar(ruta)
+        os.replace(temporal, ruta)
+        return None
+
+    nuevo = SnapshotBinario(temporal)
+    reubicar(nuevo)
+    # Las lecturas del snapshot nuevo esperan mientras se reemplaza el archivo
+    with nuevo._candado:
+        nuevo._soltar()
+        _liberar(ruta)
+        os.replace(temporal, ruta)
+        nuevo._abrir(ruta)
+    return nuevo
+
+def _liberar(ruta):
+    """Pasa a una copia los snapshots abiertos sobre un archivo que se va a reemplazar"""
+    ruta = os.path.abspath(ruta)
+    for snapshot in list(_abiertos):
+        if snapshot.ruta == ruta:
+            snapshot._mudar_a_copia()
+
+# ============================================
+# LECTURA
+# ============================================
+
+class SnapshotBinario:
+    """Snapshot abierto con mmap; lee registros solo cuando se piden"""
+
+    def __init__(self, ruta):
+        """Abre el archivo y valida la cabecera (no lee ninguna tarea)
+
+        Raises:
+            ValueError: Si el archivo no es un snapshot válido
+        """
+        # Protege el mapa: guardar_snapshot() lo puede cambiar de archivo
+        self._candado = threading.Lock()
+        self._mapa = None
+        # True si el archivo es una copia temporal que se borra al cerrar
+        self._borrar_al_cerrar = False
+        self._abrir(ruta)
+
+        (firma, version, self.cantidad_tareas, self.cantidad_materias,
+         self._pos_tareas, self._pos_materias, self._pos_heap,
+         self.siguiente_numero, self.siguiente_materia) = CABECERA.unpack_from(self._mapa, 0)
+
+        if firma != FIRMA or version != VERSION:
+            self.cerrar()
+            raise ValueError("El archivo no es un snapshot compatible")
+        # Texto de cada fecha ya convertida {ordinal: "DD/MM/AAAA"}
+        self._fechas = {}
+        _abiertos.add(self)
+
+    def _abrir(self, ruta):
+        """Abre y mapea el archivo (con el candado tomado, o al crear el objeto)"""
+        self.ruta = os.path.abspath(ruta)
+        self._archivo = open(ruta, "rb")
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap no acepta archivos vacíos
+            self._archivo.close()
+            raise ValueError("El snapshot esta vacio")
+
+    def _soltar(self):
+        """Cierra el mapa y el archivo (con el candado tomado)"""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._archivo.close()
+            self._mapa = None
+
+    def _mudar_a_copia(self):
+        """Pasa a leer de una copia temporal del archivo (el original se va a reemplazar)"""
+        # Importación diferida: solo se necesitan si un snapshot viejo sigue en uso
+        import shutil
+        import tempfile
+
+        with self._candado:
+            if self._mapa is None:
+                return
+            descriptor, copia = tempfile.mkstemp(prefix="snapshot-", suffix=".snap")
+            with os.fdopen(descriptor, "wb") as destino, open(self.ruta, "rb") as origen:
+                shutil.copyfileobj(origen, destino)
+            self._soltar()
+            self._abrir(copia)
+            self._borrar_al_cerrar = True
+
+    def __len__(self):
+        """Cantidad de tareas guardadas"""
+        return self.cantidad_tareas
+
+    def _texto(self, posicion, largo):
+        """Lee un texto del heap"""
+        inicio = self._pos_heap + posicion
+        with self._candado:
+            datos = self._mapa[inicio:inicio + largo]
+        return datos.decode("utf-8")
+
+    def _codigo_en(self, indice):
+        """Lee solo el código del registro en esa posición"""
+        inicio = self._pos_tareas + indice * REGISTRO_TAREA.size
+        with self._candado:
+            return self._mapa[inicio:inicio + LARGO_CODIGO]
+
+    def _registro_en(self, indice):
+        """Desempaqueta el registro de tarea en esa posición"""
+        with self._candado:
+            return REGISTRO_TAREA.unpack_from(self._mapa,
+                                              self._pos_tareas + indice * REGISTRO_TAREA.size)
+
+    def _fecha(self, ordinal):
+        """Convierte un ordinal en DD/MM/AAAA, compartiendo el texto entre tareas"""
+        # Muchas tareas tienen la misma fecha: en memoria queda un solo texto por fecha
+        fecha = self._fechas.get(ordinal)
+        if fecha is None:
+            fecha = self._fechas[ordinal] = _ordinal_a_fecha(ordinal)
+        return fecha
+
+    def _tarea_en(self, indice, compacta=False):
+        """Convierte el registro en esa posición en un diccionario de tarea
+
+        Args:
+            compacta: True devuelve una TareaCompacta (sin tarea ni
+                      observaciones, que se leen cuando se piden)
+        """
+        (codigo, materia_id, pos_tarea, largo_tarea, pos_obs, largo_obs,
+         pos_uid, largo_uid, inicio, fin, estado, secuencia) = self._registro_en(indice)
+
+        codigo = codigo.rstrip(b"\0").decode("utf-8")
+        if compacta:
+            campos = {
+                "materia_id": materia_id,
+                "fecha_inicio": self._fecha(inicio),
+                "fecha_fin": self._fecha(fin),
+                "estado": ESTADOS[estado],
+                "codigo": codigo,
+                "secuencia": secuencia,
+            }
+            if largo_uid:
+                campos["uid"] = self._texto(pos_uid, largo_uid)
+            return TareaCompacta(campos, self, indice)
+
+        tarea = {
+            "materia_id": materia_id,
+            "tarea": self._texto(pos_tarea, largo_tarea),
+            "fecha_inicio": _ordinal_a_fecha(inicio),
+            "fecha_fin": _ordinal_a_fecha(fin),
+            "estado": ESTADOS[estado],
+            "codigo": codigo,
+            "secuencia": secuencia,
+            "observaciones": self._texto(pos_obs, largo_obs),
+        }
+        # Solo las importadas de un calendario tienen UID
+        if largo_uid:
+            tarea["uid"] = self._texto(pos_uid, largo_uid)
+        return tarea
+
+    def _textos_en(self, indice):
+        """Lee (tarea, observaciones) del registro en esa posición"""
+        registro = self._registro_en(indice)
+        return self._texto(registro[2], registro[3]), self._texto(registro[4], registro[5])
+
+    def _prefijo_en(self, indice, campo, largo):
+        """Lee solo los primeros `largo` caracteres de tarea u observaciones"""
+        registro = self._registro_en(indice)
+        posicion, largo_bytes = (registro[2], registro[3]) if campo == "tarea" else (registro[4], registro[5])
+        # Un carácter ocupa a lo sumo 4 bytes en UTF-8; si el corte parte un
+        # carácter, "ignore" lo descarta y sobra con los anteriores
+        inicio = self._pos_heap + posicion
+        with self._candado:
+            datos = self._mapa[inicio:inicio + min(largo_bytes, largo * 4)]
+        return datos.decode("utf-8", "ignore")[:largo]
+
+    def buscar(self, codigo, compacta=False):
+        """Busca una tarea por código con búsqueda binaria
+
+        Args:
+            compacta: True la devuelve como TareaCompacta (ver _tarea_en)
+
+        Returns:
+            Diccionario con la tarea, o None si no está en el snapshot
+        """
+        clave = codigo.encode("utf-8").ljust(LARGO_CODIGO, b"\0")
+        bajo, alto = 0, self.cantidad_tareas
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self._codigo_en(medio) < clave:
+                bajo = medio + 1
+            else:
+                alto = medio
+        if bajo < self.cantidad_tareas and self._codigo_en(bajo) == clave:
+            return self._tarea_en(bajo, compacta)
+        return None
+
+    def tareas(self, compactas=False):
+        """Recorre todas las tareas, una por una, en orden de código"""
+        for indice in range(self.cantidad_tareas):
+            yield self._tarea_en(indice, compactas)
+
+    def materias(self):
+        """Devuelve el catálogo de materias guardado {numero: nombre}"""
+        catalogo = {}
+        for indice in range(self.cantidad_materias):
+            with self._candado:
+                numero, posicion, largo = REGISTRO_MATERIA.unpack_from(
+                    self._mapa, self._pos_materias + indice * REGISTRO_MATERIA.size)
+            catalogo[numero] = self._texto(posicion, largo)
+        return catalogo
+
+    def cerrar(self):
+        """Libera el mapa en memoria y el archivo (y lo borra si era una copia)"""
+        with self._candado:
+            self._soltar()
+            if self._borrar_al_cerrar:
+                self._borrar_al_cerrar = False
+                os.remove(self.ruta)
+        _abiertos.discard(self)
+
+    def __del__(self):
+        # Cuando ya nadie lo usa (por ejemplo tareas compactas de un snapshot
+        # viejo que se descartaron) se libera solo
+        if getattr(self, "_candado", None) is not None:
+            try:
+                self.cerrar()
+            except Exception:
+                # Al terminar el programa los módulos ya pueden estar descargados
+                pass
+
+def abrir_snapshot(ruta):
+    """Abre un snapshot binario sin cargar sus tareas
+
+    Returns:
+        Objeto SnapshotBinario listo para consultar
+    """
+    return SnapshotBinario(ruta)
@@ -0,0 +1,52 @@
+"""
+AYUDAS PARA LAS PRUEBAS
+Caso base que le da a cada prueba sus propias tareas
+
+UTILIDAD:
+El estado del programa vive en variables de cada módulo (tareas_colegio, los
+índices, el contador de códigos, el historial...). Para que las pruebas no se
+pisen entre sí, cada una trabaja en un inquilino nuevo (ver inquilinos.py):
+empieza sin tareas, con su propio catálogo, y al terminar se vuelve al general.
+
+DEPENDENCIAS:
+- unittest, tempfile, itertools: Módulos estándar de Python
+- inquilinos.py, eventos.py: Para crear y activar el inquilino de cada prueba
+- deshacer.py, historial.py, recurrencias.py: Se importan para que se suscriban
+  al bus igual que cuando corre el programa
+"""
+
+# Módulo estándar con el caso base de las pruebas
+import unittest
+# Módulo estándar para los archivos que genera cada prueba
+import tempfile
+# Módulo estándar para numerar los inquilinos de prueba
+import itertools
+
+# Importa los módulos que arman cada inquilino
+import eventos
+import inquilinos
+# Importa los módulos que se suscriben al bus al importarse
+import deshacer
+import historial
+import recurrencias
+
+# Número del próximo inquilino de prueba
+_numeros = itertools.count(1)
+
+class CasoConInquilino(unittest.TestCase):
+    """Prueba que corre en un inquilino vacío, con un directorio temporal"""
+
+    def setUp(self):
+        self.inquilino = inquilinos.crear(f"prueba{next(_numeros)}", "escuela",
+                                          catalogo_propio=True)
+        inquilinos.activar(self.inquilino)
+        deshacer.vaciar()
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.directorio = temporal.name
+
+    def tearDown(self):
+        # Los suscriptores asincrónicos terminan antes de cambiar de inquilino
+        eventos.esperar_pendientes()
+        deshacer.vaciar()
+        inquilinos.activar(inquilinos.GENERAL)
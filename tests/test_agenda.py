@@ -0,0 +1,83 @@
+"""
+PRUEBAS DE LA AGENDA
+La carga por día coincide con contar las tareas pendientes una por una
+"""
+
+# Módulos estándar para el caso base y las fechas
+import unittest
+from datetime import date
+
+# Importa los módulos que se prueban
+import agenda
+import eventos
+import gestor_tareas
+import recurrencias
+import servicio
+from herramientas import fijar_reloj, string_a_fecha
+from ayudas import CasoConInquilino
+
+class PruebaCargaPorDia(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        self.desde = date(2026, 10, 1).toordinal()
+        self.hasta = date(2026, 11, 30).toordinal()
+        # Tareas que empiezan antes de la ventana, terminan después, duran un
+        # día, están completadas o no tienen un inicio válido
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": "Historia", "tarea": f"Tarea {numero}",
+             "fecha_inicio": inicio, "fecha_fin": fin}
+            for numero, (inicio, fin) in enumerate([
+                ("20/09/2026", "05/10/2026"), ("01/10/2026", "01/10/2026"),
+                ("15/10/2026", "20/10/2026"), ("18/10/2026", "18/10/2026"),
+                ("25/11/2026", "10/12/2026"), ("01/09/2026", "31/12/2026"),
+                ("10/10/2026", "31/10/2026"), ("sin fecha", "22/10/2026")])])
+        gestor_tareas.marcar_completada(self.codigos[6])
+
+    def _a_mano(self):
+        """Cuenta cada día recorriendo todas las tareas y ocurrencias pendientes"""
+        with eventos.bloqueo():
+            pendientes = [info for info in gestor_tareas.obtener_tareas().values()
+                          if info["estado"] == "En proceso"]
+            pendientes += [info for _, info in recurrencias.ocurrencias(
+                self.desde, self.hasta + recurrencias.duracion_maxima())]
+        dias = []
+        for ordinal in range(self.desde, self.hasta + 1):
+            en_curso = vencen = 0
+            for info in pendientes:
+                fin = string_a_fecha(info["fecha_fin"]).toordinal()
+                # Sin un inicio válido cuenta solo el día en que vence
+                inicio = string_a_fecha(info["fecha_inicio"])
+                inicio = inicio.toordinal() if inicio else fin
+                en_curso += inicio <= ordinal <= fin
+                vencen += fin == ordinal
+            dias.append((ordinal, en_curso, vencen))
+        return dias
+
+    def _comparar(self):
+        self.assertEqual(agenda.carga_por_dia(self.desde, self.hasta), self._a_mano())
+
+    def test_sin_recurrentes(self):
+        self._comparar()
+        # Los cambios llegan por eventos, sin volver a armar la estructura
+        servicio.editar(self.codigos[2], fecha_inicio="01/10/2026", fecha_fin="03/11/2026")
+        servicio.completar(self.codigos[0])
+        servicio.eliminar(self.codigos[5])
+        servicio.agregar("Ingles", "Lectura", "30/10/2026", "02/11/2026")
+        self._comparar()
+
+    def test_con_recurrentes(self):
+        gestor_tareas.agregar_tarea_recurrente("Matematica", "Guia", "02/10/2026",
+                                               hasta="25/11/2026", cada=3, duracion=2)
+        gestor_tareas.agregar_tarea_recurrente("Ingles", "Vocabulario", "28/09/2026",
+                                               dias_semana=(0, 3), duracion=5)
+        self._comparar()
+        # Completar una ocurrencia la convierte en tarea (ya no se cuenta)
+        servicio.completar("R1-20261014")
+        servicio.editar("R2-20261029", fecha_fin="06/11/2026")
+        self._comparar()
+
+if __name__ == "__main__":
+    unittest.main()
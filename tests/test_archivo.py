@@ -0,0 +1,73 @@
+"""
+PRUEBAS DEL ARCHIVO
+Archivar las tareas viejas no cambia las estadísticas y se pueden seguir buscando
+"""
+
+# Módulos estándar para el caso base y las rutas
+import os
+import unittest
+
+# Importa los módulos que se prueban
+import archivo
+import gestor_tareas
+from herramientas import fijar_reloj
+from ayudas import CasoConInquilino
+
+class PruebaArchivarViejas(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        # El archivo del inquilino de la prueba va al directorio temporal
+        self.ruta = os.path.join(self.directorio, "viejas.jsonl.gz")
+        archivo.configurar(self.ruta)
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": materia, "tarea": tarea, "fecha_inicio": "01/06/2026",
+             "fecha_fin": fin}
+            for materia, tarea, fin in [
+                ("Historia", "Resumen del capitulo 1", "10/08/2026"),
+                ("Historia", "Mapa de Europa", "18/09/2026"),
+                ("Ingles", "Lectura", "19/09/2026"),
+                ("Matematica", "Guia de ejercicios", "01/09/2026"),
+                ("Matematica", "Resumen de funciones", "15/10/2026")]])
+        gestor_tareas.marcar_completada(self.codigos[0])
+        gestor_tareas.marcar_completada(self.codigos[4])
+
+    def test_las_estadisticas_no_cambian(self):
+        antes = gestor_tareas.obtener_estadisticas()
+        self.assertEqual((antes["total"], antes["completadas"], antes["archivadas"]), (5, 2, 0))
+        # Vencieron hace más de 30 días: antes del 19/09/2026
+        self.assertEqual(gestor_tareas.archivar_tareas_viejas(), 3)
+        self.assertEqual(sorted(gestor_tareas.obtener_tareas()),
+                         [self.codigos[2], self.codigos[4]])
+        despues = gestor_tareas.obtener_estadisticas()
+        self.assertEqual(despues, dict(antes, archivadas=3))
+        # Sin nada viejo no se toca el archivo
+        self.assertEqual(gestor_tareas.archivar_tareas_viejas(), 0)
+        self.assertEqual(gestor_tareas.obtener_estadisticas(), despues)
+
+    def test_el_resumen_se_lee_del_disco(self):
+        gestor_tareas.archivar_tareas_viejas()
+        # Como al volver a abrir el programa: el resumen se lee de nuevo
+        archivo.configurar(self.ruta)
+        self.assertEqual(archivo.obtener_resumen(), {
+            "total": 3, "completadas": 1,
+            "por_materia": {"Historia": 2, "Matematica": 1}})
+        self.assertEqual(gestor_tareas.obtener_estadisticas()["total"], 5)
+
+    def test_varios_archivados_se_buscan_juntos(self):
+        gestor_tareas.archivar_tareas_viejas()
+        fijar_reloj("01/12/2026")
+        self.assertEqual(gestor_tareas.archivar_tareas_viejas(), 2)
+        self.assertEqual(gestor_tareas.obtener_tareas(), {})
+        self.assertEqual(gestor_tareas.obtener_estadisticas()["completadas"], 2)
+        # Cada tarea archivada guarda el nombre de su materia
+        encontradas = gestor_tareas.buscar_en_archivo("resumen")
+        self.assertEqual(list(encontradas), [self.codigos[0], self.codigos[4]])
+        self.assertEqual(encontradas[self.codigos[4]]["materia"], "Matematica")
+        self.assertEqual(list(gestor_tareas.buscar_en_archivo("estado:pendiente orden:-vence")),
+                         [self.codigos[2], self.codigos[1], self.codigos[3]])
+
+if __name__ == "__main__":
+    unittest.main()
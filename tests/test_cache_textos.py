@@ -0,0 +1,143 @@
+"""
+PRUEBAS DEL MODO DE MEMORIA ACOTADA
+Tareas compactas que leen sus textos del snapshot cuando se piden
+"""
+
+# Módulos estándar para el caso base, las rutas y simular Windows
+import gc
+import os
+import unittest
+from unittest import mock
+
+# Importa los módulos que se prueban
+import cache_textos
+import deshacer
+import eventos
+import gestor_tareas
+import historial
+import inquilinos
+import servicio
+import snapshot_binario
+from cache_textos import TareaCompacta
+from ayudas import CasoConInquilino
+
+class PruebaMemoriaAcotada(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        for numero in range(5):
+            gestor_tareas.agregar_tarea("Historia", f"Tarea {numero} " + "texto " * 40,
+                                        "01/10/2026", "20/10/2026", f"Nota {numero}")
+        self.esperadas = {codigo: dict(info)
+                          for codigo, info in gestor_tareas.obtener_tareas().items()}
+        self.ruta = os.path.join(self.directorio, "tareas.snap")
+        gestor_tareas.guardar_snapshot(self.ruta)
+
+        # Otro inquilino abre el snapshot en memoria acotada
+        gestor_tareas.configurar_memoria_acotada(64 * 1024)
+        self.addCleanup(gestor_tareas.configurar_memoria_acotada, None)
+        otro = inquilinos.crear(self.inquilino.split("/")[-1] + "b", "escuela")
+        inquilinos.activar(otro)
+        gestor_tareas.cargar_snapshot(self.ruta)
+        # Al terminar se cargan las que falten, compactas como las demás (otras
+        # pruebas recorren todos los inquilinos ya sin memoria acotada)
+        self.addCleanup(self._terminar_de_cargar, otro)
+
+    def _terminar_de_cargar(self, inquilino):
+        with inquilinos.usar(inquilino):
+            gestor_tareas.obtener_tareas()
+
+    def _sin_textos(self, info):
+        """Indica si la tarea es compacta y no tiene textos guardados"""
+        return (isinstance(info, TareaCompacta)
+                and not any(dict.__contains__(info, campo)
+                            for campo in cache_textos.CAMPOS_DIFERIDOS))
+
+    def test_las_tareas_son_compactas_y_se_leen_completas(self):
+        tareas = gestor_tareas.obtener_tareas()
+        self.assertTrue(all(self._sin_textos(info) for info in tareas.values()))
+        self.assertEqual(tareas, self.esperadas)
+        codigo = next(iter(self.esperadas))
+        self.assertEqual(dict(tareas[codigo]), self.esperadas[codigo])
+        self.assertEqual(tareas[codigo].copy(), self.esperadas[codigo])
+        self.assertEqual(cache_textos.prefijo(tareas[codigo], "tarea", 7), "Tarea 0")
+
+    def test_los_eventos_de_carga_no_llevan_textos(self):
+        publicadas = []
+        def anotar(evento):
+            if evento["tipo"] == "cargadas":
+                publicadas.extend(cambio["despues"] for cambio in evento["cambios"])
+        eventos.suscribir(anotar, sincronico=True)
+        self.addCleanup(eventos.desuscribir, anotar)
+
+        tareas = gestor_tareas.obtener_tareas()
+        self.assertEqual(len(publicadas), len(self.esperadas))
+        self.assertTrue(all(self._sin_textos(info) for info in publicadas))
+        # Son copias: cambiar la tarea no cambia lo publicado
+        self.assertFalse(any(info is tareas[info["codigo"]] for info in publicadas))
+
+    def test_editar_guarda_el_texto_en_la_tarea(self):
+        codigo = next(iter(self.esperadas))
+        servicio.editar(codigo, tarea="Texto nuevo")
+        self.assertEqual(gestor_tareas.obtener_tarea(codigo)["tarea"], "Texto nuevo")
+        self.assertEqual(gestor_tareas.obtener_tarea(codigo)["observaciones"], "Nota 0")
+
+    def test_el_presupuesto_acota_la_cache(self):
+        cache_textos.configurar(300)
+        self.addCleanup(cache_textos.configurar, 64 * 1024)
+        for info in gestor_tareas.obtener_tareas().values():
+            info["tarea"]
+        self.assertLessEqual(cache_textos.obtener_metricas()["bytes"], 300)
+        with self.assertRaises(ValueError):
+            cache_textos.configurar(-1)
+
+    def test_guardar_sobre_el_archivo_abierto(self):
+        # Como en Windows: no se puede reemplazar un archivo abierto o mapeado
+        reemplazar = os.replace
+        def reemplazar_como_windows(origen, destino):
+            mapeados = {snapshot.ruta for snapshot in list(snapshot_binario._abiertos)
+                        if snapshot._mapa is not None}
+            self.assertNotIn(os.path.abspath(origen), mapeados)
+            self.assertNotIn(os.path.abspath(destino), mapeados)
+            reemplazar(origen, destino)
+        parche = mock.patch.object(snapshot_binario.os, "replace", reemplazar_como_windows)
+
+        eliminada, editada = list(self.esperadas)[:2]
+        servicio.eliminar(eliminada)
+        servicio.editar(editada, tarea="Texto nuevo")
+        esperadas = {codigo: dict(info) for codigo, info in self.esperadas.items()
+                     if codigo != eliminada}
+        esperadas[editada]["tarea"] = "Texto nuevo"
+        with parche:
+            gestor_tareas.guardar_snapshot(self.ruta)
+
+        tareas = gestor_tareas.obtener_tareas()
+        self.assertTrue(all(self._sin_textos(info) for info in tareas.values()))
+        self.assertEqual(tareas, esperadas)
+        # La tarea eliminada sigue leyendo sus textos del archivo viejo (una copia)
+        viejos = [snapshot for snapshot in list(snapshot_binario._abiertos)
+                  if snapshot._borrar_al_cerrar]
+        self.assertEqual(len(viejos), 1)
+        deshacer.deshacer()
+        deshacer.deshacer()
+        self.assertEqual(gestor_tareas.obtener_tareas(), self.esperadas)
+        copia = viejos[0].ruta
+        del viejos
+        self.assertTrue(os.path.exists(copia))
+
+        # Al volver a guardar, las tareas restauradas pasan al archivo nuevo
+        with parche:
+            gestor_tareas.guardar_snapshot(self.ruta)
+        snapshot = snapshot_binario.abrir_snapshot(self.ruta)
+        self.addCleanup(snapshot.cerrar)
+        self.assertEqual({info["codigo"]: info for info in snapshot.tareas()}, self.esperadas)
+        # La copia se borra cuando ya nadie la usa (el historial guardado al
+        # lado la leyó, así que también queda en la caché de textos)
+        historial.vaciar()
+        deshacer.vaciar()
+        cache_textos.vaciar()
+        gc.collect()
+        self.assertFalse(os.path.exists(copia))
+
+if __name__ == "__main__":
+    unittest.main()
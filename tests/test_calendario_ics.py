@@ -0,0 +1,81 @@
+"""
+PRUEBAS DEL CALENDARIO ICS
+Exportar e importar devuelve las mismas tareas, con líneas partidas y textos
+escapados, sin duplicar lo que ya se importó
+"""
+
+# Módulos estándar para el caso base y las rutas
+import os
+import unittest
+
+# Importa los módulos que se prueban
+import calendario_ics
+import gestor_tareas
+import inquilinos
+from gestor_materias import nombre_materia
+from ayudas import CasoConInquilino
+
+class PruebaIdaYVuelta(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.otro = inquilinos.crear("otro", "curso", padre=self.inquilino)
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": "Educación Física, Deportes", "tarea": "Práctica; carrera\\postas",
+             "fecha_inicio": "01/10/2026", "fecha_fin": "20/10/2026",
+             "observaciones": "Línea 1\r\nLínea 2\rLínea 3\nLínea 4"},
+            {"materia": "Historia", "tarea": "Resumen del capítulo" + " ñandú" * 30,
+             "fecha_inicio": "05/10/2026", "fecha_fin": "05/10/2026"},
+        ])
+        self.ruta = os.path.join(self.directorio, "tareas.ics")
+
+    def _datos(self, tareas):
+        """Los campos que viajan en el calendario, por descripción"""
+        return {info["tarea"]: (nombre_materia(info["materia_id"]), info["fecha_inicio"],
+                                info["fecha_fin"], info.get("observaciones", ""))
+                for info in tareas.values()}
+
+    def test_lineas_partidas_y_terminadas_en_crlf(self):
+        self.assertEqual(calendario_ics.exportar(self.ruta), 2)
+        with open(self.ruta, "rb") as archivo:
+            contenido = archivo.read()
+        lineas = contenido.split(b"\r\n")
+        self.assertEqual(lineas[-1], b"")
+        # Ningún CR ni LF suelto, ninguna línea de más de 75 bytes
+        self.assertFalse(any(b"\r" in linea or b"\n" in linea for linea in lineas))
+        self.assertTrue(all(len(linea) <= calendario_ics.LARGO_LINEA for linea in lineas))
+        self.assertTrue(any(linea.startswith(b" ") for linea in lineas))
+        # Se parte sin cortar una letra de varios bytes
+        for linea in lineas:
+            linea.decode("utf-8")
+
+    def test_importar_lo_exportado_da_las_mismas_tareas(self):
+        esperadas = self._datos(gestor_tareas.obtener_tareas())
+        # Los saltos de línea de Windows y los CR sueltos vuelven como saltos comunes
+        esperadas["Práctica; carrera\\postas"] = esperadas["Práctica; carrera\\postas"][:3] + (
+            "Línea 1\nLínea 2\nLínea 3\nLínea 4",)
+        calendario_ics.exportar(self.ruta)
+        with inquilinos.usar(self.otro):
+            resultado = calendario_ics.importar(self.ruta)
+            self.assertEqual(resultado, {"agregadas": 2, "repetidas": 0, "omitidas": 0})
+            self.assertEqual(self._datos(gestor_tareas.obtener_tareas()), esperadas)
+
+    def test_no_duplica_entre_inquilinos(self):
+        calendario_ics.exportar(self.ruta)
+        # Son tareas propias que todavía existen: no se agregan de nuevo
+        self.assertEqual(calendario_ics.importar(self.ruta)["repetidas"], 2)
+        with inquilinos.usar(self.otro):
+            self.assertEqual(calendario_ics.importar(self.ruta)["agregadas"], 2)
+            self.assertEqual(calendario_ics.importar(self.ruta)["repetidas"], 2)
+            # Las importadas conservan el UID original al volver a exportarse
+            uids = {info["uid"] for info in gestor_tareas.obtener_tareas().values()}
+            self.assertEqual(uids, {calendario_ics.uid_propio(codigo, self.inquilino)
+                                    for codigo in self.codigos})
+            vuelta = os.path.join(self.directorio, "vuelta.ics")
+            calendario_ics.exportar(vuelta)
+        self.assertEqual(calendario_ics.importar(vuelta),
+                         {"agregadas": 0, "repetidas": 2, "omitidas": 0})
+        self.assertEqual(len(gestor_tareas.obtener_tareas()), 2)
+
+if __name__ == "__main__":
+    unittest.main()
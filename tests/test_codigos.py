@@ -0,0 +1,55 @@
+"""
+PRUEBAS DE LOS CÓDIGOS
+Códigos crecientes que no se reutilizan y se ordenan por secuencia
+"""
+
+# Módulo estándar con el caso base
+import unittest
+
+# Importa los módulos que se prueban
+import codigos
+import gestor_tareas
+import servicio
+from ayudas import CasoConInquilino
+
+class PruebaCodigos(CasoConInquilino):
+
+    def _agregar(self, tarea="Resumen"):
+        return gestor_tareas.agregar_tarea("Historia", tarea, "01/10/2026", "20/10/2026")
+
+    def test_despues_de_t999_sigue_t1000_y_se_ordena_despues(self):
+        codigos.restaurar(998)
+        agregados = [self._agregar() for _ in range(3)]
+        self.assertEqual(agregados, ["T998", "T999", "T1000"])
+        # Como texto "T1000" va antes que "T998"; por secuencia va al final
+        ordenados = sorted(gestor_tareas.obtener_tareas().items(), key=codigos.clave_orden)
+        self.assertEqual([codigo for codigo, _ in ordenados], agregados)
+
+    def test_no_reutiliza_codigos_borrados(self):
+        primero, segundo = self._agregar(), self._agregar()
+        gestor_tareas.eliminar_tarea(segundo)
+        tercero = self._agregar()
+        self.assertEqual((primero, segundo, tercero), ("T001", "T002", "T003"))
+        # Borrar todas tampoco reinicia el contador
+        self.assertEqual(servicio.borrar_todas(), 2)
+        self.assertEqual(self._agregar(), "T004")
+
+    def test_restaurar_nunca_retrocede(self):
+        self._agregar()
+        self._agregar()
+        codigos.restaurar(1)
+        self.assertEqual(self._agregar(), "T003")
+
+    def test_prefijo_de_nodo(self):
+        self.addCleanup(codigos.configurar_nodo, "")
+        codigos.configurar_nodo(" a1 ")
+        self.assertEqual(codigos.generar(), ("A1-T001", 1))
+        self.assertEqual(self._agregar(), "A1-T002")
+        for invalido in ("A-1", "NODO1234"):
+            with self.assertRaises(ValueError):
+                codigos.configurar_nodo(invalido)
+        # Un prefijo inválido no cambia el que estaba
+        self.assertEqual(codigos.generar()[0], "A1-T003")
+
+if __name__ == "__main__":
+    unittest.main()
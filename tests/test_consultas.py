@@ -0,0 +1,164 @@
+"""
+PRUEBAS DE LAS CONSULTAS
+El lenguaje se traduce a los mismos criterios que armar_consulta(), el plan
+empieza por el índice más selectivo y los resultados guardados se descartan
+solo cuando un cambio los afecta
+"""
+
+# Módulos estándar para el caso base y las fechas
+import unittest
+from datetime import date
+
+# Importa los módulos que se prueban
+import consultas
+import gestor_tareas
+import gestor_materias
+from herramientas import fijar_reloj
+from ayudas import CasoConInquilino
+
+class PruebaLenguaje(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+
+    def test_todos_los_campos(self):
+        consulta = consultas.parsear('materia:"educacion fisica" estado:pendientes capitulo '
+                                     "texto:Ejercicios orden:-vence limite:5")
+        self.assertEqual(consulta, {
+            "materia": "educacion fisica", "estado": "En proceso", "desde": None,
+            "hasta": None, "palabras": ("capitulo", "ejercicios"), "orden": "vence",
+            "descendente": True, "limite": 5, "relativa": False})
+
+    def test_escrita_o_armada_es_la_misma_consulta(self):
+        self.assertEqual(consultas.parsear("ESTADO=hecha Materia:Historia orden:inicio mapa"),
+                         consultas.armar_consulta(materia="Historia", estado="completada",
+                                                  texto="mapa", orden="inicio"))
+
+    def test_rangos_de_vencimiento(self):
+        hoy = date(2026, 10, 19).toordinal()
+        consulta = consultas.parsear("vence>=hoy vence<hoy+7 vence>01/10/2026")
+        # Se queda con el rango más angosto; ">" y "<" no incluyen el día
+        self.assertEqual((consulta["desde"], consulta["hasta"]), (hoy, hoy + 6))
+        self.assertTrue(consulta["relativa"])
+        consulta = consultas.parsear("vence:05/10/2026")
+        self.assertEqual(consulta["desde"], consulta["hasta"])
+        self.assertEqual(consulta["desde"], date(2026, 10, 5).toordinal())
+        self.assertFalse(consulta["relativa"])
+        self.assertEqual(consultas.parsear("vence<=hoy-2")["hasta"], hoy - 2)
+
+    def test_palabras_con_signos_no_son_campos(self):
+        # Un campo solo tiene letras: "12:30" o "a+b:c" se buscan como texto
+        self.assertEqual(consultas.parsear("12:30")["palabras"], ("12", "30"))
+        self.assertEqual(consultas.parsear("")["palabras"], ())
+
+    def test_expresiones_invalidas(self):
+        for expresion in ('materia:"historia', "color:rojo", "materia>historia",
+                          "estado:perdida", "vence:32/13/2026", "vence<hoy+x",
+                          "orden:nombre", "limite:0", "limite:muchos"):
+            with self.subTest(expresion=expresion):
+                with self.assertRaises(ValueError):
+                    consultas.parsear(expresion)
+
+class PruebaPlanificador(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        # Una de cada diez es de Matematica; vencen repartidas en octubre
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": "Historia" if numero % 10 else "Matematica",
+             "tarea": f"Resumen {numero}" + (" mapa" if numero == 3 else ""),
+             "fecha_inicio": "01/10/2026", "fecha_fin": f"{1 + numero % 28:02d}/10/2026"}
+            for numero in range(100)])
+        for codigo in self.codigos[:40]:
+            gestor_tareas.marcar_completada(codigo)
+
+    def _pasos(self, expresion):
+        return [(filtro["descripcion"].split()[0], filtro["estimado"], modo)
+                for filtro, modo in consultas.planificar(consultas.parsear(expresion))]
+
+    def test_empieza_por_el_mas_selectivo(self):
+        self.assertEqual(self._pasos("estado:completada materia:matematica"),
+                         [("materia", 10, "indice"), ("estado", 40, "indice")])
+        self.assertEqual(self._pasos("materia:historia mapa"),
+                         [("texto", 1, "indice"), ("materia", 90, "revisar")])
+
+    def test_revisa_si_el_indice_es_mucho_mas_grande(self):
+        # 60 pendientes es más de FACTOR_CRUCE veces las 4 que vencen ese día
+        self.assertEqual(self._pasos("vence:05/10/2026 estado:pendiente"),
+                         [("vence", 4, "indice"), ("estado", 60, "revisar")])
+
+    def test_explicar(self):
+        self.assertEqual(consultas.explicar(""), ["recorrer todas las tareas"])
+        self.assertEqual(consultas.explicar("materia:matematica"),
+                         ["indice   materia ~ 'matematica' (1 materia(s)) (~10 tarea(s))"])
+
+    def test_el_plan_da_lo_mismo_que_revisar_todas(self):
+        tareas = gestor_tareas.obtener_tareas()
+        for expresion in ("estado:completada materia:matematica", "materia:historia mapa",
+                          "vence:05/10/2026 estado:pendiente", "resumen vence<=10/10/2026",
+                          "materia:histria estado:pendiente vence>20/10/2026"):
+            with self.subTest(expresion=expresion):
+                consulta = consultas.parsear(expresion)
+                esperados = [codigo for codigo in self.codigos
+                             if consultas.cumple(consulta, tareas[codigo])]
+                self.assertEqual(list(consultas.ejecutar(consulta, usar_cache=False)),
+                                 esperados)
+
+class PruebaCacheDeConsultas(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.mate = gestor_tareas.agregar_tarea("Matematica", "Ejercicios", "01/10/2026",
+                                                "20/10/2026")
+        self.historia = gestor_tareas.agregar_tarea("Historia", "Resumen", "01/10/2026",
+                                                    "25/10/2026")
+
+    def _contador(self, nombre):
+        return consultas.obtener_metricas_cache()[nombre]
+
+    def test_repetir_la_consulta_usa_la_cache(self):
+        primera = consultas.consultar("materia:matematica estado:pendiente")
+        aciertos = self._contador("aciertos")
+        # Escrita de otra forma es la misma consulta
+        segunda = consultas.consultar("estado:pendiente   materia:matematica")
+        self.assertEqual(list(segunda), [self.mate])
+        self.assertEqual(segunda, primera)
+        self.assertEqual(self._contador("aciertos"), aciertos + 1)
+
+    def test_el_resultado_devuelto_es_una_copia(self):
+        consultas.consultar("materia:matematica").clear()
+        self.assertEqual(list(consultas.consultar("materia:matematica")), [self.mate])
+
+    def test_un_cambio_que_la_afecta_la_descarta(self):
+        self.assertEqual(list(consultas.consultar("estado:pendiente")), [self.mate, self.historia])
+        gestor_tareas.marcar_completada(self.mate)
+        self.assertEqual(list(consultas.consultar("estado:pendiente")), [self.historia])
+        nueva = gestor_tareas.agregar_tarea("Historia", "Mapa", "01/10/2026", "26/10/2026")
+        self.assertEqual(list(consultas.consultar("estado:pendiente")), [self.historia, nueva])
+
+    def test_un_cambio_que_no_la_afecta_la_conserva(self):
+        consultas.consultar("materia:matematica")
+        invalidaciones = self._contador("invalidaciones")
+        # Ni la versión anterior ni la nueva de la tarea de Historia cumplen la consulta
+        gestor_tareas.editar_tarea(self.historia, {"observaciones": "Capitulo 3"})
+        self.assertEqual(self._contador("invalidaciones"), invalidaciones)
+        aciertos = self._contador("aciertos")
+        consultas.consultar("materia:matematica")
+        self.assertEqual(self._contador("aciertos"), aciertos + 1)
+
+    def test_renombrar_una_materia_descarta_las_consultas_por_materia(self):
+        self.assertEqual(list(consultas.consultar("materia:algebra")), [])
+        numero = gestor_materias.buscar_materia("Matematica")
+        gestor_materias.renombrar_materia(numero, "Algebra")
+        self.assertEqual(list(consultas.consultar("materia:algebra")), [self.mate])
+
+    def test_las_consultas_con_hoy_vencen_al_cambiar_el_dia(self):
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        self.assertEqual(list(consultas.consultar("vence<=hoy+1")), [self.mate])
+        fijar_reloj("24/10/2026")
+        self.assertEqual(list(consultas.consultar("vence<=hoy+1")), [self.mate, self.historia])
+
+if __name__ == "__main__":
+    unittest.main()
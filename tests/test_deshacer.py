@@ -0,0 +1,80 @@
+"""
+PRUEBAS DE DESHACER Y REHACER
+Cada operación vuelve los datos a como estaban, incluidas las ocurrencias
+"""
+
+# Módulo estándar con el caso base
+import unittest
+
+# Importa los módulos que se prueban
+import consultas
+import deshacer
+import gestor_tareas
+import recurrencias
+import servicio
+from herramientas import fijar_reloj
+from ayudas import CasoConInquilino
+
+class PruebaDeshacer(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.codigo = servicio.agregar("Historia", "Resumen", "01/10/2026",
+                                       "25/10/2026")["codigo"]
+        self.original = servicio.obtener(self.codigo)
+
+    def test_deshacer_y_rehacer_una_edicion(self):
+        servicio.editar(self.codigo, tarea="Mapa", estado="Completada")
+        deshacer.deshacer()
+        self.assertEqual(servicio.obtener(self.codigo), self.original)
+        deshacer.rehacer()
+        self.assertEqual(servicio.obtener(self.codigo)["tarea"], "Mapa")
+
+    def test_deshacer_una_eliminacion_varias_veces(self):
+        servicio.eliminar(self.codigo)
+        deshacer.deshacer()
+        self.assertEqual(servicio.obtener(self.codigo), self.original)
+        deshacer.rehacer()
+        self.assertIsNone(servicio.obtener(self.codigo))
+        deshacer.deshacer()
+        self.assertEqual(servicio.obtener(self.codigo), self.original)
+
+    def test_sin_nada_para_deshacer(self):
+        deshacer.deshacer()
+        with self.assertRaises(ValueError):
+            deshacer.deshacer()
+
+class PruebaDeshacerOcurrencias(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        regla = gestor_tareas.agregar_tarea_recurrente("Matematica", "Guia semanal",
+                                                       "19/10/2026", cada=7)
+        self.ocurrencia = f"R{regla}-20261019"
+
+    def test_deshacer_vuelve_a_mostrar_la_ocurrencia(self):
+        servicio.completar(self.ocurrencia)
+        self.assertIsNone(recurrencias.ocurrencia(self.ocurrencia))
+
+        deshacer.deshacer()
+        self.assertNotIn(self.ocurrencia, gestor_tareas.tareas_colegio)
+        info = gestor_tareas.obtener_tarea(self.ocurrencia)
+        self.assertEqual(info["estado"], "En proceso")
+        self.assertIn(self.ocurrencia, consultas.consultar("vence<=hoy"))
+
+        deshacer.rehacer()
+        self.assertEqual(gestor_tareas.tareas_colegio[self.ocurrencia]["estado"], "Completada")
+        self.assertIsNone(recurrencias.ocurrencia(self.ocurrencia))
+
+    def test_eliminar_una_ocurrencia_no_la_vuelve_a_mostrar(self):
+        servicio.eliminar(self.ocurrencia)
+        self.assertIsNone(gestor_tareas.obtener_tarea(self.ocurrencia))
+        deshacer.deshacer()
+        deshacer.rehacer()
+        self.assertIsNone(gestor_tareas.obtener_tarea(self.ocurrencia))
+        self.assertNotIn(self.ocurrencia, consultas.consultar("vence<=hoy"))
+
+if __name__ == "__main__":
+    unittest.main()
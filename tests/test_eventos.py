@@ -0,0 +1,59 @@
+"""
+PRUEBAS DEL BUS DE EVENTOS
+Entrega en orden a los asincrónicos sin frenar a quien espera el bloqueo
+"""
+
+# Módulos estándar para el caso base y los hilos
+import threading
+import unittest
+
+# Importa el módulo que se prueba
+import eventos
+
+class PruebaSuscriptorLento(unittest.TestCase):
+
+    def setUp(self):
+        self.recibidos = []
+        self.seguir = threading.Event()
+        # Cola de un solo lugar: el segundo evento ya tiene que esperar
+        eventos.suscribir(self._lento, nombre="prueba-lento", capacidad=1)
+        self.addCleanup(eventos.desuscribir, self._lento)
+        self.addCleanup(self.seguir.set)
+
+    def _lento(self, evento):
+        self.seguir.wait()
+        self.recibidos.append(evento["secuencia"])
+
+    def test_no_frena_al_bloqueo_del_bus(self):
+        publicados = []
+        def publicar():
+            for _ in range(4):
+                publicados.append(eventos.publicar("prueba", [], entidad="prueba")["secuencia"])
+        hilo = threading.Thread(target=publicar)
+        hilo.start()
+
+        # Quien publica queda esperando lugar en la cola, pero sin el bloqueo
+        tomado = threading.Event()
+        def tomar():
+            with eventos.bloqueo():
+                tomado.set()
+        threading.Thread(target=tomar).start()
+        self.assertTrue(tomado.wait(timeout=2))
+        self.assertTrue(hilo.is_alive())
+
+        self.seguir.set()
+        hilo.join(timeout=2)
+        eventos.esperar_pendientes()
+        self.assertEqual(self.recibidos, publicados)
+
+    def test_dentro_de_un_bloqueo_entrega_al_soltarlo(self):
+        self.seguir.set()
+        with eventos.bloqueo():
+            primero = eventos.publicar("prueba", [], entidad="prueba")["secuencia"]
+            segundo = eventos.publicar("prueba", [], entidad="prueba")["secuencia"]
+            self.assertEqual(self.recibidos, [])
+        eventos.esperar_pendientes()
+        self.assertEqual(self.recibidos, [primero, segundo])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+PRUEBAS DE GESTOR_TAREAS
+Operaciones sobre varias tareas a la vez
+"""
+
+# Módulo estándar con el caso base
+import unittest
+
+# Importa los módulos que se prueban
+import eventos
+import gestor_tareas
+import gestor_materias
+from ayudas import CasoConInquilino
+
+class PruebaOperacionesEnLote(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": "Historia", "tarea": f"Tarea {numero}",
+             "fecha_inicio": "01/10/2026", "fecha_fin": "20/10/2026"}
+            for numero in range(3)])
+        # Tipos de los eventos de tareas publicados durante la prueba
+        self.publicados = []
+        def anotar(evento):
+            if evento["entidad"] == "tarea":
+                self.publicados.append((evento["tipo"], len(evento["cambios"])))
+        eventos.suscribir(anotar, sincronico=True)
+        self.addCleanup(eventos.desuscribir, anotar)
+
+    def test_completar_varias(self):
+        gestor_tareas.marcar_completada(self.codigos[0])
+        self.publicados.clear()
+        # Ignora las ya completadas y los códigos que no existen
+        self.assertEqual(gestor_tareas.completar_tareas(self.codigos + ["T999"]), 2)
+        self.assertEqual(self.publicados, [("completadas", 2)])
+        self.assertEqual([gestor_tareas.obtener_tarea(c)["estado"] for c in self.codigos],
+                         ["Completada"] * 3)
+
+    def test_eliminar_varias(self):
+        self.assertEqual(gestor_tareas.eliminar_tareas(self.codigos[:2] + ["T999"]), 2)
+        self.assertEqual(self.publicados, [("eliminadas", 2)])
+        self.assertEqual(list(gestor_tareas.obtener_tareas()), self.codigos[2:])
+
+    def test_cambiar_materia_de_varias(self):
+        self.assertEqual(gestor_tareas.cambiar_materia_tareas(self.codigos, "Geografia"), 3)
+        self.assertEqual(self.publicados, [("materia_reasignada", 3)])
+        geografia = gestor_materias.buscar_materia("Geografia")
+        self.assertEqual({gestor_tareas.obtener_tarea(c)["materia_id"] for c in self.codigos},
+                         {geografia})
+        # Si ya están en esa materia no cambia nada ni se publica
+        self.assertEqual(gestor_tareas.cambiar_materia_tareas(self.codigos, geografia), 0)
+        self.assertEqual(len(self.publicados), 1)
+
+class PruebaBusquedaPorFecha(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.tarea = gestor_tareas.agregar_tarea("Historia", "Resumen", "19/10/2026",
+                                                 "25/10/2026")
+        # Vence los lunes desde el 26/10, cada ocurrencia empieza 3 días antes
+        regla = gestor_tareas.agregar_tarea_recurrente("Matematica", "Guia", "26/10/2026",
+                                                       cada=7, duracion=3)
+        self.ocurrencia = f"R{regla}-20261026"
+        self.siguiente = f"R{regla}-20261102"
+
+    def test_por_inicio_incluye_las_ocurrencias(self):
+        self.assertEqual(list(gestor_tareas.buscar_por_fecha_inicio("19/10/2026")),
+                         [self.tarea])
+        self.assertEqual(list(gestor_tareas.buscar_por_fecha_inicio("23/10/2026")),
+                         [self.ocurrencia])
+        self.assertEqual(list(gestor_tareas.buscar_por_fecha_inicio("30/10/2026")),
+                         [self.siguiente])
+        self.assertEqual(gestor_tareas.buscar_por_fecha_inicio("26/10/2026"), {})
+
+    def test_por_vencimiento_y_por_inicio_coinciden(self):
+        info = gestor_tareas.buscar_por_fecha_vencimiento("26/10/2026")[self.ocurrencia]
+        self.assertEqual(gestor_tareas.buscar_por_fecha_inicio(info["fecha_inicio"]),
+                         {self.ocurrencia: info})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+PRUEBAS DEL HISTORIAL
+Versiones de cada tarea en el tiempo, sin copiar las tareas
+"""
+
+# Módulos estándar para el caso base, las rutas y el reloj de los eventos
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Importa los módulos que se prueban
+import deshacer
+import eventos
+import gestor_tareas
+import historial
+import servicio
+from ayudas import CasoConInquilino
+
+class PruebaHistorial(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        # Los eventos se publican en momentos elegidos por la prueba
+        self.momento = historial.inicio_del_dia("10/10/2026")
+        reloj = mock.patch.object(eventos, "time", SimpleNamespace(time=lambda: self.momento))
+        reloj.start()
+        self.addCleanup(reloj.stop)
+
+    def _en(self, momento, funcion, *argumentos, **opciones):
+        """Hace una operación en ese momento y devuelve su resultado"""
+        self.momento = momento
+        return funcion(*argumentos, **opciones)
+
+    def test_version_en_cada_momento(self):
+        codigo = self._en(100, servicio.agregar, "Historia", "Resumen", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        creada = servicio.obtener(codigo)
+        self._en(200, servicio.editar, codigo, tarea="Mapa")
+        editada = servicio.obtener(codigo)
+        self._en(300, servicio.completar, codigo)
+        completada = servicio.obtener(codigo)
+        self._en(400, servicio.eliminar, codigo)
+
+        self.assertIsNone(historial.version_en(codigo, 99))
+        self.assertEqual(historial.version_en(codigo, 100), creada)
+        self.assertEqual(historial.version_en(codigo, 250), editada)
+        self.assertEqual(historial.version_en(codigo, 399), completada)
+        self.assertIsNone(historial.version_en(codigo, 400))
+
+    def test_historias_largas(self):
+        codigo = self._en(1, servicio.agregar, "Historia", "Tarea 0", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        esperadas = {1: servicio.obtener(codigo)}
+        # Varios puntos de control y deltas a los dos lados
+        for numero in range(2, 3 * historial.CADA_PUNTO_DE_CONTROL + 5):
+            cambios = {"tarea": f"Tarea {numero}"}
+            if numero % 5 == 0:
+                cambios["observaciones"] = f"Nota {numero}"
+            esperadas[numero] = self._en(numero, servicio.editar, codigo, **cambios)
+        for momento, esperada in esperadas.items():
+            self.assertEqual(historial.version_en(codigo, momento + 0.5), esperada)
+        self.assertEqual(len(historial.historial_de(codigo)), len(esperadas))
+
+    def test_no_copia_las_tareas(self):
+        codigos = self._en(100, gestor_tareas.agregar_tareas, [
+            {"materia": "Historia", "tarea": f"Tarea {numero}", "fecha_inicio": "01/10/2026",
+             "fecha_fin": "20/10/2026", "observaciones": "Texto largo " * 50}
+            for numero in range(3)])
+        # Crear no guarda datos: antes no existía
+        self.assertIsNone(historial._versiones[codigos[0]][0][4])
+        # Editar guarda solo el valor anterior de lo que cambió
+        self._en(200, servicio.editar, codigos[0], tarea="Otra")
+        self.assertEqual(historial._versiones[codigos[0]][1][4], {"tarea": "Tarea 0"})
+        # Eliminar guarda los datos quitados, sin copiarlos
+        quitadas = [gestor_tareas.tareas_colegio[codigo] for codigo in codigos]
+        self._en(300, gestor_tareas.eliminar_tareas, codigos)
+        for codigo, info in zip(codigos, quitadas):
+            self.assertIs(historial._versiones[codigo][-1][4], info)
+
+    def test_tareas_que_existian_antes_del_historial(self):
+        codigo = self._en(100, servicio.agregar, "Historia", "Resumen", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        original = servicio.obtener(codigo)
+        # Como al abrir un snapshot guardado sin historial
+        historial.vaciar()
+        self.assertEqual(historial.version_en(codigo, 0), original)
+        self._en(200, servicio.editar, codigo, tarea="Mapa")
+        self.assertEqual(historial.version_en(codigo, 0), original)
+        self.assertEqual(historial.version_en(codigo, 200)["tarea"], "Mapa")
+        self.assertEqual([cambio["campos"] for cambio in historial.historial_de(codigo)],
+                         [{"tarea": ("Resumen", "Mapa")}])
+
+    def test_deshacer_una_eliminacion_no_cambia_la_version_eliminada(self):
+        codigo = self._en(100, servicio.agregar, "Historia", "Resumen", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        original = servicio.obtener(codigo)
+        self._en(200, servicio.eliminar, codigo)
+        self._en(300, deshacer.deshacer)
+        self._en(400, servicio.editar, codigo, tarea="Mapa", observaciones="Nueva")
+        self.assertEqual(historial.version_en(codigo, 199), original)
+        self.assertIsNone(historial.version_en(codigo, 250))
+        self.assertEqual(historial.version_en(codigo, 350), original)
+        self.assertEqual(historial.version_en(codigo, 400)["tarea"], "Mapa")
+
+    def test_pendientes_en_una_fecha(self):
+        codigo = self._en(historial.inicio_del_dia("10/10/2026"), servicio.agregar, "Historia",
+                          "Resumen", "01/10/2026", "20/10/2026")["codigo"]
+        self._en(historial.inicio_del_dia("15/10/2026"), servicio.completar, codigo)
+        self.assertEqual(historial.pendientes_en("05/10/2026"), {})
+        self.assertEqual(list(historial.pendientes_en("12/10/2026")), [codigo])
+        self.assertEqual(historial.pendientes_en("16/10/2026"), {})
+
+    def test_cambios_entre_y_autores(self):
+        codigo = self._en(100, servicio.agregar, "Historia", "Resumen", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        with eventos.como_autor("ana"):
+            self._en(200, servicio.editar, codigo, tarea="Mapa")
+        with eventos.como_autor("luis"):
+            self._en(300, servicio.completar, codigo)
+        cambios = historial.cambios_entre(150, 300)
+        self.assertEqual([(cambio["autor"], cambio["campos"]) for cambio in cambios],
+                         [("ana", {"tarea": ("Resumen", "Mapa")}),
+                          ("luis", {"estado": ("En proceso", "Completada")})])
+
+    def test_guardar_y_cargar(self):
+        codigo = self._en(100, servicio.agregar, "Historia", "Resumen", "01/10/2026",
+                          "20/10/2026")["codigo"]
+        self._en(200, servicio.editar, codigo, tarea="Mapa")
+        otra = self._en(300, servicio.agregar, "Historia", "Otra", "01/10/2026",
+                        "20/10/2026")["codigo"]
+        self._en(400, servicio.eliminar, otra)
+        momentos = (99, 150, 250, 350, 450)
+        antes = [(historial.version_en(codigo, m), historial.version_en(otra, m))
+                 for m in momentos]
+        cambios = historial.cambios_entre(0)
+
+        ruta = os.path.join(self.directorio, "historial.jsonl.gz")
+        historial.guardar(ruta)
+        historial.vaciar()
+        historial.cargar(ruta)
+        self.assertEqual([(historial.version_en(codigo, m), historial.version_en(otra, m))
+                          for m in momentos], antes)
+        self.assertEqual(historial.cambios_entre(0), cambios)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+PRUEBAS DE LOS INQUILINOS
+Un hilo que pasa por otro inquilino no mezcla las tareas de nadie, y los
+reportes suman los inquilinos sin cambiar el activo
+"""
+
+# Módulos estándar para el caso base y los hilos
+import sys
+import threading
+import unittest
+
+# Importa los módulos que se prueban
+import gestor_tareas
+import inquilinos
+import reportes
+from ayudas import CasoConInquilino
+
+class PruebaCambioEnOtroHilo(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.otro = inquilinos.crear("otro", "curso", padre=self.inquilino)
+        # Cambios de hilo mucho más seguidos, para que el otro hilo se meta en el medio
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, intervalo)
+
+    def _pasar_por_el_otro(self, terminar):
+        # Como los recordatorios o las réplicas: entra al otro inquilino y vuelve
+        while not terminar.is_set():
+            with inquilinos.usar(self.otro):
+                gestor_tareas.obtener_tareas()
+
+    def test_las_operaciones_no_cambian_de_inquilino_a_la_mitad(self):
+        terminar = threading.Event()
+        hilo = threading.Thread(target=self._pasar_por_el_otro, args=(terminar,))
+        hilo.start()
+        try:
+            agregadas = [gestor_tareas.agregar_tarea("Historia", f"Tarea {numero}",
+                                                     "01/10/2026", "25/10/2026")
+                         for numero in range(300)]
+            for codigo in agregadas[::3]:
+                self.assertTrue(gestor_tareas.marcar_completada(codigo))
+            for codigo in agregadas[1::3]:
+                self.assertTrue(gestor_tareas.eliminar_tarea(codigo))
+        finally:
+            terminar.set()
+            hilo.join()
+
+        self.assertEqual(inquilinos.activo(), self.inquilino)
+        self.assertEqual(len(gestor_tareas.obtener_tareas()), 200)
+        self.assertEqual(gestor_tareas.obtener_estadisticas()["completadas"], 100)
+        with inquilinos.usar(self.otro):
+            self.assertEqual(gestor_tareas.obtener_tareas(), {})
+
+class PruebaReportes(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.curso = inquilinos.crear("3a", "curso", padre=self.inquilino)
+        gestor_tareas.agregar_tarea("Historia", "Resumen", "01/10/2026", "25/10/2026")
+        codigo = gestor_tareas.agregar_tarea("Ingles", "Lectura", "01/10/2026", "25/10/2026")
+        gestor_tareas.marcar_completada(codigo)
+        with inquilinos.usar(self.curso):
+            gestor_tareas.agregar_tarea("Historia", "Mapa", "01/10/2026", "26/10/2026")
+            gestor_tareas.agregar_tarea("Geografia", "Rios", "01/10/2026", "27/10/2026")
+
+    def test_suma_los_inquilinos_de_la_rama(self):
+        total = reportes.estadisticas_agregadas(self.inquilino)
+        self.assertEqual((total["inquilinos"], total["total"], total["completadas"],
+                          total["pendientes"]), (2, 4, 1, 3))
+        self.assertEqual(total["porcentaje_completado"], 25)
+        self.assertEqual(reportes.estadisticas_por_inquilino(self.curso)[self.curso]["total"], 2)
+        self.assertEqual(inquilinos.activo(), self.inquilino)
+
+    def test_pendientes_por_nombre_de_materia(self):
+        self.assertEqual(reportes.pendientes_por_materia(self.inquilino),
+                         [("Historia", 2), ("Geografia", 1)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+PRUEBAS DE LOS RECORDATORIOS
+Avisos de vencimiento a partir de los eventos, sin guardar los textos
+"""
+
+# Módulos estándar para el caso base, las fechas, las rutas y los reemplazos
+import os
+import unittest
+from datetime import date
+from unittest import mock
+
+# Importa los módulos que se prueban
+import eventos
+import gestor_tareas
+import inquilinos
+import recordatorios
+import servicio
+from ayudas import CasoConInquilino
+
+class PruebaRecordatorios(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.codigo = servicio.agregar("Historia", "Resumen", "01/10/2026",
+                                       "20/10/2026")["codigo"]
+        self.clave = f"{self.inquilino}:{self.codigo}"
+        eventos.esperar_pendientes()
+
+    def _avisos(self, dia):
+        """Avisos de las tareas de esta prueba para ese día"""
+        eventos.esperar_pendientes()
+        return [(aviso["tipo"], aviso["descripcion"])
+                for aviso in recordatorios.revisar_vencimientos(date(2026, 10, dia))
+                if aviso["codigo"] == self.clave]
+
+    def test_avisos_de_una_tarea(self):
+        self.assertEqual(self._avisos(18), [])
+        self.assertEqual(self._avisos(19), [("vence_manana", "Resumen")])
+        self.assertEqual(self._avisos(20), [("vence_hoy", "Resumen")])
+        self.assertEqual(self._avisos(21), [("vencida", "Resumen")])
+        self.assertEqual(self._avisos(22), [])
+
+    def test_no_guarda_la_descripcion(self):
+        self.assertEqual(len(recordatorios._vigentes[self.clave]), 2)
+        # El aviso sale con la descripción que tiene la tarea al emitirse
+        servicio.editar(self.codigo, tarea="Resumen del capitulo 3")
+        self.assertEqual(self._avisos(19), [("vence_manana", "Resumen del capitulo 3")])
+
+    def test_descripcion_de_otro_inquilino(self):
+        inquilinos.activar(inquilinos.GENERAL)
+        # Buscar la descripción no activa el inquilino de la tarea, ni por un momento
+        with mock.patch.object(inquilinos, "activar", side_effect=AssertionError):
+            self.assertEqual(self._avisos(19), [("vence_manana", "Resumen")])
+        self.assertEqual(inquilinos.activo(), inquilinos.GENERAL)
+        inquilinos.activar(self.inquilino)
+
+    def test_leer_de_otro_inquilino_no_carga_su_snapshot(self):
+        ruta = os.path.join(self.directorio, "tareas.snap")
+        gestor_tareas.guardar_snapshot(ruta)
+        gestor_tareas.cargar_snapshot(ruta)
+        inquilinos.activar(inquilinos.GENERAL)
+        info = inquilinos.obtener_tarea(self.inquilino, self.codigo)
+        self.assertEqual(info["tarea"], "Resumen")
+        # La tarea sigue en el snapshot, sin cargar
+        self.assertEqual(inquilinos._particiones[self.inquilino]["tareas"][0], {})
+        self.assertIsNone(inquilinos.obtener_tarea("no-existe", self.codigo))
+        inquilinos.activar(self.inquilino)
+        # No deja el snapshot a medio cargar para las pruebas siguientes
+        gestor_tareas.obtener_tareas()
+
+    def test_completar_o_mover_la_fecha_cancela_los_avisos(self):
+        servicio.editar(self.codigo, fecha_fin="25/10/2026")
+        self.assertEqual(self._avisos(19), [])
+        self.assertEqual(self._avisos(24), [("vence_manana", "Resumen")])
+        gestor_tareas.marcar_completada(self.codigo)
+        self.assertEqual(self._avisos(25), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+PRUEBAS DEL RELOJ
+El reloj fijado decide los días restantes y los indicadores de urgencia
+"""
+
+# Módulos estándar para el caso base, la salida en pantalla y los hilos
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from unittest import mock
+
+# Importa los módulos que se prueban
+import gestor_tareas
+import herramientas
+from herramientas import (fijar_reloj, fecha_de_hoy, mismo_instante,
+                          calcular_dias_restantes, obtener_indicador_urgencia)
+from ayudas import CasoConInquilino
+
+class PruebaUrgencia(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+
+    def test_indicador_segun_el_dia_fijado(self):
+        esperados = {"17/10/2026": "[VENCIDA 2 dias]", "18/10/2026": "[VENCIDA 1 dia]",
+                     "19/10/2026": "[HOY]", "20/10/2026": "[MANANA]",
+                     "22/10/2026": "[3 dias]", "26/10/2026": "(7 dias)",
+                     "27/10/2026": "8 dias", "sin fecha": ""}
+        for vence, indicador in esperados.items():
+            with self.subTest(vence=vence):
+                self.assertEqual(obtener_indicador_urgencia(calcular_dias_restantes(vence)),
+                                 indicador)
+
+    def test_cambiar_el_reloj_cambia_el_indicador(self):
+        self.assertEqual(calcular_dias_restantes("20/10/2026"), 1)
+        # La hora no importa, solo el día
+        fijar_reloj(datetime(2026, 10, 20, 23, 59))
+        self.assertEqual(obtener_indicador_urgencia(calcular_dias_restantes("20/10/2026")),
+                         "[HOY]")
+        fijar_reloj(date(2026, 10, 21))
+        self.assertEqual(obtener_indicador_urgencia(calcular_dias_restantes("20/10/2026")),
+                         "[VENCIDA 1 dia]")
+        with self.assertRaises(ValueError):
+            fijar_reloj("31/02/2026")
+        # Una fecha inválida no cambia el reloj
+        self.assertEqual(fecha_de_hoy(), date(2026, 10, 21))
+
+    def test_mismo_instante_no_ve_el_cambio_de_dia(self):
+        with mismo_instante():
+            fijar_reloj("25/10/2026")
+            self.assertEqual(calcular_dias_restantes("20/10/2026"), 1)
+            # Cada hilo lee su propio instante
+            vistos = []
+            hilo = threading.Thread(
+                target=lambda: vistos.append(calcular_dias_restantes("20/10/2026")))
+            hilo.start()
+            hilo.join()
+            self.assertEqual(vistos, [-5])
+        self.assertEqual(calcular_dias_restantes("20/10/2026"), -5)
+
+    def test_sin_reloj_fijo_usa_el_del_sistema(self):
+        fijar_reloj(None)
+        self.assertIsNone(herramientas._reloj_fijo)
+        self.assertEqual(calcular_dias_restantes(date.today().strftime("%d/%m/%Y")), 0)
+
+class PruebaListaDeTareas(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        self.codigos = gestor_tareas.agregar_tareas([
+            {"materia": "Historia", "tarea": f"Tarea {numero}",
+             "fecha_inicio": "01/10/2026", "fecha_fin": fin}
+            for numero, fin in enumerate(["18/10/2026", "19/10/2026", "23/10/2026"])])
+        gestor_tareas.marcar_completada(self.codigos[0])
+
+    def _indicadores(self):
+        salida = io.StringIO()
+        with mock.patch.object(gestor_tareas, "limpiar_pantalla"), redirect_stdout(salida):
+            gestor_tareas.mostrar_lista_tareas()
+        filas = [linea for linea in salida.getvalue().splitlines()
+                 if linea.split()[:1] and linea.split()[0] in self.codigos]
+        # La columna VENCE va entre la tarea y el estado (que ocupa 12 más un espacio)
+        return [fila[8 + 16 + 26:-13].strip() for fila in filas]
+
+    def test_la_lista_usa_el_reloj_fijado(self):
+        self.assertEqual(self._indicadores(), ["COMPLETADA", "[HOY]", "(4 dias)"])
+        fijar_reloj("22/10/2026")
+        self.assertEqual(self._indicadores(), ["COMPLETADA", "[VENCIDA 3 dias]", "[MANANA]"])
+
+if __name__ == "__main__":
+    unittest.main()
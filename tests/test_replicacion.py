@@ -0,0 +1,136 @@
+"""
+PRUEBAS DE LA REPLICACIÓN
+Las funciones de lectura no cambian datos ni publican eventos, y un seguidor
+de otra corrida del primario vuelve a empezar con una foto
+"""
+
+# Módulos estándar para el caso base, los hilos, las rutas y la conexión con el seguidor
+import os
+import threading
+import unittest
+from multiprocessing.connection import Pipe
+
+# Importa los módulos que se prueban
+import eventos
+import gestor_tareas
+import recurrencias
+import replicacion
+from herramientas import fijar_reloj
+from ayudas import CasoConInquilino
+
+class PruebaConsultasDeSoloLectura(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(fijar_reloj, None)
+        fijar_reloj("19/10/2026")
+        gestor_tareas.agregar_tarea("Historia", "Resumen", "01/10/2026", "25/10/2026")
+        regla = gestor_tareas.agregar_tarea_recurrente("Matematica", "Guia semanal",
+                                                       "19/10/2026", cada=7)
+        # Primera ocurrencia de la regla (todavía no es una tarea)
+        self.ocurrencia = f"R{regla}-20261019"
+
+    def _consultar(self, nombre, *argumentos):
+        estado, resultado = replicacion.consultar(nombre, argumentos, inquilino=self.inquilino)
+        self.assertEqual(estado, "ok", resultado)
+        return resultado
+
+    def test_leer_una_ocurrencia_no_la_materializa(self):
+        secuencia = eventos.ultima_secuencia()
+        info = self._consultar("obtener_tarea", self.ocurrencia)
+        self.assertEqual(info["fecha_fin"], "19/10/2026")
+        self.assertEqual(self._consultar("buscar_por_codigo", self.ocurrencia),
+                         {self.ocurrencia: info})
+        self.assertEqual(eventos.ultima_secuencia(), secuencia)
+        self.assertNotIn(self.ocurrencia, gestor_tareas.tareas_colegio)
+        self.assertIsNotNone(recurrencias.ocurrencia(self.ocurrencia))
+
+    def test_ninguna_lectura_publica_eventos(self):
+        tareas = {codigo: dict(info) for codigo, info in gestor_tareas.tareas_colegio.items()}
+        secuencia = eventos.ultima_secuencia()
+        for nombre, argumentos in [("obtener_tareas", ()), ("obtener_tareas_pendientes", ()),
+                                   ("obtener_tareas_mas_urgentes", (3,)),
+                                   ("obtener_estadisticas", ()),
+                                   ("buscar_por_estado", ("pendiente",)),
+                                   ("consultar", ("vence<=hoy+30",))]:
+            self._consultar(nombre, *argumentos)
+        self.assertEqual(eventos.ultima_secuencia(), secuencia)
+        self.assertEqual(gestor_tareas.tareas_colegio, tareas)
+
+    def test_solo_atiende_funciones_de_lectura(self):
+        estado, _ = replicacion.consultar("eliminar_tarea", (self.ocurrencia,),
+                                          inquilino=self.inquilino)
+        self.assertEqual(estado, "error")
+
+    def test_cambiar_una_ocurrencia_si_la_materializa(self):
+        gestor_tareas.marcar_completada(self.ocurrencia)
+        self.assertEqual(gestor_tareas.tareas_colegio[self.ocurrencia]["estado"], "Completada")
+        self.assertIsNone(recurrencias.ocurrencia(self.ocurrencia))
+
+class PruebaProtocolo(CasoConInquilino):
+
+    def setUp(self):
+        super().setUp()
+        # El WAL se llena como con iniciar_primario(), sin abrir un puerto (y
+        # sin los eventos de otras pruebas: no serían consecutivos)
+        replicacion._wal.clear()
+        eventos.suscribir(replicacion._registrar_en_wal, sincronico=True)
+        self.addCleanup(eventos.desuscribir, replicacion._registrar_en_wal)
+
+    def _conectar(self, pedido):
+        """Atiende un seguidor por una conexión en memoria y devuelve su punta"""
+        seguidor, primario = Pipe()
+        self.addCleanup(seguidor.close)
+        threading.Thread(target=replicacion._atender_seguidor, args=(primario,),
+                         daemon=True).start()
+        seguidor.send(pedido)
+        return seguidor
+
+    def _recibir(self, seguidor):
+        self.assertTrue(seguidor.poll(5))
+        return seguidor.recv()
+
+    def test_al_dia_recibe_eventos_nuevos(self):
+        secuencia = eventos.ultima_secuencia()
+        seguidor = self._conectar({"desde": secuencia, "corrida": replicacion._corrida})
+        codigo = gestor_tareas.agregar_tarea("Historia", "Resumen", "01/10/2026", "25/10/2026")
+        evento = self._recibir(seguidor)
+        self.assertEqual((evento["secuencia"], evento["cambios"][0]["clave"]),
+                         (secuencia + 1, codigo))
+
+    def test_otra_corrida_recibe_una_foto(self):
+        seguidor = self._conectar({"desde": eventos.ultima_secuencia(), "corrida": "otra"})
+        foto = self._recibir(seguidor)
+        self.assertEqual(foto["tipo"], "snapshot")
+        self.assertEqual(foto["corrida"], replicacion._corrida)
+
+    def test_adelantado_al_primario_recibe_una_foto(self):
+        # Por ejemplo si el primario se reinició y el seguidor no trae la corrida
+        seguidor = self._conectar({"desde": eventos.ultima_secuencia() + 50,
+                                   "corrida": replicacion._corrida})
+        foto = self._recibir(seguidor)
+        self.assertEqual((foto["tipo"], foto["secuencia"]),
+                         ("snapshot", eventos.ultima_secuencia()))
+
+    def test_el_latido_trae_la_secuencia_del_primario(self):
+        intervalo = replicacion.INTERVALO_LATIDO
+        replicacion.INTERVALO_LATIDO = 0.05
+        self.addCleanup(setattr, replicacion, "INTERVALO_LATIDO", intervalo)
+        seguidor = self._conectar({"desde": eventos.ultima_secuencia(),
+                                   "corrida": replicacion._corrida})
+        latido = self._recibir(seguidor)
+        self.assertEqual((latido["tipo"], latido["secuencia"]),
+                         ("latido", eventos.ultima_secuencia()))
+
+    def test_la_foto_incluye_lo_que_termina_de_cargar(self):
+        codigo = gestor_tareas.agregar_tarea("Historia", "Resumen", "01/10/2026", "25/10/2026")
+        ruta = os.path.join(self.directorio, "tareas.snap")
+        gestor_tareas.guardar_snapshot(ruta)
+        gestor_tareas.cargar_snapshot(ruta)
+        # Sacar la foto carga las tareas del snapshot y eso publica un evento
+        foto = replicacion._tomar_snapshot()
+        self.assertEqual(foto["secuencia"], eventos.ultima_secuencia())
+        self.assertIn(codigo, foto["particiones"][self.inquilino]["tareas"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+PRUEBAS DEL SERVICIO
+Validación de los datos y copias devueltas, sincrónicas y con asyncio
+"""
+
+# Módulos estándar para el caso base y la interfaz asincrónica
+import asyncio
+import unittest
+
+# Importa los módulos que se prueban
+import deshacer
+import eventos
+import gestor_tareas
+import servicio
+from ayudas import CasoConInquilino
+
+class PruebaServicio(CasoConInquilino):
+
+    def test_agregar_guarda_los_textos_sin_espacios(self):
+        tarea = servicio.agregar("Historia", "  Resumen  ", "01/10/2026", "20/10/2026",
+                                 " Capitulo 2 ")
+        self.assertEqual((tarea["tarea"], tarea["observaciones"]), ("Resumen", "Capitulo 2"))
+
+    def test_agregar_sin_observaciones(self):
+        tarea = servicio.agregar("Historia", "Resumen", "01/10/2026", "20/10/2026", None)
+        self.assertEqual(tarea["observaciones"], "")
+
+    def test_agregar_valida_los_datos(self):
+        with self.assertRaises(ValueError):
+            servicio.agregar("Historia", "   ", "01/10/2026", "20/10/2026")
+        with self.assertRaises(ValueError):
+            servicio.agregar("Historia", "Resumen", "20/10/2026", "01/10/2026")
+        self.assertEqual(gestor_tareas.obtener_tareas(), {})
+
+    def test_editar_guarda_los_textos_sin_espacios(self):
+        codigo = servicio.agregar("Historia", "Resumen", "01/10/2026", "20/10/2026")["codigo"]
+        tarea = servicio.editar(codigo.lower(), tarea="  Mapa  ", observaciones=None)
+        self.assertEqual((tarea["tarea"], tarea["observaciones"]), ("Mapa", ""))
+        self.assertEqual(gestor_tareas.obtener_tarea(codigo)["tarea"], "Mapa")
+
+    def test_editar_valida_los_datos(self):
+        codigo = servicio.agregar("Historia", "Resumen", "01/10/2026", "20/10/2026")["codigo"]
+        for cambios in ({"tarea": "  "}, {"estado": "Terminada"}, {"uid": "x"},
+                        {"fecha_fin": "01/09/2026"}):
+            with self.assertRaises(ValueError):
+                servicio.editar(codigo, **cambios)
+        self.assertEqual(servicio.obtener(codigo)["tarea"], "Resumen")
+        with self.assertRaises(ValueError):
+            servicio.editar("T999", tarea="Otra")
+
+    def test_devuelve_copias(self):
+        codigo = servicio.agregar("Historia", "Resumen", "01/10/2026", "20/10/2026")["codigo"]
+        servicio.obtener(codigo)["tarea"] = "Cambiada"
+        self.assertEqual(servicio.obtener(codigo)["tarea"], "Resumen")
+
+    def test_borrar_todas_se_deshace_de_una_vez(self):
+        for tarea in ("Resumen", "Mapa", "Cuestionario"):
+            servicio.agregar("Historia", tarea, "01/10/2026", "20/10/2026")
+        tareas = {codigo: dict(info) for codigo, info in gestor_tareas.obtener_tareas().items()}
+        secuencia = eventos.ultima_secuencia()
+        self.assertEqual(servicio.borrar_todas(), 3)
+        self.assertEqual(eventos.ultima_secuencia(), secuencia + 1)
+        self.assertEqual(gestor_tareas.obtener_tareas(), {})
+        self.assertEqual(servicio.borrar_todas(), 0)
+        deshacer.deshacer()
+        self.assertEqual(gestor_tareas.obtener_tareas(), tareas)
+
+    def test_cargar_ejemplos_se_deshace_de_una_vez(self):
+        agregadas = servicio.cargar_ejemplos()
+        self.assertEqual(len(gestor_tareas.obtener_tareas()), len(agregadas))
+        self.assertEqual(sum(info["estado"] == "Completada" for info in agregadas), 3)
+        deshacer.deshacer()
+        self.assertEqual(gestor_tareas.obtener_tareas(), {})
+
+    def test_interfaz_asincronica(self):
+        async def usar():
+            tarea = await servicio.asincrono.agregar("Historia", "Resumen", "01/10/2026",
+                                                     "20/10/2026")
+            return await servicio.asincrono.completar(tarea["codigo"])
+        self.assertEqual(asyncio.run(usar())["estado"], "Completada")
+
+if __name__ == "__main__":
+    unittest.main()
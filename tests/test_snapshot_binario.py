@@ -0,0 +1,68 @@
+"""
+PRUEBAS DEL SNAPSHOT BINARIO
+Guardar y volver a abrir las tareas sin perder datos
+"""
+
+# Módulos estándar para las rutas y el caso base
+import os
+import unittest
+
+# Importa los módulos que se prueban
+import gestor_tareas
+import snapshot_binario
+import inquilinos
+from ayudas import CasoConInquilino
+
+class PruebaSnapshotBinario(CasoConInquilino):
+
+    def _agregar_tareas(self):
+        """Agrega tareas con textos repetidos, acentos, UID y una completada"""
+        gestor_tareas.agregar_tarea("Matemática", "Ejercicios del ñandú", "01/10/2026",
+                                    "20/10/2026", "Página 40")
+        completada = gestor_tareas.agregar_tarea("Historia", "Resumen", "02/10/2026",
+                                                 "21/10/2026")
+        gestor_tareas.marcar_completada(completada)
+        gestor_tareas.agregar_tarea("Historia", "Resumen", "03/10/2026", "22/10/2026",
+                                    uid="clase-7@ejemplo")
+        return {codigo: dict(info) for codigo, info in gestor_tareas.obtener_tareas().items()}
+
+    def test_ida_y_vuelta(self):
+        esperadas = self._agregar_tareas()
+        ruta = os.path.join(self.directorio, "tareas.snap")
+        gestor_tareas.guardar_snapshot(ruta)
+
+        snapshot = snapshot_binario.abrir_snapshot(ruta)
+        try:
+            self.assertEqual({info["codigo"]: info for info in snapshot.tareas()}, esperadas)
+            for codigo, info in esperadas.items():
+                self.assertEqual(snapshot.buscar(codigo), info)
+            self.assertIsNone(snapshot.buscar("T999"))
+        finally:
+            snapshot.cerrar()
+
+    def test_cargar_en_otro_inquilino(self):
+        esperadas = self._agregar_tareas()
+        materias = gestor_tareas.obtener_catalogo()
+        ruta = os.path.join(self.directorio, "tareas.snap")
+        gestor_tareas.guardar_snapshot(ruta)
+
+        inquilinos.activar(inquilinos.crear(self.inquilino.split("/")[-1] + "b", "escuela"))
+        gestor_tareas.cargar_snapshot(ruta)
+        # Una tarea se lee sola, sin cargar las demás
+        codigo = next(iter(esperadas))
+        self.assertEqual(gestor_tareas.obtener_tarea(codigo), esperadas[codigo])
+        self.assertEqual(gestor_tareas.obtener_tareas(), esperadas)
+        self.assertEqual(gestor_tareas.obtener_catalogo(), materias)
+        # El contador sigue desde el guardado: no reutiliza códigos
+        self.assertNotIn(gestor_tareas.agregar_tarea("Historia", "Otra", "01/10/2026",
+                                                     "30/10/2026"), esperadas)
+
+    def test_archivo_que_no_es_snapshot(self):
+        ruta = os.path.join(self.directorio, "otro.snap")
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"no es un snapshot" * 10)
+        with self.assertRaises(ValueError):
+            snapshot_binario.abrir_snapshot(ruta)
+
+if __name__ == "__main__":
+    unittest.main()
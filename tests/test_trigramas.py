@@ -0,0 +1,76 @@
+"""
+PRUEBAS DE LOS TRIGRAMAS
+La búsqueda aproximada de materias tolera errores, acentos y nombres parciales
+"""
+
+# Módulo estándar con el caso base
+import unittest
+
+# Importa los módulos que se prueban
+import gestor_materias
+from trigramas import IndiceTrigramas, trigramas
+from ayudas import CasoConInquilino
+
+class PruebaIndice(unittest.TestCase):
+
+    def setUp(self):
+        self.indice = IndiceTrigramas()
+        for clave, texto in enumerate(["Matematicas", "Fisica", "Geografia",
+                                       "Educacion Fisica", "Quimica"], 1):
+            self.indice.agregar(clave, texto)
+
+    def _claves(self, texto, **opciones):
+        return [clave for clave, _ in self.indice.buscar(texto, **opciones)]
+
+    def test_relleno_por_palabra(self):
+        self.assertEqual(trigramas("ingles"),
+                         {"  i", " in", "ing", "ngl", "gle", "les", "es "})
+        self.assertEqual(trigramas("ab cd"), {"  a", " ab", "ab ", "  c", " cd", "cd "})
+
+    def test_tolera_errores_y_acentos(self):
+        self.assertEqual(self._claves("Matemáticas"), [1])
+        self.assertEqual(self.indice.buscar("MATEMATICAS"), [(1, 1.0)])
+        self.assertEqual(self._claves("matematcas"), [1])
+        self.assertEqual(self._claves("quimca"), [5])
+        self.assertEqual(self._claves("xyz"), [])
+        self.assertEqual(self._claves(""), [])
+
+    def test_contenido_antes_que_parecido(self):
+        # Igual gana a contenido, y el contenido que más cubre va primero
+        self.assertEqual(self._claves("fisica"), [2, 4])
+        self.assertEqual(self._claves("fi"), [2, 3, 4])
+        self.assertEqual(self._claves("fi", limite=1), [2])
+        # Un umbral alto deja afuera lo que solo se parece
+        self.assertEqual(self._claves("matematcas", umbral=0.9), [])
+
+    def test_quitar_y_volver_a_agregar(self):
+        self.indice.quitar(2)
+        self.indice.quitar(99)
+        self.assertEqual(self._claves("fisica"), [4])
+        self.indice.agregar(4, "Gimnasia")
+        self.assertEqual(self._claves("fisica"), [])
+        self.assertEqual(self._claves("gimnasia"), [4])
+        # Ningún trigrama queda apuntando a una clave vieja
+        self.assertNotIn(" fi", self.indice._claves_por_trigrama)
+        self.indice.limpiar()
+        self.assertEqual(len(self.indice), 0)
+        self.assertEqual(self._claves("gimnasia"), [])
+
+class PruebaMateriasParecidas(CasoConInquilino):
+
+    def test_busca_en_el_catalogo(self):
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("ingl"), [6])
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("biolgia"), [13])
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("fi", limite=2), [11, 4])
+
+    def test_sigue_los_cambios_del_catalogo(self):
+        numero = gestor_materias.crear_materia("Programación")
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("programacion"), [numero])
+        gestor_materias.renombrar_materia(numero, "Robotica")
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("programacion"), [])
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("robotca"), [numero])
+        gestor_materias.eliminar_materia_por_numero(numero)
+        self.assertEqual(gestor_materias.buscar_materias_parecidas("robotica"), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+MÓDULO DE TRIGRAMAS
+Índice de trigramas para buscar textos parecidos (tolerante a errores)
+
+UTILIDAD:
+Permite encontrar "Matematicas" escribiendo "matematica" o "matematcas", e
+"Ingles" escribiendo "ingl". Cada texto se parte en trigramas (grupos de 3
+letras seguidas, con espacios de relleno al principio y al final de cada
+palabra) y el índice guarda, para cada trigrama, qué claves lo contienen:
+
+    "ingles" -> "  i", " in", "ing", "ngl", "gle", "les", "es "
+
+Al buscar solo se miran las claves que comparten al menos un trigrama con el
+texto buscado, así el costo depende de cuántas se parecen y no del total.
+
+PUNTAJE (de 0 a 1):
+- 1.0 si el texto normalizado es igual
+- entre 0.9 y 1.0 si está contenido en el nombre (más alto cuanto más cubre)
+- si no, la similitud de trigramas: compartidos / (total de ambos - compartidos)
+
+DEPENDENCIAS:
+- herramientas.py: Necesita normalizar_texto() para ignorar mayúsculas y acentos
+
+¿POR QUÉ UN MÓDULO APARTE?
+- No conoce materias ni tareas: cualquier catálogo de textos puede usarlo
+"""
+
+# Importa la normalización de textos
+from herramientas import normalizar_texto
+
+# Similitud mínima para considerar que dos textos se parecen
+UMBRAL_SIMILITUD = 0.3
+# Textos más cortos que esto no tienen trigramas útiles: se comparan uno por uno
+LARGO_MINIMO_TRIGRAMAS = 3
+
+def trigramas(texto):
+    """Devuelve el conjunto de trigramas de un texto ya normalizado"""
+    resultado = set()
+    for palabra in texto.split():
+        # Relleno estilo pg_trgm: dos espacios al principio y uno al final
+        relleno = f"  {palabra} "
+        for inicio in range(len(relleno) - 2):
+            resultado.add(relleno[inicio:inicio + 3])
+    return resultado
+
+def _puntaje(buscado, cantidad_buscado, texto, cantidad_texto, compartidos):
+    """Calcula qué tanto se parece el texto buscado a un texto del índice
+
+    Recibe solo las cantidades de trigramas (y cuántos comparten) para no
+    tener que intersectar conjuntos por cada candidato.
+    """
+    if buscado == texto:
+        return 1.0
+    if buscado in texto:
+        # Contenido: siempre por encima de cualquier parecido por trigramas
+        return 0.9 + 0.1 * len(buscado) / len(texto)
+    total = cantidad_buscado + cantidad_texto - compartidos
+    return compartidos / total if total else 0.0
+
+class IndiceTrigramas:
+    """Índice {trigrama: set(claves)} sobre textos asociados a una clave"""
+
+    def __init__(self):
+        """Crea un índice vacío"""
+        # Conjunto de claves de cada trigrama
+        self._claves_por_trigrama = {}
+        # Texto normalizado y trigramas de cada clave {clave: (texto, trigramas)}
+        self._textos = {}
+
+    def __len__(self):
+        """Cantidad de claves indexadas"""
+        return len(self._textos)
+
+    def agregar(self, clave, texto):
+        """Indexa (o vuelve a indexar) el texto de una clave"""
+        self.quitar(clave)
+        normalizado = normalizar_texto(texto)
+        conjunto = trigramas(normalizado)
+        self._textos[clave] = (normalizado, conjunto)
+        for trigrama in conjunto:
+            self._claves_por_trigrama.setdefault(trigrama, set()).add(clave)
+
+    def quitar(self, clave):
+        """Quita una clave del índice (no hace nada si no estaba)"""
+        dato = self._textos.pop(clave, None)
+        if dato is None:
+            return
+        for trigrama in dato[1]:
+            claves = self._claves_por_trigrama.get(trigrama)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._claves_por_trigrama[trigrama]
+
+    def limpiar(self):
+        """Vacía el índice"""
+        self._claves_por_trigrama.clear()
+        self._textos.clear()
+
+    def buscar(self, texto, limite=None, umbral=UMBRAL_SIMILITUD):
+        """Busca las claves cuyo texto se parece al buscado
+
+        Args:
+            texto: Texto a buscar (sin normalizar)
+            limite: Cantidad máxima de resultados (None = todos)
+            umbral: Puntaje mínimo para incluir un resultado
+
+        Returns:
+            Lista de (clave, puntaje) ordenada del más parecido al menos parecido
+        """
+        buscado = normalizar_texto(texto)
+        if not buscado:
+            return []
+        conjunto = trigramas(buscado)
+
+        # Trigramas compartidos por cada candidata {clave: cantidad}
+        if len(buscado) < LARGO_MINIMO_TRIGRAMAS:
+            # Una o dos letras: solo tiene sentido buscarlas como contenido
+            compartidos = {clave: 0 for clave, (normalizado, _) in self._textos.items()
+                           if buscado in normalizado}
+        else:
+            # Solo las claves que comparten algún trigrama con lo buscado
+            compartidos = {}
+            for trigrama in conjunto:
+                for clave in self._claves_por_trigrama.get(trigrama, ()):
+                    compartidos[clave] = compartidos.get(clave, 0) + 1
+
+        resultados = []
+        for clave, cantidad in compartidos.items():
+            normalizado, trigramas_clave = self._textos[clave]
+            puntaje = _puntaje(buscado, len(conjunto), normalizado,
+                               len(trigramas_clave), cantidad)
+            if puntaje >= umbral:
+                resultados.append((clave, puntaje))
+
+        # Más parecidos primero; a igual puntaje, por clave para que sea estable
+        resultados.sort(key=lambda par: (-par[1], par[0]))
+        return resultados[:limite] if limite is not None else resultados